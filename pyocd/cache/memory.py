@@ -15,7 +15,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from intervaltree import (Interval, IntervalTree)
+from collections import OrderedDict
 import logging
 
 from ..utility import conversion
@@ -24,14 +24,39 @@ from ..core.exceptions import TransferFaultError
 
 LOG = logging.getLogger(__name__)
 
+class _CacheLine(object):
+    """@brief One line of cached memory.
+
+    The line's data is stored in a bytearray of the cache line size. The @a valid attribute is an
+    integer used as a bitmask, with bit n set if byte n of the line holds cached data.
+    """
+
+    __slots__ = ('data', 'valid', 'invalidate_on_run')
+
+    def __init__(self, size, invalidate_on_run):
+        self.data = bytearray(size)
+        self.valid = 0
+        self.invalidate_on_run = invalidate_on_run
+
 class MemoryCache(object):
     """@brief Memory cache.
 
     Maintains a cache of target memory. The constructor is passed a backing DebugContext object that
     will be used to fill the cache.
 
+    Cached data is stored in fixed size, line aligned blocks. Each line tracks which of its bytes are
+    valid, so adjacent reads and writes naturally coalesce into the same storage. Lines are kept in
+    least recently used order, and the oldest lines are evicted when the total size of cached lines
+    exceeds the size limit.
+
+    When read-ahead is enabled, reads that miss the cache are extended to cover the whole of each
+    cache line touched by the read (clipped to the containing memory region). Small sequential reads,
+    such as the many small memory reads gdb issues while walking the stack, then hit the cache. If
+    the extended read fails, the exact requested range is read instead.
+
     The cache is invalidated whenever the target has run since the last cache operation (based on run
-    tokens). If the target is currently running, all accesses cause the cache to be invalidated.
+    tokens). If the target is currently running, all accesses cause the cache to be invalidated. Lines
+    belonging to a region whose `invalidate_cache_on_run` attribute is false are retained across runs.
 
     The target's memory map is referenced. All memory accesses must be fully contained within a single
     memory region, or a TransferFaultError will be raised. However, if an access is outside of all regions,
@@ -39,84 +64,46 @@ class MemoryCache(object):
     region's cacheability flag is honoured.
     """
 
-    def __init__(self, context, core):
+    ## Size in bytes of a cache line. Must be a power of two.
+    LINE_SIZE = 256
+
+    ## Default limit on the total size of cached lines.
+    DEFAULT_SIZE_LIMIT = 4 * 1024 * 1024
+
+    def __init__(self, context, core, size_limit=DEFAULT_SIZE_LIMIT, read_ahead=True):
         self._context = context
         self._core = core
+        self._size_limit = size_limit
+        self._read_ahead = read_ahead
+        self._max_lines = max(1, size_limit // self.LINE_SIZE)
         self._run_token = -1
+        self._lines = OrderedDict()
         self._reset_cache()
 
-    def _reset_cache(self):
-        self._cache = IntervalTree()
+    def _reset_cache(self, run_invalidate_only=False):
+        """@brief Drop cached lines.
+        @param self
+        @param run_invalidate_only If true, only lines from regions that are invalidated when the target
+            runs are dropped. Otherwise the whole cache is cleared.
+        """
+        if run_invalidate_only:
+            for base in [base for base, line in self._lines.items() if line.invalidate_on_run]:
+                del self._lines[base]
+        else:
+            self._lines.clear()
         self._metrics = CacheMetrics()
 
     def _check_cache(self):
         """@brief Invalidates the cache if appropriate."""
         if self._core.is_running():
             LOG.debug("core is running; invalidating cache")
-            self._reset_cache()
+            self._reset_cache(run_invalidate_only=True)
         elif self._run_token != self._core.run_token:
             self._dump_metrics()
             LOG.debug("out of date run token; invalidating cache")
-            self._reset_cache()
+            self._reset_cache(run_invalidate_only=True)
             self._run_token = self._core.run_token
 
-    def _get_ranges(self, addr, count):
-        """@brief Splits a memory address range into cached and uncached subranges.
-        @return Returns a 2-tuple with the first element being a set of Interval objects for each
-          of the cached subranges. The second element is a set of Interval objects for each of the
-          non-cached subranges.
-        """
-        cached = self._cache.overlap(addr, addr + count)
-        uncached = {Interval(addr, addr + count)}
-        for cachedIv in cached:
-            newUncachedSet = set()
-            for uncachedIv in uncached:
-
-                # No overlap.
-                if cachedIv.end < uncachedIv.begin or cachedIv.begin > uncachedIv.end:
-                    newUncachedSet.add(uncachedIv)
-                    continue
-
-                # Begin segment.
-                if cachedIv.begin - uncachedIv.begin > 0:
-                    newUncachedSet.add(Interval(uncachedIv.begin, cachedIv.begin))
-
-                # End segment.
-                if uncachedIv.end - cachedIv.end > 0:
-                    newUncachedSet.add(Interval(cachedIv.end, uncachedIv.end))
-            uncached = newUncachedSet
-        return cached, uncached
-
-    def _read_uncached(self, uncached):
-        """"@brief Reads uncached memory ranges and updates the cache.
-        @return A list of Interval objects is returned. Each Interval has its @a data attribute set
-          to a bytearray of the data read from target memory.
-        """
-        uncachedData = []
-        for uncachedIv in uncached:
-            data = self._context.read_memory_block8(uncachedIv.begin, uncachedIv.end - uncachedIv.begin)
-            iv = Interval(uncachedIv.begin, uncachedIv.end, bytearray(data))
-            self._cache.add(iv) # TODO merge contiguous cached intervals
-            uncachedData.append(iv)
-        return uncachedData
-
-    def _update_metrics(self, cached, uncached, addr, size):
-        cachedSize = 0
-        for iv in cached:
-            begin = iv.begin
-            end = iv.end
-            if iv.begin < addr:
-                begin = addr
-            if iv.end > addr + size:
-                end = addr + size
-            cachedSize += end - begin
-
-        uncachedSize = sum((iv.end - iv.begin) for iv in uncached)
-
-        self._metrics.reads += 1
-        self._metrics.hits += cachedSize
-        self._metrics.misses += uncachedSize
-
     def _dump_metrics(self):
         if self._metrics.total > 0:
             LOG.debug("%d reads, %d bytes [%d%% hits, %d bytes]; %d bytes written",
@@ -125,112 +112,147 @@ class MemoryCache(object):
         else:
             LOG.debug("no reads")
 
-    def _read(self, addr, size):
-        """@brief Performs a cached read operation of an address range.
-        @return A list of Interval objects sorted by address.
+    def _line_ranges(self, addr, size):
+        """@brief Generator splitting an address range by cache line.
+        @return Yields 3-tuples of line base address, start offset within the line, and end offset.
         """
-        # Get the cached and uncached subranges of the requested read.
-        cached, uncached = self._get_ranges(addr, size)
-        self._update_metrics(cached, uncached, addr, size)
-
-        # Read any uncached ranges.
-        uncachedData = self._read_uncached(uncached)
-
-        # Merged cached with data we just read
-        combined = list(cached) + uncachedData
-        combined.sort(key=lambda x: x.begin)
-        return combined
-
-    def _merge_data(self, combined, addr, size):
-        """@brief Extracts data from the intersection of an address range across a list of interval objects.
+        end = addr + size
+        while addr < end:
+            base = addr & ~(self.LINE_SIZE - 1)
+            line_end = min(base + self.LINE_SIZE, end)
+            yield base, addr - base, line_end - base
+            addr = line_end
+
+    def _is_cached(self, addr, size):
+        """@brief Returns whether the entire address range is held in the cache."""
+        for base, begin, end in self._line_ranges(addr, size):
+            line = self._lines.get(base)
+            mask = ((1 << (end - begin)) - 1) << begin
+            if line is None or (line.valid & mask) != mask:
+                return False
+        return True
+
+    def _get_uncached(self, addr, size):
+        """@brief Computes the uncached subranges of an address range.
+        @return List of (start, end) address tuples for each uncached subrange, sorted by address and
+            with adjacent subranges merged.
+        """
+        uncached = []
+        for base, begin, end in self._line_ranges(addr, size):
+            line = self._lines.get(base)
+            mask = ((1 << (end - begin)) - 1) << begin
+            missing = mask if line is None else (mask & ~line.valid)
+
+            # Extract runs of set bits from the missing mask.
+            while missing:
+                start = (missing & -missing).bit_length() - 1
+                shifted = missing >> start
+                length = (shifted ^ (shifted + 1)).bit_length() - 1
+                missing &= ~(((1 << length) - 1) << start)
+
+                run_start = base + start
+                run_end = run_start + length
+                if uncached and uncached[-1][1] == run_start:
+                    uncached[-1] = (uncached[-1][0], run_end)
+                else:
+                    uncached.append((run_start, run_end))
+        return uncached
+
+    def _store(self, addr, data, region):
+        """@brief Copy data into the cache, allocating lines as required."""
+        view = memoryview(data)
+        offset = 0
+        for base, begin, end in self._line_ranges(addr, len(data)):
+            line = self._lines.get(base)
+            if line is None:
+                line = _CacheLine(self.LINE_SIZE, region.invalidate_cache_on_run)
+                self._lines[base] = line
+            else:
+                # A line can span more than one region. It must be invalidated on run if any of
+                # its data comes from a region that is.
+                line.invalidate_on_run = line.invalidate_on_run or region.invalidate_cache_on_run
+                self._lines.move_to_end(base)
+            length = end - begin
+            line.data[begin:end] = view[offset:offset + length]
+            line.valid |= ((1 << length) - 1) << begin
+            offset += length
+
+        # Evict least recently used lines.
+        while len(self._lines) > self._max_lines:
+            self._lines.popitem(last=False)
+
+    def _read_uncached(self, uncached, region):
+        """@brief Reads uncached memory ranges and updates the cache."""
+        for begin, end in uncached:
+            if self._read_ahead:
+                # Extend the read to whole cache lines, clipped to the region.
+                ahead_begin = max(begin & ~(self.LINE_SIZE - 1), region.start)
+                ahead_end = min((end + self.LINE_SIZE - 1) & ~(self.LINE_SIZE - 1), region.end + 1)
+                ranges = self._get_uncached(ahead_begin, ahead_end - ahead_begin)
+                try:
+                    for ahead_range_begin, ahead_range_end in ranges:
+                        data = self._context.read_memory_block_bytes(ahead_range_begin,
+                                ahead_range_end - ahead_range_begin)
+                        self._store(ahead_range_begin, data, region)
+                    continue
+                except TransferFaultError as err:
+                    LOG.debug("read-ahead of [%x:%x] failed (%s); reading requested range only",
+                            ahead_begin, ahead_end, err)
 
-        The range represented by @a addr and @a size are assumed to overlap the intervals. The first
-        and last interval in the list may have ragged edges not fully contained in the address range, in
-        which case the correct slice of those intervals is extracted.
+            data = self._context.read_memory_block_bytes(begin, end - begin)
+            self._store(begin, data, region)
 
-        @param self
-        @param combined List of Interval objects forming a contiguous range. The @a data attribute of
-          each interval must be a bytearray.
-        @param addr Start address. Must be within the range of the first interval.
-        @param size Number of bytes. (@a addr + @a size) must be within the range of the last interval.
-        @return A single bytearray object with all data from the intervals that intersects the address
-          range.
+    def _read(self, addr, size, region):
+        """@brief Performs a cached read operation of an address range.
+        @return A bytearray containing the requested data.
         """
-        result = bytearray()
-        resultAppend = bytearray()
-
-        # Check for fully contained subrange.
-        if len(combined) and combined[0].begin < addr and combined[0].end > addr + size:
-            offset = addr - combined[0].begin
-            endOffset = offset + size
-            result = combined[0].data[offset:endOffset]
-            return result
-
-        # Take slice of leading ragged edge.
-        if len(combined) and combined[0].begin < addr:
-            offset = addr - combined[0].begin
-            result += combined[0].data[offset:]
-            combined = combined[1:]
-        # Take slice of trailing ragged edge.
-        if len(combined) and combined[-1].end > addr + size:
-            offset = addr + size - combined[-1].begin
-            resultAppend = combined[-1].data[:offset]
-            combined = combined[:-1]
-
-        # Merge.
-        for iv in combined:
-            result += iv.data
-        result += resultAppend
-
+        # Get the uncached subranges of the requested read and fill them.
+        uncached = self._get_uncached(addr, size)
+        uncached_size = sum((end - begin) for begin, end in uncached)
+        self._metrics.reads += 1
+        self._metrics.hits += size - uncached_size
+        self._metrics.misses += uncached_size
+        self._read_uncached(uncached, region)
+
+        # Extract data from the cache lines. The lines just filled will not have been evicted
+        # unless the read is larger than the cache size limit, in which case fall back to
+        # a direct read.
+        result = bytearray(size)
+        offset = 0
+        for base, begin, end in self._line_ranges(addr, size):
+            line = self._lines.get(base)
+            mask = ((1 << (end - begin)) - 1) << begin
+            if line is None or (line.valid & mask) != mask:
+                LOG.debug("read [%x:%x] exceeds the cache size; reading directly", addr, addr + size)
+                return self._context.read_memory_block_bytes(addr, size)
+            self._lines.move_to_end(base)
+            result[offset:offset + end - begin] = line.data[begin:end]
+            offset += end - begin
         return result
 
-    def _update_contiguous(self, cached, addr, value):
-        size = len(value)
-        end = addr + size
-        leadBegin = addr
-        leadData = bytearray()
-        trailData = bytearray()
-        trailEnd = end
-
-        if cached[0].begin < addr and cached[0].end > addr:
-            offset = addr - cached[0].begin
-            leadData = cached[0].data[:offset]
-            leadBegin = cached[0].begin
-        if cached[-1].begin < end and cached[-1].end > end:
-            offset = end - cached[-1].begin
-            trailData = cached[-1].data[offset:]
-            trailEnd = cached[-1].end
-
-        self._cache.remove_overlap(addr, end)
-
-        data = leadData + value + trailData
-        self._cache.addi(leadBegin, trailEnd, data)
-
-    def _check_regions(self, addr, count):
-        """@return A bool indicating whether the given address range is fully contained within
-              one known memory region, and that region is cacheable.
+    def _get_region(self, addr, count):
+        """@return The memory region containing the address range if it is cacheable, otherwise None.
         @exception TransferFaultError Raised if the access is not entirely contained within a single region.
         """
         regions = self._core.memory_map.get_intersecting_regions(addr, length=count)
 
         # If no regions matched, then allow an uncached operation.
         if len(regions) == 0:
-            return False
+            return None
 
         # Raise if not fully contained within one region.
         if len(regions) > 1 or not regions[0].contains_range(addr, length=count):
             raise TransferFaultError("individual memory accesses must not cross memory region boundaries")
 
-        # Otherwise return whether the region is cacheable.
-        return regions[0].is_cacheable
+        # Otherwise return the region if it is cacheable.
+        return regions[0] if regions[0].is_cacheable else None
 
     def read_memory(self, addr, transfer_size=32, now=True):
-        # TODO use more optimal underlying read_memory calls
+        data = self.read_memory_block_bytes(addr, transfer_size // 8)
         if transfer_size == 8:
-            data = self.read_memory_block8(addr, 1)[0]
+            data = data[0]
         else:
-            data = conversion.byte_list_to_nbit_le_list(self.read_memory_block8(addr, transfer_size // 8),
-                    transfer_size)[0]
+            data = int.from_bytes(data, 'little')
 
         if now:
             return data
@@ -239,70 +261,54 @@ class MemoryCache(object):
                 return data
             return read_cb
 
-    def read_memory_block8(self, addr, size):
+    def read_memory_block_bytes(self, addr, size):
         if size <= 0:
-            return []
+            return bytearray()
 
         self._check_cache()
 
         # Validate memory regions.
-        if not self._check_regions(addr, size):
+        region = self._get_region(addr, size)
+        if region is None:
             LOG.debug("range [%x:%x] is not cacheable", addr, addr+size)
-            return self._context.read_memory_block8(addr, size)
-
-        # Get the cached and uncached subranges of the requested read.
-        combined = self._read(addr, size)
+            return self._context.read_memory_block_bytes(addr, size)
 
-        # Extract data out of combined intervals.
-        result = list(self._merge_data(combined, addr, size))
+        result = self._read(addr, size, region)
         assert len(result) == size, "result size ({}) != requested size ({})".format(len(result), size)
         return result
 
+    def read_memory_block8(self, addr, size):
+        return list(self.read_memory_block_bytes(addr, size))
+
     def read_memory_block32(self, addr, size):
-        return conversion.byte_list_to_u32le_list(self.read_memory_block8(addr, size*4))
+        return conversion.bytes_to_u32le_list(self.read_memory_block_bytes(addr, size*4))
 
     def write_memory(self, addr, value, transfer_size=32):
-        if transfer_size == 8:
-            return self.write_memory_block8(addr, [value])
-        else:
-            return self.write_memory_block8(addr, conversion.nbit_le_list_to_byte_list([value], transfer_size))
+        return self.write_memory_block_bytes(addr, value.to_bytes(transfer_size // 8, 'little'))
 
-    def write_memory_block8(self, addr, value):
+    def write_memory_block_bytes(self, addr, value):
         if len(value) <= 0:
             return
 
         self._check_cache()
 
         # Validate memory regions.
-        cacheable = self._check_regions(addr, len(value))
+        region = self._get_region(addr, len(value))
 
         # Write to the target first, so if it fails we don't update the cache.
-        result = self._context.write_memory_block8(addr, value)
-
-        if cacheable:
-            size = len(value)
-            end = addr + size
-            cached = sorted(self._cache.overlap(addr, end), key=lambda x:x.begin)
-            self._metrics.writes += size
+        result = self._context.write_memory_block_bytes(addr, value)
 
-            if len(cached):
-                # Write data is entirely within a single cached interval.
-                if addr >= cached[0].begin and end <= cached[0].end:
-                    beginOffset = addr - cached[0].begin
-                    endOffset = beginOffset + size
-                    cached[0].data[beginOffset:endOffset] = value
-
-                else:
-                    self._update_contiguous(cached, addr, bytearray(value))
-            else:
-                # No cached data in this range, so just add the entire interval.
-                self._cache.addi(addr, end, bytearray(value))
+        if region is not None:
+            self._metrics.writes += len(value)
+            self._store(addr, value, region)
 
         return result
 
+    def write_memory_block8(self, addr, value):
+        return self.write_memory_block_bytes(addr, bytes(value))
+
     def write_memory_block32(self, addr, data):
-        return self.write_memory_block8(addr, conversion.u32le_list_to_byte_list(data))
+        return self.write_memory_block_bytes(addr, conversion.u32le_list_to_bytes(data))
 
     def invalidate(self):
         self._reset_cache()
-
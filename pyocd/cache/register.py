@@ -147,13 +147,13 @@ class RegisterCache(object):
                 self._cache[r] = v & CortexMCoreRegisterInfo.get(r).psr_mask
 
         # Build the results list in the same order as requested registers.
+        read_values = dict(zip(read_list, values))
         results = []
         for r in reg_list:
             if r in cached_set:
                 results.append(self._cache[r])
             else:
-                i = read_list.index(r)
-                v = values[i]
+                v = read_values[r]
                 results.append(v)
                 self._cache[r] = v
 
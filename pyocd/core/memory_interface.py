@@ -15,7 +15,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import (Callable, Sequence, Union, cast, overload)
+from typing import (Callable, List, Sequence, Tuple, Union, cast, overload)
 from typing_extensions import Literal
 
 from ..utility import conversion
@@ -234,3 +234,37 @@ class MemoryInterface:
         if (size > 0):
             self.write8(addr, data[idx])
 
+    def read_memory_block_bytes(self, addr: int, size: int) -> bytearray:
+        """@brief Read a block of unaligned bytes in memory.
+
+        This is a bytes-native alternative to read_memory_block8(). Memory interfaces that are able
+        to transfer data without converting to and from lists of integers should override this method.
+        The default implementation simply converts the result of read_memory_block8().
+
+        @return A bytearray of length _size_.
+        """
+        return bytearray(self.read_memory_block8(addr, size))
+
+    def read_memory_blocks_bytes(self, blocks: Sequence[Tuple[int, int]]) -> List[bytearray]:
+        """@brief Read several separate blocks of unaligned bytes in memory.
+
+        Memory interfaces that are able to pipeline the reads of separate blocks should override this
+        method. The default implementation reads each block in turn with read_memory_block_bytes().
+
+        @param blocks Sequence of (address, size) tuples.
+        @return List of bytearrays holding the data of each block, in the same order as _blocks_.
+        """
+        return [self.read_memory_block_bytes(addr, size) for addr, size in blocks]
+
+    def write_memory_block_bytes(self, addr: int, data: Union[bytes, bytearray, memoryview]) -> None:
+        """@brief Write a block of unaligned bytes in memory.
+
+        This is a bytes-native alternative to write_memory_block8(). Memory interfaces that are able
+        to transfer data without converting to and from lists of integers should override this method.
+        The default implementation passes the data to write_memory_block8().
+
+        @param addr Start address of the write.
+        @param data Any bytes-like object.
+        """
+        self.write_memory_block8(addr, list(data))
+
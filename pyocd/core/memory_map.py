@@ -15,6 +15,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from bisect import (bisect_left, bisect_right)
 from enum import Enum
 import collections.abc
 import copy
@@ -561,6 +562,8 @@ class FlashRegion(MemoryRegion):
         @retval False At least one byte in d did not match the erased byte value.
         """
         erased_byte = self.erased_byte_value
+        if isinstance(d, (bytes, bytearray)):
+            return d.count(erased_byte) == len(d)
         for b in d:
             if b != erased_byte:
                 return False
@@ -646,6 +649,8 @@ class MemoryMap(MemoryRangeBase, collections.abc.Sequence):
     """
 
     _regions: List[MemoryRegion]
+    _region_starts: List[int]
+    _region_max_ends: List[int]
     _region_validator: Callable[[MemoryRegion], bool]
 
     def __init__(
@@ -676,6 +681,8 @@ class MemoryMap(MemoryRangeBase, collections.abc.Sequence):
             length=kwargs.get('length')
         )
         self._regions = []
+        self._region_starts = []
+        self._region_max_ends = []
         self._region_validator = kwargs.get('region_validator', lambda r: True)
         self.add_regions(*more_regions)
 
@@ -757,6 +764,7 @@ class MemoryMap(MemoryRangeBase, collections.abc.Sequence):
         new_region.map = self
         self._regions.append(new_region)
         self._regions.sort()
+        self._update_index()
 
     def remove_region(self, region: MemoryRegion) -> None:
         """@brief Removes a memory region from the map.
@@ -767,6 +775,40 @@ class MemoryMap(MemoryRangeBase, collections.abc.Sequence):
         for i, r in enumerate(self._regions):
             if r is region:
                 del self._regions[i]
+        self._update_index()
+
+    def set_region_bounds(self, region: MemoryRegion, start: int, end: int) -> None:
+        """@brief Change the start and end addresses of a region in the map.
+
+        Region bounds are normally fixed once the region is created. This method is for the few
+        cases where a region's final bounds are only known after it has been added to the map, such
+        as a flash region whose size comes from its flash algorithm. The region list is resorted
+        and the address lookup index rebuilt.
+
+        @param self
+        @param region The region to modify. It must be the exact region object in the map.
+        @param start New start address of the region.
+        @param end New end address of the region, inclusive.
+        """
+        assert end >= (start - 1)
+        region._start = start
+        region._end = end
+        self._regions.sort()
+        self._update_index()
+
+    def _update_index(self) -> None:
+        """@brief Rebuild the address lookup index from the sorted region list.
+
+        The index holds the start address of each region and the running maximum of region end
+        addresses. Both lists are non-decreasing, so address lookups can bisect them even when
+        regions overlap.
+        """
+        self._region_starts = [r.start for r in self._regions]
+        self._region_max_ends = []
+        max_end = -1
+        for r in self._regions:
+            max_end = max(max_end, r.end)
+            self._region_max_ends.append(max_end)
 
     def get_boot_memory(self) -> Optional[MemoryRegion]:
         """@brief Returns the first region marked as boot memory.
@@ -786,9 +828,12 @@ class MemoryMap(MemoryRangeBase, collections.abc.Sequence):
         @param address An integer target address.
         @return MemoryRegion or None.
         """
-        for r in self._regions:
-            if r.contains_address(address):
-                return r
+        # Only regions before this index start at or below the address.
+        count = bisect_right(self._region_starts, address)
+        # The first of those regions that extends to the address is the first containing it.
+        index = bisect_left(self._region_max_ends, address, 0, count)
+        if index < count:
+            return self._regions[index]
         return None
 
     def is_valid_address(self, address: int) -> bool:
@@ -28,6 +28,9 @@ class OptionInfo(NamedTuple):
 ## @brief Definitions of the builtin options.
 BUILTIN_OPTIONS = [
     # Common options
+    OptionInfo('adi.v5.discovery_cache_dir', str, None,
+        "Directory in which to cache the results of ADIv5 AP scans and ROM table parsing. Caching is disabled "
+        "if not set."),
     OptionInfo('adi.v5.max_invalid_ap_count', int, 3,
         "If this number of invalid APs is found in a row, then AP scanning will stop. The 'scan_all_aps' option "
         "takes precedence over this option if set."),
@@ -39,6 +42,12 @@ BUILTIN_OPTIONS = [
         "Enable the memory read cache. Default is enabled."),
     OptionInfo('cache.enable_register', bool, True,
         "Enable the core register cache. Default is enabled."),
+    OptionInfo('cache.memory_read_ahead', bool, True,
+        "Extend memory cache misses to whole cache lines within the containing memory region. Default is "
+        "enabled."),
+    OptionInfo('cache.memory_size_limit', int, 4 * 1024 * 1024,
+        "Maximum number of bytes held by the memory cache before least recently used data is evicted. "
+        "Default is 4 MiB."),
     OptionInfo('cache.read_code_from_elf', bool, True,
         "Controls whether reads of code sections will be taken from an attached ELF file instead of the "
         "target memory."),
@@ -56,6 +65,11 @@ BUILTIN_OPTIONS = [
         "One of 'halt', 'pre-reset', 'under-reset', 'attach'. Default is 'halt'."),
     OptionInfo('cpu.step.instruction.timeout', float, 0.0,
         "Timeout in seconds for instruction step operations. Defaults to 0, or no timeout."),
+    OptionInfo('cpu.step.range.breakpoint_min_size', int, 0,
+        "Minimum size in bytes of a range step for which the core is run to temporary hardware breakpoints "
+        "set on the range's exits, instead of stepping each instruction. Requires the capstone package. "
+        "Exception handlers entered while running are not stopped in. Defaults to 0, which disables the use "
+        "of breakpoints."),
     OptionInfo('dap_protocol', str, 'default',
         "Wire protocol, either 'swd', 'jtag', or 'default'."),
     OptionInfo('dap_swj_enable', bool, True,
@@ -66,6 +80,9 @@ BUILTIN_OPTIONS = [
         "Log details of loaded .FLM flash algos."),
     OptionInfo('debug.traceback', bool, False,
         "Print tracebacks for exceptions."),
+    OptionInfo('elf.index_cache_dir', str, None,
+        "Directory in which to cache the symbol and line number indices of ELF files with a build ID. "
+        "Caching is disabled if not set."),
     OptionInfo('enable_multicore_debug', bool, False,
         "Whether to put pyOCD into multicore debug mode. Doing so changes the default software reset type of "
         "secondary cores to VECTRESET, or emulated reset if that is not supported (i.e., non-v7-M cores)."),
@@ -140,6 +157,10 @@ BUILTIN_OPTIONS = [
         "If set to True, the flash loader will attempt to not program pages whose contents are not "
         "going to change by scanning target flash memory. A value of False will force all pages to "
         "be erased and programmed. Default is True."),
+    OptionInfo('svd.cache', bool, False,
+        "Cache parsed SVD files so later sessions can skip parsing the XML. Default is False."),
+    OptionInfo('svd.cache_dir', str, None,
+        "Directory used for the SVD cache. Defaults to pyocd/svd within the user's cache directory."),
     OptionInfo('target_override', str, None,
         "Name of target to use instead of default."),
     OptionInfo('test_binary', str, None,
@@ -160,6 +181,13 @@ BUILTIN_OPTIONS = [
         "Duration in seconds that a failed target status check will be retried before an error is raised. "
         "Only applies while the target is running after a resume operation in the debugger and pyOCD is waiting "
         "for it to halt again."),
+    OptionInfo('debug.status_poll.max_interval', float, 0.02,
+        "Maximum interval in seconds between checks of the target's state while it is running after a resume "
+        "operation in the debugger. The interval starts at debug.status_poll.min_interval and doubles after each "
+        "check that finds the target still running, up to this value. Default is 0.02 seconds."),
+    OptionInfo('debug.status_poll.min_interval', float, 0.001,
+        "Interval in seconds between checks of the target's state right after a resume operation in the debugger. "
+        "Default is 0.001 seconds."),
     OptionInfo('gdbserver_port', int, 3333,
         "Base TCP port for the gdbserver."),
     OptionInfo('persist', bool, False,
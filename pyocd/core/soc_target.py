@@ -16,7 +16,7 @@
 # limitations under the License.
 
 import logging
-from typing import (Callable, Dict, List, Optional, overload, Sequence, Union, TYPE_CHECKING)
+from typing import (Callable, Dict, List, Optional, overload, Sequence, Tuple, Union, TYPE_CHECKING)
 from typing_extensions import Literal
 
 from .target import (Target, TargetGraphNode)
@@ -121,7 +121,8 @@ class SoCTarget(TargetGraphNode):
         if filename is None:
             self._elf = None
         else:
-            self._elf = ELFBinaryFile(filename, self.memory_map)
+            self._elf = ELFBinaryFile(filename, self.memory_map,
+                    cache_dir=self.session.options.get('elf.index_cache_dir'))
             for core_number in range(len(self.cores)):
                 self.cores[core_number].elf = self._elf
                 if self.session.options['cache.read_code_from_elf']:
@@ -144,6 +145,8 @@ class SoCTarget(TargetGraphNode):
                 core,
                 enable_memory=self.session.options['cache.enable_memory'],
                 enable_register=self.session.options['cache.enable_register'],
+                memory_size_limit=self.session.options['cache.memory_size_limit'],
+                memory_read_ahead=self.session.options['cache.memory_read_ahead'],
                 )
         core.set_target_context(ctx)
         self.cores[core.core_number] = core
@@ -200,6 +203,10 @@ class SoCTarget(TargetGraphNode):
     def resume(self) -> None:
         return self.selected_core_or_raise.resume()
 
+    def resume_with_registers(self, reg_list: Sequence["CoreRegisterNameOrNumberType"],
+            data_list: Sequence[int]) -> None:
+        return self.selected_core_or_raise.resume_with_registers(reg_list, data_list)
+
     def mass_erase(self) -> None:
         if not self.call_delegate('mass_erase', target=self):
             # The default mass erase implementation is to simply perform a chip erase.
@@ -241,6 +248,15 @@ class SoCTarget(TargetGraphNode):
     def read_memory_block32(self, addr: int, size: int) -> Sequence[int]:
         return self.selected_core_or_raise.read_memory_block32(addr, size)
 
+    def write_memory_block_bytes(self, addr: int, data: Union[bytes, bytearray, memoryview]) -> None:
+        return self.selected_core_or_raise.write_memory_block_bytes(addr, data)
+
+    def read_memory_block_bytes(self, addr: int, size: int) -> bytearray:
+        return self.selected_core_or_raise.read_memory_block_bytes(addr, size)
+
+    def read_memory_blocks_bytes(self, blocks: Sequence[Tuple[int, int]]) -> List[bytearray]:
+        return self.selected_core_or_raise.read_memory_blocks_bytes(blocks)
+
     def read_core_register(self, id: "CoreRegisterNameOrNumberType") -> "CoreRegisterValueType":
         return self.selected_core_or_raise.read_core_register(id)
 
@@ -293,6 +309,9 @@ class SoCTarget(TargetGraphNode):
     def get_state(self) -> Target.State:
         return self.selected_core_or_raise.get_state()
 
+    def get_state_deferred(self) -> Callable[[], Target.State]:
+        return self.selected_core_or_raise.get_state_deferred()
+
     def get_security_state(self) -> Target.SecurityState:
         return self.selected_core_or_raise.get_security_state()
 
@@ -242,6 +242,16 @@ class Target(MemoryInterface, DelegateHavingMixIn):
     def resume(self) -> None:
         raise NotImplementedError()
 
+    def resume_with_registers(self, reg_list: Sequence["CoreRegisterNameOrNumberType"],
+            data_list: Sequence[int]) -> None:
+        """@brief Write core registers and resume execution.
+
+        Targets that can queue the register writes together with resuming override this method. The
+        default implementation writes the registers and then calls resume().
+        """
+        self.write_core_registers_raw(reg_list, data_list)
+        self.resume()
+
     def mass_erase(self) -> None:
         raise NotImplementedError()
 
@@ -290,6 +300,18 @@ class Target(MemoryInterface, DelegateHavingMixIn):
     def get_state(self) -> State:
         raise NotImplementedError()
 
+    def get_state_deferred(self) -> Callable[[], State]:
+        """@brief Start reading the target's state.
+
+        Targets that can queue the state read with the probe override this method. The default
+        implementation reads the state immediately.
+
+        @return Callable that returns the target's state. It must be called even if the state is not
+            needed.
+        """
+        state = self.get_state()
+        return lambda: state
+
     def get_security_state(self) -> SecurityState:
         raise NotImplementedError()
 
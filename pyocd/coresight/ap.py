@@ -16,20 +16,24 @@
 # limitations under the License.
 
 import logging
+import struct
 from contextlib import contextmanager
 from functools import total_ordering
 from enum import Enum
-from typing import (Any, Callable, Dict, Generator, Optional, TYPE_CHECKING, Sequence, Set, Tuple, Type, Union, overload)
+from typing import (Any, Callable, Dict, Generator, List, Optional, TYPE_CHECKING, Sequence, Set, Tuple, Type,
+        Union, overload)
 from typing_extensions import Literal
 
 from ..core import (exceptions, memory_interface)
 from ..core.target import Target
+from ..utility import conversion
 from ..utility.concurrency import locked
 
 if TYPE_CHECKING:
     from types import TracebackType
     from ..core.core_target import CoreTarget
     from .dap import DebugPort
+    from .discovery_cache import RecordedReads
     from .rom_table import CoreSightComponentID
     from ..utility.notification import Notification
 
@@ -421,6 +425,8 @@ class AccessPort:
         self.rom_addr = 0
         self.has_rom_table = False
         self.rom_table = None
+        ## Cache through which ROM tables are read during discovery, if the discovery cache is enabled.
+        self.rom_table_reads: Optional["RecordedReads"] = None
         self.core: Optional["CoreTarget"] = None
         self._flags = flags
         self._cmpid = cmpid
@@ -610,11 +616,19 @@ class MEM_AP(AccessPort, memory_interface.MemoryInterface):
             self.read_memory_block32 = self._accelerated_read_memory_block32
             self.write_memory_block8 = self._accelerated_write_memory_block8
             self.read_memory_block8 = self._accelerated_read_memory_block8
+            self.write_memory_block_bytes = self._accelerated_write_memory_block_bytes
+            self.read_memory_block_bytes = self._accelerated_read_memory_block_bytes
+            self.read_memory_blocks_bytes = self._accelerated_read_memory_blocks_bytes
         else:
             self.write_memory = self._write_memory
             self.read_memory = self._read_memory
             self.write_memory_block32 = self._write_memory_block32
             self.read_memory_block32 = self._read_memory_block32
+            self.write_memory_block8 = self._write_memory_block8
+            self.read_memory_block8 = self._read_memory_block8
+            self.write_memory_block_bytes = self._write_memory_block_bytes
+            self.read_memory_block_bytes = self._read_memory_block_bytes
+            self.read_memory_blocks_bytes = self._read_memory_blocks_bytes
 
         # Subscribe to reset events.
         self.dp.session.subscribe(self._reset_did_occur, (Target.Event.PRE_RESET, Target.Event.POST_RESET))
@@ -1123,39 +1137,62 @@ class MEM_AP(AccessPort, memory_interface.MemoryInterface):
         else:
             return read_mem_cb
 
-    def _write_block32_page(self, addr: int, data: Sequence[int]) -> None:
+    def _write_block32_page(self, addr: int, data: memoryview) -> None:
         """@brief Write a single transaction's worth of aligned words.
 
         The transaction must not cross the MEM-AP's auto-increment boundary.
 
-        This method is not locked because it is only called by _write_memory_block32(), which is locked.
+        This method is not locked because it is only called by _write_aligned_bytes(), which is locked.
+
+        @param self
+        @param addr Word aligned start address.
+        @param data Bytes-like object containing little-endian words.
         """
         assert (addr & 0x3) == 0
         num = self.dp.next_access_number
         TRACE.debug("_write_block32:%06d (ap=0x%x; addr=0x%08x, size=%d) {",
-            num, self.address.nominal_address, addr, len(data))
+            num, self.address.nominal_address, addr, len(data) // 4)
         # put address in TAR
         self.write_reg(self._reg_offset + MEM_AP_CSW, self._csw | CSW_SIZE32)
         self.write_reg(self._reg_offset + MEM_AP_TAR, addr)
         try:
-            self.dp.write_ap_multiple(self.address.address + self._reg_offset + MEM_AP_DRW, data)
+            self.dp.write_ap_multiple_bytes(self.address.address + self._reg_offset + MEM_AP_DRW, data)
         except exceptions.TransferFaultError as error:
             # Annotate error with target address.
             self._handle_error(error, num)
             error.fault_address = addr
-            error.fault_length = len(data) * 4
+            error.fault_length = len(data)
             raise
         except exceptions.Error as error:
             self._handle_error(error, num)
             raise
         TRACE.debug("_write_block32:%06d }", num)
 
-    def _read_block32_page(self, addr: int, size: int) -> Sequence[int]:
+    @overload
+    def _read_block32_page(self, addr: int, size: int) -> bytearray:
+        ...
+
+    @overload
+    def _read_block32_page(self, addr: int, size: int, now: Literal[True] = True) -> bytearray:
+        ...
+
+    @overload
+    def _read_block32_page(self, addr: int, size: int, now: Literal[False]) -> Callable[[], bytearray]:
+        ...
+
+    def _read_block32_page(self, addr: int, size: int, now: bool = True) \
+            -> Union[bytearray, Callable[[], bytearray]]:
         """@brief Read a single transaction's worth of aligned words.
 
         The transaction must not cross the MEM-AP's auto-increment boundary.
 
-        This method is not locked because it is only called by _read_memory_block32(), which is locked.
+        This method is not locked because it is only called by _read_aligned_bytes(), which is locked.
+
+        @param self
+        @param addr Word aligned start address.
+        @param size Number of words to read.
+        @param now If False, the read is queued and a callable is returned that will return the data.
+        @return Bytearray of the little-endian words, or a callable returning it.
         """
         assert (addr & 0x3) == 0
         num = self.dp.next_access_number
@@ -1165,7 +1202,8 @@ class MEM_AP(AccessPort, memory_interface.MemoryInterface):
         self.write_reg(self._reg_offset + MEM_AP_CSW, self._csw | CSW_SIZE32)
         self.write_reg(self._reg_offset + MEM_AP_TAR, addr)
         try:
-            resp = self.dp.read_ap_multiple(self.address.address + self._reg_offset + MEM_AP_DRW, size)
+            result_cb = self.dp.read_ap_multiple_bytes(self.address.address + self._reg_offset + MEM_AP_DRW,
+                    size, now=False)
         except exceptions.TransferFaultError as error:
             # Annotate error with target address.
             self._handle_error(error, num)
@@ -1175,24 +1213,117 @@ class MEM_AP(AccessPort, memory_interface.MemoryInterface):
         except exceptions.Error as error:
             self._handle_error(error, num)
             raise
-        TRACE.debug("_read_block32:%06d }", num)
-        return resp
+
+        def read_block32_page_cb() -> bytearray:
+            try:
+                resp = result_cb()
+            except exceptions.TransferFaultError as error:
+                # Annotate error with target address.
+                self._handle_error(error, num)
+                error.fault_address = addr
+                error.fault_length = size * 4
+                raise
+            except exceptions.Error as error:
+                self._handle_error(error, num)
+                raise
+            TRACE.debug("_read_block32:%06d %s}", num, "" if now else "...")
+            return resp
+
+        if now:
+            return read_block32_page_cb()
+        else:
+            return read_block32_page_cb
+
+    def _write_aligned_bytes(self, addr: int, data: memoryview) -> None:
+        """@brief Write a word aligned block of bytes, split into auto-increment pages.
+
+        This method is not locked because it is only called by locked methods.
+
+        @param self
+        @param addr Word aligned start address.
+        @param data Memoryview whose length is a multiple of 4. Pages are written from slices of
+            the view, so the data is never copied.
+        """
+        assert (addr & 0x3) == 0 and (len(data) & 0x3) == 0
+        addr &= self._address_mask
+        offset = 0
+        size = len(data)
+        while offset < size:
+            n = min(self.auto_increment_page_size - (addr & (self.auto_increment_page_size - 1)),
+                    size - offset)
+            self._write_block32_page(addr, data[offset:offset + n])
+            offset += n
+            addr += n
+
+    def _read_aligned_bytes(self, addr: int, dest: memoryview) -> None:
+        """@brief Read a word aligned block of bytes, split into auto-increment pages.
+
+        All pages are queued with deferred reads before any results are collected. This lets the
+        probe keep its full number of packets in flight for the whole transfer, rather than
+        waiting for a round trip at the end of every auto-increment page.
+
+        This method is not locked because it is only called by locked methods.
+
+        @param self
+        @param addr Word aligned start address.
+        @param dest Memoryview whose length is a multiple of 4. The read data for each page is
+            copied directly into the view.
+        """
+        self._read_aligned_blocks([(addr, dest)])
+
+    def _read_aligned_blocks(self, blocks: Sequence[Tuple[int, memoryview]]) -> None:
+        """@brief Read several word aligned blocks of bytes as one pipelined transfer.
+
+        The pages of every block are queued with deferred reads before any results are collected.
+
+        This method is not locked because it is only called by locked methods.
+
+        @param self
+        @param blocks Sequence of (address, memoryview) tuples. Each address must be word aligned
+            and each view's length a multiple of 4.
+        """
+        pages: List[Tuple[memoryview, Callable[[], bytearray]]] = []
+        try:
+            for addr, dest in blocks:
+                assert (addr & 0x3) == 0 and (len(dest) & 0x3) == 0
+                addr &= self._address_mask
+                offset = 0
+                size = len(dest)
+                while offset < size:
+                    n = min(self.auto_increment_page_size - (addr & (self.auto_increment_page_size - 1)),
+                            size - offset)
+                    pages.append((dest[offset:offset + n], self._read_block32_page(addr, n // 4, now=False)))
+                    offset += n
+                    addr += n
+        except Exception:
+            # Invoke the callbacks of pages that were already queued so the DP locks they hold are
+            # released, then reraise the error from queueing.
+            for _, page_cb in pages:
+                try:
+                    page_cb()
+                except exceptions.Error:
+                    pass
+            raise
+
+        # Collect results in order. If one page fails, the remaining callbacks must still be
+        # invoked so the DP locks they hold are released; the first error is reraised.
+        error: Optional[Exception] = None
+        for page_dest, page_cb in pages:
+            try:
+                data = page_cb()
+                if error is None:
+                    page_dest[:] = data
+            except exceptions.Error as page_error:
+                if error is None:
+                    error = page_error
+        if error is not None:
+            raise error
 
     @locked
     def _write_memory_block32(self, addr: int, data: Sequence[int]) -> None:
         """@brief Write a block of aligned words in memory."""
         assert (addr & 0x3) == 0
-        addr &= self._address_mask
-        size = len(data)
-        while size > 0:
-            n = self.auto_increment_page_size - (addr & (self.auto_increment_page_size - 1))
-            if size*4 < n:
-                n = (size*4) & 0xfffffffc
-            self._write_block32_page(addr, data[:n//4])
-            data = data[n//4:]
-            size -= n//4
-            addr += n
-        return
+        self._write_aligned_bytes(addr, memoryview(conversion.u32le_list_to_bytes(data)))
 
     @locked
     def _read_memory_block32(self, addr: int, size: int) -> Sequence[int]:
@@ -1201,16 +1332,102 @@ class MEM_AP(AccessPort, memory_interface.MemoryInterface):
         @return A list of word values.
         """
         assert (addr & 0x3) == 0
-        addr &= self._address_mask
-        resp = []
-        while size > 0:
-            n = self.auto_increment_page_size - (addr & (self.auto_increment_page_size - 1))
-            if size*4 < n:
-                n = (size*4) & 0xfffffffc
-            resp += self._read_block32_page(addr, n//4)
-            size -= n//4
-            addr += n
-        return resp
+        result = bytearray(size * 4)
+        self._read_aligned_bytes(addr, memoryview(result))
+        return conversion.bytes_to_u32le_list(result)
+
+    @locked
+    def _write_memory_block_bytes(self, addr: int, data: Union[bytes, bytearray, memoryview]) -> None:
+        """@brief Write a block of unaligned bytes in memory from a bytes-like object.
+
+        Leading and trailing unaligned bytes are written with 8- and 16-bit transfers. The aligned
+        middle of the block is written directly from a view on _data_.
+        """
+        view = memoryview(data).cast('B')
+        size = len(view)
+        pos = 0
+
+        if (size > 0) and (addr & 0x01):
+            self._write_memory(addr, view[0], 8)
+            pos += 1
+
+        if (size - pos > 1) and ((addr + pos) & 0x02):
+            self._write_memory(addr + pos, view[pos] | (view[pos + 1] << 8), 16)
+            pos += 2
+
+        aligned_size = (size - pos) & ~0x03
+        if aligned_size:
+            self._write_aligned_bytes(addr + pos, view[pos:pos + aligned_size])
+            pos += aligned_size
+
+        if (size - pos > 1):
+            self._write_memory(addr + pos, view[pos] | (view[pos + 1] << 8), 16)
+            pos += 2
+
+        if (size - pos > 0):
+            self._write_memory(addr + pos, view[pos], 8)
+
+    @locked
+    def _read_memory_block_bytes(self, addr: int, size: int) -> bytearray:
+        """@brief Read a block of unaligned bytes in memory into a bytearray.
+
+        Leading and trailing unaligned bytes are read with 8- and 16-bit transfers. The aligned
+        middle of the block is read by pages directly into the preallocated result buffer.
+        """
+        result = bytearray(size)
+        view = memoryview(result)
+        pos = 0
+
+        if (size > 0) and (addr & 0x01):
+            result[0] = self._read_memory(addr, 8)
+            pos += 1
+
+        if (size - pos > 1) and ((addr + pos) & 0x02):
+            struct.pack_into('<H', result, pos, self._read_memory(addr + pos, 16))
+            pos += 2
+
+        aligned_size = (size - pos) & ~0x03
+        if aligned_size:
+            self._read_aligned_bytes(addr + pos, view[pos:pos + aligned_size])
+            pos += aligned_size
+
+        if (size - pos > 1):
+            struct.pack_into('<H', result, pos, self._read_memory(addr + pos, 16))
+            pos += 2
+
+        if (size - pos > 0):
+            result[pos] = self._read_memory(addr + pos, 8)
+
+        return result
+
+    @locked
+    def _read_memory_blocks_bytes(self, blocks: Sequence[Tuple[int, int]]) -> List[bytearray]:
+        """@brief Read several separate blocks of unaligned bytes in memory.
+
+        The pages of all word aligned blocks are read as one pipelined transfer. Blocks with an
+        unaligned address or size are read separately with _read_memory_block_bytes().
+        """
+        results = []
+        aligned_blocks = []
+        for addr, size in blocks:
+            if (addr & 0x3) or (size & 0x3):
+                results.append(self._read_memory_block_bytes(addr, size))
+            else:
+                result = bytearray(size)
+                aligned_blocks.append((addr, memoryview(result)))
+                results.append(result)
+        self._read_aligned_blocks(aligned_blocks)
+        return results
+
+    def _write_memory_block8(self, addr: int, data: Sequence[int]) -> None:
+        """@brief Write a block of unaligned bytes in memory."""
+        self._write_memory_block_bytes(addr, bytes(data))
+
+    def _read_memory_block8(self, addr: int, size: int) -> Sequence[int]:
+        """@brief Read a block of unaligned bytes in memory.
+        @return A list of byte values.
+        """
+        return list(self._read_memory_block_bytes(addr, size))
 
     @locked
     def _accelerated_write_memory(self, addr: int, data: int, transfer_size: int=32) -> None:
@@ -1273,6 +1490,30 @@ class MEM_AP(AccessPort, memory_interface.MemoryInterface):
         return self._accelerated_memory_interface.read_memory_block8(addr, size,
                 csw=self._csw)
 
+    @locked
+    def _accelerated_write_memory_block_bytes(self, addr: int, data: Union[bytes, bytearray, memoryview]) -> None:
+        """@brief Write a memory block from a bytes-like object using the probe's accelerated memory interface.
+
+        The current CSW value is passed to the accelerted interface, primarily for STLink.
+        """
+        assert self._accelerated_memory_interface is not None
+        self._accelerated_memory_interface.write_memory_block8(addr, list(data),
+                csw=self._csw)
+
+    @locked
+    def _accelerated_read_memory_block_bytes(self, addr: int, size: int) -> bytearray:
+        """@brief Read a memory block into a bytearray using the probe's accelerated memory interface.
+
+        The current CSW value is passed to the accelerted interface, primarily for STLink.
+        """
+        assert self._accelerated_memory_interface is not None
+        return bytearray(self._accelerated_memory_interface.read_memory_block8(addr, size,
+                csw=self._csw))
+
+    def _accelerated_read_memory_blocks_bytes(self, blocks: Sequence[Tuple[int, int]]) -> List[bytearray]:
+        """@brief Read several blocks into bytearrays using the probe's accelerated memory interface."""
+        return [self._accelerated_read_memory_block_bytes(addr, size) for addr, size in blocks]
+
     def _handle_error(self, error: Exception, num: int) -> None:
         self.dp._handle_error(error, num)
         self._invalidate_cache()
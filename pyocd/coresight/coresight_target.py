@@ -24,6 +24,7 @@ from ..core.memory_map import (FlashRegion, MemoryType, RamRegion, DeviceRegion,
 from ..core.soc_target import SoCTarget
 from ..core import exceptions
 from . import (dap, discovery)
+from ..debug.svd.cache import get_default_cache_dir
 from ..debug.svd.loader import SVDLoader
 from ..utility.sequencer import CallSequence
 from ..target.pack.flm_region_builder import FlmFlashRegionBuilder
@@ -88,8 +89,13 @@ class CoreSightTarget(SoCTarget):
             self._svd_load_thread = None
 
         if not self._svd_device and self._svd_location:
+            if self.session.options.get('svd.cache'):
+                cache_dir = self.session.options.get('svd.cache_dir') or get_default_cache_dir()
+            else:
+                cache_dir = None
+
             # Spawn thread to load SVD in background.
-            self._svd_load_thread = SVDLoader(self._svd_location, svd_load_completed_cb)
+            self._svd_load_thread = SVDLoader(self._svd_location, svd_load_completed_cb, cache_dir=cache_dir)
             self._svd_load_thread.load()
 
     def create_init_sequence(self) -> CallSequence:
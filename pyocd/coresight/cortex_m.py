@@ -17,7 +17,8 @@
 
 import logging
 from time import sleep
-from typing import (Any, Callable, List, Optional, Set, overload, Sequence, TYPE_CHECKING, Union, cast)
+from typing import (Any, Callable, List, Optional, Set, Tuple, overload, Sequence, TYPE_CHECKING, Union,
+        cast)
 from typing_extensions import Literal
 
 from ..core.target import Target
@@ -35,6 +36,7 @@ from .cortex_m_core_registers import (
     )
 from ..debug.breakpoints.manager import BreakpointManager
 from ..debug.breakpoints.software import SoftwareBreakpointProvider
+from ..debug.range_step import find_range_exits
 from .ap import MEM_AP
 
 if TYPE_CHECKING:
@@ -188,6 +190,9 @@ class CortexM(CoreTarget, CoreSightCoreComponent): # lgtm[py/multiple-calls-to-i
 
     _RESET_RECOVERY_SLEEP_INTERVAL = 0.01 # 10 ms
 
+    _RANGE_RUN_MIN_POLL_INTERVAL = 0.001 # 1 ms
+    _RANGE_RUN_MAX_POLL_INTERVAL = 0.05 # 50 ms
+
     @classmethod
     def factory(cls, ap: "MemoryInterface", cmpid: "CoreSightComponentID", address: int) -> Any:
         assert isinstance(ap, MEM_AP)
@@ -564,6 +569,20 @@ class CortexM(CoreTarget, CoreSightCoreComponent): # lgtm[py/multiple-calls-to-i
         data = self.ap.read_memory_block32(addr, size)
         return self.bp_manager.filter_memory_aligned_32(addr, size, data)
 
+    def read_memory_block_bytes(self, addr: int, size: int) -> bytearray:
+        """@brief Read a block of unaligned bytes in memory into a bytearray."""
+        data = self.ap.read_memory_block_bytes(addr, size)
+        return self.bp_manager.filter_memory_unaligned_8(addr, size, data)
+
+    def read_memory_blocks_bytes(self, blocks: Sequence[Tuple[int, int]]) -> List[bytearray]:
+        """@brief Read several separate blocks of unaligned bytes in memory."""
+        return [self.bp_manager.filter_memory_unaligned_8(addr, size, data)
+                for (addr, size), data in zip(blocks, self.ap.read_memory_blocks_bytes(blocks))]
+
+    def write_memory_block_bytes(self, addr: int, data: Union[bytes, bytearray, memoryview]) -> None:
+        """@brief Write a block of unaligned bytes in memory from a bytes-like object."""
+        self.ap.write_memory_block_bytes(addr, data)
+
     def halt(self) -> None:
         """@brief Halt the core
         """
@@ -640,46 +659,193 @@ class CortexM(CoreTarget, CoreSightCoreComponent): # lgtm[py/multiple-calls-to-i
         # Get the step timeout. A timeout of 0 means no timeout, so we have to pass None to the Timeout class.
         step_timeout = self.session.options.get('cpu.step.instruction.timeout') or None
 
-        exit_step_loop = False
-        while True:
+        if start == end:
             # Single step using current C_MASKINTS setting
             self.write32(CortexM.DHCSR, dhcsr_step)
+            self._wait_for_step_halt(step_timeout, hook_cb)
+        else:
+            self._range_step(dhcsr_step, start, end, step_timeout, hook_cb)
 
-            # Wait for halt to auto set.
-            #
-            # Note that it may take a very long time for this loop to exit in cases such as stepping over
-            # a branch into the Secure world where the debugger doesn't have secure debug access, or similar
-            # for Privileged code in the case of UDE.
-            with timeout.Timeout(step_timeout) as tmo:
-                while tmo.check():
-                    # Invoke the callback if provided. If it returns True, then exit the loop.
-                    if (hook_cb is not None) and hook_cb():
-                        exit_step_loop = True
-                        break
-                    if (self.read32(CortexM.DHCSR) & CortexM.C_HALT) != 0:
-                        break
+        # Restore interrupt mask state.
+        if maskints_differs:
+            self.write32(CortexM.DHCSR,
+                    CortexM.DBGKEY | CortexM.C_DEBUGEN | CortexM.C_HALT | saved_maskints | saved_pmov)
+
+        self.flush()
+
+        self.session.notify(Target.Event.POST_RUN, self, Target.RunType.STEP)
+
+    def _wait_for_step_halt(self, step_timeout: Optional[float], hook_cb: Optional[Callable[[], bool]]) -> bool:
+        """@brief Wait for the core to halt after a step.
+
+        Note that it may take a very long time for this to return in cases such as stepping over
+        a branch into the Secure world where the debugger doesn't have secure debug access, or similar
+        for Privileged code in the case of UDE.
+
+        @return Boolean indicating whether the hook callback requested that stepping stop.
+        """
+        with timeout.Timeout(step_timeout) as tmo:
+            while tmo.check():
+                # Invoke the callback if provided. If it returns True, then exit the loop.
+                if (hook_cb is not None) and hook_cb():
+                    return True
+                if (self.read32(CortexM.DHCSR) & CortexM.C_HALT) != 0:
+                    break
+        return False
+
+    def _range_step(self, dhcsr_step: int, start: int, end: int, step_timeout: Optional[float],
+            hook_cb: Optional[Callable[[], bool]]) -> None:
+        """@brief Step until the PC leaves [_start_, _end_) or a debug event occurs.
+
+        Each step is performed as two batches of queued transfers. The first starts the step and reads
+        back DHCSR and DFSR. Once DHCSR shows the core has halted, the second reads the PC through
+        DCRSR/DCRDR. So a step costs two probe round trips in the common case where the instruction
+        completes immediately.
+
+        If the range is at least as large as the `cpu.step.range.breakpoint_min_size` option, after the
+        first step the core is instead run with temporary hardware breakpoints on all of the range's
+        exits. This requires that every exit of the range can be found by disassembly.
+        """
+        exits = None
+        min_size = self.session.options.get('cpu.step.range.breakpoint_min_size')
+        if min_size and (end - start) >= min_size:
+            exits = self._get_range_exit_breakpoints(start, end)
 
-            # Range is empty, 'range step' will degenerate to 'step'
-            if (start == end) or exit_step_loop:
+        while True:
+            result = self._pipelined_step(dhcsr_step, step_timeout, hook_cb)
+            if result is None:
                 break
+            program_counter, dfsr = result
 
-            # Read program counter and compare to [start, end)
-            program_counter = self.read_core_register('pc')
+            # Compare program counter to [start, end)
             if (program_counter < start) or (end <= program_counter):
                 break
 
             # Check for stop reasons other than HALTED, which will have been set by our step action.
-            if (self.read32(CortexM.DFSR) & ~CortexM.DFSR_HALTED) != 0:
+            if (dfsr & ~CortexM.DFSR_HALTED) != 0:
                 break
 
-        # Restore interrupt mask state.
-        if maskints_differs:
-            self.write32(CortexM.DHCSR,
-                    CortexM.DBGKEY | CortexM.C_DEBUGEN | CortexM.C_HALT | saved_maskints | saved_pmov)
+            # A hardware breakpoint on the current instruction would stop the core immediately, so
+            # keep stepping until the PC moves off of any user breakpoint.
+            if (exits is not None) and (self.bp_manager.find_breakpoint(program_counter) is None):
+                if self._run_to_breakpoints(dhcsr_step & ~CortexM.C_STEP, exits, step_timeout, hook_cb):
+                    break
+                exits = None
 
-        self.flush()
+    def _pipelined_step(self, dhcsr_step: int, step_timeout: Optional[float],
+            hook_cb: Optional[Callable[[], bool]]) -> Optional[Tuple[int, int]]:
+        """@brief Single step the core and read the resulting PC and DFSR.
 
-        self.session.notify(Target.Event.POST_RUN, self, Target.RunType.STEP)
+        @return Tuple of the PC and DFSR values, or None if the hook callback requested that stepping
+            stop.
+        """
+        if (hook_cb is not None) and hook_cb():
+            return None
+
+        self.write32(CortexM.DHCSR, dhcsr_step)
+        dhcsr, dfsr = self._call_deferred_reads(
+                self.read32(CortexM.DHCSR, now=False),
+                self.read32(CortexM.DFSR, now=False))
+
+        # If the instruction didn't complete before DHCSR was read, the DFSR read is invalid and the
+        # core registers can't be accessed yet. Fall back to waiting for the halt.
+        if (dhcsr & CortexM.S_HALT) == 0:
+            if self._wait_for_step_halt(step_timeout, hook_cb):
+                return None
+            return self.read_core_register('pc'), self.read32(CortexM.DFSR)
+
+        self.write_memory(CortexM.DCRSR, CortexMCoreRegisterInfo.get('pc').index)
+        regrdy_dhcsr, program_counter = self._call_deferred_reads(
+                self.read32(CortexM.DHCSR, now=False),
+                self.read32(CortexM.DCRDR, now=False))
+        if (regrdy_dhcsr & CortexM.S_REGRDY) == 0:
+            program_counter = self.read_core_register('pc')
+        return program_counter, dfsr
+
+    @staticmethod
+    def _call_deferred_reads(*read_cbs: Callable[[], int]) -> List[int]:
+        """@brief Call every deferred read callback, even if one fails, to complete the transaction.
+
+        @return List of the values read, in the same order as the callbacks.
+        @exception TransferError The first error raised by a callback.
+        """
+        values = []
+        error = None
+        for cb in read_cbs:
+            try:
+                values.append(cb())
+            except exceptions.Error as err:
+                error = error or err
+        if error is not None:
+            raise error
+        return values
+
+    def _get_range_exit_breakpoints(self, start: int, end: int) -> Optional[Set[int]]:
+        """@brief Determine the temporary breakpoints needed to run to the end of a step range.
+
+        @return Set of addresses that need a breakpoint, or None if the range can't be run with
+            breakpoints.
+        """
+        if self.fpb is None:
+            return None
+        exits = find_range_exits(bytes(self.read_memory_block8(start, end - start)), start)
+        if exits is None:
+            return None
+
+        # Exits with a user breakpoint already stop the core.
+        exits = {addr for addr in exits if self.bp_manager.find_breakpoint(addr) is None}
+        if (len(exits) > self.fpb.available_breakpoints) \
+                or not all(self.fpb.can_support_address(addr) for addr in exits):
+            LOG.debug("not enough hardware breakpoints for range exits %s",
+                    ", ".join("%#010x" % addr for addr in sorted(exits)))
+            return None
+        return exits
+
+    def _run_to_breakpoints(self, dhcsr_run: int, exits: Set[int], step_timeout: Optional[float],
+            hook_cb: Optional[Callable[[], bool]]) -> bool:
+        """@brief Run the core with temporary hardware breakpoints set.
+
+        When the core halts on one of the temporary breakpoints, DFSR.BKPT is cleared so the halt is
+        reported as a step. DHCSR is polled with an increasing delay between reads. If the core has not
+        halted within _step_timeout_, it is halted where it is.
+
+        @return Boolean indicating whether the core was run. False is returned if the breakpoints
+            could not be set.
+        """
+        assert self.fpb is not None
+        fpb_was_enabled = self.fpb.enabled
+        temp_bps = [self.fpb.set_breakpoint(addr) for addr in exits]
+        try:
+            if any(bp is None for bp in temp_bps):
+                return False
+
+            self.write32(CortexM.DHCSR, dhcsr_run)
+            halted = False
+            poll_delay = self._RANGE_RUN_MIN_POLL_INTERVAL
+            with timeout.Timeout(step_timeout) as tmo:
+                while tmo.check():
+                    if (hook_cb is not None) and hook_cb():
+                        break
+                    if (self.read32(CortexM.DHCSR) & CortexM.S_HALT) != 0:
+                        halted = True
+                        break
+                    sleep(poll_delay)
+                    poll_delay = min(poll_delay * 2, self._RANGE_RUN_MAX_POLL_INTERVAL)
+            if tmo.did_time_out:
+                LOG.debug("core #%d did not reach a range exit within the step timeout", self.core_number)
+            # Halt the core if the hook requested a stop or the timeout expired.
+            if not halted:
+                self.write32(CortexM.DHCSR, dhcsr_run | CortexM.C_HALT)
+        finally:
+            for bp in temp_bps:
+                if bp is not None:
+                    self.fpb.remove_breakpoint(bp)
+            if not fpb_was_enabled:
+                self.fpb.disable()
+
+        if self.read_core_register('pc') in exits:
+            self.write32(CortexM.DFSR, CortexM.DFSR_BKPT)
+        return True
 
     def clear_debug_cause_bits(self):
         self.write32(CortexM.DFSR,
@@ -1060,7 +1226,24 @@ class CortexM(CoreTarget, CoreSightCoreComponent): # lgtm[py/multiple-calls-to-i
                 LOG.warning("T bit in XPSR is invalid; the vector table may be invalid or corrupt")
 
     def get_state(self):
-        dhcsr = self.read_memory(CortexM.DHCSR)
+        return self._get_state_from_dhcsr(self.read_memory(CortexM.DHCSR))
+
+    def get_state_deferred(self) -> Callable[[], Target.State]:
+        """@brief Queue a read of the core's state.
+
+        The DHCSR read is queued with the probe, so reads of several cores' states can be combined
+        into a single probe transaction.
+
+        @return Callable that returns the core's state. It must be called even if the state is not
+            needed.
+        """
+        dhcsr_cb = self.read32(CortexM.DHCSR, now=False)
+        def get_state_cb() -> Target.State:
+            return self._get_state_from_dhcsr(dhcsr_cb())
+        return get_state_cb
+
+    def _get_state_from_dhcsr(self, dhcsr: int) -> Target.State:
+        """@brief Determine the core's state from a DHCSR value."""
         if dhcsr & CortexM.S_RESET_ST:
             # Reset is a special case because the bit is sticky and really means
             # "core was reset since last read of DHCSR". We have to re-read the
@@ -1111,6 +1294,40 @@ class CortexM(CoreTarget, CoreSightCoreComponent): # lgtm[py/multiple-calls-to-i
         self.flush()
         self.session.notify(Target.Event.POST_RUN, self, Target.RunType.RESUME)
 
+    def resume_with_registers(self, reg_list, data_list):
+        """@brief Write core registers and resume execution.
+
+        The register writes and the DHCSR write that resumes the core are queued together, so they
+        are performed in a single probe transaction.
+
+        @param self The core.
+        @param reg_list List of registers to write. Each element in the list can be either the
+            register's name in lowercase or the integer register index.
+        @param data_list List of values for the registers in the corresponding positions of
+            _reg_list_.
+
+        @exception KeyError Invalid or unsupported register was requested.
+        @exception @ref pyocd.core.exceptions.CoreRegisterAccessError "CoreRegisterAccessError" The
+            core is not halted, or writing one or more registers failed. In the latter case the core
+            has already been resumed when the error is raised.
+        """
+        assert len(reg_list) == len(data_list)
+        reg_list = [CortexMCoreRegisterInfo.register_name_to_index(reg) for reg in reg_list]
+        self.check_reg_list(reg_list)
+        self._check_halted_for_register_write(reg_list)
+
+        LOG.debug("resuming core %d", self.core_number)
+        check_writes = self._begin_write_core_registers_raw(reg_list, data_list)
+        try:
+            self.session.notify(Target.Event.PRE_RUN, self, Target.RunType.RESUME)
+            self._run_token += 1
+            self.clear_debug_cause_bits()
+            self.write_memory(CortexM.DHCSR, CortexM.DBGKEY | CortexM.C_DEBUGEN)
+            self.flush()
+        finally:
+            check_writes()
+        self.session.notify(Target.Event.POST_RUN, self, Target.RunType.RESUME)
+
     def find_breakpoint(self, addr):
         return self.bp_manager.find_breakpoint(addr)
 
@@ -1199,27 +1416,19 @@ class CortexM(CoreTarget, CoreSightCoreComponent): # lgtm[py/multiple-calls-to-i
                     ", ".join(CortexMCoreRegisterInfo.get(r).name for r in reg_list),
                     self.core_number))
 
-        # Handle doubles.
-        doubles = [reg for reg in reg_list if CortexMCoreRegisterInfo.get(reg).is_double_float_register]
-        hasDoubles = len(doubles) > 0
-        originalRegList = []
-        singleValues = []
-        if hasDoubles:
-            originalRegList = reg_list
-
-            # Strip doubles from reg_list.
-            reg_list = [reg for reg in reg_list if not CortexMCoreRegisterInfo.get(reg).is_double_float_register]
-
-            # Read float regs required to build doubles.
-            singleRegList = []
-            for reg in doubles:
-                singleRegList += (-reg, -reg + 1)
-            singleValues = self._base_read_core_registers_raw(singleRegList)
+        # Replace each double with the pair of single-precision registers that hold it, so that all
+        # registers, including the FP bank, are read in a single batch of queued transfers.
+        read_list = []
+        for reg in reg_list:
+            if CortexMCoreRegisterInfo.get(reg).is_double_float_register:
+                read_list += (-reg, -reg + 1)
+            else:
+                read_list.append(reg)
 
         # Begin all reads and writes
         dhcsr_cb_list = []
         reg_cb_list = []
-        for reg in reg_list:
+        for reg in read_list:
             if CortexMCoreRegisterInfo.get(reg).is_cfbp_subregister:
                 reg = CortexMCoreRegisterInfo.get('cfbp').index
             elif CortexMCoreRegisterInfo.get(reg).is_psr_subregister:
@@ -1238,9 +1447,9 @@ class CortexM(CoreTarget, CoreSightCoreComponent): # lgtm[py/multiple-calls-to-i
             reg_cb_list.append(reg_cb)
 
         # Read all results
-        reg_vals = []
+        read_vals = []
         fail_list = []
-        for reg, reg_cb, dhcsr_cb in zip(reg_list, reg_cb_list, dhcsr_cb_list):
+        for reg, reg_cb, dhcsr_cb in zip(read_list, reg_cb_list, dhcsr_cb_list):
             dhcsr_val = dhcsr_cb()
             if (dhcsr_val & CortexM.S_REGRDY) == 0:
                 fail_list.append(reg)
@@ -1252,28 +1461,25 @@ class CortexM(CoreTarget, CoreSightCoreComponent): # lgtm[py/multiple-calls-to-i
             elif CortexMCoreRegisterInfo.get(reg).is_psr_subregister:
                 val &= CortexMCoreRegisterInfo.get(reg).psr_mask
 
-            reg_vals.append(val)
+            read_vals.append(val)
 
         if fail_list:
             raise exceptions.CoreRegisterAccessError("failed to read register{0} {1}".format(
                     "s" if (len(fail_list) > 1) else "",
                     ", ".join(CortexMCoreRegisterInfo.get(r).name for r in fail_list)))
 
-        # Merge double regs back into result list.
-        if hasDoubles:
-            results = []
-            for reg in originalRegList:
-                # Double
-                if CortexMCoreRegisterInfo.get(reg).is_double_float_register:
-                    doubleIndex = doubles.index(reg)
-                    singleLow = singleValues[doubleIndex * 2]
-                    singleHigh = singleValues[doubleIndex * 2 + 1]
-                    double = (singleHigh << 32) | singleLow
-                    results.append(double)
-                # Other register
-                else:
-                    results.append(reg_vals[reg_list.index(reg)])
-            reg_vals = results
+        # Merge single-precision pairs back into doubles.
+        if len(read_list) == len(reg_list):
+            return read_vals
+        reg_vals = []
+        vals_iter = iter(read_vals)
+        for reg in reg_list:
+            if CortexMCoreRegisterInfo.get(reg).is_double_float_register:
+                single_low = next(vals_iter)
+                single_high = next(vals_iter)
+                reg_vals.append((single_high << 32) | single_low)
+            else:
+                reg_vals.append(next(vals_iter))
 
         return reg_vals
 
@@ -1339,6 +1545,11 @@ class CortexM(CoreTarget, CoreSightCoreComponent): # lgtm[py/multiple-calls-to-i
         @exception @ref pyocd.core.exceptions.CoreRegisterAccessError "CoreRegisterAccessError" Failed to
             write one or more registers.
         """
+        self._check_halted_for_register_write(reg_list)
+        self._begin_write_core_registers_raw(reg_list, data_list)()
+
+    def _check_halted_for_register_write(self, reg_list):
+        """@brief Raise an error if the core is not halted, as required to write registers."""
         # Make sure the core is in debug state. If not, the DHCSR.S_REGRDY bit is UNKNOWN and may read
         # as 1, so we have no way to see that the write failed. (This is seen on real devices.)
         if not self.is_halted():
@@ -1348,6 +1559,17 @@ class CortexM(CoreTarget, CoreSightCoreComponent): # lgtm[py/multiple-calls-to-i
                     ", ".join(CortexMCoreRegisterInfo.get(r).name for r in reg_list),
                     self.core_number))
 
+    def _begin_write_core_registers_raw(self, reg_list, data_list) -> Callable[[], None]:
+        """@brief Queue core register writes.
+
+        The arguments are the same as for _base_write_core_registers_raw(), and the core must already
+        be known to be halted.
+
+        @return Callable that checks the writes were successful. It must be called even if the check
+            isn't needed.
+        @exception @ref pyocd.core.exceptions.CoreRegisterAccessError "CoreRegisterAccessError" Raised
+            by the returned callable if writing one or more registers failed.
+        """
         # Read special register if it is present in the list and
         # convert doubles to single float register writes.
         cfbpValue = None
@@ -1400,17 +1622,19 @@ class CortexM(CoreTarget, CoreSightCoreComponent): # lgtm[py/multiple-calls-to-i
             dhcsr_cb = self.read32(CortexM.DHCSR, now=False)
             dhcsr_cb_list.append(dhcsr_cb)
 
-        # Make sure S_REGRDY was set for all register writes.
-        fail_list = []
-        for dhcsr_cb, reg_and_data in zip(dhcsr_cb_list, reg_data_list):
-            dhcsr_val = dhcsr_cb()
-            if (dhcsr_val & CortexM.S_REGRDY) == 0:
-                fail_list.append(reg_and_data[0])
-
-        if fail_list:
-            raise exceptions.CoreRegisterAccessError("failed to write register{0} {1}".format(
-                    "s" if (len(fail_list) > 1) else "",
-                    ", ".join(CortexMCoreRegisterInfo.get(r).name for r in fail_list)))
+        def check_writes() -> None:
+            # Make sure S_REGRDY was set for all register writes.
+            fail_list = []
+            for dhcsr_cb, reg_and_data in zip(dhcsr_cb_list, reg_data_list):
+                dhcsr_val = dhcsr_cb()
+                if (dhcsr_val & CortexM.S_REGRDY) == 0:
+                    fail_list.append(reg_and_data[0])
+
+            if fail_list:
+                raise exceptions.CoreRegisterAccessError("failed to write register{0} {1}".format(
+                        "s" if (len(fail_list) > 1) else "",
+                        ", ".join(CortexMCoreRegisterInfo.get(r).name for r in fail_list)))
+        return check_writes
 
     def set_breakpoint(self, addr, type=Target.BreakpointType.AUTO):
         """@brief Set a hardware or software breakpoint at a specific location in memory.
@@ -17,8 +17,9 @@
 import logging
 
 from ..core import exceptions
-from .ap import (APv1Address, APv2Address, AccessPort)
+from .ap import (AP_IDR, APSEL_SHIFT, APv1Address, APv2Address, AccessPort)
 from .dap import (ADIVersion, APAccessMemoryInterface)
+from .discovery_cache import (DiscoveryCache, DiscoveryRecord)
 from .rom_table import (CoreSightComponentID, ROMTable)
 from . import (cortex_m, cortex_m_v8m)
 from ..utility.sequencer import CallSequence
@@ -88,20 +89,78 @@ class ADIv5Discovery(CoreSightDiscovery):
     4. `create_cores`: Create any discovered core (CPU) components. The cores are created first to
         ensure that other components have a core to which they may be connected.
     5. `create_components`: Create remaining discovered components.
+
+    If the `adi.v5.discovery_cache_dir` session option is set, the results of the AP scan and the
+    values read from ROM tables and component ID registers are cached. The cache is keyed by the
+    DPIDR, target type, and AP scan options. On a later connect to the same type of target, the AP
+    scan is replaced by reading the IDRs of the cached APs and of the unused APSELs between and
+    following them. For each AP, the ID registers of the top level ROM table are read and compared
+    with the cache. If these match, the cached reads are used to parse the ROM tables; otherwise the
+    target is fully scanned.
+    Writes made while parsing ROM tables, such as to power up debug domains, are still performed.
+    The cache is updated by the `store_discovery_cache` task that follows `find_components`.
     """
 
     ## APSEL is 8-bit, thus there are a maximum of 256 APs.
     MAX_APSEL = 255
 
+    def __init__(self, target):
+        """@brief Constructor."""
+        super(ADIv5Discovery, self).__init__(target)
+        self._cache = None
+        self._cache_key = None
+        self._record = None
+
     def discover(self):
+        self._load_cache()
         return CallSequence(
-            ('find_aps',            self._find_aps),
-            ('create_aps',          self._create_aps),
-            ('find_components',     self._find_components),
-            ('create_cores',        self._create_cores),
-            ('create_components',   self._create_components),
+            ('find_aps',                self._find_aps),
+            ('create_aps',              self._create_aps),
+            ('find_components',         self._find_components),
+            ('store_discovery_cache',   self._store_cache),
+            ('create_cores',            self._create_cores),
+            ('create_components',       self._create_components),
             )
 
+    def _load_cache(self):
+        """@brief Load the discovery record for this target if the discovery cache is enabled."""
+        cache_dir = self.session.options.get('adi.v5.discovery_cache_dir')
+        if not cache_dir:
+            return
+        self._cache = DiscoveryCache(cache_dir)
+        self._cache_key = {
+                'dpidr': self.dp.dpidr.idr,
+                'target': self.target.part_number,
+                'scan_all_aps': bool(self.session.options.get('scan_all_aps')),
+                'max_invalid_ap_count': self.session.options.get('adi.v5.max_invalid_ap_count'),
+            }
+        self._record = self._cache.load(self._cache_key)
+        if self._record is None:
+            LOG.debug("No discovery cache entry for %s", self._cache_key)
+            self._record = DiscoveryRecord()
+
+    def _check_cached_aps(self):
+        """@brief Compare the cached AP scan with the target.
+
+        The IDR of every APSEL up to and including the one following the last cached AP is read.
+        APSELs that are not in the cache must be invalid. If the `scan_all_aps` option is set, all
+        APSELs are checked.
+
+        @return Boolean indicating whether the target matches the cache.
+        """
+        if self.session.options.get('scan_all_aps'):
+            last_apsel = self.MAX_APSEL
+        else:
+            last_apsel = min(max(self._record.aps) + 1, self.MAX_APSEL)
+        expected = {apsel: self._record.aps.get(apsel, 0) for apsel in range(last_apsel + 1)}
+        try:
+            idrs = {apsel: self.dp.read_ap((apsel << APSEL_SHIFT) | AP_IDR, now=False)
+                    for apsel in expected}
+            return all(idrs[apsel]() == idr for apsel, idr in expected.items())
+        except exceptions.Error as e:
+            LOG.debug("Error checking cached APs: %s", e)
+            return False
+
     def _find_aps(self):
         """@brief Find valid APs using the ADIv5 method.
 
@@ -120,6 +179,15 @@ class ADIv5Discovery(CoreSightDiscovery):
         if self.dp.valid_aps is not None:
             return
 
+        # Use the cached AP list if it matches the target.
+        if self._record is not None and self._record.aps:
+            if self._check_cached_aps():
+                LOG.debug("Using cached AP scan results")
+                self.dp.valid_aps = list(self._record.aps)
+                return
+            LOG.info("Target does not match discovery cache; performing full AP scan")
+            self._record = DiscoveryRecord()
+
         ap_list = []
         apsel = 0
         invalid_count = 0
@@ -160,6 +228,8 @@ class ADIv5Discovery(CoreSightDiscovery):
             ap_address = APv1Address(apsel)
             ap = AccessPort.create(self.dp, ap_address)
             self.dp.aps[ap_address] = ap
+            if self._record is not None:
+                ap.rom_table_reads = self._record.reads_for(apsel)
 
             LOG.info("%s IDR = 0x%08x (%s)", ap.short_description, ap.idr, ap.description)
         except exceptions.Error as e:
@@ -171,10 +241,41 @@ class ADIv5Discovery(CoreSightDiscovery):
         seq = CallSequence()
         for ap in [x for x in self.dp.aps.values() if x.has_rom_table]:
             seq.append(
-                ('init_ap.{}'.format(ap.address.apsel), ap.find_components)
+                ('init_ap.{}'.format(ap.address.apsel), lambda ap=ap: self._find_ap_components(ap))
                 )
         return seq
 
+    def _find_ap_components(self, ap):
+        """@brief Init task to find the components of one AP.
+
+        If the AP has cached ROM table reads, the first of them, the ID registers of the top level
+        ROM table, is read from the target. The cached reads are discarded if the values differ.
+        """
+        reads = ap.rom_table_reads
+        first_read = reads.first_read if (reads is not None) else None
+        if first_read is not None:
+            addr, count, words = first_read
+            try:
+                matches = list(ap.read_memory_block32(addr, count)) == words
+            except exceptions.TransferError:
+                matches = False
+            if not matches:
+                LOG.info("%s ROM table does not match discovery cache; performing full scan",
+                        ap.short_description)
+                self._record.discard_reads(ap.address.apsel)
+                ap.rom_table_reads = self._record.reads_for(ap.address.apsel)
+        ap.find_components()
+
+    def _store_cache(self):
+        """@brief Init task to write the discovery record to the cache if it has changed."""
+        if self._record is None:
+            return
+        for ap in self.dp.aps.values():
+            ap.rom_table_reads = None
+        self._record.set_aps({ap.address.apsel: ap.idr for ap in self.dp.aps.values()})
+        if self._record.is_modified:
+            self._cache.store(self._cache_key, self._record)
+
 class ADIv6Discovery(CoreSightDiscovery):
     """@brief Component discovery process for ADIv6.
 
@@ -0,0 +1,187 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import (Any, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING)
+
+if TYPE_CHECKING:
+    from ..core.memory_interface import MemoryInterface
+
+LOG = logging.getLogger(__name__)
+
+## Version of the cache file format. Cache files with a different version are ignored.
+CACHE_FORMAT_VERSION = 1
+
+class RecordedReads:
+    """@brief Read-through cache of the ROM table and component ID reads for one AP.
+
+    ROM tables and component ID registers are read through an instance of this class during
+    discovery. Reads that are in the cache are returned without accessing the target. Other reads
+    are passed to the memory interface and the results added to the cache.
+    """
+
+    def __init__(self, reads: Optional[Dict[Tuple[int, int], List[int]]] = None) -> None:
+        self._reads: Dict[Tuple[int, int], List[int]] = reads if reads is not None else {}
+        self._is_modified = False
+
+    @property
+    def is_modified(self) -> bool:
+        """@brief Whether any reads were added since the cache was loaded."""
+        return self._is_modified
+
+    @property
+    def first_read(self) -> Optional[Tuple[int, int, List[int]]]:
+        """@brief The first read that was recorded, as an (address, count, words) tuple.
+
+        This is the read of the ID registers of the AP's top level ROM table.
+        """
+        for (addr, count), words in self._reads.items():
+            return (addr, count, words)
+        return None
+
+    def get(self, addr: int, count: int) -> Optional[List[int]]:
+        """@brief Return the words of a recorded read, or None if the read isn't in the cache."""
+        words = self._reads.get((addr, count))
+        return list(words) if (words is not None) else None
+
+    def add(self, addr: int, count: int, words: Sequence[int]) -> None:
+        """@brief Record the words returned by a read."""
+        self._reads[(addr, count)] = list(words)
+        self._is_modified = True
+
+    def read_memory_block32(self, memif: "MemoryInterface", addr: int, count: int) -> Sequence[int]:
+        words = self.get(addr, count)
+        if words is None:
+            words = list(memif.read_memory_block32(addr, count))
+            self.add(addr, count, words)
+        return words
+
+    def to_list(self) -> List[Any]:
+        return [[addr, count, words] for (addr, count), words in self._reads.items()]
+
+    @classmethod
+    def from_list(cls, data: List[Any]) -> "RecordedReads":
+        return cls({(addr, count): words for addr, count, words in data})
+
+class DiscoveryRecord:
+    """@brief Results of ADIv5 discovery for one type of target.
+
+    The record holds the APSELs and IDR values of the APs found by the AP scan, plus a RecordedReads
+    for each AP with the reads of its ROM tables and component ID registers.
+    """
+
+    def __init__(self, aps: Optional[Dict[int, int]] = None,
+                reads: Optional[Dict[int, RecordedReads]] = None) -> None:
+        ## Dict of APSEL to IDR value.
+        self.aps: Dict[int, int] = aps if aps is not None else {}
+        self._reads: Dict[int, RecordedReads] = reads if reads is not None else {}
+        self._is_modified = False
+
+    @property
+    def is_modified(self) -> bool:
+        """@brief Whether the record has changed since it was loaded."""
+        return self._is_modified or any(r.is_modified for r in self._reads.values())
+
+    def set_aps(self, aps: Dict[int, int]) -> None:
+        """@brief Replace the AP scan results."""
+        if aps != self.aps:
+            self.aps = aps
+            self._is_modified = True
+
+    def reads_for(self, apsel: int) -> RecordedReads:
+        """@brief Return the recorded reads for an AP, creating an empty set if there are none."""
+        try:
+            return self._reads[apsel]
+        except KeyError:
+            reads = self._reads[apsel] = RecordedReads()
+            return reads
+
+    def discard_reads(self, apsel: int) -> None:
+        """@brief Remove the recorded reads for an AP, so its ROM tables will be read again."""
+        self._reads[apsel] = RecordedReads()
+        self._is_modified = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'aps': [[apsel, idr] for apsel, idr in self.aps.items()],
+            'reads': [[apsel, reads.to_list()] for apsel, reads in self._reads.items()],
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DiscoveryRecord":
+        return cls({apsel: idr for apsel, idr in data['aps']},
+                {apsel: RecordedReads.from_list(reads) for apsel, reads in data['reads']})
+
+class DiscoveryCache:
+    """@brief Directory of cached discovery records.
+
+    Records are stored as JSON files named by a hash of the key values, which identify the type of
+    target and the settings that affect the AP scan. The key values are also stored in the file
+    and compared when loading.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self._directory = directory
+
+    def _path_for(self, key: Dict[str, Any]) -> str:
+        digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+        return os.path.join(self._directory, digest + ".json")
+
+    def load(self, key: Dict[str, Any]) -> Optional[DiscoveryRecord]:
+        """@brief Load the record for a key.
+
+        @return The DiscoveryRecord, or None if the cache doesn't have a valid record for the key.
+        """
+        try:
+            with open(self._path_for(key), 'r') as f:
+                text = f.read()
+        except OSError:
+            return None
+
+        try:
+            data = json.loads(text)
+            if data['version'] != CACHE_FORMAT_VERSION or data['key'] != key:
+                return None
+            return DiscoveryRecord.from_dict(data)
+        except (ValueError, KeyError, TypeError) as err:
+            LOG.debug("ignoring invalid discovery cache file for %s: %s", key, err)
+            return None
+
+    def store(self, key: Dict[str, Any], record: DiscoveryRecord) -> None:
+        """@brief Write the record for a key.
+
+        The file is written to a temporary name then renamed into place, so concurrent sessions never
+        see a partially written file. Errors are logged and otherwise ignored.
+        """
+        data = record.to_dict()
+        data['version'] = CACHE_FORMAT_VERSION
+        data['key'] = key
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(data, f, separators=(',', ':'))
+                os.replace(temp_path, self._path_for(key))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as err:
+            LOG.debug("unable to write discovery cache file for %s: %s", key, err)
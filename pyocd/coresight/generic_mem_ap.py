@@ -85,6 +85,12 @@ class GenericMemAPTarget(Target, CoreSightCoreComponent):
     def read_memory_block32(self, addr, size):
         return self.ap.read_memory_block32(addr, size)
 
+    def write_memory_block_bytes(self, addr, data):
+        self.ap.write_memory_block_bytes(addr, data)
+
+    def read_memory_block_bytes(self, addr, size):
+        return self.ap.read_memory_block_bytes(addr, size)
+
     def halt(self):
         pass
 
@@ -29,6 +29,59 @@ from ..utility.timeout import Timeout
 
 LOG = logging.getLogger(__name__)
 
+def _read_block32(memif, addr, count):
+    """@brief Read ROM table entries or component ID registers.
+
+    If the memory interface has a `rom_table_reads` attribute that is not None, which is set on APs
+    by discovery when the discovery cache is enabled, the read goes through it.
+    """
+    reads = getattr(memif, 'rom_table_reads', None)
+    if reads is not None:
+        return reads.read_memory_block32(memif, addr, count)
+    return memif.read_memory_block32(addr, count)
+
+def _read_blocks32(memif, blocks):
+    """@brief Read several blocks of ROM table entries or component ID registers at once.
+
+    Every word is read with a deferred read, and all reads are queued before any result is
+    collected. This allows the probe to pipeline the reads into a few transactions rather than
+    waiting for a round trip per block. Like _read_block32(), reads go through the memory
+    interface's `rom_table_reads` cache if it has one.
+
+    @param memif The memory interface.
+    @param blocks Sequence of (address, word count) tuples.
+    @return List with a list of words for each block.
+    @exception TransferError If any of the reads fail.
+    """
+    reads = getattr(memif, 'rom_table_reads', None)
+    results = [(reads.get(addr, count) if (reads is not None) else None) for addr, count in blocks]
+    pending = []
+    try:
+        for i, (addr, count) in enumerate(blocks):
+            if results[i] is None:
+                pending.append((i, [memif.read32(addr + 4 * n, now=False) for n in range(count)]))
+    finally:
+        # Collect results in order. If one read fails, the remaining callbacks must still be
+        # invoked so the DP locks they hold are released; the first error is reraised.
+        error = None
+        for i, callbacks in pending:
+            words = []
+            for cb in callbacks:
+                try:
+                    words.append(cb())
+                except exceptions.Error as read_error:
+                    if error is None:
+                        error = read_error
+            results[i] = words
+        if error is not None:
+            raise error
+
+    if reads is not None:
+        for i, _ in pending:
+            addr, count = blocks[i]
+            reads.add(addr, count, results[i])
+    return results
+
 class CoreSightComponentID(object):
     """@brief Reads and parses CoreSight architectural component ID registers.
 
@@ -121,7 +174,44 @@ class CoreSightComponentID(object):
     def read_id_registers(self):
         """@brief Read Component ID, Peripheral ID, and DEVID/DEVARCH registers."""
         # Read registers as a single block read for performance reasons.
-        regs = self.ap.read_memory_block32(self.top_address + self.IDR_READ_START, self.IDR_READ_COUNT)
+        regs = _read_block32(self.ap, self.top_address + self.IDR_READ_START, self.IDR_READ_COUNT)
+        if not self._parse_id_registers(regs):
+            return
+
+        coresight_regs = None
+        if self.component_class == self.CORESIGHT_CLASS:
+            coresight_regs = _read_block32(self.ap,
+                self.top_address + self.CORESIGHT_IDR_READ_START, self.CORESIGHT_IDR_READ_COUNT)
+        self._identify(coresight_regs)
+
+    @classmethod
+    def read_id_registers_multiple(cls, memif, cmpids):
+        """@brief Read the ID registers of several components with pipelined reads.
+
+        This has the same result as calling read_id_registers() on each of the components, but the
+        reads for all components are performed together. The Component and Peripheral ID registers
+        are read first, then the DEVID/DEVARCH registers of the CoreSight-class components.
+
+        @param memif MemoryInterface used to access the components.
+        @param cmpids Sequence of CoreSightComponentID instances.
+        @exception TransferError If any of the reads fail.
+        """
+        all_regs = _read_blocks32(memif,
+                [(c.top_address + cls.IDR_READ_START, cls.IDR_READ_COUNT) for c in cmpids])
+        valid = [c for c, regs in zip(cmpids, all_regs) if c._parse_id_registers(regs)]
+
+        coresight = [c for c in valid if c.component_class == cls.CORESIGHT_CLASS]
+        all_coresight_regs = _read_blocks32(memif,
+                [(c.top_address + cls.CORESIGHT_IDR_READ_START, cls.CORESIGHT_IDR_READ_COUNT) for c in coresight])
+        coresight_regs_map = dict(zip(coresight, all_coresight_regs))
+
+        for c in valid:
+            c._identify(coresight_regs_map.get(c))
+
+    def _parse_id_registers(self, regs):
+        """@brief Extract fields from the Component and Peripheral ID registers.
+        @return Boolean indicating whether the CIDR value is valid.
+        """
         self.cidr = self._extract_id_register_value(regs, self.CIDR0_OFFSET)
         self.pidr = (self._extract_id_register_value(regs, self.PIDR4_OFFSET) << 32) \
                     | self._extract_id_register_value(regs, self.PIDR0_OFFSET)
@@ -129,7 +219,7 @@ class CoreSightComponentID(object):
         # Check if the component has a valid CIDR value
         if (self.cidr & self.CIDR_PREAMBLE_MASK) != self.CIDR_PREAMBLE_VALUE:
             LOG.warning("Invalid coresight component, cidr=0x%x", self.cidr)
-            return
+            return False
 
         # Extract class.
         self.component_class = (self.cidr & self.CIDR_COMPONENT_CLASS_MASK) >> self.CIDR_COMPONENT_CLASS_SHIFT
@@ -141,26 +231,30 @@ class CoreSightComponentID(object):
             self.designer_name = VENDOR_NAMES_MAP[self.designer]
 
         self.part = self.pidr & self.PIDR_PART_MASK
+        return True
 
+    def _identify(self, coresight_regs):
+        """@brief Determine the component type.
+        @param self
+        @param coresight_regs The DEVARCH, DEVID, and DEVTYPE register values for a CoreSight-class
+            component, otherwise None.
+        """
         # Handle Class 0x1 and Type 0x9 components.
         if self.component_class == self.ROM_TABLE_CLASS:
             # Class 0x1 ROM table.
             self.is_rom_table = True
         elif self.component_class == self.CORESIGHT_CLASS:
-             coresight_regs = self.ap.read_memory_block32(
-                 self.top_address + self.CORESIGHT_IDR_READ_START, self.CORESIGHT_IDR_READ_COUNT)
-
             # For CoreSight-class components, extract additional fields.
-             self.devarch = coresight_regs[self.DEVARCH_OFFSET]
-             self.devid = coresight_regs[1:4]
-             self.devid.reverse()
-             self.devtype = coresight_regs[self.DEVTYPE_OFFSET]
+            self.devarch = coresight_regs[self.DEVARCH_OFFSET]
+            self.devid = coresight_regs[1:4]
+            self.devid.reverse()
+            self.devtype = coresight_regs[self.DEVTYPE_OFFSET]
 
-             if self.devarch & self.DEVARCH_PRESENT_MASK:
-                 self.archid = self.devarch & self.DEVARCH_ARCHID_MASK
+            if self.devarch & self.DEVARCH_PRESENT_MASK:
+                self.archid = self.devarch & self.DEVARCH_ARCHID_MASK
 
-             # Identify a Class 0x9 ROM table.
-             self.is_rom_table = (self.archid == self.CLASS_0X9_ROM_TABLE_ARCHID)
+            # Identify a Class 0x9 ROM table.
+            self.is_rom_table = (self.archid == self.CLASS_0X9_ROM_TABLE_ARCHID)
 
         # Determine component name.
         if self.is_rom_table:
@@ -269,6 +363,7 @@ class ROMTable(CoreSightComponent):
             parent_table.add_child(self)
         self._depth = (self.parent.depth + 1) if self.parent else 0
         self._components = []
+        self._prefetched = {}
         self.name = 'ROM'
         self.gpr = None
 
@@ -310,6 +405,31 @@ class ROMTable(CoreSightComponent):
     def _read_table(self):
         raise NotImplementedError()
 
+    def _prefetch_id_registers(self, addresses):
+        """@brief Read the ID registers of the components at the given addresses together.
+
+        The CoreSightComponentID instances are saved to be used by _get_component_id(). If any of
+        the reads fail, nothing is saved, so each component's ID registers will be read separately
+        and errors reported against the table entry.
+        """
+        cmpids = [CoreSightComponentID(self, self.ap, address) for address in addresses]
+        if len(cmpids) < 2:
+            return
+        try:
+            CoreSightComponentID.read_id_registers_multiple(self.ap, cmpids)
+        except exceptions.TransferError as err:
+            LOG.debug("Error reading component IDs of ROM table @ %#010x together: %s", self.address, err)
+            return
+        self._prefetched = {cmpid.address: cmpid for cmpid in cmpids}
+
+    def _get_component_id(self, address, powerid):
+        """@brief Return the CoreSightComponentID for a component, reading its ID registers if needed."""
+        cmpid = self._prefetched.pop(address, None) if (powerid is None) else None
+        if cmpid is None:
+            cmpid = CoreSightComponentID(self, self.ap, address, powerid)
+            cmpid.read_id_registers()
+        return cmpid
+
     def for_each(self, action, filter=None):
         """@brief Apply an action to every component defined in the ROM table and child tables.
 
@@ -369,27 +489,35 @@ class Class1ROMTable(ROMTable):
         entryAddress = self.address
         foundEnd = False
         entriesRead = 0
-        entryNumber = 0
+        tableEntries = []
         while not foundEnd and entriesRead < self.ROM_TABLE_MAX_ENTRIES:
             # Read several entries at a time for performance.
             readCount = min(self.ROM_TABLE_MAX_ENTRIES - entriesRead, self.ROM_TABLE_ENTRY_READ_COUNT)
-            entries = self.ap.read_memory_block32(entryAddress, readCount)
+            entries = _read_block32(self.ap, entryAddress, readCount)
             entriesRead += readCount
+            entryAddress += 4 * readCount
 
             for entry in entries:
                 # Zero entry indicates the end of the table.
                 if entry == 0:
                     foundEnd = True
                     break
-                try:
-                    self._handle_table_entry(entry, entryNumber)
-                except exceptions.TransferError as err:
-                    LOG.error("Error attempting to probe CoreSight component referenced by "
-                            "ROM table entry #%d: %s", entryNumber, err,
-                            exc_info=self.ap.dp.session.get_current().log_tracebacks)
-
-                entryAddress += 4
-                entryNumber += 1
+                tableEntries.append(entry)
+
+        # Read the IDs of components that don't need to be powered up together.
+        self._prefetch_id_registers([self._entry_address(entry) for entry in tableEntries
+                if (entry & (self.ROM_TABLE_ENTRY_PRESENT_MASK | self.ROM_TABLE_32BIT_FORMAT_MASK
+                            | self.ROM_TABLE_POWERIDVALID_MASK))
+                    == (self.ROM_TABLE_ENTRY_PRESENT_MASK | self.ROM_TABLE_32BIT_FORMAT_MASK)])
+
+        for entryNumber, entry in enumerate(tableEntries):
+            try:
+                self._handle_table_entry(entry, entryNumber)
+            except exceptions.TransferError as err:
+                LOG.error("Error attempting to probe CoreSight component referenced by "
+                        "ROM table entry #%d: %s", entryNumber, err,
+                        exc_info=self.ap.dp.session.get_current().log_tracebacks)
+        self._prefetched = {}
 
     def _power_component(self, number, powerid, entry):
         if self.gpr is None:
@@ -406,6 +534,17 @@ class Class1ROMTable(ROMTable):
             LOG.info("Enabled power to power domain #%d", powerid)
             return True
 
+    def _entry_address(self, entry):
+        """@brief Return the address of the component referenced by a table entry."""
+        offset = entry & self.ROM_TABLE_ADDR_OFFSET_MASK
+        if (entry & self.ROM_TABLE_ADDR_OFFSET_NEG_MASK) != 0:
+            offset = ~bit_invert(offset)
+        address = self.address + offset
+        # Handle address going negative, since python doesn't have unsigned ints.
+        if address < 0:
+            address = 0x100000000 + address
+        return address
+
     def _handle_table_entry(self, entry, number):
         # Nonzero entries can still be disabled, so check the present bit before handling.
         if (entry & self.ROM_TABLE_ENTRY_PRESENT_MASK) == 0:
@@ -417,13 +556,7 @@ class Class1ROMTable(ROMTable):
             return
 
         # Get the component's top 4k address.
-        offset = entry & self.ROM_TABLE_ADDR_OFFSET_MASK
-        if (entry & self.ROM_TABLE_ADDR_OFFSET_NEG_MASK) != 0:
-            offset = ~bit_invert(offset)
-        address = self.address + offset
-        # Handle address going negative, since python doesn't have unsigned ints.
-        if address < 0:
-            address = 0x100000000 + address
+        address = self._entry_address(entry)
 
         # Check power ID.
         if (entry & self.ROM_TABLE_POWERIDVALID_MASK) != 0:
@@ -435,9 +568,8 @@ class Class1ROMTable(ROMTable):
         else:
             powerid = None
 
-        # Create component instance.
-        cmpid = CoreSightComponentID(self, self.ap, address, powerid)
-        cmpid.read_id_registers()
+        # Get the component's ID.
+        cmpid = self._get_component_id(address, powerid)
 
         # Is this component a power requestor?
         if cmpid.factory == GPR.factory:
@@ -556,12 +688,14 @@ class Class9ROMTable(ROMTable):
         foundEnd = False
         entriesRead = 0
         entryNumber = 0
+        presentEntries = []
 
         while not foundEnd and entriesRead < actualMaxEntries:
             # Read several entries at a time for performance.
             readCount = min(actualMaxEntries - entriesRead, entryReadCount)
-            entries = self.ap.read_memory_block32(entryAddress, readCount)
+            entries = _read_block32(self.ap, entryAddress, readCount)
             entriesRead += readCount
+            entryAddress += 4 * readCount
 
             # For 64-bit entries, combine pairs of 32-bit values into single 64-bit value.
             if self._width == 64:
@@ -575,18 +709,36 @@ class Class9ROMTable(ROMTable):
                     foundEnd = True
                     break
                 elif present == self.ROM_TABLE_ENTRY_PRESENT:
-                    try:
-                        self._handle_table_entry(entry, entryNumber)
-                    except exceptions.TransferError as err:
-                        LOG.error("Error attempting to probe CoreSight component referenced by "
-                                "ROM table entry #%d: %s", entryNumber, err,
-                                exc_info=self.ap.dp.session.get_current().log_tracebacks)
+                    presentEntries.append((entryNumber, entry))
                 else:
                     LOG.debug("%s[%d]<%08x not present>", self.depth_indent, entryNumber, entry)
 
-                entryAddress += 4 * entrySizeMultiplier
                 entryNumber += 1
 
+        # Read the IDs of components that don't need to be powered up together.
+        self._prefetch_id_registers([self._entry_address(entry) for _, entry in presentEntries
+                if (entry & self.ROM_TABLE_ENTRY_POWERIDVALID_MASK) == 0])
+
+        for entryNumber, entry in presentEntries:
+            try:
+                self._handle_table_entry(entry, entryNumber)
+            except exceptions.TransferError as err:
+                LOG.error("Error attempting to probe CoreSight component referenced by "
+                        "ROM table entry #%d: %s", entryNumber, err,
+                        exc_info=self.ap.dp.session.get_current().log_tracebacks)
+        self._prefetched = {}
+
+    def _entry_address(self, entry):
+        """@brief Return the address of the component referenced by a table entry."""
+        offset = entry & self.ROM_TABLE_ADDR_OFFSET_MASK[self._width]
+        if (entry & self.ROM_TABLE_ADDR_OFFSET_NEG_MASK[self._width]) != 0:
+            offset = ~bit_invert(offset, width=self._width)
+        address = self.address + offset
+        # Handle address going negative, since python doesn't have unsigned ints.
+        if address < 0:
+            address = (1 << self._width) + address
+        return address
+
     def _power_component(self, number, powerid, entry):
         """@brief Enable power to a component defined by a ROM table entry."""
         if not self._has_prr:
@@ -610,13 +762,7 @@ class Class9ROMTable(ROMTable):
     def _handle_table_entry(self, entry, number):
         """@brief Parse one ROM table entry."""
         # Get the component's top 4k address.
-        offset = entry & self.ROM_TABLE_ADDR_OFFSET_MASK[self._width]
-        if (entry & self.ROM_TABLE_ADDR_OFFSET_NEG_MASK[self._width]) != 0:
-            offset = ~bit_invert(offset, width=self._width)
-        address = self.address + offset
-        # Handle address going negative, since python doesn't have unsigned ints.
-        if address < 0:
-            address = (1 << self._width) + address
+        address = self._entry_address(entry)
 
         # Check power ID.
         if (entry & self.ROM_TABLE_ENTRY_POWERIDVALID_MASK) != 0:
@@ -628,9 +774,8 @@ class Class9ROMTable(ROMTable):
         else:
             powerid = None
 
-        # Create component instance.
-        cmpid = CoreSightComponentID(self, self.ap, address, powerid)
-        cmpid.read_id_registers()
+        # Get the component's ID.
+        cmpid = self._get_component_id(address, powerid)
 
         # Is this component a power requestor?
         if cmpid.factory == GPR.factory:
@@ -17,7 +17,7 @@
 
 import logging
 from copy import copy
-from typing import (Dict, List, TYPE_CHECKING, Iterable, MutableSequence, Optional, Sequence, Tuple)
+from typing import (Dict, List, TYPE_CHECKING, Iterable, MutableSequence, Optional, Sequence, Tuple, TypeVar)
 
 from .provider import Breakpoint
 from ...core.target import Target
@@ -29,6 +29,9 @@ if TYPE_CHECKING:
 
 LOG = logging.getLogger(__name__)
 
+## Type of data passed to filter_memory_unaligned_8(), which is returned with the same type.
+_DataT = TypeVar("_DataT", bound=MutableSequence[int])
+
 class UnrealizedBreakpoint(Breakpoint):
     """@brief Breakpoint class used until a breakpoint's type is decided."""
     pass
@@ -282,7 +285,7 @@ class BreakpointManager:
             data = provider.filter_memory(addr, size, data)
         return data
 
-    def filter_memory_unaligned_8(self, addr: int, size: int, data: MutableSequence[int]) -> Sequence[int]:
+    def filter_memory_unaligned_8(self, addr: int, size: int, data: _DataT) -> _DataT:
         for provider in [p for p in self._providers.values() if p.do_filter_memory]:
             for i, d in enumerate(data):
                 data[i] = provider.filter_memory(addr + i, 8, d)
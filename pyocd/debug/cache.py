@@ -22,12 +22,20 @@ from ..cache.register import RegisterCache
 class CachingDebugContext(DebugContext):
     """@brief Debug context combining register and memory caches."""
 
-    def __init__(self, parent, enable_memory: bool = True, enable_register: bool = True) -> None:
+    def __init__(
+                self,
+                parent,
+                enable_memory: bool = True,
+                enable_register: bool = True,
+                memory_size_limit: int = MemoryCache.DEFAULT_SIZE_LIMIT,
+                memory_read_ahead: bool = True,
+            ) -> None:
         super().__init__(parent)
         self._enable_memory = enable_memory
         self._enable_register = enable_register
         self._regcache = RegisterCache(parent, self.core) if enable_register else parent
-        self._memcache = MemoryCache(parent, self.core) if enable_memory else parent
+        self._memcache = MemoryCache(parent, self.core, size_limit=memory_size_limit,
+                read_ahead=memory_read_ahead) if enable_memory else parent
 
     def write_memory(self, addr, value, transfer_size=32):
         return self._memcache.write_memory(addr, value, transfer_size)
@@ -47,12 +55,22 @@ class CachingDebugContext(DebugContext):
     def read_memory_block32(self, addr, size):
         return self._memcache.read_memory_block32(addr, size)
 
+    def write_memory_block_bytes(self, addr, data):
+        return self._memcache.write_memory_block_bytes(addr, data)
+
+    def read_memory_block_bytes(self, addr, size):
+        return self._memcache.read_memory_block_bytes(addr, size)
+
     def read_core_registers_raw(self, reg_list):
         return self._regcache.read_core_registers_raw(reg_list)
 
     def write_core_registers_raw(self, reg_list, data_list):
         return self._regcache.write_core_registers_raw(reg_list, data_list)
 
+    def prefetch_core_registers(self, reg_list):
+        if self._enable_register:
+            self._regcache.read_core_registers_raw(reg_list)
+
     def invalidate(self):
         if self._enable_register:
             self._regcache.invalidate()
@@ -80,6 +80,12 @@ class DebugContext(MemoryInterface):
     def read_memory_block32(self, addr, size):
         return self._parent.read_memory_block32(addr, size)
 
+    def write_memory_block_bytes(self, addr, data):
+        return self._parent.write_memory_block_bytes(addr, data)
+
+    def read_memory_block_bytes(self, addr, size):
+        return self._parent.read_memory_block_bytes(addr, size)
+
     def read_core_register(self, reg):
         """@brief Read one core register.
 
@@ -126,6 +132,21 @@ class DebugContext(MemoryInterface):
         """
         return self._parent.read_core_registers_raw(reg_list)
 
+    def prefetch_core_registers(self, reg_list):
+        """@brief Read core registers that are expected to be requested soon.
+
+        Contexts that cache register values override this method to read all of the registers in
+        a single batch. The default implementation does nothing.
+
+        @param self The debug context.
+        @param reg_list List of registers to read. Each element in the list can be either the
+            register's name in lowercase or the integer register index.
+
+        @exception @ref pyocd.core.exceptions.CoreRegisterAccessError "CoreRegisterAccessError" Failed to
+            read one or more registers.
+        """
+        pass
+
     def write_core_register(self, reg, data):
         """@brief Write a CPU register.
 
@@ -15,12 +15,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import os
+import tempfile
+from array import array
+from bisect import (bisect_left, bisect_right)
 from elftools.elf.elffile import ELFFile
 from elftools.dwarf.constants import DW_LNE_set_address
-from intervaltree import IntervalTree
 from collections import namedtuple
-from itertools import islice
+from itertools import (accumulate, islice)
 import logging
 
 LOG = logging.getLogger(__name__)
@@ -29,28 +32,138 @@ FunctionInfo = namedtuple('FunctionInfo', 'name subprogram low_pc high_pc')
 LineInfo = namedtuple('LineInfo', 'cu filename dirname line')
 SymbolInfo = namedtuple('SymbolInfo', 'name address size type')
 
+## Version of the index cache file format. Cache files with a different version are ignored.
+INDEX_CACHE_VERSION = 1
+
+def get_build_id(elf):
+    """@brief Return the GNU build ID of an ELF file as a hex string, or None if it doesn't have one."""
+    section = elf.get_section_by_name('.note.gnu.build-id')
+    if section is None:
+        return None
+    for note in section.iter_notes():
+        if note['n_type'] == 'NT_GNU_BUILD_ID':
+            return note['n_desc']
+    return None
+
+class AddressRangeIndex(object):
+    """@brief Index of half-open address ranges for finding the range containing an address.
+
+    The ranges are held in parallel arrays sorted by start and then end address. A lookup returns
+    the position of the first range in this order that contains the address. This is the same
+    result as sorting the intervals of an IntervalTree that overlap the address, but without
+    creating an interval object per range.
+    """
+
+    def __init__(self, starts, ends):
+        """@brief Constructor.
+
+        @param self
+        @param starts Sequence of range start addresses, which must be sorted.
+        @param ends Sequence of range end addresses (exclusive), sorted along with _starts_.
+        """
+        self.starts = array('Q', starts)
+        self.ends = array('Q', ends)
+        # Running maximum of the end addresses. Like the start addresses, this is non-decreasing
+        # and so can be bisected.
+        self._max_ends = array('Q', accumulate(self.ends, max))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def find(self, addr):
+        """@brief Return the position of the first range containing the address, or None."""
+        # Only ranges before this position start at or below the address.
+        count = bisect_right(self.starts, addr)
+        # The first of those with an end above the address is the one we want.
+        index = bisect_left(self._max_ends, addr + 1, 0, count)
+        if index < count:
+            return index
+        return None
+
+class _IndexCache(object):
+    """@brief JSON files holding ELF indices, keyed by the ELF build ID."""
+
+    def __init__(self, cache_dir, build_id):
+        self._cache_dir = cache_dir
+        self._build_id = build_id
+
+    @classmethod
+    def for_elf(cls, elf, cache_dir):
+        """@brief Return a cache for the ELF, or None if caching is disabled or there is no build ID."""
+        if cache_dir is None:
+            return None
+        build_id = get_build_id(elf)
+        if build_id is None:
+            return None
+        return cls(cache_dir, build_id)
+
+    def _path_for(self, kind):
+        return os.path.join(self._cache_dir, "{}.{}.json".format(self._build_id, kind))
+
+    def load(self, kind):
+        try:
+            with open(self._path_for(kind), 'r') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_CACHE_VERSION:
+                return data
+        except (OSError, ValueError, AttributeError) as err:
+            LOG.debug("unable to read %s index cache for build %s: %s", kind, self._build_id, err)
+        return None
+
+    def store(self, kind, data):
+        data['version'] = INDEX_CACHE_VERSION
+        try:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self._cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(data, f, separators=(',', ':'))
+                os.replace(temp_path, self._path_for(kind))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as err:
+            LOG.debug("unable to write %s index cache for build %s: %s", kind, self._build_id, err)
+
 class ElfSymbolDecoder(object):
-    def __init__(self, elf):
+    """@brief Look up function and object symbols by name or address.
+
+    The symbol table is read on the first query, and the address index is built on the first
+    lookup by address. If a cache directory is provided and the ELF has a build ID, the symbols
+    read from the symbol table are cached.
+    """
+
+    def __init__(self, elf, cache_dir=None):
         assert isinstance(elf, ELFFile)
         self.elffile = elf
 
         self.symtab = self.elffile.get_section_by_name('.symtab')
         self.symcount = self.symtab.num_symbols()
-        self.symbol_dict = {}
-        self.symbol_tree = None
+        self._cache = _IndexCache.for_elf(elf, cache_dir)
+        self._symbols = None
+        self._symbol_dict = None
+        self._symbol_index = None
+        self._indexed_symbols = None
 
-        # Build indices.
-        self._build_symbol_search_tree()
         self._process_arm_type_symbols()
 
     def get_elf(self):
         return self.elffile
 
+    @property
+    def symbol_dict(self):
+        """@brief Dict mapping symbol names to SymbolInfo."""
+        if self._symbol_dict is None:
+            self._symbol_dict = {sym.name: sym for sym in self._get_symbols()}
+        return self._symbol_dict
+
     def get_symbol_for_address(self, addr):
-        try:
-            return sorted(self.symbol_tree[addr])[0].data
-        except IndexError:
+        if self._symbol_index is None:
+            self._build_symbol_index()
+        index = self._symbol_index.find(addr)
+        if index is None:
             return None
+        return self._indexed_symbols[index]
 
     def get_symbol_for_name(self, name):
         try:
@@ -58,31 +171,35 @@ class ElfSymbolDecoder(object):
         except KeyError:
             return None
 
-    def _build_symbol_search_tree(self):
-        self.symbol_tree = IntervalTree()
-        symbols = self.symtab.iter_symbols()
-        for symbol in symbols:
+    def _get_symbols(self):
+        """@brief Return the list of function and object symbols in symbol table order."""
+        if self._symbols is None:
+            data = self._cache.load('symbols') if self._cache else None
+            if data is not None:
+                self._symbols = [SymbolInfo(*sym) for sym in data['symbols']]
+            else:
+                self._symbols = self._read_symbols()
+                if self._cache:
+                    self._cache.store('symbols', {'symbols': self._symbols})
+        return self._symbols
+
+    def _read_symbols(self):
+        symbols = []
+        for symbol in self.symtab.iter_symbols():
             # Only look for functions and objects.
             sym_type = symbol.entry['st_info']['type']
-            if sym_type not in ['STT_FUNC', 'STT_OBJECT']:
+            if sym_type not in ('STT_FUNC', 'STT_OBJECT'):
                 continue
 
-            sym_value = symbol.entry['st_value']
-            sym_size = symbol.entry['st_size']
-
-            # Cannot put an empty interval into the tree, so ensure symbols have
-            # at least a size of 1.
-            real_sym_size = sym_size
-            if sym_size == 0:
-                sym_size = 1
-
-            syminfo = SymbolInfo(name=symbol.name, address=sym_value, size=real_sym_size, type=sym_type)
-
-            # Add to symbol dict.
-            self.symbol_dict[symbol.name] = syminfo
+            symbols.append(SymbolInfo(name=symbol.name, address=symbol.entry['st_value'],
+                    size=symbol.entry['st_size'], type=sym_type))
+        return symbols
 
-            # Add to symbol tree.
-            self.symbol_tree.addi(sym_value, sym_value+sym_size, syminfo)
+    def _build_symbol_index(self):
+        # Symbols with a size of 0 are treated as covering one byte.
+        ranges = sorted((sym.address, sym.address + max(sym.size, 1), sym) for sym in self._get_symbols())
+        self._symbol_index = AddressRangeIndex((r[0] for r in ranges), (r[1] for r in ranges))
+        self._indexed_symbols = [r[2] for r in ranges]
 
     def _process_arm_type_symbols(self):
         pass
@@ -103,41 +220,94 @@ class ElfSymbolDecoder(object):
         return islice(self.symtab.iter_symbols(), i, n)
 
 
+def _encode_path(value):
+    """@brief Convert a DWARF file or directory name to a JSON value.
+
+    Depending on the pyelftools version, names are either bytes or str. Bytes are stored as a
+    single element list holding the latin-1 decoded str, so they are restored with the same type.
+    """
+    if isinstance(value, bytes):
+        return [value.decode('latin-1')]
+    return value
+
+def _decode_path(value):
+    if isinstance(value, list):
+        return value[0].encode('latin-1')
+    return value
+
 class DwarfAddressDecoder(object):
-    def __init__(self, elf):
+    """@brief Look up the function and source line for an address from DWARF debug info.
+
+    The function and line indices are each built on the first lookup. If a cache directory is
+    provided and the ELF has a build ID, the line index is cached.
+    """
+
+    def __init__(self, elf, cache_dir=None):
         assert isinstance(elf, ELFFile)
         self.elffile = elf
         self.dwarfinfo = None
 
-        self.subprograms = []
-        self.function_tree = IntervalTree()
-        self.line_tree = IntervalTree()
+        self._cache = _IndexCache.for_elf(elf, cache_dir)
+        self._subprograms = None
+        self._function_index = None
+        self._functions = None
+        self._line_index = None
+        self._line_files = None
+        self._line_file_numbers = None
+        self._line_numbers = None
+        self._cus = {}
 
         if self.elffile.has_dwarf_info():
             self.dwarfinfo = self.elffile.get_dwarf_info()
 
-            # Build indices.
-            self._get_subprograms()
-            self._build_function_search_tree()
-            self._build_line_search_tree()
+    @property
+    def subprograms(self):
+        """@brief List of all subprogram DIEs."""
+        if self._subprograms is None:
+            self._subprograms = []
+            if self.dwarfinfo is not None:
+                self._get_subprograms()
+        return self._subprograms
 
     def get_function_for_address(self, addr):
-        try:
-            return sorted(self.function_tree[addr])[0].data
-        except IndexError:
+        if self._function_index is None:
+            self._build_function_index()
+        index = self._function_index.find(addr)
+        if index is None:
             return None
+        return self._functions[index]
 
     def get_line_for_address(self, addr):
-        try:
-            return sorted(self.line_tree[addr])[0].data
-        except IndexError:
+        if self._line_index is None:
+            self._build_line_index()
+        index = self._line_index.find(addr)
+        if index is None:
             return None
+        cu_offset, filename, dirname = self._line_files[self._line_file_numbers[index]]
+        return LineInfo(cu=self._get_cu(cu_offset), filename=filename, dirname=dirname,
+                line=self._line_numbers[index])
+
+    def _get_cu(self, offset):
+        """@brief Return the compile unit at an offset in the debug info."""
+        try:
+            return self._cus[offset]
+        except KeyError:
+            pass
+        # The CU is only not already known if the line index was loaded from the cache.
+        try:
+            cu = self.dwarfinfo.get_CU_at(offset)
+        except AttributeError:
+            # Older pyelftools versions don't have get_CU_at().
+            cu = None
+        self._cus[offset] = cu
+        return cu
 
     def _get_subprograms(self):
         for CU in self.dwarfinfo.iter_CUs():
-            self.subprograms.extend([d for d in CU.iter_DIEs() if d.tag == 'DW_TAG_subprogram'])
+            self._subprograms.extend([d for d in CU.iter_DIEs() if d.tag == 'DW_TAG_subprogram'])
 
-    def _build_function_search_tree(self):
+    def _build_function_index(self):
+        functions = []
         for prog in self.subprograms:
             try:
                 name = prog.attributes['DW_AT_name'].value
@@ -147,7 +317,7 @@ class DwarfAddressDecoder(object):
                 # Skip subprograms excluded from the link.
                 if low_pc == 0:
                     continue
-                # Skip empty subprograms (no null intervals are allowed).
+                # Skip empty subprograms.
                 if low_pc == high_pc:
                     continue
 
@@ -156,62 +326,101 @@ class DwarfAddressDecoder(object):
                 if prog.attributes['DW_AT_high_pc'].form != 'DW_FORM_addr':
                     high_pc = low_pc + high_pc
 
-                fninfo = FunctionInfo(name=name, subprogram=prog, low_pc=low_pc, high_pc=high_pc)
-
-                self.function_tree.addi(low_pc, high_pc, fninfo)
+                functions.append(FunctionInfo(name=name, subprogram=prog, low_pc=low_pc, high_pc=high_pc))
             except KeyError:
                 pass
 
-    def _build_line_search_tree(self):
-        for cu in self.dwarfinfo.iter_CUs():
-            lineprog = self.dwarfinfo.line_program_for_CU(cu)
-            prevstate = None
-            skipThisSequence = False
-            for entry in lineprog.get_entries():
-                # Look for a DW_LNE_set_address command with a 0 address. This indicates
-                # code that is not actually included in the link.
-                #
-                # TODO: find a better way to determine the code is really not present and
-                #       doesn't have a real address of 0
-                if entry.is_extended and entry.command == DW_LNE_set_address \
-                        and len(entry.args) == 1 and entry.args[0] == 0:
-                    skipThisSequence = True
-
-                # We're interested in those entries where a new state is assigned
-                if entry.state is None:
-                    continue
+        functions.sort(key=lambda fn: (fn.low_pc, fn.high_pc, fn.name))
+        self._function_index = AddressRangeIndex((fn.low_pc for fn in functions),
+                (fn.high_pc for fn in functions))
+        self._functions = functions
+
+    def _build_line_index(self):
+        data = self._cache.load('lines') if self._cache else None
+        if data is None:
+            data = self._read_line_rows()
+            if self._cache:
+                self._cache.store('lines', data)
+
+        self._line_files = [(cu_offset, _decode_path(filename), _decode_path(dirname))
+                for cu_offset, filename, dirname in data['files']]
+        self._line_index = AddressRangeIndex(data['starts'], data['ends'])
+        self._line_file_numbers = array('L', data['file_numbers'])
+        self._line_numbers = array('L', data['lines'])
+
+    def _read_line_rows(self):
+        """@brief Read the address ranges of all line program rows.
+
+        @return Dict of lists in the form stored in the index cache. The 'starts', 'ends',
+            'file_numbers', and 'lines' lists are parallel and sorted by address range. The file
+            numbers are indices into the 'files' list of (CU offset, filename, dirname).
+        """
+        files = {}
+        rows = []
+        if self.dwarfinfo is not None:
+            for cu in self.dwarfinfo.iter_CUs():
+                self._cus[cu.cu_offset] = cu
+                self._read_line_program_rows(cu, files, rows)
+
+        # Sorting is stable, so rows with the same range stay in line program order.
+        rows.sort(key=lambda row: (row[0], row[1]))
+        return {
+            'files': [(cu_offset, _encode_path(filename), _encode_path(dirname))
+                    for cu_offset, filename, dirname in files],
+            'starts': [row[0] for row in rows],
+            'ends': [row[1] for row in rows],
+            'file_numbers': [row[2] for row in rows],
+            'lines': [row[3] for row in rows],
+            }
+
+    def _read_line_program_rows(self, cu, files, rows):
+        lineprog = self.dwarfinfo.line_program_for_CU(cu)
+        prevstate = None
+        skipThisSequence = False
+        for entry in lineprog.get_entries():
+            # Look for a DW_LNE_set_address command with a 0 address. This indicates
+            # code that is not actually included in the link.
+            #
+            # TODO: find a better way to determine the code is really not present and
+            #       doesn't have a real address of 0
+            if entry.is_extended and entry.command == DW_LNE_set_address \
+                    and len(entry.args) == 1 and entry.args[0] == 0:
+                skipThisSequence = True
+
+            # We're interested in those entries where a new state is assigned
+            if entry.state is None:
+                continue
 
-                # Looking for a range of addresses in two consecutive states.
-                if prevstate and not skipThisSequence:
+            # Looking for a range of addresses in two consecutive states.
+            if prevstate and not skipThisSequence:
+                try:
+                    fileinfo = lineprog['file_entry'][prevstate.file - 1]
+                    filename = fileinfo.name
                     try:
-                        fileinfo = lineprog['file_entry'][prevstate.file - 1]
-                        filename = fileinfo.name
-                        try:
-                            dirname = lineprog['include_directory'][fileinfo.dir_index - 1]
-                        except IndexError:
-                            dirname = ""
+                        dirname = lineprog['include_directory'][fileinfo.dir_index - 1]
                     except IndexError:
-                        filename = ""
                         dirname = ""
-                    info = LineInfo(cu=cu, filename=filename, dirname=dirname, line=prevstate.line)
-                    fromAddr = prevstate.address
-                    toAddr = entry.state.address
-                    try:
-                        if fromAddr != 0 and toAddr != 0:
-                            # Ensure we don't insert null intervals.
-                            if fromAddr == toAddr:
-                                toAddr += 1
-                            self.line_tree.addi(fromAddr, toAddr, info)
-                    except Exception:
+                except IndexError:
+                    filename = ""
+                    dirname = ""
+                fromAddr = prevstate.address
+                toAddr = entry.state.address
+                if fromAddr != 0 and toAddr != 0:
+                    # Ensure we don't create empty ranges.
+                    if fromAddr == toAddr:
+                        toAddr += 1
+                    if fromAddr > toAddr:
                         LOG.debug("Problematic lineprog:")
                         self._dump_lineprog(lineprog)
-                        raise
+                        raise ValueError("line program row at %#x has negative length" % fromAddr)
+                    file_number = files.setdefault((cu.cu_offset, filename, dirname), len(files))
+                    rows.append((fromAddr, toAddr, file_number, prevstate.line))
 
-                if entry.state.end_sequence:
-                    prevstate = None
-                    skipThisSequence = False
-                else:
-                    prevstate = entry.state
+            if entry.state.end_sequence:
+                prevstate = None
+                skipThisSequence = False
+            else:
+                prevstate = entry.state
 
     def _dump_lineprog(self, lineprog):
         for i, e in enumerate(lineprog.get_entries()):
@@ -106,9 +106,12 @@ class ELFBinaryFile(object):
     of memory not mapped with a section of the ELF file, those ranges will not be considered in
     the used/unused lists. Also, only ranges completely contained within a region of the memory
     map are considered.
+
+    If a cache directory is provided, the symbol and line number indices built by the decoders are
+    stored there, keyed by the GNU build ID of the ELF. ELF files without a build ID are not cached.
     """
 
-    def __init__(self, elf, memory_map=None):
+    def __init__(self, elf, memory_map=None, cache_dir=None):
         self._owns_file = False
         if isinstance(elf, str):
             self._file = open(elf, 'rb')
@@ -117,6 +120,7 @@ class ELFBinaryFile(object):
             self._file = elf
         self._elf = ELFFile(self._file)
         self._memory_map = memory_map or MemoryMap()
+        self._cache_dir = cache_dir
 
         self._symbol_decoder = None
         self._address_decoder = None
@@ -228,13 +232,13 @@ class ELFBinaryFile(object):
     @property
     def symbol_decoder(self):
         if self._symbol_decoder is None:
-            self._symbol_decoder = ElfSymbolDecoder(self._elf)
+            self._symbol_decoder = ElfSymbolDecoder(self._elf, self._cache_dir)
         return self._symbol_decoder
 
     @property
     def address_decoder(self):
         if self._address_decoder is None:
-            self._address_decoder = DwarfAddressDecoder(self._elf)
+            self._address_decoder = DwarfAddressDecoder(self._elf, self._cache_dir)
         return self._address_decoder
 
 
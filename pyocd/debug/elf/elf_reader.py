@@ -80,3 +80,13 @@ class ElfReaderContext(DebugContext):
     def read_memory_block32(self, addr, size):
         return conversion.byte_list_to_u32le_list(self.read_memory_block8(addr, size * 4))
 
+    def read_memory_block_bytes(self, addr, size):
+        matches = self._tree.overlap(addr, addr + size)
+        # Must match only one interval (ELF section).
+        if len(matches) != 1:
+            return self._parent.read_memory_block_bytes(addr, size)
+        section = matches.pop().data
+        addr -= section.start
+        LOG.debug("read flash data [%x:%x]", section.start + addr, section.start + addr  + size)
+        return bytearray(section.data[addr:addr + size])
+
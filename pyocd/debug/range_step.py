@@ -0,0 +1,101 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from typing import (Optional, Set)
+
+# Make disassembly optional.
+try:
+    import capstone
+    from capstone import arm as cs_arm
+    IS_CAPSTONE_AVAILABLE = True
+except ImportError:
+    IS_CAPSTONE_AVAILABLE = False
+
+LOG = logging.getLogger(__name__)
+
+if IS_CAPSTONE_AVAILABLE:
+    ## Branches whose target is encoded in the instruction.
+    _DIRECT_BRANCHES = {
+        cs_arm.ARM_INS_B,
+        cs_arm.ARM_INS_BL,
+        cs_arm.ARM_INS_CBZ,
+        cs_arm.ARM_INS_CBNZ,
+        }
+
+    ## Instructions that cause an exception or halt instead of continuing execution.
+    _EXCEPTION_INSTRUCTIONS = {
+        cs_arm.ARM_INS_SVC,
+        cs_arm.ARM_INS_BKPT,
+        cs_arm.ARM_INS_UDF,
+        }
+
+    ## Instruction groups that transfer control.
+    _BRANCH_GROUPS = {
+        capstone.CS_GRP_JUMP,
+        capstone.CS_GRP_CALL,
+        capstone.CS_GRP_RET,
+        capstone.CS_GRP_INT,
+        }
+
+def find_range_exits(code: bytes, start: int) -> Optional[Set[int]]:
+    """@brief Find every address at which execution can leave a range of Thumb code.
+
+    The range is the extent of _code_, placed at _start_. Exits are the address immediately following
+    the range, plus the targets of direct branches (B, BL, CBZ, and CBNZ) that lie outside the range.
+    If the core runs from inside the range with breakpoints at all exits, it will halt at the first
+    instruction executed outside of the range, as long as no exception is taken.
+
+    The exits can only be known if all control flow in the range is direct. None is returned for
+    ranges containing an indirect branch or other write to the PC, a table branch, an instruction that
+    raises an exception, or bytes that cannot be decoded. None is also returned if the Capstone package
+    is not installed.
+
+    @param code Bytes of the instructions in the range.
+    @param start Address of the first instruction.
+    @return Set of exit addresses, or None if the exits cannot be determined.
+    """
+    if not IS_CAPSTONE_AVAILABLE:
+        return None
+
+    end = start + len(code)
+    md = capstone.Cs(capstone.CS_ARCH_ARM, capstone.CS_MODE_THUMB | capstone.CS_MODE_MCLASS)
+    md.detail = True
+
+    exits = {end}
+    next_address = start
+    for insn in md.disasm(code, start):
+        # Decoding stops at invalid bytes.
+        if insn.address != next_address:
+            break
+        next_address = insn.address + insn.size
+
+        if insn.id in _DIRECT_BRANCHES:
+            target = [op.imm for op in insn.operands if op.type == cs_arm.ARM_OP_IMM][-1]
+            if not (start <= target < end):
+                exits.add(target)
+        elif ((insn.id in _EXCEPTION_INSTRUCTIONS)
+                or any(insn.group(group) for group in _BRANCH_GROUPS)
+                or (cs_arm.ARM_REG_PC in insn.regs_access()[1])):
+            LOG.debug("range %#010x-%#010x has unsupported control flow at %#010x: %s %s",
+                    start, end, insn.address, insn.mnemonic, insn.op_str)
+            return None
+
+    # Every byte of the range must be decoded, and the last instruction must not extend past the end.
+    if next_address != end:
+        LOG.debug("range %#010x-%#010x could not be fully decoded", start, end)
+        return None
+    return exits
@@ -21,7 +21,7 @@
 from abc import ABC, abstractmethod
 from ctypes import Structure, c_char, c_int32, c_uint32, sizeof
 import struct
-from typing import Optional, Sequence
+from typing import List, Optional, Sequence
 
 from ..core.memory_map import MemoryMap, MemoryRegion, MemoryType
 from ..core.soc_target import SoCTarget
@@ -116,6 +116,19 @@ class RTTControlBlock(ABC):
         """
         pass
 
+    def read_up_channels(self, channels: Optional[Sequence[int]] = None) -> List[bytes]:
+        """@brief Read all available data from several up channels.
+
+        Subclasses may override this method to read the state of all channels at once. The default
+        implementation reads each channel in turn.
+
+        @param channels Indices of the up channels to read. All up channels are read if not specified.
+        @return List with the data read from each requested channel, in the same order as _channels_.
+        """
+        if channels is None:
+            channels = range(len(self.up_channels))
+        return [self.up_channels[i].read() for i in channels]
+
     @classmethod
     def from_target(cls, target: SoCTarget, address: int = None,
                     size: int = None, control_block_id: bytes = b'SEGGER RTT'):
@@ -189,22 +202,27 @@ class GenericRTTUpChannel(RTTUpChannel):
         self._buffer_address = descriptor.pBuffer
         self.size = descriptor.SizeOfBuffer
 
+    @property
+    def is_configured(self) -> bool:
+        """@brief Whether the target has populated the buffer descriptor."""
+        return (self.size != 0) and (self._buffer_address != 0)
+
     @property
     def bytes_available(self) -> int:
         """@brief Number of bytes available to be read from up channel. """
-        if (self.size == 0) or (self._buffer_address == 0):
+        if not self.is_configured:
             # descriptor is not yet populated
             self._read_descriptor()
-            if (self.size == 0) or (self._buffer_address == 0):
+            if not self.is_configured:
                 # descriptor is still not populated
                 return 0
 
         # Get offsets
-        write_off, read_off = self.target.read_memory_block32(self._offsets_addr, 2)
+        write_off, read_off = self._target.read_memory_block32(self._offsets_addr, 2)
 
         if (write_off >= self.size) or (read_off >= self.size):
             raise exceptions.RTTError("Invalid up buffer")
-        elif write_off == self.read_off:
+        elif write_off == read_off:
             return 0
         elif write_off > read_off:
             return write_off - read_off
@@ -213,16 +231,34 @@ class GenericRTTUpChannel(RTTUpChannel):
 
     def read(self) -> bytes:
         """@brief Read all available data from RTT channel. """
-        if (self.size == 0) or (self._buffer_address == 0):
+        if not self.is_configured:
             # descriptor is not yet populated
             self._read_descriptor()
-            if (self.size == 0) or (self._buffer_address == 0):
+            if not self.is_configured:
                 # descriptor is still not populated
                 return b''
 
         # Get offsets
         write_off, read_off = self._target.read_memory_block32(self._offsets_addr, 2)
+        return self.read_with_offsets(write_off, read_off)
 
+    def update_descriptor(self, buffer_address: int, size: int) -> None:
+        """@brief Update the buffer location from descriptor fields read by the caller.
+
+        If the target has populated the descriptor since it was last read, the whole descriptor is
+        read again to get the channel name.
+        """
+        was_configured = self.is_configured
+        self._buffer_address = buffer_address
+        self.size = size
+        if not was_configured and self.is_configured:
+            self._read_descriptor()
+
+    def read_with_offsets(self, write_off: int, read_off: int) -> bytes:
+        """@brief Read available data given the buffer offsets already read from the descriptor.
+
+        The read offset on the target is updated to release the data that was read.
+        """
         if (write_off >= self.size) or (read_off >= self.size):
             raise exceptions.RTTError("Invalid up buffer")
         elif write_off == read_off:
@@ -233,16 +269,17 @@ class GenericRTTUpChannel(RTTUpChannel):
             |oooooo|xxxxxxxxxxxx|oooooo|
             0    rdOff        WrOff    SizeOfBuffer
             """
-            data = self._target.read_memory_block8(self._buffer_address + read_off,
-                                                   write_off - read_off)
+            data = self._target.read_memory_block_bytes(self._buffer_address + read_off,
+                                                        write_off - read_off)
         else:
             """
             |xxxxxx|oooooooooooo|xxxxxx|
             0    WrOff        RdOff    SizeOfBuffer
             """
-            data = self._target.read_memory_block8(self._buffer_address + read_off,
-                                                   self.size - read_off)
-            data += self._target.read_memory_block8(self._buffer_address, write_off)
+            data = self._target.read_memory_block_bytes(self._buffer_address + read_off,
+                                                        self.size - read_off)
+            if write_off:
+                data += self._target.read_memory_block_bytes(self._buffer_address, write_off)
 
         # Update read offset
         self._target.write32(self._offsets_addr + 4, write_off)
@@ -312,7 +349,7 @@ class GenericRTTDownChannel(RTTDownChannel):
 
         if (write_off >= self.size) or (read_off >= self.size):
             raise exceptions.RTTError("Invalid down buffer")
-        elif write_off == self.read_off:
+        elif write_off == read_off:
             return self.size
         elif write_off > read_off:
             return (self.size - write_off) + (read_off - 1)
@@ -359,8 +396,8 @@ class GenericRTTDownChannel(RTTDownChannel):
                 # Can't use the last element in the buffer
                 free_space -= 1
             data_to_write: bytes = data[:free_space]
-            self._target.write_memory_block8(self._buffer_address + write_off,
-                                             data_to_write)
+            self._target.write_memory_block_bytes(self._buffer_address + write_off,
+                                                  data_to_write)
             bytes_written = len(data_to_write)
             data = data[bytes_written:]
             write_off = (write_off + bytes_written) % self.size
@@ -370,8 +407,8 @@ class GenericRTTDownChannel(RTTDownChannel):
             free_space = 0
 
         bytes_to_write: int = min(free_space, len(data))
-        self._target.write_memory_block8(self._buffer_address + write_off,
-                                         data[:bytes_to_write])
+        self._target.write_memory_block_bytes(self._buffer_address + write_off,
+                                              data[:bytes_to_write])
         bytes_written += bytes_to_write
         write_off += bytes_to_write
 
@@ -404,6 +441,7 @@ class GenericRTTControlBlock(RTTControlBlock):
         self.target = target
         self.up_channels = list()
         self.down_channels = list()
+        self._up_base = 0
 
         if address is None:
             memory_map: MemoryMap = self.target.get_memory_map()
@@ -477,6 +515,7 @@ class GenericRTTControlBlock(RTTControlBlock):
 
         # Setup up channels
         up_base = cb_addr + sizeof(SEGGER_RTT_CB)
+        self._up_base = up_base
         for i in range(num_up_buffs):
             addr = up_base + (i * sizeof(SEGGER_RTT_BUFFER_UP))
             self.up_channels.append(GenericRTTUpChannel(self.target, addr))
@@ -486,3 +525,38 @@ class GenericRTTControlBlock(RTTControlBlock):
         for i in range(num_down_buffs):
             addr = down_base + (i * sizeof(SEGGER_RTT_BUFFER_DOWN))
             self.down_channels.append(GenericRTTDownChannel(self.target, addr))
+
+    def read_up_channels(self, channels: Optional[Sequence[int]] = None) -> List[bytes]:
+        """@brief Read all available data from several up channels.
+
+        The descriptors of all up channels are contiguous in the control block, so they are read
+        with a single transfer. Data is then read only from channels that aren't empty.
+
+        @param channels Indices of the up channels to read. All up channels are read if not specified.
+        @return List with the data read from each requested channel, in the same order as _channels_.
+        """
+        if channels is None:
+            channels = range(len(self.up_channels))
+        if not channels:
+            return []
+
+        # Read the descriptors of the range of channels being read.
+        first = min(channels)
+        count = max(channels) - first + 1
+        desc_words = sizeof(SEGGER_RTT_BUFFER_UP) // 4
+        words = self.target.read_memory_block32(self._up_base + first * sizeof(SEGGER_RTT_BUFFER_UP),
+                count * desc_words)
+
+        result = []
+        for i in channels:
+            descriptor = SEGGER_RTT_BUFFER_UP(*words[(i - first) * desc_words:(i - first + 1) * desc_words])
+            chan = self.up_channels[i]
+            if not isinstance(chan, GenericRTTUpChannel):
+                result.append(chan.read())
+                continue
+            chan.update_descriptor(descriptor.pBuffer, descriptor.SizeOfBuffer)
+            if not chan.is_configured:
+                result.append(b'')
+            else:
+                result.append(chan.read_with_offsets(descriptor.WrOff, descriptor.RdOff))
+        return result
@@ -18,17 +18,19 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
+from functools import lru_cache
 import lark.lark
 import lark.exceptions
 import lark.visitors
 import logging
 import threading
+import weakref
 from dataclasses import dataclass
 from enum import Enum
 from inspect import signature
 from lark.lexer import Token as LarkToken
 from lark.tree import Tree as LarkTree
-from typing import (Any, Iterator, cast, List, Optional, Union, TYPE_CHECKING)
+from typing import (Any, Callable, Iterator, cast, List, Optional, Set, Union, TYPE_CHECKING)
 from typing_extensions import Self
 
 from ...core import exceptions
@@ -42,7 +44,7 @@ if TYPE_CHECKING:
     # Only import Session when type checking to avoid complex import cycles.
     from ...core.session import Session
     from ...coresight.ap import APAddressBase
-    from .delegates import DebugSequenceDelegate
+    from .delegates import (DebugSequenceDelegate, DebugSequenceFunctionsDelegate)
 
 LOG = logging.getLogger(__name__)
 TRACE = LOG.getChild("trace")
@@ -50,6 +52,9 @@ TRACE.setLevel(logging.CRITICAL)
 
 NodeType = Union[LarkTree, LarkToken, int]
 
+## Type of compiled debug sequence code. The arguments are the scope and functions delegate.
+CompiledCode = Callable[[Scope, "DebugSequenceFunctionsDelegate"], Any]
+
 class DebugSequenceError(exceptions.Error):
     pass
 
@@ -77,7 +82,12 @@ class _ConvertLiterals(lark.visitors.Transformer):
         return tok
 
 class Parser:
-    """@brief Debug sequence statement parser."""
+    """@brief Debug sequence statement parser.
+
+    Parse results are memoised by source text and shared, so the same block or control predicate
+    is only parsed once even if several pack devices, targets, or sessions create nodes for it.
+    The returned trees must not be modified.
+    """
 
     ## Shared parser object.
     _parser = lark.lark.Lark.open("sequences.lark",
@@ -88,6 +98,7 @@ class Parser:
                         transformer=_ConvertLiterals())
 
     @classmethod
+    @lru_cache(maxsize=4096)
     def parse(cls, data: str) -> LarkTree:
         try:
             # Parse the input.
@@ -261,6 +272,44 @@ class DebugSequenceExecutionContext:
         assert self._thread_local_contexts.context == self
         del self._thread_local_contexts.context
 
+class _CompiledStatements:
+    """@brief Debug sequence statements that are checked and compiled once, then executed many times.
+
+    The semantic checks depend on the delegate and Pname of the execution context, so they are run
+    once for each delegate and Pname combination. The compiled code only depends on the statements,
+    and is created on first use.
+
+    When trace logging is enabled, the statements are run by an Interpreter instead, so every
+    operation is logged.
+    """
+
+    def __init__(self, tree: LarkTree) -> None:
+        self._tree = tree
+        self._code: Optional[CompiledCode] = None
+        self._checked: weakref.WeakKeyDictionary[DebugSequenceDelegate, Set[Optional[str]]] = \
+                weakref.WeakKeyDictionary()
+
+    def prepare(self, scope: Scope, context: DebugSequenceExecutionContext) -> Callable[[], Any]:
+        """@brief Return a callable that executes the statements in the given scope.
+
+        @exception DebugSequenceSemanticError A semantic error was discovered in the statements.
+        """
+        if TRACE.isEnabledFor(logging.DEBUG):
+            return Interpreter(self._tree, scope, context).execute
+
+        delegate = context.delegate
+        checked_pnames = self._checked.setdefault(delegate, set())
+        if context.pname not in checked_pnames:
+            SemanticChecker(self._tree, scope, context).check()
+            checked_pnames.add(context.pname)
+
+        if self._code is None:
+            self._code = Compiler().compile(_ConstantFolder().transform(self._tree))
+
+        code = self._code
+        fns = delegate.get_sequence_functions()
+        return lambda: code(scope, fns)
+
 class DebugSequenceNode(GraphNode):
     """@brief Common base class for debug sequence nodes."""
 
@@ -449,6 +498,7 @@ class Control(DebugSequenceNode):
         self._timeout = (timeout_µs / 1000000) if timeout_µs else None
         self._predicate = predicate
         self._ast = Parser.parse(predicate)
+        self._statements = _CompiledStatements(self._ast)
 
     def execute(self, context: DebugSequenceExecutionContext) -> Optional[Scope]:
         """@brief Run the sequence."""
@@ -458,7 +508,7 @@ class Control(DebugSequenceNode):
             parent_scope,
             name=f"{parent_scope.name}.{self._type.name}"
             )
-        interp = Interpreter(self._ast, scope, context)
+        predicate = self._statements.prepare(scope, context)
 
         # Push our new scope.
         with context.push(self, scope):
@@ -467,7 +517,7 @@ class Control(DebugSequenceNode):
             timeout.start()
 
             # Execute the predicate a first time.
-            result = interp.execute()
+            result = predicate()
             TRACE.debug("%s(%s): pred=%s", self._type.name, self._predicate, result)
 
             while result and timeout.check():
@@ -479,7 +529,7 @@ class Control(DebugSequenceNode):
                     break
                 # For a while control, re-evaluate the predicate.
                 elif self._type == self.ControlType.WHILE:
-                    result = interp.execute()
+                    result = predicate()
                     TRACE.debug("%s(%s): pred=%d", self._type.name, self._predicate, result)
 
         return scope
@@ -508,6 +558,7 @@ class Block(DebugSequenceNode):
     def __init__(self, code: str, is_atomic: bool = False, info: str = "") -> None:
         super().__init__(info)
         self._ast = Parser.parse(code)
+        self._statements = _CompiledStatements(self._ast)
         self._is_atomic = is_atomic
 
     def execute(self, context: DebugSequenceExecutionContext) -> Optional[Scope]:
@@ -519,8 +570,7 @@ class Block(DebugSequenceNode):
             if self._is_atomic:
                 context.session.probe.lock()
 
-            interp = Interpreter(self._ast, context.current_scope, context)
-            interp.execute()
+            self._statements.prepare(context.current_scope, context)()
         finally:
             if self._is_atomic:
                 context.session.probe.unlock()
@@ -992,3 +1042,149 @@ class Interpreter:
         visitor = self._InterpreterVisitor(self._scope, self._context)
         return visitor.visit(self._tree)
 
+
+class Compiler:
+    """@brief Compiler of debug sequence ASTs into Python closures.
+
+    Each node of the AST is converted to a closure that takes the scope and functions delegate as
+    arguments, and evaluates the node by calling the closures of its children. This avoids the
+    overhead of dispatching on node types and visiting the tree each time the code runs, which
+    matters for while-control predicates that poll a register in a tight loop.
+
+    The AST should already have been semantically checked and constant folded. The compiled code
+    has the same behaviour as Interpreter, including evaluating all operands of an expression.
+    """
+
+    def compile(self, tree: LarkTree) -> CompiledCode:
+        """@brief Compile the statements in an AST.
+
+        @return Callable taking a Scope and a functions delegate. It returns the value of the last
+            statement, or None if the last statement is a declaration or there are no statements.
+        @exception DebugSequenceSemanticError The AST contains an unexpected node.
+        """
+        statements = [self._compile_node(node) for node in tree.children]
+
+        if not statements:
+            return lambda scope, fns: None
+        elif len(statements) == 1:
+            return statements[0]
+
+        def run_statements(scope: Scope, fns: DebugSequenceFunctionsDelegate) -> Any:
+            result = None
+            for statement in statements:
+                result = statement(scope, fns)
+            return result
+        return run_statements
+
+    def _compile_node(self, node: NodeType) -> CompiledCode:
+        if isinstance(node, LarkTree):
+            try:
+                handler = getattr(self, "_compile_" + node.data)
+            except AttributeError:
+                raise DebugSequenceSemanticError(f"unexpected expression tree of type {node.data}") from None
+            return handler(node)
+        elif isinstance(node, LarkToken):
+            if node.type == 'IDENT':
+                return self._compile_variable(node.value)
+            elif node.type in ('INTLIT', 'STRLIT'):
+                value = node.value
+                return lambda scope, fns: value
+            else:
+                raise DebugSequenceSemanticError(f"unexpected literal type {node.type}")
+        elif isinstance(node, int):
+            return lambda scope, fns: node
+        else:
+            raise DebugSequenceSemanticError("unexpected node type when expecting atom")
+
+    def _compile_variable(self, name: str) -> CompiledCode:
+        def get_variable(scope: Scope, fns: DebugSequenceFunctionsDelegate) -> int:
+            try:
+                return scope.get(name)
+            except KeyError as err:
+                LOG.debug("debug sequence reference to undefined variable %s... %s", name, scope.dump())
+                raise DebugSequenceSemanticError(f"reference to undefined variable {name}") from err
+        return get_variable
+
+    def _compile_decl_stmt(self, tree: LarkTree) -> CompiledCode:
+        name_token, expr = tree.children
+        assert isinstance(name_token, LarkToken)
+        name = name_token.value
+
+        # Handle __var declarations with no initialiser expression. Even though this is disallowed
+        # by the specification, it appears in some DFPs, including some of NXP's.
+        if expr is None:
+            def declare_zero(scope: Scope, fns: DebugSequenceFunctionsDelegate) -> None:
+                scope.set(name, 0)
+            return declare_zero
+
+        value_code = self._compile_node(expr)
+        def declare(scope: Scope, fns: DebugSequenceFunctionsDelegate) -> None:
+            scope.set(name, value_code(scope, fns))
+        return declare
+
+    def _compile_assign_expr(self, tree: LarkTree) -> CompiledCode:
+        name_token, op_token, expr = tree.children
+        assert isinstance(name_token, LarkToken) and isinstance(op_token, LarkToken)
+        name = name_token.value
+        value_code = self._compile_node(expr)
+
+        if op_token.value == '=':
+            def assign(scope: Scope, fns: DebugSequenceFunctionsDelegate) -> int:
+                value = value_code(scope, fns)
+                scope.set(name, value)
+                return value
+            return assign
+
+        # Handle compound assignment operators.
+        op = _BINARY_OPS[op_token.value.rstrip('=')]
+        def compound_assign(scope: Scope, fns: DebugSequenceFunctionsDelegate) -> int:
+            value = value_code(scope, fns)
+            value = op(scope.get(name), value)
+            scope.set(name, value)
+            return value
+        return compound_assign
+
+    def _compile_expr_stmt(self, tree: LarkTree) -> CompiledCode:
+        return self._compile_node(tree.children[0])
+
+    def _compile_ternary_expr(self, tree: LarkTree) -> CompiledCode:
+        predicate_code, true_code, false_code = (self._compile_node(n) for n in tree.children)
+
+        def ternary(scope: Scope, fns: DebugSequenceFunctionsDelegate) -> int:
+            predicate = predicate_code(scope, fns)
+            # Both branches are evaluated, as by the interpreter.
+            true_value = true_code(scope, fns)
+            false_value = false_code(scope, fns)
+            if not isinstance(predicate, int):
+                raise DebugSequenceSemanticError("ternary expression predicate is not an integer")
+            return true_value if (predicate != 0) else false_value
+        return ternary
+
+    def _compile_binary_expr(self, tree: LarkTree) -> CompiledCode:
+        left, op_token, right = tree.children
+        assert isinstance(op_token, LarkToken)
+        op = _BINARY_OPS[op_token.value]
+        left_code = self._compile_node(left)
+        right_code = self._compile_node(right)
+        return lambda scope, fns: op(left_code(scope, fns), right_code(scope, fns))
+
+    def _compile_unary_expr(self, tree: LarkTree) -> CompiledCode:
+        op_token, arg = tree.children
+        assert isinstance(op_token, LarkToken)
+        op = _UNARY_OPS[op_token.value]
+        arg_code = self._compile_node(arg)
+        return lambda scope, fns: op(arg_code(scope, fns))
+
+    def _compile_fncall(self, tree: LarkTree) -> CompiledCode:
+        fn_name = tree.children[0]
+        assert isinstance(fn_name, str)
+        # Case-insensitive match.
+        fn_name = fn_name.lower()
+        arg_codes = [self._compile_node(n) for n in tree.children[1:]]
+
+        def call(scope: Scope, fns: DebugSequenceFunctionsDelegate) -> int:
+            args = [arg_code(scope, fns) for arg_code in arg_codes]
+            # The function name was already verified by the semantic checker.
+            result = getattr(fns, fn_name)(*args)
+            return 0 if (result is None) else result
+        return call
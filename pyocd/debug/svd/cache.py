@@ -0,0 +1,261 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import zlib
+from typing import (Any, Dict, Optional)
+
+from .model import (
+    SVDAddressBlock,
+    SVDCpu,
+    SVDDevice,
+    SVDElement,
+    SVDEnumeratedValue,
+    SVDField,
+    SVDInterrupt,
+    SVDPeripheral,
+    SVDRegister,
+    SVDRegisterArray,
+    SVDRegisterCluster,
+    SVDRegisterClusterArray,
+)
+
+LOG = logging.getLogger(__name__)
+
+## Version of the cache file format. Cache files with a different version are ignored.
+CACHE_FORMAT_VERSION = 1
+
+## Extension of cache files.
+CACHE_FILE_EXTENSION = ".svdc"
+
+## Peripheral attributes that are stored in a separately compressed record of the cache file and
+# only decoded when first accessed.
+DEFERRED_PERIPHERAL_ATTRIBUTES = ("_registers", "_register_arrays", "_clusters")
+
+## Default cache directory, relative to the user's cache directory.
+DEFAULT_CACHE_SUBDIR = os.path.join("pyocd", "svd")
+
+## Key of encoded objects that holds the type name.
+_TYPE_KEY = "$"
+
+## Key of encoded elements that is present if the element's parent is its containing element.
+_PARENT_KEY = "^"
+
+_ELEMENT_CLASSES = {cls.__name__: cls for cls in (
+    SVDAddressBlock,
+    SVDCpu,
+    SVDEnumeratedValue,
+    SVDField,
+    SVDInterrupt,
+    SVDRegister,
+    SVDRegisterArray,
+    SVDRegisterCluster,
+    SVDRegisterClusterArray,
+    )}
+
+def _encode(value: Any, container: Optional[SVDElement] = None) -> Any:
+    """@brief Convert a value from the SVD object graph to a JSON-compatible value.
+
+    Elements are encoded as a dict of their instance attributes. Parent links are not stored
+    directly. Instead, an element is flagged if its parent is the element containing it, which is
+    how the constructors set up parents.
+    """
+    if isinstance(value, SVDElement):
+        encoded: Dict[str, Any] = {_TYPE_KEY: type(value).__name__}
+        if (container is not None) and (value.parent is container):
+            encoded[_PARENT_KEY] = 1
+        for k, v in value.__dict__.items():
+            if k != 'parent':
+                encoded[k] = _encode(v, value)
+        return encoded
+    elif isinstance(value, list):
+        return [_encode(v, container) for v in value]
+    elif isinstance(value, tuple):
+        return {_TYPE_KEY: 'tuple', 'a': [_encode(v, container) for v in value]}
+    elif isinstance(value, range):
+        return {_TYPE_KEY: 'range', 'a': [value.start, value.stop, value.step]}
+    else:
+        return value
+
+def _decode(value: Any, container: Optional[SVDElement] = None) -> Any:
+    """@brief Reverse _encode()."""
+    if isinstance(value, list):
+        return [_decode(v, container) for v in value]
+    elif isinstance(value, dict):
+        kind = value[_TYPE_KEY]
+        if kind == 'tuple':
+            return tuple(_decode(v, container) for v in value['a'])
+        elif kind == 'range':
+            return range(*value['a'])
+        cls = _ELEMENT_CLASSES[kind]
+        element = cls.__new__(cls)
+        element.parent = container if value.get(_PARENT_KEY) else None
+        _decode_attributes(element, value)
+        return element
+    else:
+        return value
+
+def _decode_attributes(element: SVDElement, encoded: Dict[str, Any]) -> None:
+    for k, v in encoded.items():
+        if k not in (_TYPE_KEY, _PARENT_KEY):
+            element.__dict__[k] = _decode(v, element)
+
+def _deferred_attribute(name: str) -> property:
+    """@brief Create a property for a peripheral attribute that is decoded on first access."""
+    def getter(self):
+        if '_cache_record' in self.__dict__:
+            self._materialize()
+        return self.__dict__[name]
+
+    def setter(self, value):
+        self.__dict__[name] = value
+
+    return property(getter, setter)
+
+class CachedSVDPeripheral(SVDPeripheral):
+    """@brief SVD peripheral loaded from the cache.
+
+    The name, base address, interrupts, and other peripheral level attributes are available
+    immediately. Registers, register arrays, and clusters are decoded from the compressed cache
+    record the first time any of them is accessed.
+    """
+
+    _registers = _deferred_attribute('_registers')
+    _register_arrays = _deferred_attribute('_register_arrays')
+    _clusters = _deferred_attribute('_clusters')
+
+    def __init__(self, parent: SVDDevice, encoded: Dict[str, Any], record: memoryview) -> None:
+        # SVDPeripheral.__init__() is not called since all attributes come from the cache.
+        self.parent = parent
+        _decode_attributes(self, encoded)
+        self.__dict__['_cache_record'] = record
+
+    def _materialize(self) -> None:
+        record = self.__dict__.pop('_cache_record')
+        encoded = json.loads(zlib.decompress(record))
+        _decode_attributes(self, encoded)
+
+    def _to_dict_items(self):
+        if '_cache_record' in self.__dict__:
+            self._materialize()
+        return super()._to_dict_items()
+
+def get_default_cache_dir() -> str:
+    """@brief Return the default SVD cache directory.
+
+    This is under `$XDG_CACHE_HOME` if set, otherwise `~/.cache`.
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, DEFAULT_CACHE_SUBDIR)
+
+class SVDCache:
+    """@brief Directory of preparsed SVD files.
+
+    Each cache file holds one device, and is named by the SHA-256 hash of the SVD file contents.
+    The file starts with a single line of JSON containing the device, CPU, and peripheral level
+    attributes along with the offset and length of a record for each peripheral. The records follow,
+    each being the zlib compressed JSON of the peripheral's registers, register arrays, and
+    clusters. Loading a device only decodes the first line; peripheral records are decoded as
+    needed by CachedSVDPeripheral.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self._directory = directory
+
+    @staticmethod
+    def key_for(data: bytes) -> str:
+        """@brief Return the cache key for the contents of an SVD file."""
+        return hashlib.sha256(data).hexdigest()
+
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self._directory, key + CACHE_FILE_EXTENSION)
+
+    def load(self, key: str) -> Optional[SVDDevice]:
+        """@brief Load a device from the cache.
+
+        @return The SVDDevice, or None if the cache doesn't have a valid entry for the key.
+        """
+        try:
+            with open(self._path_for(key), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        try:
+            header_end = data.index(b'\n') + 1
+            header = json.loads(data[:header_end])
+            if header['version'] != CACHE_FORMAT_VERSION:
+                return None
+
+            device = SVDDevice.__new__(SVDDevice)
+            device.parent = None
+            _decode_attributes(device, header['device'])
+
+            records = memoryview(data)[header_end:]
+            peripherals = []
+            for encoded, offset, length in header['peripherals']:
+                peripherals.append(CachedSVDPeripheral(device, encoded, records[offset:offset + length]))
+            device.peripherals = peripherals
+            return device
+        except (ValueError, KeyError, TypeError) as err:
+            LOG.debug("ignoring invalid SVD cache file for %s: %s", key, err)
+            return None
+
+    def store(self, key: str, device: SVDDevice) -> None:
+        """@brief Write a device to the cache.
+
+        The file is written to a temporary name then renamed into place, so concurrent sessions never
+        see a partially written file. Errors are logged and otherwise ignored.
+        """
+        device_attrs = {k: _encode(v, device) for k, v in device.__dict__.items()
+                        if k not in ('parent', 'peripherals')}
+
+        peripheral_index = []
+        records = []
+        offset = 0
+        for peripheral in (device.peripherals or []):
+            encoded = {k: _encode(v, peripheral) for k, v in peripheral.__dict__.items()
+                        if k != 'parent' and k not in DEFERRED_PERIPHERAL_ATTRIBUTES}
+            deferred = {k: _encode(peripheral.__dict__[k], peripheral) for k in DEFERRED_PERIPHERAL_ATTRIBUTES}
+            record = zlib.compress(json.dumps(deferred, separators=(',', ':')).encode())
+            peripheral_index.append((encoded, offset, len(record)))
+            records.append(record)
+            offset += len(record)
+
+        header = {
+            'version': CACHE_FORMAT_VERSION,
+            'device': device_attrs,
+            'peripherals': peripheral_index,
+            }
+
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(json.dumps(header, separators=(',', ':')).encode())
+                    f.write(b'\n')
+                    f.writelines(records)
+                os.replace(temp_path, self._path_for(key))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as err:
+            LOG.debug("unable to write SVD cache file for %s: %s", key, err)
@@ -20,6 +20,7 @@ import logging
 import importlib_resources
 import zipfile
 
+from .cache import SVDCache
 from .parser import SVDParser
 
 LOG = logging.getLogger(__name__)
@@ -44,18 +45,42 @@ class SVDFile(object):
         self.filename = filename
         self.device = None
 
-    def load(self):
-        self.device = SVDParser.for_xml_file(self.filename).get_device()
+    def load(self, cache_dir=None):
+        """@brief Parse the SVD file.
+
+        @param self
+        @param cache_dir Optional path to a directory of preparsed SVD files. If the SVD file has been
+            loaded before, the device is loaded from the cache without parsing the XML, and
+            peripheral registers are decoded only when first used. Otherwise the file is parsed and
+            added to the cache.
+        """
+        if cache_dir is None:
+            self.device = SVDParser.for_xml_file(self.filename).get_device()
+            return
+
+        if isinstance(self.filename, str):
+            with open(self.filename, 'rb') as f:
+                data = f.read()
+        else:
+            data = self.filename.read()
+
+        cache = SVDCache(cache_dir)
+        key = cache.key_for(data)
+        self.device = cache.load(key)
+        if self.device is None:
+            self.device = SVDParser.for_xml_data(data).get_device()
+            cache.store(key, self.device)
 
 class SVDLoader(threading.Thread):
     """@brief Thread to read an SVD file in the background."""
 
-    def __init__(self, svdFile, completionCallback):
+    def __init__(self, svdFile, completionCallback, cache_dir=None):
         super(SVDLoader, self).__init__(name='load-svd')
         self.daemon = True
         self._svd_location = svdFile
         self._svd_device = None
         self._callback = completionCallback
+        self._cache_dir = cache_dir
 
     @property
     def device(self):
@@ -69,7 +94,7 @@ class SVDLoader(threading.Thread):
 
     def run(self):
         try:
-            self._svd_location.load()
+            self._svd_location.load(cache_dir=self._cache_dir)
             self._svd_device = self._svd_location.device
             if self._callback:
                 self._callback(self._svd_device)
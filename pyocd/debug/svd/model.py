@@ -52,7 +52,7 @@ class SVDJSONEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, SVDElement):
             eldict = {}
-            for k, v in obj.__dict__.items():
+            for k, v in obj._to_dict_items():
                 if k in TO_DICT_SKIP_KEYS:
                     continue
                 if k.startswith("_"):
@@ -109,6 +109,10 @@ class SVDElement(object):
     def get_derived_from(self):
         pass  # override in children
 
+    def _to_dict_items(self):
+        """@brief Return the attributes included in the dict representation."""
+        return self.__dict__.items()
+
     def to_dict(self):
         # This is a little convoluted but it works and ensures a
         # json-compatible dictionary representation (at the cost of
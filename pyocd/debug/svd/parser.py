@@ -73,6 +73,10 @@ class SVDParser(object):
     def for_xml_file(cls, path, remove_reserved=False):
         return cls(ET.parse(path), remove_reserved)
 
+    @classmethod
+    def for_xml_data(cls, data, remove_reserved=False):
+        return cls(ET.ElementTree(ET.fromstring(data)), remove_reserved)
+
     def __init__(self, tree, remove_reserved=False):
         self.remove_reserved = remove_reserved
         self._tree = tree
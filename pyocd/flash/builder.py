@@ -17,6 +17,7 @@
 
 import logging
 import abc
+from bisect import bisect_right
 from dataclasses import dataclass
 from time import time
 from binascii import crc32
@@ -31,6 +32,9 @@ from ..utility.mask import same
 PAGE_ESTIMATE_SIZE = 32
 DATA_TRANSFER_B_PER_S = 40 * 1000 # ~40KB/s, depends on clock speed, theoretical limit for HID is 56,000 B/s
 
+# Erased padding used to extend the CRC of partial pages without building a padded copy of the data.
+_CRC_PADDING = memoryview(b'\xff' * 4096)
+
 LOG = logging.getLogger(__name__)
 
 def get_page_count(count: int) -> str:
@@ -130,12 +134,12 @@ class _FlashPage:
     def __init__(self, page_info):
         self.addr: int = page_info.base_addr
         self.size: int = page_info.size
-        self.data: List[int] = []
+        self.data = bytearray()
         self.program_weight: float = page_info.program_weight
         self.erased: Optional[bool] = None # Whether the data all matches the erased value.
         self.same: Optional[bool] = None
         self.crc: int = 0
-        self.cached_estimate_data: Optional[List[int]] = None
+        self.cached_estimate_data: Optional[bytearray] = None
 
     def get_program_weight(self):
         """@brief Get time to program a page including the data transfer."""
@@ -156,6 +160,9 @@ class _FlashOperation:
         self.addr = addr
         self.data = data
 
+    def __lt__(self, other):
+        return self.addr < other.addr
+
 class FlashBuilder(MemoryBuilder):
     """@brief Manages programming flash within one flash memory region.
 
@@ -216,7 +223,9 @@ class FlashBuilder(MemoryBuilder):
         @param self
         @param addr Base address of the block of data passed to this method. The entire block of
             data must be contained within the flash memory region associated with this instance.
-        @param data Data to be programmed. Should be a list of byte values.
+        @param data Data to be programmed, either a bytes-like object or a list of byte values.
+            Bytes-like data is referenced rather than copied until the pages are built, so it
+            must not be modified before program() is called.
 
         @exception ValueError Attempt to add overlapping data, or address range of added data is
             outside the address range of the flash region associated with the builder.
@@ -230,23 +239,25 @@ class FlashBuilder(MemoryBuilder):
             raise ValueError("Flash address range 0x%x-0x%x is not contained within region '%s'" %
                 (addr, addr + len(data) - 1, self.flash.region.name))
 
-        # Add operation to list
-        self.flash_operation_list.append(_FlashOperation(addr, data))
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            data = bytes(data)
+        new_operation = _FlashOperation(addr, data)
+
+        # Find the position that keeps the list sorted, and verify the new data does not overlap
+        # its neighbours.
+        index = bisect_right(self.flash_operation_list, new_operation)
+        neighbours = self.flash_operation_list[max(index - 1, 0):index]
+        neighbours.append(new_operation)
+        neighbours += self.flash_operation_list[index:index + 1]
+        for prev_flash_operation, operation in zip(neighbours, neighbours[1:]):
+            if prev_flash_operation.addr + len(prev_flash_operation.data) > operation.addr:
+                raise ValueError("Error adding data - Data at 0x%x..0x%x overlaps with 0x%x..0x%x"
+                        % (prev_flash_operation.addr, prev_flash_operation.addr + len(prev_flash_operation.data),
+                           operation.addr, operation.addr + len(operation.data)))
+
+        self.flash_operation_list.insert(index, new_operation)
         self._buffered_data_size += len(data)
 
-        # Keep list sorted
-        self.flash_operation_list = sorted(self.flash_operation_list, key=lambda operation: operation.addr)
-
-        # Verify this does not overlap
-        prev_flash_operation = None
-        for operation in self.flash_operation_list:
-            if prev_flash_operation is not None:
-                if prev_flash_operation.addr + len(prev_flash_operation.data) > operation.addr:
-                    raise ValueError("Error adding data - Data at 0x%x..0x%x overlaps with 0x%x..0x%x"
-                            % (prev_flash_operation.addr, prev_flash_operation.addr + len(prev_flash_operation.data),
-                               operation.addr, operation.addr + len(operation.data)))
-            prev_flash_operation = operation
-
     def _enable_read_access(self):
         """@brief Ensure flash is accessible by initing the algo for verify.
 
@@ -298,9 +309,9 @@ class FlashBuilder(MemoryBuilder):
                 old_data_len = current_page.size - len(current_page.data)
                 if keep_unwritten and self.flash.region.is_readable:
                     self._enable_read_access()
-                    old_data = self.flash.target.read_memory_block8(page_data_end, old_data_len)
+                    old_data = self.flash.target.read_memory_block_bytes(page_data_end, old_data_len)
                 else:
-                    old_data = [self.flash.region.erased_byte_value] * old_data_len
+                    old_data = bytes((self.flash.region.erased_byte_value,)) * old_data_len
                 current_page.data.extend(old_data)
                 self.program_byte_count += old_data_len
 
@@ -336,9 +347,9 @@ class FlashBuilder(MemoryBuilder):
                     old_data_len = flash_addr - page_data_end
                     if keep_unwritten and self.flash.region.is_readable:
                         self._enable_read_access()
-                        old_data = self.flash.target.read_memory_block8(page_data_end, old_data_len)
+                        old_data = self.flash.target.read_memory_block_bytes(page_data_end, old_data_len)
                     else:
-                        old_data = [self.flash.region.erased_byte_value] * old_data_len
+                        old_data = bytes((self.flash.region.erased_byte_value,)) * old_data_len
                     current_page.data.extend(old_data)
                     self.program_byte_count += old_data_len
 
@@ -371,7 +382,7 @@ class FlashBuilder(MemoryBuilder):
                     raise FlashFailure("attempt to program invalid flash address", address=sector_page_addr)
                 new_page = _FlashPage(page_info)
                 self._enable_read_access()
-                new_page.data = self.flash.target.read_memory_block8(new_page.addr, new_page.size)
+                new_page.data = self.flash.target.read_memory_block_bytes(new_page.addr, new_page.size)
                 new_page.same = True
                 sector.add_page(new_page)
                 self.page_list.append(new_page)
@@ -601,28 +612,44 @@ class FlashBuilder(MemoryBuilder):
         """@brief Estimate how many pages are the same by reading data.
 
         Pages are analyzed by reading the first 32 bytes and comparing with data to be
-        programmed.
+        programmed. The sample reads of all pages are performed together with
+        read_memory_blocks_bytes(), so they can be pipelined as one transfer.
         """
         # Quickly estimate how many pages are the same as current flash contents.
         # Init the flash algo in case it is required in order to access the flash memory.
         self._enable_read_access()
-        for page in self.page_list:
-            # Analyze pages that haven't been analyzed yet
-            if page.same is None:
-                size = min(PAGE_ESTIMATE_SIZE, len(page.data))
-                data = self.flash.target.read_memory_block8(page.addr, size)
-                page_same = same(data, page.data[0:size])
-                if page_same is False:
-                    page.same = False
-                else:
-                    # Save the data read for estimation so we don't need to read it again.
-                    page.cached_estimate_data = data
+
+        # Analyze pages that haven't been analyzed yet
+        pages = [page for page in self.page_list if page.same is None]
+        sizes = [min(PAGE_ESTIMATE_SIZE, len(page.data)) for page in pages]
+        results = self.flash.target.read_memory_blocks_bytes(
+                [(page.addr, size) for page, size in zip(pages, sizes)])
+        for page, size, data in zip(pages, sizes, results):
+            page_same = same(data, page.data[0:size])
+            if page_same is False:
+                page.same = False
+            else:
+                # Save the data read for estimation so we don't need to read it again.
+                page.cached_estimate_data = data
+
+    @staticmethod
+    def _compute_page_crc(page):
+        """@brief Compute the CRC32 of a page's data padded with 0xFF to the page size."""
+        data = page.data if isinstance(page.data, (bytes, bytearray)) else bytes(page.data)
+        crc = crc32(data)
+        pad_size = page.size - len(page.data)
+        while pad_size > 0:
+            chunk = min(pad_size, len(_CRC_PADDING))
+            crc = crc32(_CRC_PADDING[:chunk], crc)
+            pad_size -= chunk
+        return crc & 0xFFFFFFFF
 
     def _analyze_pages_with_crc32(self, assume_estimate_correct=False):
         """@brief Estimate how many pages are the same using a CRC32 analyzer.
 
         A CRC32 analyzer program is loaded into target RAM and is passed an array of pages
-        and sizes. When executed, it computes the CRC32 for every page.
+        and sizes. When executed, it computes the CRC32 for every page. The CRCs of the data to
+        be programmed are computed while the analyzer runs.
 
         @param self
         @param assume_estimate_correct If set to True, then pages with matching CRCs will
@@ -630,24 +657,15 @@ class FlashBuilder(MemoryBuilder):
             data is different, but the odds of this happing are low: ~1/(2^32) = ~2.33*10^-8%.
         """
         # Build list of all the pages that need to be analyzed
-        sector_list = []
-        page_list = []
-        for page in self.page_list:
-            if page.same is None:
-                # Add page to compute_crcs
-                sector_list.append((page.addr, page.size))
-                page_list.append(page)
-                # Compute CRC of data (Padded with 0xFF)
-                data = list(page.data)
-                pad_size = page.size - len(page.data)
-                if pad_size > 0:
-                    data.extend([0xFF] * pad_size)
-                page.crc = crc32(bytearray(data)) & 0xFFFFFFFF
+        page_list = [page for page in self.page_list if page.same is None]
 
         # Analyze pages
         if len(page_list) > 0:
             self._enable_read_access()
-            crc_list = self.flash.compute_crcs(sector_list)
+            self.flash.start_compute_crcs([(page.addr, page.size) for page in page_list])
+            for page in page_list:
+                page.crc = self._compute_page_crc(page)
+            crc_list = self.flash.finish_compute_crcs()
             for page, crc in zip(page_list, crc_list):
                 page_same = page.crc == crc
                 if assume_estimate_correct:
@@ -861,10 +879,10 @@ class FlashBuilder(MemoryBuilder):
                     data = page.cached_estimate_data
                     offset = len(data)
                 else:
-                    data = []
+                    data = bytearray()
                     offset = 0
                 assert len(page.data) == page.size, "page data size (%d) != page size (%d)" % (len(page.data), page.size)
-                data.extend(self.flash.target.read_memory_block8(page.addr + offset,
+                data.extend(self.flash.target.read_memory_block_bytes(page.addr + offset,
                                                                     page.size - offset))
                 page.same = same(page.data, data)
                 page.cached_estimate_data = None # This data isn't needed anymore.
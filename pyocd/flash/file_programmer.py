@@ -18,13 +18,15 @@
 import errno
 import itertools
 import logging
+import mmap
 import os
-from typing import (IO, TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union)
+from typing import (IO, TYPE_CHECKING, Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union)
 
 from elftools.elf.elffile import ELFFile
 from intelhex import IntelHex
 
 from ..core import exceptions
+from .builder import ProgrammingInfo
 from .loader import (FlashLoader, ProgressCallback)
 
 if TYPE_CHECKING:
@@ -43,68 +45,62 @@ def ranges(i: List[int]) -> Iterator[Tuple[int, int]]:
         b = list(b)
         yield b[0][1], b[-1][1]
 
-class FileProgrammer(object):
-    """@brief Class to manage programming a file in any supported format with many options.
+class ImageSegment(NamedTuple):
+    """@brief One contiguous chunk of data from a file to be programmed."""
+    ## Start address of the data, or None to use the start of the target's boot memory.
+    address: Optional[int]
+    ## The data, usually a read-only view of the file contents.
+    data: Union[bytes, memoryview]
+    ## Whether a failure to add the data to the loader is only logged as a warning.
+    warn_on_error: bool
 
-    Most specifically, this class implements the behaviour provided by the command-line flash
-    programming tool. The code in this class simply extracts data from the given file, potentially
-    respecting format-specific options such as the base address for binary files. Then the heavy
-    lifting of flash programming is handled by FlashLoader, and beneath that, FlashBuilder.
+class ProgramImage:
+    """@brief Data extracted from one or more files to be programmed.
+
+    Files are parsed once into a list of segments, which can then be programmed into any number of
+    targets with FileProgrammer.program_image(), including from several threads at once. The
+    segments are never modified.
+
+    Binary and ELF segment data are views of a memory map of the file, so the image must be closed
+    when it's no longer needed. The class is a context manager that closes the image on exit.
 
     Support file formats are:
     - Binary (.bin)
     - Intel Hex (.hex)
     - ELF (.elf or .axf)
     """
-    def __init__(self,
-            session: "Session",
-            progress: Optional[ProgressCallback] = None,
-            chip_erase: Optional[bool] = None,
-            smart_flash: Optional[bool] = None,
-            trust_crc: Optional[bool] = None,
-            keep_unwritten: Optional[bool] = None,
-            no_reset: Optional[bool] = None
-        ):
-        """@brief Constructor.
 
-        @param self
-        @param session The session object.
-        @param progress A progress report handler as a callable that takes a percentage completed.
-            If not set or None, a default progress handler will be used unless the session option
-            'hide_programming_progress' is set to True, in which case progress will be disabled.
-        @param chip_erase Sets whether to use chip erase or sector erase. The value must be one of
-            "auto", "sector", or "chip". "auto" means the fastest erase method should be used.
-        @param smart_flash If set to True, the programmer will attempt to not program pages whose
-            contents are not going to change by scanning target flash memory. A value of False will
-            force all pages to be erased and programmed.
-        @param trust_crc Boolean indicating whether to use only the sector CRC32 to decide whether a
-            sector already contains the data to be programmed. Use with caution, as CRC32 may return
-            the same value for different content.
-        @param keep_unwritten Depending on the sector versus page size and the amount of data
-            written, there may be ranges of flash that would be erased but not written with new
-            data. This parameter sets whether the existing contents of those unwritten ranges will
-            be read from memory and restored while programming.
-        @param no_reset Boolean indicating whether if the device should not be reset after the
-            programming process has finished.
-        """
-        self._session = session
-        self._chip_erase = chip_erase
-        self._smart_flash = smart_flash
-        self._trust_crc = trust_crc
-        self._keep_unwritten = keep_unwritten
-        self._no_reset = no_reset
-        self._progress = progress
-        self._loader = None
+    def __init__(self) -> None:
+        self._segments: List[ImageSegment] = []
+        self._maps: List[mmap.mmap] = []
+        self._views: List[memoryview] = []
 
         self._format_handlers: Dict[str, Callable[..., None]] = {
-            'axf': self._program_elf,
-            'bin': self._program_bin,
-            'elf': self._program_elf,
-            'hex': self._program_hex,
+            'axf': self._add_elf,
+            'bin': self._add_bin,
+            'elf': self._add_elf,
+            'hex': self._add_hex,
             }
 
-    def program(self, file_or_path: Union[str, IO[bytes]], file_format: Optional[str] = None, **kwargs: Any):
-        """@brief Program a file into flash.
+    def __enter__(self) -> "ProgramImage":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def segments(self) -> List[ImageSegment]:
+        """@brief List of ImageSegment objects, in the order they were added."""
+        return self._segments
+
+    @property
+    def byte_count(self) -> int:
+        """@brief Total number of bytes in all segments."""
+        return sum(len(segment.data) for segment in self._segments)
+
+    def add_file(self, file_or_path: Union[str, IO[bytes]], file_format: Optional[str] = None,
+            **kwargs: Any) -> None:
+        """@brief Parse a file and add its data to the image.
 
         @param self
         @param file_or_path Either a string that is a path to a file, or a file-like object.
@@ -146,15 +142,6 @@ class FileProgrammer(object):
         if file_format is None or file_format not in self._format_handlers:
             raise ValueError("unknown file format '%s'" % file_format)
 
-        self._loader = FlashLoader(self._session,
-                                    progress=self._progress,
-                                    chip_erase=self._chip_erase,
-                                    smart_flash=self._smart_flash,
-                                    trust_crc=self._trust_crc,
-                                    keep_unwritten=self._keep_unwritten,
-                                    no_reset=self._no_reset)
-
-        # file_obj = None
         # Open the file if a path was provided.
         if is_path:
             mode = 'rb'
@@ -167,71 +154,190 @@ class FileProgrammer(object):
             assert not isinstance(file_or_path, str)
             file_obj = file_or_path
         try:
-
-            # Pass to the format-specific programmer.
+            # Pass to the format-specific parser. A memory map of the file remains valid after
+            # the file is closed.
             self._format_handlers[file_format](file_obj, **kwargs)
-            self._loader.commit()
         finally:
-            if is_path and file_obj is not None:
+            if is_path:
                 file_obj.close()
 
-    def _program_bin(self, file_obj: IO[bytes], **kwargs: Any) -> None:
-        """@brief Binary file format loader"""
-        assert self._loader
-
-        # If no base address is specified use the start of the boot memory.
+    def close(self) -> None:
+        """@brief Remove all segments and release the file views and memory maps."""
+        self._segments = []
+        for view in self._views:
+            view.release()
+        self._views = []
+        for file_map in self._maps:
+            try:
+                file_map.close()
+            except BufferError:
+                # Slices of the view are still referenced, most likely by an exception traceback.
+                # The file is unmapped once they are freed.
+                pass
+        self._maps = []
+
+    def _get_file_data(self, file_obj: IO[bytes]) -> memoryview:
+        """@brief Return a read-only view of the entire contents of a binary file.
+
+        The file is memory mapped if possible, so that data can be passed to the loader as slices
+        of the view without being copied. Otherwise, for instance with in-memory file objects, the
+        file is read. The view remains valid until close() is called.
+        """
+        try:
+            file_map = mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps.append(file_map)
+            view = memoryview(file_map)
+        except (AttributeError, OSError, ValueError):
+            # Empty files cannot be mapped, and io.UnsupportedOperation is both an OSError
+            # and a ValueError.
+            file_obj.seek(0, os.SEEK_SET)
+            view = memoryview(file_obj.read())
+        self._views.append(view)
+        return view
+
+    def _add_bin(self, file_obj: IO[bytes], **kwargs: Any) -> None:
+        """@brief Binary file format parser"""
+        # If no base address is specified, the start of the boot memory is used when programming.
         address = kwargs.get('base_address', None)
-        if address is None:
-            assert self._session.target
-            boot_memory = self._session.target.memory_map.get_boot_memory()
-            if boot_memory is None:
-                raise exceptions.TargetSupportError("No boot memory is defined for this device")
-            address = boot_memory.start
-        assert isinstance(address, int)
+        assert (address is None) or isinstance(address, int)
 
         skip_offset = kwargs.get('skip', 0)
         if not isinstance(skip_offset, int):
             raise TypeError("skip argument must be an integer")
-        file_obj.seek(skip_offset, os.SEEK_SET)
-        data = list(bytearray(file_obj.read()))
-
-        self._loader.add_data(address, data)
+        data = self._get_file_data(file_obj)[skip_offset:]
 
-    def _program_hex(self, file_obj: IO[bytes], **kwargs: Any) -> None:
-        """Intel hex file format loader"""
-        assert self._loader
+        self._segments.append(ImageSegment(address, data, False))
 
+    def _add_hex(self, file_obj: IO[bytes], **kwargs: Any) -> None:
+        """Intel hex file format parser"""
         hexfile = IntelHex(file_obj)
-        addresses = hexfile.addresses()
-        addresses.sort()
 
-        data_list = list(ranges(addresses))
-        for start, end in data_list:
-            size = end - start + 1
-            data = list(hexfile.tobinarray(start=start, size=size))
+        for start, end in hexfile.segments():
+            data = hexfile.tobinstr(start=start, size=end - start)
             # Ignore invalid addresses for HEX files only
             # Binary files (obviously) don't contain addresses
             # For ELF files, any metadata that's not part of the application code
             # will be held in a section that doesn't have the SHF_WRITE flag set
-            try:
-                self._loader.add_data(start, data)
-            except ValueError as e:
-                LOG.warning("Failed to add data chunk: %s", e)
-
-    def _program_elf(self, file_obj: IO[bytes], **kwargs: Any) -> None:
-        assert self._loader
+            self._segments.append(ImageSegment(start, data, True))
 
+    def _add_elf(self, file_obj: IO[bytes], **kwargs: Any) -> None:
+        """ELF file format parser"""
         elf = ELFFile(file_obj)
+        file_data = self._get_file_data(file_obj)
         for segment in elf.iter_segments():
             addr = segment['p_paddr']
             if segment.header.p_type == 'PT_LOAD' and segment.header.p_filesz != 0:
-                data = bytearray(segment.data())
-                LOG.debug("Writing segment LMA:0x%08x, VMA:0x%08x, size %d", addr,
+                offset = segment['p_offset']
+                data = file_data[offset:offset + segment.header.p_filesz]
+                LOG.debug("Adding segment LMA:0x%08x, VMA:0x%08x, size %d", addr,
                           segment['p_vaddr'], segment.header.p_filesz)
-                try:
-                    self._loader.add_data(addr, data)
-                except ValueError as e:
-                    LOG.warning("Failed to add data chunk: %s", e)
+                self._segments.append(ImageSegment(addr, data, True))
             else:
                 LOG.debug("Skipping segment LMA:0x%08x, VMA:0x%08x, size %d", addr,
                           segment['p_vaddr'], segment.header.p_filesz)
+
+class FileProgrammer(object):
+    """@brief Class to manage programming a file in any supported format with many options.
+
+    Most specifically, this class implements the behaviour provided by the command-line flash
+    programming tool. The code in this class simply extracts data from the given file with
+    ProgramImage, potentially respecting format-specific options such as the base address for
+    binary files. Then the heavy lifting of flash programming is handled by FlashLoader, and
+    beneath that, FlashBuilder.
+    """
+
+    def __init__(self,
+            session: "Session",
+            progress: Optional[ProgressCallback] = None,
+            chip_erase: Optional[bool] = None,
+            smart_flash: Optional[bool] = None,
+            trust_crc: Optional[bool] = None,
+            keep_unwritten: Optional[bool] = None,
+            no_reset: Optional[bool] = None
+        ):
+        """@brief Constructor.
+
+        @param self
+        @param session The session object.
+        @param progress A progress report handler as a callable that takes a percentage completed.
+            If not set or None, a default progress handler will be used unless the session option
+            'hide_programming_progress' is set to True, in which case progress will be disabled.
+        @param chip_erase Sets whether to use chip erase or sector erase. The value must be one of
+            "auto", "sector", or "chip". "auto" means the fastest erase method should be used.
+        @param smart_flash If set to True, the programmer will attempt to not program pages whose
+            contents are not going to change by scanning target flash memory. A value of False will
+            force all pages to be erased and programmed.
+        @param trust_crc Boolean indicating whether to use only the sector CRC32 to decide whether a
+            sector already contains the data to be programmed. Use with caution, as CRC32 may return
+            the same value for different content.
+        @param keep_unwritten Depending on the sector versus page size and the amount of data
+            written, there may be ranges of flash that would be erased but not written with new
+            data. This parameter sets whether the existing contents of those unwritten ranges will
+            be read from memory and restored while programming.
+        @param no_reset Boolean indicating whether if the device should not be reset after the
+            programming process has finished.
+        """
+        self._session = session
+        self._chip_erase = chip_erase
+        self._smart_flash = smart_flash
+        self._trust_crc = trust_crc
+        self._keep_unwritten = keep_unwritten
+        self._no_reset = no_reset
+        self._progress = progress
+        self._loader: Optional[FlashLoader] = None
+
+    def program(self, file_or_path: Union[str, IO[bytes]], file_format: Optional[str] = None, **kwargs: Any):
+        """@brief Program a file into flash.
+
+        @param self
+        @param file_or_path Either a string that is a path to a file, or a file-like object.
+        @param file_format Optional file format name, one of "bin", "hex", "elf", "axf". If not provided,
+            the file's extension will be used. If a file object is passed for _file_or_path_ then
+            this parameter must be used to set the format.
+        @param kwargs Optional keyword arguments for format-specific parameters. See
+            ProgramImage.add_file() for details.
+
+        @exception FileNotFoundError Provided file_or_path string does not reference a file.
+        @exception ValueError Invalid argument value, for instance providing a file object but
+            not setting file_format.
+        """
+        with ProgramImage() as image:
+            image.add_file(file_or_path, file_format, **kwargs)
+            self.program_image(image)
+
+    def program_image(self, image: ProgramImage) -> List[ProgrammingInfo]:
+        """@brief Program an already parsed image into flash.
+
+        The image is not modified, so the same image can be programmed into several targets
+        concurrently by FileProgrammer instances in different threads.
+
+        @param self
+        @param image The ProgramImage to program.
+        @return List of ProgrammingInfo objects with statistics for each programmed memory region.
+        """
+        self._loader = FlashLoader(self._session,
+                                    progress=self._progress,
+                                    chip_erase=self._chip_erase,
+                                    smart_flash=self._smart_flash,
+                                    trust_crc=self._trust_crc,
+                                    keep_unwritten=self._keep_unwritten,
+                                    no_reset=self._no_reset)
+
+        for segment in image.segments:
+            address = segment.address
+            if address is None:
+                # Use the start of the boot memory.
+                assert self._session.target
+                boot_memory = self._session.target.memory_map.get_boot_memory()
+                if boot_memory is None:
+                    raise exceptions.TargetSupportError("No boot memory is defined for this device")
+                address = boot_memory.start
+
+            try:
+                self._loader.add_data(address, segment.data)
+            except ValueError as e:
+                if not segment.warn_on_error:
+                    raise
+                LOG.warning("Failed to add data chunk: %s", e)
+
+        return self._loader.commit()
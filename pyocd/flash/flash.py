@@ -19,6 +19,8 @@
 from dataclasses import dataclass
 import logging
 from enum import Enum
+from time import (monotonic, sleep)
+from typing import (Dict, Optional)
 
 from ..core import exceptions
 from ..core.target import Target
@@ -127,6 +129,13 @@ class Flash:
     ## Canary value used for checking stack overflow.
     _STACK_CANARY = 0xdeadf00d
 
+    ## Fraction of the shortest previous run time of a flash algo function to wait before the first
+    # check for completion.
+    _FIRST_POLL_FRACTION = 0.8
+
+    ## Upper limit in seconds for the interval between checks for completion.
+    _MAX_POLL_INTERVAL = 0.01
+
     def __init__(self, target, flash_algo):
         self.target = target
         self.flash_algo = flash_algo
@@ -134,6 +143,11 @@ class Flash:
         self._region = None
         self._did_prepare_target = False
         self._active_operation = None
+        self._crc_count = 0
+        self._running_pc: Optional[int] = None
+        self._run_start = 0.0
+        # Shortest observed run time of each flash algo function, keyed by entry point.
+        self._run_times: Dict[int, float] = {}
         if flash_algo is not None:
             self.is_valid = True
             self.use_analyzer = flash_algo['analyzer_supported']
@@ -311,6 +325,22 @@ class Flash:
         pass
 
     def compute_crcs(self, sectors):
+        """@brief Compute the CRC32 of each of a list of sectors using the analyzer.
+
+        @param self
+        @param sectors List of (address, size) tuples. Sizes must be powers of 2 and addresses must
+            be aligned to the size.
+        @return List of CRC32 values, one for each sector.
+        """
+        self.start_compute_crcs(sectors)
+        return self.finish_compute_crcs()
+
+    def start_compute_crcs(self, sectors):
+        """@brief Load and start the analyzer, without waiting for it to complete.
+
+        Use finish_compute_crcs() to wait for the analyzer and read the results. The host is free
+        to perform other work in between, as long as it doesn't access the target.
+        """
         assert self.use_analyzer
 
         data = []
@@ -334,11 +364,15 @@ class Flash:
 
         # update core register to execute the subroutine
         TRACE.debug("call compute crc(%x, %x)", self.begin_data, len(data))
-        self._call_function_and_wait(self.flash_algo['analyzer_address'], self.begin_data, len(data),
-                timeout=self.target.session.options.get('flash.timeout.analyzer'))
+        self._call_function(self.flash_algo['analyzer_address'], self.begin_data, len(data))
+        self._crc_count = len(data)
+
+    def finish_compute_crcs(self):
+        """@brief Wait for the analyzer started by start_compute_crcs() and return the CRCs."""
+        self.wait_for_completion(timeout=self.target.session.options.get('flash.timeout.analyzer'))
 
         # Read back the CRCs for each section
-        data = self.target.read_memory_block32(self.begin_data, len(data))
+        data = self.target.read_memory_block32(self.begin_data, self._crc_count)
         return data
 
     def erase_all(self):
@@ -391,7 +425,7 @@ class Flash:
         bytes = self.override_security_bits(address, bytes)
 
         # first transfer in RAM
-        self.target.write_memory_block8(self.begin_data, bytes)
+        self._write_data(self.begin_data, bytes)
 
         # update core register to execute the program_page subroutine
         TRACE.debug("call program_page(addr=%x, len=%x, data=%x)", address, len(bytes), self.begin_data)
@@ -431,7 +465,7 @@ class Flash:
         bytes = self.override_security_bits(address, bytes)
 
         # transfer the buffer to device RAM
-        self.target.write_memory_block8(self.page_buffers[buffer_number], bytes)
+        self._write_data(self.page_buffers[buffer_number], bytes)
 
     def program_phrase(self, address, bytes):
         """@brief Flash a portion of a page.
@@ -455,7 +489,7 @@ class Flash:
         bytes = self.override_security_bits(address, bytes)
 
         # first transfer in RAM
-        self.target.write_memory_block8(self.begin_data, bytes)
+        self._write_data(self.begin_data, bytes)
 
         # update core register to execute the program_page subroutine
         TRACE.debug("call program_phrase(addr=%x, len=%x, data=%x)", address, len(bytes), self.begin_data)
@@ -569,10 +603,11 @@ class Flash:
             data_list.append(self.begin_stack)
         reg_list.append('lr')
         data_list.append(self.flash_algo['load_address'] + 1)
-        self.target.write_core_registers_raw(reg_list, data_list)
 
-        # resume target
-        self.target.resume()
+        # Write registers and resume the target in one go.
+        self.target.resume_with_registers(reg_list, data_list)
+        self._running_pc = pc
+        self._run_start = monotonic()
 
     def _flash_algo_debug_setup(self):
         # Save vector catch state for use in wait_for_completion()
@@ -580,16 +615,17 @@ class Flash:
         self.target.set_vector_catch(Target.VectorCatch.ALL)
 
     def _flash_algo_debug_check(self):
-        regs = self.target.read_core_registers_raw(list(range(19)) + [20])
+        # Read all registers, plus IPSR, in a single batch.
+        regs = self.target.read_core_registers_raw(list(range(19)) + [20, 'ipsr'])
+        final_ipsr = regs.pop()
         LOG.debug("Registers after flash algo: [%s]", " ".join("%08x" % r for r in regs))
 
         expected_fp = self.flash_algo['static_base']
         expected_sp = self.flash_algo['begin_stack']
         expected_pc = self.flash_algo['load_address']
-        final_ipsr = self.target.read_core_register('ipsr')
-        final_fp = self.target.read_core_register('r9')
-        final_sp = self.target.read_core_register('sp')
-        final_pc = self.target.read_core_register('pc')
+        final_fp = regs[9]
+        final_sp = regs[13]
+        final_pc = regs[15]
         #TODO - uncomment if Read/write and zero init sections can be moved into a separate flash algo section
         #expected_flash_algo = self.flash_algo['instructions']
         #if self.use_analyzer:
@@ -637,8 +673,12 @@ class Flash:
         # This setting of state isn't strictly necessary, but pyright sees it as possibly unbound when used
         # below. Otoh, lgtm sees it as unnecessary! So we disable the lgtm warning.
         state = Target.State.RUNNING # lgtm[py/multiple-definition]
+        min_run_time = self._run_times.get(self._running_pc) if (self._running_pc is not None) else None
         with Timeout(timeout) as time_out:
             while time_out.check():
+                delay = self._get_poll_delay(monotonic() - self._run_start, min_run_time)
+                if delay > 0:
+                    sleep(delay)
                 try:
                     state = self.target.get_state()
                     if state != Target.State.RUNNING:
@@ -654,6 +694,12 @@ class Flash:
                 LOG.debug("flash operation timed out; IPSR=%d", ipsr)
                 return self.TIMEOUT_ERROR
 
+        # Record the run time so later calls of the same function can delay the first poll.
+        if self._running_pc is not None:
+            run_time = monotonic() - self._run_start
+            if (min_run_time is None) or (run_time < min_run_time):
+                self._run_times[self._running_pc] = run_time
+
         if self.flash_algo_debug:
             self._flash_algo_debug_check()
 
@@ -663,13 +709,44 @@ class Flash:
             raise exceptions.FlashFailure("target was not halted as expected after calling "
                                           f"flash algorithm routine (IPSR={ipsr})")
 
-        # Check stack canary if we have one.
-        if self.end_stack is not None:
-            canary = self.target.read32(self.end_stack)
-            if canary != self._STACK_CANARY:
-                raise exceptions.FlashFailure(f"flash algorithm overflowed stack ({self.begin_stack - self.end_stack} bytes)")
-
-        return self.target.read_core_register('r0')
+        # Queue the stack canary read, if we have one, so it is combined with the r0 read.
+        canary_cb = self.target.read32(self.end_stack, now=False) if (self.end_stack is not None) else None
+        try:
+            result = self.target.read_core_register('r0')
+        except Exception:
+            # The deferred canary read must still be completed, but the r0 error is the one reported.
+            if canary_cb is not None:
+                try:
+                    canary_cb()
+                except exceptions.Error:
+                    pass
+            raise
+        canary = canary_cb() if (canary_cb is not None) else self._STACK_CANARY
+
+        # Check stack canary.
+        if canary != self._STACK_CANARY:
+            raise exceptions.FlashFailure(f"flash algorithm overflowed stack ({self.begin_stack - self.end_stack} bytes)")
+
+        return result
+
+    def _get_poll_delay(self, elapsed: float, min_run_time: Optional[float]) -> float:
+        """@brief Compute how long to wait before the next check for completion of a flash algo function.
+
+        If the function has run before, the first check is delayed until most of its shortest previous
+        run time has passed. Otherwise, checks are spaced at intervals that grow with the time elapsed so
+        far, so quick functions are checked often while long operations such as erases don't flood the
+        probe with transfers.
+
+        @param self
+        @param elapsed Time in seconds since the function was started.
+        @param min_run_time Shortest previous run time in seconds of the function, or None.
+        @return Delay in seconds.
+        """
+        if min_run_time is not None:
+            first_poll_time = min_run_time * self._FIRST_POLL_FRACTION
+            if elapsed < first_poll_time:
+                return first_poll_time - elapsed
+        return min(elapsed / 8, self._MAX_POLL_INTERVAL)
 
     def _call_function_and_wait(self, pc, r0=None, r1=None, r2=None, r3=None, init=False, timeout=None):
         self._call_function(pc, r0, r1, r2, r3, init)
@@ -684,3 +761,14 @@ class Flash:
 
     def override_security_bits(self, address, data):
         return data
+
+    def _write_data(self, address, data):
+        """@brief Write page data to target RAM.
+
+        @param self
+        @param address Target RAM address.
+        @param data Either a bytes-like object or a list of byte values.
+        """
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            data = bytes(data)
+        self.target.write_memory_block_bytes(address, data)
@@ -38,7 +38,7 @@ ProgressCallback = Callable[[Union[int, float]], None]
 @dataclass
 class DataChunk:
     addr: int
-    data: Union[bytes, bytearray]
+    data: bytearray
 
 class RamBuilder(MemoryBuilder):
     """@brief Memory builder for writing potentially discontiguous data to RAM."""
@@ -54,7 +54,7 @@ class RamBuilder(MemoryBuilder):
         self._region = region
         self._chunks: List[DataChunk] = []
 
-    def add_data(self, addr: int, data: Union[bytes, bytearray]) -> None:
+    def add_data(self, addr: int, data: Union[bytes, bytearray, memoryview]) -> None:
         # Make sure this address range is contained by our region.
         if not self._region.contains_range(start=addr, length=len(data)):
             raise ValueError(f"Attempt to add data ({addr:#010x}-{addr + len(data) - 1:#010x}) outside "
@@ -79,7 +79,7 @@ class RamBuilder(MemoryBuilder):
             offset_within_chunk = 0
             while offset_within_chunk < chunk_size:
                 write_size = min(self._MAX_WRITE_SIZE, chunk_size - offset_within_chunk)
-                target.write_memory_block8(
+                target.write_memory_block_bytes(
                             chunk.addr + offset_within_chunk,
                             chunk.data[offset_within_chunk:offset_within_chunk + write_size]
                             )
@@ -211,9 +211,12 @@ class MemoryLoader:
 
         The data may cross memory region boundaries, as long as the regions are contiguous.
 
+        Bytes-like data is passed on to the region builders as memoryview slices, without being
+        copied. The caller must not modify the data until commit() has been called.
+
         @param self
         @param address Integer address for where the first byte of _data_ should be written.
-        @param data A list of byte values to be programmed at the given address.
+        @param data A bytes-like object, or a list of byte values, to be programmed at the given address.
 
         @return The MemoryLoader instance is returned, to allow chaining further add_data()
             calls or a call to commit().
@@ -223,7 +226,12 @@ class MemoryLoader:
             instance associated with it, which indicates that the target connect sequence did
             not run successfully.
         """
-        while len(data):
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            data = bytes(data)
+        view = memoryview(data).cast('B')
+
+        offset = 0
+        while offset < len(view):
             # Look up the memory region for this address.
             region = self._map.get_region_for_address(address)
             if region is None:
@@ -242,7 +250,7 @@ class MemoryLoader:
                 elif region.is_writable:
                     # Casting to a RamRegion is technically not quite right, since we're only checking
                     # that the region is writable
-                    region_builder = RamBuilder(self._session, cast(RamRegion, region))
+                    region_builder = RamBuilder(self._session, cast("RamRegion", region))
                 else:
                     raise ValueError(f"memory region at address {address:#010x} is not writable")
 
@@ -251,14 +259,14 @@ class MemoryLoader:
                 self._builders[region] = region_builder
 
             # Take as much data as is contained by this region.
-            program_length = min(len(data), region.end - address + 1)
+            program_length = min(len(view) - offset, region.end - address + 1)
             assert program_length != 0
 
             # Add data to this region's builder.
-            region_builder.add_data(address, data[:program_length])
+            region_builder.add_data(address, view[offset:offset + program_length])
 
             # Advance.
-            data = data[program_length:]
+            offset += program_length
             address += program_length
             self._total_data_size += program_length
 
@@ -276,6 +284,8 @@ class MemoryLoader:
         algorithm for the first region doesn't actually erase the entire chip (all regions).
 
         After calling this method, the loader instance can be reused to program more data.
+
+        @return List of ProgrammingInfo objects with statistics for each programmed memory region.
         """
         didChipErase = False
         perfList = []
@@ -304,6 +314,8 @@ class MemoryLoader:
         # Clear state to allow reuse.
         self._reset_state()
 
+        return perfList
+
     def _log_performance(self, perf_list):
         """@brief Log a report of programming performance numbers."""
         # Compute overall performance numbers.
@@ -348,7 +360,8 @@ class MemoryLoader:
         @param cls
         @param session The session instance.
         @param address Start address of the data to program.
-        @param data A list of byte values that will be programmed starting at _address_.
+        @param data A bytes-like object or list of byte values that will be programmed starting
+            at _address_.
         """
         mgr = cls(session)
         mgr.add_data(address, data)
@@ -0,0 +1,183 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+import sys
+import threading
+from time import (monotonic, sleep)
+from typing import (IO, TYPE_CHECKING, Any, List, NamedTuple, Optional, Sequence)
+
+from .file_programmer import (FileProgrammer, ProgramImage)
+
+if TYPE_CHECKING:
+    from ..core.session import Session
+
+LOG = logging.getLogger(__name__)
+
+class ProbeResult(NamedTuple):
+    """@brief Outcome of programming the target connected to one probe."""
+    ## Unique ID of the probe.
+    unique_id: str
+    ## Result code, 0 for success or 1 if programming failed.
+    status: int
+    ## Description of the error if programming failed, otherwise None.
+    error: Optional[str]
+    ## Number of bytes in the image.
+    byte_count: int
+    ## Number of bytes actually programmed into flash.
+    program_byte_count: int
+    ## Total time in seconds, including connecting and disconnecting.
+    elapsed: float
+
+class MultiProgressReport:
+    """@brief Combined progress report for several targets being programmed at once.
+
+    For TTYs, a single line with the percentage completed for each probe is redrawn as progress is
+    updated. For other output, a line is printed each time a probe passes a quarter of its progress.
+    """
+
+    ## Number of progress steps reported for non-TTY output.
+    STEPS = 4
+
+    def __init__(self, names: Sequence[str], file: Optional[IO[str]] = None) -> None:
+        self._file = file or sys.stdout
+        self._names = list(names)
+        self._progress = [0.0] * len(self._names)
+        self._steps = [0] * len(self._names)
+        self._lock = threading.Lock()
+        try:
+            self._is_tty = os.isatty(self._file.fileno())
+        except (OSError, AttributeError):
+            self._is_tty = False
+
+    def callback_for(self, index: int):
+        """@brief Return a progress callback for FileProgrammer that updates the given probe."""
+        return lambda progress: self.update(index, progress)
+
+    def update(self, index: int, progress: float) -> None:
+        """@brief Set the progress of one probe, from 0.0 to 1.0."""
+        progress = min(max(progress, 0.0), 1.0)
+        with self._lock:
+            self._progress[index] = progress
+            if self._is_tty:
+                self._file.write('\r' + "  ".join("%s %3d%%" % (name, round(p * 100))
+                        for name, p in zip(self._names, self._progress)))
+                self._file.flush()
+            else:
+                step = int(progress * self.STEPS)
+                if step != self._steps[index]:
+                    self._steps[index] = step
+                    self._file.write("%s: %3d%%\n" % (self._names[index], round(progress * 100)))
+                    self._file.flush()
+
+    def finish(self) -> None:
+        """@brief End the progress output."""
+        with self._lock:
+            if self._is_tty:
+                self._file.write('\n')
+                self._file.flush()
+
+class ParallelProgrammer:
+    """@brief Program the same image into the targets of several probes at once.
+
+    Each session is opened, programmed with a FileProgrammer, and closed in a worker thread. All
+    workers share the one ProgramImage, which is read-only, so files are parsed only once no
+    matter how many targets are programmed.
+
+    Opening sessions is staggered by a configurable interval, so that the USB heavy probe
+    connection and target discovery phases of different probes are spread out instead of all
+    starting at the same time.
+    """
+
+    def __init__(self,
+            sessions: Sequence["Session"],
+            image: ProgramImage,
+            max_workers: Optional[int] = None,
+            stagger: float = 0.0,
+            progress: Optional[MultiProgressReport] = None,
+            **programmer_args: Any
+        ) -> None:
+        """@brief Constructor.
+
+        @param self
+        @param sessions The sessions to program. They must not be open yet.
+        @param image The ProgramImage with the data to program.
+        @param max_workers Maximum number of targets programmed at the same time. Defaults to the
+            number of sessions.
+        @param stagger Minimum time in seconds between opening each session.
+        @param progress Optional MultiProgressReport. If not provided, progress is not reported.
+        @param programmer_args Keyword arguments passed to FileProgrammer, for instance _chip_erase_.
+        """
+        self._sessions = list(sessions)
+        self._image = image
+        self._max_workers = max_workers or max(len(self._sessions), 1)
+        self._stagger = stagger
+        self._progress = progress
+        self._programmer_args = programmer_args
+        self._start_lock = threading.Lock()
+        self._next_start = 0.0
+
+    def program(self) -> List[ProbeResult]:
+        """@brief Program all targets.
+
+        Errors are caught and reported in the results, so a failure with one probe doesn't
+        affect the others.
+
+        @return List of ProbeResult objects, in the same order as the sessions.
+        """
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            futures = [executor.submit(self._program_one, index, session)
+                    for index, session in enumerate(self._sessions)]
+            results = [future.result() for future in futures]
+        if self._progress is not None:
+            self._progress.finish()
+        return results
+
+    def _wait_for_start(self) -> None:
+        """@brief Delay until the stagger interval since the previous session was opened has passed."""
+        with self._start_lock:
+            delay = self._next_start - monotonic()
+            if delay > 0:
+                sleep(delay)
+            self._next_start = monotonic() + self._stagger
+
+    def _program_one(self, index: int, session: "Session") -> ProbeResult:
+        assert session.probe is not None
+        unique_id = session.probe.unique_id
+        progress = self._progress.callback_for(index) if (self._progress is not None) else None
+        program_byte_count = 0
+        error = None
+        self._wait_for_start()
+        start = monotonic()
+        try:
+            with session:
+                programmer = FileProgrammer(session, progress=progress, **self._programmer_args)
+                perf_list = programmer.program_image(self._image)
+                program_byte_count = sum(perf.program_byte_count for perf in perf_list)
+        except Exception as err:
+            LOG.error("Programming with probe %s failed: %s", unique_id, err,
+                    exc_info=session.log_tracebacks)
+            error = str(err) or err.__class__.__name__
+        return ProbeResult(
+                unique_id=unique_id,
+                status=0 if (error is None) else 1,
+                error=error,
+                byte_count=self._image.byte_count,
+                program_byte_count=program_byte_count,
+                elapsed=monotonic() - start,
+                )
@@ -61,6 +61,9 @@ class GDBDebugContextFacade(object):
     ## The order certain target features should appear in target XML.
     REQUIRED_FEATURE_ORDER = ("org.gnu.gdb.arm.m-profile", "org.gnu.gdb.arm.vfp")
 
+    ## Registers whose values are included in T stop replies.
+    T_RESPONSE_REGISTERS = ('r7', 'sp', 'lr', 'pc')
+
     def __init__(self, context):
         self._context = context
 
@@ -73,6 +76,9 @@ class GDBDebugContextFacade(object):
         self._register_list = sorted(set(self._context.core.core_registers.iter_matching(
                 lambda reg: reg.gdb_regnum is not None)), key=lambda v: v.gdb_regnum)
 
+        ## List of the number of bytes used to send each register in _register_list.
+        self._register_byte_counts = [round_up_div(reg.bitsize, 8) for reg in self._register_list]
+
         ## List of internal register numbers corresponding to gdb registers.
         self._full_reg_num_list = [reg.index for reg in self._register_list]
 
@@ -95,23 +101,20 @@ class GDBDebugContextFacade(object):
         @exception CoreRegisterAccessError
         """
         LOG.debug("GDB getting register context")
-        resp = b''
         try:
             vals = self._context.read_core_registers_raw(self._full_reg_num_list)
         except exceptions.CoreRegisterAccessError:
-            vals = [None] * len(self._full_reg_num_list)
-
-        for reg, reg_value in zip(self._register_list, vals):
-            # Return x's to indicate unavailable register value.
-            if reg_value is None:
-                r = b"xx" * round_up_div(reg.bitsize, 8)
-            else:
-                r = conversion.uint_to_hex_le(reg_value, reg.bitsize).encode()
-            resp += r
-            LOG.debug("GDB get_reg_context: %s = %s -> %s", reg.name,
-                    "None" if (reg_value is None) else ("0x%08X" % reg_value), r)
-
-        return resp
+            # Return x's to indicate unavailable register values.
+            return b"xx" * sum(self._register_byte_counts)
+
+        # Pack all values as little-endian bytes, then hex encode the whole context at once.
+        data = b"".join(
+                (reg_value & ((1 << (byte_count * 8)) - 1)).to_bytes(byte_count, 'little')
+                for byte_count, reg_value in zip(self._register_byte_counts, vals))
+        if LOG.isEnabledFor(logging.DEBUG):
+            for reg, reg_value in zip(self._register_list, vals):
+                LOG.debug("GDB get_reg_context: %s = 0x%08X", reg.name, reg_value)
+        return data.hex().encode()
 
     def set_register_context(self, data):
         """@brief Set registers from GDB hexadecimal string.
@@ -186,8 +189,15 @@ class GDBDebugContextFacade(object):
         else:
             response = ('T' + conversion.byte_to_hex2(self.get_signal_value())).encode()
 
+        # Read the full register context in a single batch. With a register cache, this serves both the
+        # expedited registers below and gdb's usual 'g' request that follows a stop.
+        try:
+            self._context.prefetch_core_registers(self._full_reg_num_list)
+        except exceptions.CoreRegisterAccessError:
+            pass
+
         # Append fp(r7), sp(r13), lr(r14), pc(r15)
-        response += self._get_reg_index_value_pairs(['r7', 'sp', 'lr', 'pc'])
+        response += self._get_reg_index_value_pairs(self.T_RESPONSE_REGISTERS)
 
         return response
 
@@ -216,20 +226,20 @@ class GDBDebugContextFacade(object):
         for the T response string.  NN is the index of the
         register to follow MMMMMMMM is the value of the register.
         """
-        result = b''
         try:
             reg_values = self._context.read_core_registers_raw(reg_list)
         except exceptions.CoreRegisterAccessError:
             # If we cannot read registers, return an empty string. We mustn't return 'x's like the other
             # register read methods do, because gdb terribly dislikes 'x's in a T response.
-            return result
+            return b''
 
+        by_name = self._context.core.core_registers.by_name
+        result = []
         for reg_name, reg_value in zip(reg_list, reg_values):
-            reg = self._context.core.core_registers.by_name[reg_name]
+            reg = by_name[reg_name]
             assert reg_value is not None
-            encoded_reg = conversion.uint_to_hex_le(reg_value, reg.bitsize)
-            result += (conversion.byte_to_hex2(reg.gdb_regnum) + ':' + encoded_reg + ';').encode()
-        return result
+            result.append("%02x:%s;" % (reg.gdb_regnum, conversion.uint_to_hex_le(reg_value, reg.bitsize)))
+        return "".join(result).encode()
 
     def get_memory_map_xml(self):
         """@brief Generate GDB memory map XML.
@@ -28,7 +28,7 @@ from ..core import exceptions
 from ..core.target import Target
 from ..flash.loader import FlashLoader
 from ..utility.cmdline import convert_vector_catch
-from ..utility.conversion import (hex_to_byte_list, hex_encode, hex_decode, hex8_to_u32le)
+from ..utility.conversion import (hex_encode, hex_decode, hex8_to_u32le)
 from ..utility.compatibility import (to_bytes_safe, to_str_safe)
 from ..utility.server import StreamServer
 from ..utility.timeout import Timeout
@@ -38,6 +38,7 @@ from ..utility.sockets import ListenerSocket
 from .syscall import GDBSyscallIOHandler
 from ..debug import semihost
 from .context_facade import GDBDebugContextFacade
+from .status_poller import TargetStatusPoller
 from .symbols import GDBSymbolProvider
 from ..rtos import RTOS
 from . import signals
@@ -57,25 +58,29 @@ LOG = logging.getLogger(__name__)
 TRACE_MEM = LOG.getChild("trace.mem")
 TRACE_MEM.setLevel(logging.CRITICAL)
 
-def unescape(data: bytes) -> List[int]:
+def unescape(data: bytes) -> bytes:
     """@brief De-escapes binary data from Gdb.
 
+    Runs of bytes between escapes are copied as whole slices, so the cost is linear in the length of
+    the data.
+
     @param data Bytes-like object with possibly escaped values.
-    @return List of integers in the range 0-255, with all escaped bytes de-escaped.
+    @return Bytes object with all escaped bytes de-escaped.
     """
-    data_idx = 0
-
-    # unpack the data into binary array
-    result = list(data)
-
-    # check for escaped characters
-    while data_idx < len(result):
-        if result[data_idx] == 0x7d:
-            result.pop(data_idx)
-            result[data_idx] = result[data_idx] ^ 0x20
-        data_idx += 1
-
-    return result
+    data = bytes(data)
+    escape_pos = data.find(b'}')
+    if escape_pos < 0:
+        return data
+
+    result = bytearray()
+    start = 0
+    while (escape_pos >= 0) and (escape_pos + 1 < len(data)):
+        result += data[start:escape_pos]
+        result.append(data[escape_pos + 1] ^ 0x20)
+        start = escape_pos + 2
+        escape_pos = data.find(b'}', start)
+    result += data[start:]
+    return bytes(result)
 
 ## Tuple of int values of characters that must be escaped.
 _GDB_ESCAPED_CHARS = tuple(b'#$}*')
@@ -593,76 +598,91 @@ class GDBServer(threading.Thread):
         # also serves as a flag that a fault occurred and we're attempting to retry.
         fault_retry_timeout = Timeout(self.session.options.get('debug.status_fault_retry_timeout'))
 
-        while fault_retry_timeout.check():
-            if self.shutdown_event.is_set():
-                self.packet_io.interrupt_event.clear()
-                return self.create_rsp_packet(val)
-
-            self.lock.release()
-
-            # Wait for a ctrl-c to be received.
-            if self.packet_io.interrupt_event.wait(0.01):
-                self.lock.acquire()
-                LOG.debug("receive CTRL-C")
-                self.packet_io.interrupt_event.clear()
-
-                # Be careful about reading the target state. If we previously got a fault (the timeout
-                # is running) then ignore the error. In all cases we still return SIGINT.
-                try:
-                    self.target.halt()
-                    val = self.get_t_response(forceSignal=signals.SIGINT)
-                except exceptions.TransferError as e:
-                    # Note: if the target is not actually halted, gdb can get confused from this point on.
-                    # But there's not much we can do if we're getting faults attempting to control it.
-                    if not fault_retry_timeout.is_running:
-                        LOG.error('Error reading target status: %s', e, exc_info=self.session.log_tracebacks)
-                    val = ('S%02x' % signals.SIGINT).encode()
-                break
+        # The target's state is polled often right after resuming, so short runs such as stepping over a
+        # function call are detected quickly, then less often the longer the target keeps running.
+        min_poll_interval = self.session.options.get('debug.status_poll.min_interval')
+        max_poll_interval = max(min_poll_interval, self.session.options.get('debug.status_poll.max_interval'))
+        poll_interval = min_poll_interval
+        poller = TargetStatusPoller.for_session(self.session)
 
-            self.lock.acquire()
+        with poller.watch(self.target):
+            while fault_retry_timeout.check():
+                if self.shutdown_event.is_set():
+                    self.packet_io.interrupt_event.clear()
+                    return self.create_rsp_packet(val)
 
-            try:
-                state = self.target.get_state()
+                self.lock.release()
 
-                if self.rtt_server:
-                    self.rtt_server.poll()
+                # Wait for a ctrl-c to be received. The wait ends as soon as the interrupt event is set.
+                if self.packet_io.interrupt_event.wait(poll_interval):
+                    self.lock.acquire()
+                    LOG.debug("receive CTRL-C")
+                    self.packet_io.interrupt_event.clear()
 
-                # If we were able to successfully read the target state after previously receiving a fault,
-                # then clear the timeout.
-                if fault_retry_timeout.is_running:
-                    LOG.info("Target control reestablished.")
-                    fault_retry_timeout.clear()
+                    # Be careful about reading the target state. If we previously got a fault (the timeout
+                    # is running) then ignore the error. In all cases we still return SIGINT.
+                    try:
+                        self.target.halt()
+                        val = self.get_t_response(forceSignal=signals.SIGINT)
+                    except exceptions.TransferError as e:
+                        # Note: if the target is not actually halted, gdb can get confused from this point on.
+                        # But there's not much we can do if we're getting faults attempting to control it.
+                        if not fault_retry_timeout.is_running:
+                            LOG.error('Error reading target status: %s', e, exc_info=self.session.log_tracebacks)
+                        val = ('S%02x' % signals.SIGINT).encode()
+                    break
 
-                if state == Target.State.HALTED:
-                    # Handle semihosting
-                    if self.enable_semihosting:
-                        was_semihost = self.semihost.check_and_handle_semihost_request()
+                self.lock.acquire()
 
-                        if was_semihost:
-                            self.target.resume()
-                            continue
+                try:
+                    state = poller.get_state(self.target, max_age=poll_interval)
+
+                    rtt_transferred = self.rtt_server.poll() if self.rtt_server else 0
+
+                    # If we were able to successfully read the target state after previously receiving a fault,
+                    # then clear the timeout.
+                    if fault_retry_timeout.is_running:
+                        LOG.info("Target control reestablished.")
+                        fault_retry_timeout.clear()
+
+                    if state == Target.State.HALTED:
+                        # Handle semihosting
+                        if self.enable_semihosting:
+                            was_semihost = self.semihost.check_and_handle_semihost_request()
+
+                            if was_semihost:
+                                self.target.resume()
+                                poller.invalidate(self.target)
+                                poll_interval = min_poll_interval
+                                continue
+
+                        pc = self.target_context.read_core_register('pc')
+                        LOG.debug("state halted; pc=0x%08x", pc)
+                        val = self.get_t_response()
+                        break
 
-                    pc = self.target_context.read_core_register('pc')
-                    LOG.debug("state halted; pc=0x%08x", pc)
-                    val = self.get_t_response()
+                    # Back off while the target keeps running, unless RTT data is flowing.
+                    if rtt_transferred:
+                        poll_interval = min_poll_interval
+                    else:
+                        poll_interval = min(poll_interval * 2, max_poll_interval)
+                except exceptions.TransferError as e:
+                    # If we get any sort of transfer error or fault while checking target status, then start
+                    # a timeout running. Upon a later successful status check, the timeout is cleared. In the event
+                    # that the timeout expires, this loop is exited and an error raised to gdb.
+                    if not fault_retry_timeout.is_running:
+                        LOG.warning("Transfer error while checking target status; retrying: %s", e,
+                                exc_info=self.session.log_tracebacks)
+                    fault_retry_timeout.start()
+                except exceptions.Error as e:
+                    try:
+                        self.target.halt()
+                    except exceptions.Error:
+                        pass
+                    LOG.warning('Error while target was running: %s', e, exc_info=self.session.log_tracebacks)
+                    # This exception was not a transfer error, so reading the target state should be ok.
+                    val = ('S%02x' % self.target_facade.get_signal_value()).encode()
                     break
-            except exceptions.TransferError as e:
-                # If we get any sort of transfer error or fault while checking target status, then start
-                # a timeout running. Upon a later successful status check, the timeout is cleared. In the event
-                # that the timeout expires, this loop is exited and an error raised to gdb.
-                if not fault_retry_timeout.is_running:
-                    LOG.warning("Transfer error while checking target status; retrying: %s", e,
-                            exc_info=self.session.log_tracebacks)
-                fault_retry_timeout.start()
-            except exceptions.Error as e:
-                try:
-                    self.target.halt()
-                except exceptions.Error:
-                    pass
-                LOG.warning('Error while target was running: %s', e, exc_info=self.session.log_tracebacks)
-                # This exception was not a transfer error, so reading the target state should be ok.
-                val = ('S%02x' % self.target_facade.get_signal_value()).encode()
-                break
 
         # Check if we exited the above loop due to a timeout after a fault.
         if fault_retry_timeout.did_time_out:
@@ -847,10 +867,10 @@ class GDBServer(threading.Thread):
         TRACE_MEM.debug("GDB getMem: addr=%x len=%x", addr, length)
 
         try:
-            mem = self.target_context.read_memory_block8(addr, length)
+            mem = self.target_context.read_memory_block_bytes(addr, length)
             # Flush so an exception is thrown now if invalid memory was accesses
             self.target_context.flush()
-            val = hex_encode(bytearray(mem))
+            val = hex_encode(mem)
         except exceptions.TransferError as e:
             LOG.debug("get_memory failed at 0x%x: %s", addr, str(e))
             val = b'E01' #EPERM
@@ -864,13 +884,13 @@ class GDBServer(threading.Thread):
         length = int(split[0], 16)
 
         split = split[1].split(b'#')
-        data = hex_to_byte_list(split[0])
+        data = hex_decode(split[0])
 
         TRACE_MEM.debug("GDB writeMemHex: addr=%x len=%x", addr, length)
 
         try:
             if length > 0:
-                self.target_context.write_memory_block8(addr, data)
+                self.target_context.write_memory_block_bytes(addr, data)
                 # Flush so an exception is thrown now if invalid memory was accessed
                 self.target_context.flush()
             resp = b"OK"
@@ -893,7 +913,7 @@ class GDBServer(threading.Thread):
 
         try:
             if length > 0:
-                self.target_context.write_memory_block8(addr, data)
+                self.target_context.write_memory_block_bytes(addr, data)
                 # Flush so an exception is thrown now if invalid memory was accessed
                 self.target_context.flush()
             resp = b"OK"
@@ -19,6 +19,7 @@ import logging
 import threading
 import queue
 import socket
+from typing import Union
 
 CTRL_C = b'\x03'
 
@@ -30,7 +31,7 @@ TRACE_ACK.setLevel(logging.CRITICAL)
 TRACE_PACKETS = LOG.getChild("trace.packet")
 TRACE_PACKETS.setLevel(logging.CRITICAL)
 
-def checksum(data: bytes) -> bytes:
+def checksum(data: Union[bytes, bytearray, memoryview]) -> bytes:
     return ("%02x" % (sum(data) % 256)).encode()
 
 class ConnectionClosedException(Exception):
@@ -58,7 +59,11 @@ class GDBServerPacketIOThread(threading.Thread):
         self.interrupt_event = threading.Event()
         self.send_acks = True
         self._clear_send_acks = False
-        self._buffer = b''
+        # Received data. Bytes before _read_pos have already been processed.
+        self._buffer = bytearray()
+        self._read_pos = 0
+        # Offset from which to continue searching for the end of the packet being received.
+        self._scan_pos = 0
         self._expecting_ack = False
         self.drop_reply = False
         self._last_packet = b''
@@ -156,9 +161,9 @@ class GDBServerPacketIOThread(threading.Thread):
 
     def _check_expected_ack(self):
         # Handle expected ack.
-        c = self._buffer[0:1]
+        c = bytes(self._buffer[self._read_pos:self._read_pos + 1])
         if c in (b'+', b'-'):
-            self._buffer = self._buffer[1:]
+            self._read_pos += 1
             TRACE_ACK.debug('got ack: %s', c)
             if c == b'-':
                 # Handle nack from gdb
@@ -173,34 +178,54 @@ class GDBServerPacketIOThread(threading.Thread):
             LOG.debug("GDB: expected n/ack but got '%s'", c)
 
     def _process_data(self):
-        """@brief Process all incoming data until there are no more complete packets."""
-        while len(self._buffer):
+        """@brief Process all incoming data until there are no more complete packets.
+
+        Instead of slicing the buffer each time something is extracted from it, a read cursor
+        is advanced, and processed data is removed from the buffer only once at the end. The
+        search for the end of a packet resumes where the previous search stopped, so a large
+        packet received in many pieces is only scanned once.
+        """
+        buffer = self._buffer
+        while self._read_pos < len(buffer):
             if self._expecting_ack:
                 self._expecting_ack = False
                 self._check_expected_ack()
 
             # Check for a ctrl-c.
-            if len(self._buffer) and self._buffer[0:1] == CTRL_C:
+            if buffer[self._read_pos:self._read_pos + 1] == CTRL_C:
                 self.interrupt_event.set()
-                self._buffer = self._buffer[1:]
+                self._read_pos += 1
 
-            try:
-                # Look for complete packet and extract from buffer.
-                pkt_begin = self._buffer.index(b"$")
-                pkt_end = self._buffer.index(b"#") + 2
-                if pkt_begin >= 0 and pkt_end < len(self._buffer):
-                    pkt = self._buffer[pkt_begin:pkt_end + 1]
-                    self._buffer = self._buffer[pkt_end + 1:]
-                    self._handling_incoming_packet(pkt)
-                else:
-                    break
-            except ValueError:
+            # Look for complete packet and extract from buffer.
+            pkt_begin = buffer.find(b"$", self._read_pos)
+            if pkt_begin < 0:
+                break
+            hash_pos = buffer.find(b"#", max(pkt_begin, self._scan_pos))
+            if hash_pos < 0:
                 # No complete packet received yet.
+                self._scan_pos = len(buffer)
                 break
+            pkt_end = hash_pos + 3
+            if pkt_end > len(buffer):
+                # Waiting for the checksum.
+                self._scan_pos = hash_pos
+                break
+
+            pkt = bytes(buffer[pkt_begin:pkt_end])
+            self._read_pos = pkt_end
+            self._scan_pos = pkt_end
+            self._handling_incoming_packet(pkt)
+
+        # Drop processed data.
+        if self._read_pos:
+            del buffer[:self._read_pos]
+            self._scan_pos = max(self._scan_pos - self._read_pos, 0)
+            self._read_pos = 0
 
     def _handling_incoming_packet(self, packet):
         # Compute checksum
-        data, cksum = packet[1:].split(b'#')
+        data = memoryview(packet)[1:-3]
+        cksum = packet[-2:]
         computedCksum = checksum(data)
         goodPacket = (computedCksum.lower() == cksum.lower())
 
@@ -0,0 +1,137 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from contextlib import contextmanager
+import logging
+import threading
+from time import monotonic
+from typing import (Callable, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING)
+from weakref import WeakKeyDictionary
+
+from ..core import exceptions
+from ..core.target import Target
+
+if TYPE_CHECKING:
+    from ..core.session import Session
+
+LOG = logging.getLogger(__name__)
+
+class TargetStatusPoller:
+    """@brief Reads the run state of targets being waited on by gdbservers in a session.
+
+    When several gdbservers share a session, one per core, each polls the state of its core while
+    the core is running. Instead of reading each core's state separately, a gdbserver asks the
+    poller for its core's state. The poller then queues state reads for every watched target and
+    collects the results from a single probe transaction. The states read for other targets are kept,
+    so a gdbserver polling soon afterwards can use its target's state without accessing the probe.
+    Each kept state is used at most once.
+
+    Use for_session() to get the poller shared by all gdbservers in a session.
+    """
+
+    _pollers: "WeakKeyDictionary[Session, TargetStatusPoller]" = WeakKeyDictionary()
+    _pollers_lock = threading.Lock()
+
+    @classmethod
+    def for_session(cls, session: "Session") -> "TargetStatusPoller":
+        """@brief Return the poller for a session, creating it if necessary."""
+        with cls._pollers_lock:
+            poller = cls._pollers.get(session)
+            if poller is None:
+                poller = cls()
+                cls._pollers[session] = poller
+            return poller
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Reference count for each watched target.
+        self._watched: Dict[Target, int] = {}
+        # Unused state of watched targets read on behalf of another target, and the time it was read.
+        self._states: Dict[Target, Tuple[Target.State, float]] = {}
+
+    @contextmanager
+    def watch(self, target: Target) -> Iterator[None]:
+        """@brief Context manager that includes a target in batched state reads.
+
+        The target should be watched only while it is running, between resuming it and seeing it halt.
+        """
+        with self._lock:
+            self._watched[target] = self._watched.get(target, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._watched[target] -= 1
+                if self._watched[target] == 0:
+                    del self._watched[target]
+                    self._states.pop(target, None)
+
+    def invalidate(self, target: Target) -> None:
+        """@brief Discard any kept state for a target.
+
+        Must be called after resuming a watched target again, for instance after handling a semihosting
+        request, so a state read before the target was resumed isn't used.
+        """
+        with self._lock:
+            self._states.pop(target, None)
+
+    def get_state(self, target: Target, max_age: float = 0.0) -> Target.State:
+        """@brief Return the state of a target.
+
+        @param self
+        @param target The target whose state is requested.
+        @param max_age If a state for the target was read by a previous poll no longer than this many
+            seconds ago, it is returned without accessing the target.
+        @exception TransferError Reading the requested target's state failed. Errors reading the states
+            of other watched targets are ignored; the next poll of those targets will retry.
+        """
+        with self._lock:
+            entry = self._states.pop(target, None)
+            if (entry is not None) and (monotonic() - entry[1] <= max_age):
+                return entry[0]
+
+            # Queue state reads for the requested target first, then all other watched targets.
+            targets = [target] + [t for t in self._watched if t is not target]
+            callbacks: List[Tuple[Target, Callable[[], Target.State]]] = []
+            error: Optional[exceptions.Error] = None
+            try:
+                for t in targets:
+                    try:
+                        callbacks.append((t, t.get_state_deferred()))
+                    except exceptions.Error as err:
+                        if t is target:
+                            raise
+                        LOG.debug("error reading state of %s: %s", t, err)
+            finally:
+                # Every callback must be invoked to complete the queued reads.
+                now = monotonic()
+                for t, cb in callbacks:
+                    try:
+                        state = cb()
+                    except exceptions.Error as err:
+                        if (t is target) and (error is None):
+                            error = err
+                        else:
+                            LOG.debug("error reading state of %s: %s", t, err)
+                        continue
+                    if t is target:
+                        result = state
+                    else:
+                        self._states[t] = (state, now)
+
+            if error is not None:
+                raise error
+            return result
@@ -677,6 +677,61 @@ class CMSISDAPProbe(DebugProbe):
                     ", ".join(["%#010x" % v for v in values]), exc)
             raise self._convert_exception(exc) from exc
 
+    @overload
+    def read_ap_multiple_bytes(self, addr: int, count: int = 1) -> bytearray:
+        ...
+
+    @overload
+    def read_ap_multiple_bytes(self, addr: int, count: int, now: Literal[True] = True) -> bytearray:
+        ...
+
+    @overload
+    def read_ap_multiple_bytes(self, addr: int, count: int, now: Literal[False]) -> Callable[[], bytearray]:
+        ...
+
+    @overload
+    def read_ap_multiple_bytes(self, addr: int, count: int, now: bool) -> Union[bytearray, Callable[[], bytearray]]:
+        ...
+
+    def read_ap_multiple_bytes(self, addr: int, count: int = 1, now: bool = True) \
+             -> Union[bytearray, Callable[[], bytearray]]:
+        assert isinstance(addr, int)
+        ap_reg = self.REG_ADDR_TO_ID_MAP[self.AP, (addr & self.A32)]
+
+        try:
+            TRACE.debug("trace: read_ap_multi_bytes(addr=%#010x, count=%i) -> ...", addr, count)
+            result = self._link.reg_read_repeat_bytes(count, ap_reg, dap_index=0, now=False)
+        except DAPAccess.Error as exc:
+            raise self._convert_exception(exc) from exc
+
+        # Need to wrap the deferred callback to convert exceptions.
+        def read_ap_repeat_bytes_callback():
+            try:
+                data = result()
+                TRACE.debug("trace: ... read_ap_multi_bytes(addr=%#010x, count=%i) -> %i bytes",
+                        addr, count, len(data))
+                return data
+            except DAPAccess.Error as exc:
+                TRACE.debug("trace: ... read_ap_multi_bytes(addr=%#010x, count=%i) -> error(%s)",
+                    addr, count, exc)
+                raise self._convert_exception(exc) from exc
+
+        if now:
+            return read_ap_repeat_bytes_callback()
+        else:
+            return read_ap_repeat_bytes_callback
+
+    def write_ap_multiple_bytes(self, addr: int, data: Union[bytes, bytearray, memoryview]) -> None:
+        assert isinstance(addr, int)
+        ap_reg = self.REG_ADDR_TO_ID_MAP[self.AP, (addr & self.A32)]
+
+        try:
+            self._link.reg_write_repeat_bytes(ap_reg, data, dap_index=0)
+            TRACE.debug("trace: write_ap_multi_bytes(addr=%#010x, %i bytes)", addr, len(data))
+        except DAPAccess.Error as exc:
+            TRACE.debug("trace: write_ap_multi_bytes(addr=%#010x, %i bytes) -> error(%s)", addr, len(data), exc)
+            raise self._convert_exception(exc) from exc
+
     # ------------------------------------------- #
     #          SWO functions
     # ------------------------------------------- #
@@ -20,6 +20,8 @@ import threading
 from typing import (Callable, Collection, Optional, overload, Sequence, Set, TYPE_CHECKING, Tuple, Union)
 from typing_extensions import Literal
 
+from ..utility import conversion
+
 if TYPE_CHECKING:
     from ..core.session import Session
     from ..core.memory_interface import MemoryInterface
@@ -503,6 +505,54 @@ class DebugProbe:
         """@brief Write one AP register multiple times."""
         raise NotImplementedError()
 
+    @overload
+    def read_ap_multiple_bytes(self, addr: int, count: int = 1) -> bytearray:
+        ...
+
+    @overload
+    def read_ap_multiple_bytes(self, addr: int, count: int, now: Literal[True] = True) -> bytearray:
+        ...
+
+    @overload
+    def read_ap_multiple_bytes(self, addr: int, count: int, now: Literal[False]) -> Callable[[], bytearray]:
+        ...
+
+    @overload
+    def read_ap_multiple_bytes(self, addr: int, count: int, now: bool) -> Union[bytearray, Callable[[], bytearray]]:
+        ...
+
+    def read_ap_multiple_bytes(self, addr: int, count: int = 1, now: bool = True) \
+             -> Union[bytearray, Callable[[], bytearray]]:
+        """@brief Read one AP register multiple times, returning the little-endian data as bytes.
+
+        The default implementation converts the result of read_ap_multiple(). Probes that natively
+        handle raw transfer data should override this method.
+
+        @param self
+        @param addr AP register address.
+        @param count Number of words to read.
+        @param now Whether to return the data immediately or a callable that returns the data.
+        @return A bytearray of length 4 * _count_, or a callable returning it.
+        """
+        result = self.read_ap_multiple(addr, count, now=False)
+
+        def read_ap_multiple_bytes_cb() -> bytearray:
+            return bytearray(conversion.u32le_list_to_bytes(result()))
+
+        return read_ap_multiple_bytes_cb() if now else read_ap_multiple_bytes_cb
+
+    def write_ap_multiple_bytes(self, addr: int, data: Union[bytes, bytearray, memoryview]) -> None:
+        """@brief Write one AP register multiple times with little-endian words from a bytes-like object.
+
+        The default implementation converts the data to words and calls write_ap_multiple(). Probes
+        that natively handle raw transfer data should override this method.
+
+        @param self
+        @param addr AP register address.
+        @param data Bytes-like object whose length is a multiple of 4.
+        """
+        self.write_ap_multiple(addr, conversion.bytes_to_u32le_list(data))
+
     def get_memory_interface_for_ap(self, ap_address: "APAddressBase") -> Optional["MemoryInterface"]:
         """@brief Returns a @ref pyocd.core.memory_interface.MemoryInterface "MemoryInterface" for
             the specified AP.
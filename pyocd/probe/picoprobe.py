@@ -24,7 +24,8 @@ import libusb_package
 import platform
 import errno
 import logging
-from typing import List
+import struct
+from typing import (Iterable, List, Sequence, Tuple)
 
 from .debug_probe import DebugProbe
 from .common import show_no_libusb_warning
@@ -57,6 +58,9 @@ class PicoLink(object):
 
     BUFFER_SIZE = 8192      # Size of buffers in the picoprobe
 
+    # Command header layout: id, command, bit count
+    CMD_HEADER = struct.Struct('<BBI')
+
     def __init__(self, dev):
         self._dev = dev
         self._probe_id = dev.serial_number
@@ -68,11 +72,11 @@ class PicoLink(object):
         self._rd_ep = None
         # Progressive command id
         self._id = 0
-        # Probe command queue
-        self._queue = array('B', (0, 0, 0, 0))
+        # Probe command queue, preallocated to the probe buffer size; _qulen is the used length
+        self._queue = array('B', bytes(self.BUFFER_SIZE))
         self._qulen = self.PKT_HDR_LEN
         # Buffer for endpoint reads
-        self._bits = array('B', (0 for _ in range(self.BUFFER_SIZE)))
+        self._bits = array('B', bytes(self.BUFFER_SIZE))
 
     # ------------------------------------------- #
     #          Picoprobe Access functions
@@ -126,16 +130,38 @@ class PicoLink(object):
         if bits is None:
             bits = 8 * len(data)  # will raise TypeError if data is int
         count = (bits + 7) // 8
-        self._queue_cmd_header(self.PROBE_WRITE_BITS, bits, count)
-        self._queue.extend(data if type(data) is not int else data.to_bytes(count, 'little'))
+        offset = self._queue_cmd_header(self.PROBE_WRITE_BITS, bits, count)
+        self._queue[offset:offset + count] = array(
+            'B', data if type(data) is not int else data.to_bytes(count, 'little'))
+
+    def q_repeat(self, template: bytes, count: int, id_offsets: Sequence[int],
+                 lanes: Iterable[Tuple[int, bytes]] = ()):
+        """@brief Queue _count_ copies of a block of pre-encoded commands.
+
+        @param template Encoded commands, including headers, to be repeated.
+        @param count Number of copies to queue.
+        @param id_offsets Offsets of the command id bytes in _template_. They are filled in with
+            progressive ids.
+        @param lanes Pairs of an offset in _template_ and a bytes object of length _count_. Byte i of
+            the bytes object is placed at the offset in copy i, to fill in per-copy data.
+        """
+        length = len(template)
+        offset = self._reserve(length * count)
+        end = offset + length * count
+        self._queue[offset:end] = array('B', template * count)
+        ids = self._take_ids(len(id_offsets) * count)
+        with memoryview(self._queue) as view:
+            for i, id_offset in enumerate(id_offsets):
+                view[offset + id_offset:end:length] = ids[i::len(id_offsets)]
+            for lane_offset, data in lanes:
+                view[offset + lane_offset:end:length] = data
 
     def flush_queue(self):
         """@brief Execute all the queued probe actions"""
         # Put in the packet header (byte count)
-        self._queue[:self.PKT_HDR_LEN] = array(
-            'B', self._qulen.to_bytes(4, 'little'))
+        struct.pack_into('<I', self._queue, 0, self._qulen)
         try:
-            self._wr_ep.write(self._queue)
+            self._wr_ep.write(self._queue[:self._qulen])
         except Exception:
             # Anything from the USB layer assumes probe is no longer connected
             raise exceptions.ProbeDisconnected(
@@ -144,12 +170,16 @@ class PicoLink(object):
             # Make sure there are no leftovers
             self._clear_queue()
 
-    def get_bits(self):
-        """@briefExecute all the queued probe actions and return read values"""
+    def get_response(self) -> bytes:
+        """@brief Execute all the queued probe actions and return the raw response
+
+        @return The response packet without its header, made of a read header followed by the read
+            bytes for each queued read.
+        """
         self.flush_queue()
         try:
-            # A single read is enough, as the 8 kB buffer in the Picoprobe can
-            # contain about 454 ACKs+Register reads, and I never queue more than 256
+            # A single read is enough, as the queue never holds more reads than fit in the
+            # 8 kB buffer of the Picoprobe.
             received = self._rd_ep.read(self._bits)
         except Exception:
             # Anything from the USB layer assumes probe is no longer connected
@@ -163,21 +193,27 @@ class PicoLink(object):
             raise exceptions.ProbeError(
                 'Mismatched header from %s: expected %d, received %d' % (self._probe_id, remaining, received))
 
-        remaining -= self.PKT_HDR_LEN
-        offset = self.PKT_HDR_LEN
+        return self._bits[self.PKT_HDR_LEN:received].tobytes()
+
+    def get_bits(self):
+        """@briefExecute all the queued probe actions and return read values"""
+        response = self.get_response()
+        remaining = len(response)
+        offset = 0
         result = []
         # Loop over the received data, creating a list of ints
         while remaining > 0:
             # Check for a real read header
-            if self._bits[offset+1] != self.PROBE_READ_BITS:
+            _, cmd, bits = self.CMD_HEADER.unpack_from(response, offset)
+            if cmd != self.PROBE_READ_BITS:
                 # Something went wrong: wrong command in received header
                 # Possible sign we are misaligned
-                raise exceptions.ProbeError('Wrong header received from %s')
+                raise exceptions.ProbeError('Wrong header received from %s' % self._probe_id)
             # Get the bytes count for the operation
             # The receiver must know how many bits they are interested in!
-            count = (int.from_bytes(self._bits[offset + 2:offset + 6], 'little') + 7) // 8
+            count = (bits + 7) // 8
             offset += self.CMD_HDR_LEN
-            result.append(int.from_bytes(self._bits[offset:offset + count], 'little'))
+            result.append(int.from_bytes(response[offset:offset + count], 'little'))
             offset += count
             remaining -= self.CMD_HDR_LEN + count
         return result
@@ -214,19 +250,33 @@ class PicoLink(object):
         self._id = (self._id + 1) % 0x100
         return id
 
+    def _take_ids(self, count):
+        """@brief Returns a bytes object with the next _count_ progressive ids"""
+        start = self._id
+        self._id = (start + count) % 0x100
+        return (bytes(range(0x100)) * ((start + count) // 0x100 + 1))[start:start + count]
+
+    def _reserve(self, length):
+        """@brief Reserve _length_ bytes at the end of the queue and return their offset"""
+        offset = self._qulen
+        self._qulen += length
+        if self._qulen > len(self._queue):
+            self._queue.extend(bytes(self._qulen - len(self._queue)))
+        return offset
+
     def _queue_cmd_header(self, cmd, bits, length=0, id=None):
-        """@brief Prepare a header structure in _queue byte array"""
+        """@brief Prepare a header structure in _queue byte array
+
+        @return Offset in the queue of the _length_ bytes reserved after the header.
+        """
         if id is None:
             id = self._next_id()
-        length += self.CMD_HDR_LEN
-        # update packet header, packet is for sure shorter than 64
-        self._qulen += length
-        self._queue.extend((id, cmd))
-        self._queue.extend(bits.to_bytes(4, 'little'))
+        offset = self._reserve(self.CMD_HDR_LEN + length)
+        self.CMD_HEADER.pack_into(self._queue, offset, id, cmd, bits)
+        return offset + self.CMD_HDR_LEN
 
     def _clear_queue(self):
-        # Empty send queue and reset packet header
-        del self._queue[self.PKT_HDR_LEN:]
+        # Empty send queue, the packet header is written when flushing
         self._qulen = self.PKT_HDR_LEN
 
     def start_queue(self):
@@ -334,6 +384,26 @@ class Picoprobe(DebugProbe):
 
     PARITY_BIT = 0x100000000
 
+    # Offsets of the three command ids in an AP/DP operation template
+    OP_ID_OFFSETS = (0, 7, 13)
+
+    # Offset of the 36 bits of data + parity + idle in a write operation template
+    OP_WRITE_DATA_OFFSET = 19
+
+    # Response to a read operation: ACK read header and byte, data read header and 5 bytes
+    READ_OP_RESPONSE_LEN = 18
+    READ_OP_ACK_OFFSET = 6
+    READ_OP_DATA_OFFSET = 13
+
+    # Response to a write operation: ACK read header and byte
+    WRITE_OP_RESPONSE_LEN = 7
+
+    # Parity of each byte value, for computing parity over many values at once
+    BYTE_PARITY = bytes(bin(n).count('1') & 1 for n in range(256))
+
+    # Extracts the parity bit (bit 32) from the fifth byte of a read, dropping the Trn bit
+    PARITY_BIT_OF_BYTE = bytes(n & 1 for n in range(256))
+
     @ classmethod
     def get_all_connected_probes(cls, unique_id=None, is_explicit=False):
         return [cls(dev) for dev in PicoLink.enumerate_picoprobes()]
@@ -351,6 +421,15 @@ class Picoprobe(DebugProbe):
         self._is_open = False
         self._unique_id = self._link.get_unique_id()
         self._reset = False
+        # Encoded commands for an AP/DP operation, keyed by (RnW, APnDP, A[3:2])
+        self._op_templates = {}
+        # Most operations of each kind that fit in the Picoprobe buffers, leaving room for the
+        # final RDBUFF read and idle bits of a bulk read
+        read_len = len(self._get_op_template(self.READ, self.AP, 0))
+        self._max_reads_per_packet = ((PicoLink.BUFFER_SIZE - PicoLink.PKT_HDR_LEN - PicoLink.CMD_HDR_LEN - 1)
+                                      // read_len) - 1
+        write_len = len(self._get_op_template(self.WRITE, self.AP, 0))
+        self._max_writes_per_packet = (PicoLink.BUFFER_SIZE - PicoLink.PKT_HDR_LEN) // write_len
 
     @ property
     def description(self):
@@ -527,41 +606,51 @@ class Picoprobe(DebugProbe):
             self._write_reg(addr, self.AP, v)
 
     def _bulk_read_ap_multiple(self, addr, count=1, now=True):
-        # Start queueing - queue a max of 256 AP reads not to exceed Picoprobe buffers
-        # Theoretical maximum for the Picoprobe internal 8 kB buffer is ~454
-        # Raising the chunk size brings no great benefit, though.
-        reads = []
+        # Each packet holds as many reads as fit in the Picoprobe buffers. All the commands for
+        # a packet are copied from a template, and the responses decoded with slices.
+        template = self._get_op_template(self.READ, self.AP, addr)
+        responses = []
         while count > 0:
-            chunk = 256 if count > 256 else count
+            chunk = min(count, self._max_reads_per_packet)
             count -= chunk
             self._link.start_queue()
 
             # Queue reads for 1 old value plus count - 1 new values
-            for _ in range(chunk):
-                # Queue read command
-                self._swd_command(self.READ, self.AP, addr)
-                # Queue read value + parity + TrN
-                self._link.q_read_bits(32 + 1 + 1)
+            self._link.q_repeat(template, chunk, self.OP_ID_OFFSETS)
 
             if count == 0:
                 # Now queue final read from RDBUFF
-                self._swd_command(self.READ, self.DP, self.RDBUFF)
-                # Queue read value + parity + TrN
-                self._link.q_read_bits(32 + 1 + 1)
+                self._link.q_repeat(self._get_op_template(self.READ, self.DP, self.RDBUFF), 1,
+                                    self.OP_ID_OFFSETS)
                 # Queue write 3 idle bits (enough?)
                 self._link.q_write_bits(0, 3)
 
             # Run and collect all the reads in this chunk
-            reads.extend(self._link.get_bits())
+            responses.append(self._link.get_response())
 
-        # Check all the acks (including the one for discarded read!)
-        self._check_swd_acks(reads[0::2])
+        response = b''.join(responses)
+        stride = self.READ_OP_RESPONSE_LEN
+        n = len(response) // stride
+        if len(response) != n * stride or response[1::stride].count(PicoLink.PROBE_READ_BITS) != n \
+                or response[8::stride].count(PicoLink.PROBE_READ_BITS) != n:
+            raise exceptions.ProbeError('Wrong header received from %s' % self._unique_id)
 
-        # Skip first read and zero parity if no errors
-        results = [(v & 0x1FFFFFFFF) ^ parity32_high(v) for v in reads[3::2]]
-
-        # Parity check
-        if any(v & self.PARITY_BIT for v in results):
+        # Check all the acks (including the one for discarded read!)
+        self._check_swd_acks(response[self.READ_OP_ACK_OFFSET::stride])
+
+        # Skip first read, then gather each byte lane of the data words
+        data_lanes = [response[stride + self.READ_OP_DATA_OFFSET + i::stride] for i in range(5)]
+        words = bytearray(4 * (n - 1))
+        for i in range(4):
+            words[i::4] = data_lanes[i]
+        results = list(struct.unpack('<%dI' % (n - 1), words))
+
+        # Parity check, for all words at once: the parity of all data bytes and the parity bit of a
+        # word XOR'd together must be 0, so any non-zero byte of the combined lanes is an error
+        parity = int.from_bytes(data_lanes[4].translate(self.PARITY_BIT_OF_BYTE), 'little')
+        for lane in data_lanes[:4]:
+            parity ^= int.from_bytes(lane.translate(self.BYTE_PARITY), 'little')
+        if parity:
             raise exceptions.ProbeError('Bad parity in SWD read')
 
         def read_ap_multiple_result_callback():
@@ -570,28 +659,31 @@ class Picoprobe(DebugProbe):
         return results if now else read_ap_multiple_result_callback
 
     def _bulk_write_ap_multiple(self, addr, values):
-        acks = []
+        template = self._get_op_template(self.WRITE, self.AP, addr)
         left = len(values)
         done = 0
-        # Use 256 chunks. Max is about 340.
         while left > 0:
-            chunk = 256 if left > 256 else left
+            chunk = min(left, self._max_writes_per_packet)
             self._link.start_queue()
-            for value in values[done:done+chunk]:
-                # Queue write command
-                self._swd_command(self.WRITE, self.AP, addr)
-                # Prepare the write buffer
-                value |= parity32_high(value)
-                # Send the value: 32 (data) + 1 (parity) bits (no Trn needed)
-                # Insert also 3 bits of idle
-                self._link.q_write_bits(value, 32 + 1 + 3)
+
+            # Fill in the data + parity bytes of each write in the template copies; the idle bits
+            # following the parity bit are already 0
+            words = struct.pack('<%dI' % chunk, *values[done:done + chunk])
+            parity = 0
+            for i in range(4):
+                parity ^= int.from_bytes(words[i::4].translate(self.BYTE_PARITY), 'little')
+            lanes = [(self.OP_WRITE_DATA_OFFSET + i, words[i::4]) for i in range(4)]
+            lanes.append((self.OP_WRITE_DATA_OFFSET + 4, parity.to_bytes(chunk, 'little')))
+            self._link.q_repeat(template, chunk, self.OP_ID_OFFSETS, lanes)
             left -= chunk
             done += chunk
 
             # Now collect all the ACK reads!
-            acks.extend(self._link.get_bits())
-
-        self._check_swd_acks(acks)
+            response = self._link.get_response()
+            stride = self.WRITE_OP_RESPONSE_LEN
+            if len(response) != chunk * stride or response[1::stride].count(PicoLink.PROBE_READ_BITS) != chunk:
+                raise exceptions.ProbeError('Wrong header received from %s' % self._unique_id)
+            self._check_swd_acks(response[self.READ_OP_ACK_OFFSET::stride])
 
     # ------------------------------------------- #
     #          Internal implementation functions
@@ -635,17 +727,43 @@ class Picoprobe(DebugProbe):
         self._link.q_write_bits(value, 32 + 1 + 3)
         self._link.flush_queue()
 
-    def _swd_command(self, RnW, APnDP, addr):
-        """@brief Builds and queues an SWD command byte plus an ACK read"""
+    def _swd_command_byte(self, RnW, APnDP, addr):
+        """@brief Builds an SWD command byte"""
         cmd = (APnDP << 1) + (RnW << 2) + ((addr << 1) & self.SWD_CMD_A32)
         cmd |= parity32_high(cmd) >> (32 - 5)
         cmd |= self.SWD_CMD_START | self.SWD_CMD_STOP | self.SWD_CMD_PARK
+        return cmd
 
+    def _swd_command(self, RnW, APnDP, addr):
+        """@brief Builds and queues an SWD command byte plus an ACK read"""
         # Write the command to the probe
-        self._link.q_write_bits(cmd, 8)
+        self._link.q_write_bits(self._swd_command_byte(RnW, APnDP, addr), 8)
         # Queue also ACK reading, plus TrN if needed
         self._link.q_read_bits(1 + 3 + 1 - RnW)
 
+    def _get_op_template(self, RnW, APnDP, addr):
+        """@brief Returns the encoded commands for a whole AP/DP register read or write
+
+        The template has the same commands as _swd_command() followed by the data read or write
+        of _read_reg() or _write_reg(), without the idle bits after reads. The command ids are 0,
+        and a write has 0 data.
+        """
+        key = (RnW, APnDP, addr & self.A32)
+        template = self._op_templates.get(key)
+        if template is None:
+            header = PicoLink.CMD_HEADER
+            template = (header.pack(0, PicoLink.PROBE_WRITE_BITS, 8)
+                        + bytes((self._swd_command_byte(RnW, APnDP, addr),))
+                        + header.pack(0, PicoLink.PROBE_READ_BITS, 1 + 3 + 1 - RnW))
+            if RnW == self.READ:
+                # Read 32 (data) + 1 (parity) + 1 (Trn) bits
+                template += header.pack(0, PicoLink.PROBE_READ_BITS, 32 + 1 + 1)
+            else:
+                # Write 32 (data) + 1 (parity) + 3 (idle) bits
+                template += header.pack(0, PicoLink.PROBE_WRITE_BITS, 32 + 1 + 3) + bytes(5)
+            self._op_templates[key] = template
+        return template
+
     def _read_check_swd_ack(self):
         # Reads Trn + ACK, plus a following Trn bit if the cmd was a write
         ack = self._link.get_bits()
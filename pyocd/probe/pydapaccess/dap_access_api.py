@@ -349,3 +349,11 @@ class DAPAccessIntf(object):
     def reg_read_repeat(self, num_repeats, reg_id, dap_index=0, now=True):
         """@brief Read one or more words from the same DP or AP register"""
         raise NotImplementedError()
+
+    def reg_write_repeat_bytes(self, reg_id, data, dap_index=0):
+        """@brief Write little-endian words from a bytes-like object to the same DP or AP register"""
+        raise NotImplementedError()
+
+    def reg_read_repeat_bytes(self, num_repeats, reg_id, dap_index=0, now=True):
+        """@brief Read one or more words from the same DP or AP register as a bytearray"""
+        raise NotImplementedError()
@@ -19,6 +19,7 @@
 import re
 import logging
 import collections
+import struct
 import threading
 from typing import (Any, Dict, Optional, Tuple, Union)
 
@@ -38,6 +39,7 @@ from .cmsis_dap_core import (
     CMSISDAPVersion,
     )
 from ...core import session
+from ...utility import conversion
 from ...utility.concurrency import locked
 
 # NoneType was added in Python 3.10, but we need to support back to Python 3.6.
@@ -118,6 +120,9 @@ class _Transfer(object):
         self._size_bytes = 0
         if transfer_request & READ:
             self._size_bytes = transfer_count * 4
+        # Response data is copied directly into this preallocated buffer as packets are decoded.
+        self._buffer = bytearray(self._size_bytes)
+        self._received = 0
         self._result = None
         self._error = None
 
@@ -126,19 +131,28 @@ class _Transfer(object):
         """
         return self._size_bytes
 
+    @property
+    def is_complete(self):
+        """@brief Whether all response data for this transfer has been received."""
+        return self._received == self._size_bytes
+
     def add_response(self, data):
         """@brief Add data read from the remote device to this object.
 
-        The size of data added must match exactly the size
-        that get_data_size returns.
+        The response data for a transfer may be split across several packets, so this method
+        may be called multiple times. The data is copied into the transfer's buffer up to the
+        remaining size returned by get_data_size().
+
+        @param self
+        @param data A bytes-like object (normally a memoryview of the decoded packet).
+        @return The number of bytes consumed from _data_.
         """
-        assert len(data) == self._size_bytes
-        result = []
-        for i in range(0, self._size_bytes, 4):
-            word = ((data[0 + i] << 0) | (data[1 + i] << 8) |
-                    (data[2 + i] << 16) | (data[3 + i] << 24))
-            result.append(word)
-        self._result = result
+        count = min(len(data), self._size_bytes - self._received)
+        self._buffer[self._received:self._received + count] = data[:count]
+        self._received += count
+        if self._received == self._size_bytes:
+            self._result = self._buffer
+        return count
 
     def add_error(self, error):
         """@brief Attach an exception to this transfer rather than data.
@@ -146,10 +160,10 @@ class _Transfer(object):
         assert isinstance(error, Exception)
         self._error = error
 
-    def get_result(self):
-        """@brief Get the result of this transfer.
+    def get_result_bytes(self):
+        """@brief Get the result of this transfer as a bytearray of little-endian words.
         """
-        while self._result is None:
+        while self._result is None and self._error is None:
             if len(self.daplink._commands_to_read) > 0:
                 self.daplink._read_packet()
             else:
@@ -166,6 +180,11 @@ class _Transfer(object):
         assert self._result is not None
         return self._result
 
+    def get_result(self):
+        """@brief Get the result of this transfer as a list of words.
+        """
+        return conversion.bytes_to_u32le_list(self.get_result_bytes())
+
 class _Command(object):
     """@brief Wrapper object representing a command sent to the layer below (ex. USB).
 
@@ -285,6 +304,9 @@ class _Command(object):
 
     def add(self, count, request, data, dap_index):
         """@brief Add a single or block register transfer operation to this command
+
+        For write requests, _data_ must be a bytes-like object containing _count_ little-endian
+        words. It is referenced, not copied, until the command is encoded.
         """
         assert self._data_encoded is False
         if self._dap_index == self._UNSET_DAP_INDEX:
@@ -316,30 +338,20 @@ class _Command(object):
         assert self.get_empty() is False
         buf = bytearray(self._size)
         transfer_count = self._read_count + self._write_count
-        pos = 0
-        buf[pos] = Command.DAP_TRANSFER
-        pos += 1
-        buf[pos] = self._dap_index
-        pos += 1
-        buf[pos] = transfer_count
-        pos += 1
-        for count, request, write_list in self._data:
-            assert write_list is None or len(write_list) <= count
-            write_pos = 0
-            for _ in range(count):
-                buf[pos] = request
-                pos += 1
-                if not request & READ:
-                    buf[pos] = (write_list[write_pos] >> (8 * 0)) & 0xff
-                    pos += 1
-                    buf[pos] = (write_list[write_pos] >> (8 * 1)) & 0xff
-                    pos += 1
-                    buf[pos] = (write_list[write_pos] >> (8 * 2)) & 0xff
-                    pos += 1
-                    buf[pos] = (write_list[write_pos] >> (8 * 3)) & 0xff
-                    pos += 1
-                    write_pos += 1
-        return buf[:pos]
+        struct.pack_into('<BBB', buf, 0, Command.DAP_TRANSFER, self._dap_index, transfer_count)
+        pos = 3
+        for count, request, write_data in self._data:
+            if request & READ:
+                buf[pos:pos + count] = bytes((request,)) * count
+                pos += count
+            else:
+                # Write data is always a bytes-like object; see add().
+                assert len(write_data) == count * 4
+                for offset in range(0, count * 4, 4):
+                    buf[pos] = request
+                    buf[pos + 1:pos + 5] = write_data[offset:offset + 4]
+                    pos += 5
+        return memoryview(buf)[:pos]
 
     def _check_response(self, response):
         """@brief Check the response status byte from CMSIS-DAP transfer commands.
@@ -391,7 +403,7 @@ class _Command(object):
         if data[1] != self._read_count + self._write_count:
             raise DAPAccessIntf.TransferError()
 
-        return data[3:3 + 4 * self._read_count]
+        return memoryview(data)[3:3 + 4 * self._read_count]
 
     def _encode_transfer_block_data(self):
         """@brief Encode this command into a byte array that can be sent
@@ -404,33 +416,17 @@ class _Command(object):
         transfer_count = self._read_count + self._write_count
         assert not (self._read_count != 0 and self._write_count != 0)
         assert self._block_request is not None
-        pos = 0
-        buf[pos] = Command.DAP_TRANSFER_BLOCK
-        pos += 1
-        buf[pos] = self._dap_index
-        pos += 1
-        buf[pos] = transfer_count & 0xff
-        pos += 1
-        buf[pos] = (transfer_count >> 8) & 0xff
-        pos += 1
-        buf[pos] = self._block_request
-        pos += 1
-        for count, request, write_list in self._data:
-            assert write_list is None or len(write_list) <= count
+        struct.pack_into('<BBHB', buf, 0,
+                Command.DAP_TRANSFER_BLOCK, self._dap_index, transfer_count, self._block_request)
+        pos = 5
+        for count, request, write_data in self._data:
             assert request == self._block_request
-            write_pos = 0
             if not request & READ:
-                for _ in range(count):
-                    buf[pos] = (write_list[write_pos] >> (8 * 0)) & 0xff
-                    pos += 1
-                    buf[pos] = (write_list[write_pos] >> (8 * 1)) & 0xff
-                    pos += 1
-                    buf[pos] = (write_list[write_pos] >> (8 * 2)) & 0xff
-                    pos += 1
-                    buf[pos] = (write_list[write_pos] >> (8 * 3)) & 0xff
-                    pos += 1
-                    write_pos += 1
-        return buf[:pos]
+                # Write data is always a bytes-like object; see add().
+                assert len(write_data) == count * 4
+                buf[pos:pos + count * 4] = write_data
+                pos += count * 4
+        return memoryview(buf)[:pos]
 
     def _decode_transfer_block_data(self, data):
         """@brief Take a byte array and extract the data from it
@@ -453,7 +449,7 @@ class _Command(object):
         if transfer_count != self._read_count + self._write_count:
             raise DAPAccessIntf.TransferError()
 
-        return data[4:4 + 4 * self._read_count]
+        return memoryview(data)[4:4 + 4 * self._read_count]
 
     def encode_data(self):
         """@brief Encode this command into a byte array that can be sent
@@ -586,7 +582,6 @@ class DAPAccessCMSISDAP(DAPAccessIntf):
         self._crnt_cmd = _Command(0)
         self._packet_size = None
         self._commands_to_read = collections.deque()
-        self._command_response_buf = bytearray()
         self._swo_status = None
         self._cmsis_dap_version: VersionTuple = CMSISDAPVersion.V1_0_0
         self._fw_version: Optional[str] = None
@@ -1051,7 +1046,7 @@ class DAPAccessCMSISDAP(DAPAccessIntf):
         else:
             request |= AP_ACC
         request |= (reg_id.value % 4) * 4
-        self._write(dap_index, 1, request, [value])
+        self._write(dap_index, 1, request, struct.pack('<I', value))
 
     def read_reg(self, reg_id, dap_index=0, now=True):
         assert reg_id in self.REG
@@ -1068,10 +1063,9 @@ class DAPAccessCMSISDAP(DAPAccessIntf):
         assert transfer is not None
 
         def read_reg_cb():
-            res = transfer.get_result()
-            assert len(res) == 1
-            res = res[0]
-            return res
+            res = transfer.get_result_bytes()
+            assert len(res) == 4
+            return struct.unpack('<I', res)[0]
 
         if now:
             return read_reg_cb()
@@ -1081,8 +1075,17 @@ class DAPAccessCMSISDAP(DAPAccessIntf):
     def reg_write_repeat(self, num_repeats, reg_id, data_array, dap_index=0):
         assert isinstance(num_repeats, int)
         assert num_repeats == len(data_array)
+        self.reg_write_repeat_bytes(reg_id, conversion.u32le_list_to_bytes(data_array), dap_index)
+
+    def reg_write_repeat_bytes(self, reg_id, data, dap_index=0):
         assert reg_id in self.REG
         assert isinstance(dap_index, int)
+        assert (len(data) % 4) == 0
+
+        # Take an immutable copy of the data unless we were passed bytes, since with deferred
+        # transfers the data is referenced until the packet is sent. This is a single memcpy.
+        if not isinstance(data, bytes):
+            data = bytes(data)
 
         request = WRITE
         if reg_id.value < 4:
@@ -1090,10 +1093,22 @@ class DAPAccessCMSISDAP(DAPAccessIntf):
         else:
             request |= AP_ACC
         request |= (reg_id.value % 4) * 4
-        self._write(dap_index, num_repeats, request, data_array)
+        self._write(dap_index, len(data) // 4, request, memoryview(data))
 
     def reg_read_repeat(self, num_repeats, reg_id, dap_index=0,
                         now=True):
+        result = self.reg_read_repeat_bytes(num_repeats, reg_id, dap_index, now=False)
+
+        def reg_read_repeat_cb():
+            return conversion.bytes_to_u32le_list(result())
+
+        if now:
+            return reg_read_repeat_cb()
+        else:
+            return reg_read_repeat_cb
+
+    def reg_read_repeat_bytes(self, num_repeats, reg_id, dap_index=0,
+                        now=True):
         assert isinstance(num_repeats, int)
         assert reg_id in self.REG
         assert isinstance(dap_index, int)
@@ -1108,15 +1123,15 @@ class DAPAccessCMSISDAP(DAPAccessIntf):
         transfer = self._write(dap_index, num_repeats, request, None)
         assert transfer is not None
 
-        def reg_read_repeat_cb():
-            res = transfer.get_result()
-            assert len(res) == num_repeats
+        def reg_read_repeat_bytes_cb():
+            res = transfer.get_result_bytes()
+            assert len(res) == num_repeats * 4
             return res
 
         if now:
-            return reg_read_repeat_cb()
+            return reg_read_repeat_bytes_cb()
         else:
-            return reg_read_repeat_cb
+            return reg_read_repeat_bytes_cb
     # ------------------------------------------- #
     #          Private functions
     # ------------------------------------------- #
@@ -1136,9 +1151,6 @@ class DAPAccessCMSISDAP(DAPAccessIntf):
         self._crnt_cmd = _Command(self._packet_size)
         # Packets that have been sent but not read
         self._commands_to_read.clear()
-        # Buffer for data returned for completed commands.
-        # This data will be added to transfers
-        self._command_response_buf = bytearray()
 
     @locked
     def _read_packet(self):
@@ -1160,30 +1172,18 @@ class DAPAccessCMSISDAP(DAPAccessIntf):
             self._abort_all_transfers(exception)
             raise
 
-        decoded_data = bytearray(decoded_data)
-        self._command_response_buf.extend(decoded_data)
-
-        # Attach data to transfers
+        # Attach data to transfers. The decoded data is a memoryview of the raw packet, so it is
+        # copied exactly once, into each transfer's preallocated buffer. A transfer's data may
+        # span multiple packets.
         pos = 0
-        while True:
-            size_left = len(self._command_response_buf) - pos
-            if size_left == 0:
-                # If size left is 0 then the transfer list might
-                # be empty, so don't try to access element 0
-                break
+        size_left = len(decoded_data)
+        while size_left > 0:
             transfer = self._transfer_list[0]
-            size = transfer.get_data_size()
-            if size > size_left:
-                break
-
-            self._transfer_list.popleft()
-            data = self._command_response_buf[pos:pos + size]
-            pos += size
-            transfer.add_response(data)
-
-        # Remove used data from _command_response_buf
-        if pos > 0:
-            self._command_response_buf = self._command_response_buf[pos:]
+            count = transfer.add_response(decoded_data[pos:])
+            pos += count
+            size_left -= count
+            if transfer.is_complete:
+                self._transfer_list.popleft()
 
     @locked
     def _send_packet(self):
@@ -1206,7 +1206,7 @@ class DAPAccessCMSISDAP(DAPAccessIntf):
         TRACE.debug("[cmd:%d] _send_packet: sending", cmd.uid)
         data = cmd.encode_data()
         try:
-            self._interface.write(list(data))
+            self._interface.write(data)
         except Exception as exception:
             self._abort_all_transfers(exception)
             raise
@@ -1217,6 +1217,13 @@ class DAPAccessCMSISDAP(DAPAccessIntf):
     def _write(self, dap_index, transfer_count,
                transfer_request, transfer_data):
         """@brief Write one or more commands
+
+        @param self
+        @param dap_index DAP index; must be 0.
+        @param transfer_count Number of transfers.
+        @param transfer_request Transfer request byte.
+        @param transfer_data None for reads. For writes, a bytes-like object containing
+            _transfer_count_ little-endian words.
         """
         assert dap_index == 0  # dap index currently unsupported
         assert isinstance(transfer_count, int)
@@ -1245,11 +1252,11 @@ class DAPAccessCMSISDAP(DAPAccessIntf):
                 cmd = self._crnt_cmd
                 continue
 
-            # Add request to packet.
+            # Add request to packet. Write data is a memoryview, so slicing doesn't copy.
             if transfer_data is None:
                 data = None
             else:
-                data = transfer_data[trans_data_pos:trans_data_pos + size]
+                data = transfer_data[trans_data_pos * 4:(trans_data_pos + size) * 4]
             cmd.add(size, transfer_request, data, dap_index)
             size_to_transfer -= size
             trans_data_pos += size
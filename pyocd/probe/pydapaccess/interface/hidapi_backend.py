@@ -155,7 +155,8 @@ class HidApiUSB(Interface):
         """@brief Write data on the OUT endpoint associated to the HID interface"""
         if TRACE.isEnabledFor(logging.DEBUG):
             TRACE.debug("  USB OUT> (%d) %s", len(data), ' '.join([f'{i:02x}' for i in data]))
-        data.extend([0] * (self.packet_size - len(data)))
+        # Any bytes-like object or list of byte values is accepted, and is not modified.
+        data = list(data) + [0] * (self.packet_size - len(data))
         if not _IS_WINDOWS:
             self.read_sem.release()
         self.device.write([0] + data)
@@ -19,6 +19,7 @@
 # limitations under the License.
 
 import logging
+import queue
 import threading
 import platform
 import errno
@@ -32,7 +33,6 @@ from .common import (
     generate_device_unique_id,
     )
 from ..dap_access_api import DAPAccessIntf
-from ....utility.timeout import Timeout
 
 LOG = logging.getLogger(__name__)
 TRACE = LOG.getChild("trace")
@@ -69,7 +69,7 @@ class PyUSB(Interface):
         self.kernel_driver_was_attached = False
         self.closed = True
         self.thread = None
-        self.rcv_data = []
+        self.rcv_data: queue.SimpleQueue = queue.SimpleQueue()
         self.read_sem = threading.Semaphore(0)
 
     def open(self):
@@ -155,10 +155,10 @@ class PyUSB(Interface):
                         # Strip off trailing zero bytes to reduce clutter.
                         TRACE.debug("  USB IN < (%d) %s", len(read_data), ' '.join([f'{i:02x}' for i in bytes(read_data).rstrip(b'\x00')]))
 
-                    self.rcv_data.append(read_data)
+                    self.rcv_data.put(read_data)
         finally:
-            # Set last element of rcv_data to None on exit
-            self.rcv_data.append(None)
+            # Queue None to tell the reader that the thread has exited.
+            self.rcv_data.put(None)
 
     @staticmethod
     def get_all_connected_interfaces():
@@ -194,8 +194,10 @@ class PyUSB(Interface):
         if TRACE.isEnabledFor(logging.DEBUG):
             TRACE.debug("  USB OUT> (%d) %s", len(data), ' '.join([f'{i:02x}' for i in data]))
 
-        for _ in range(report_size - len(data)):
-            data.append(0)
+        # Any bytes-like object or list of byte values is accepted, and is not modified.
+        data = bytes(data)
+        if len(data) < report_size:
+            data += bytes(report_size - len(data))
 
         self.read_sem.release()
 
@@ -212,25 +214,25 @@ class PyUSB(Interface):
 
     def read(self):
         """@brief Read data on the IN endpoint associated to the HID interface"""
-        # Spin for a while if there's not data available yet. 100 µs sleep between checks.
-        with Timeout(self.DEFAULT_USB_TIMEOUT_S, sleeptime=0.0001) as t_o:
-            while t_o.check():
-                if len(self.rcv_data) != 0:
-                    break
-            else:
-                raise DAPAccessIntf.DeviceError(f"Timeout reading from device {self.serial_number}")
+        # Wait for the RX thread to queue a packet. The wait ends as soon as a packet is queued.
+        try:
+            data = self.rcv_data.get(timeout=self.DEFAULT_USB_TIMEOUT_S)
+        except queue.Empty:
+            raise DAPAccessIntf.DeviceError(f"Timeout reading from device {self.serial_number}") from None
 
-        if self.rcv_data[0] is None:
+        if data is None:
+            # Requeue the exit marker so later reads also fail immediately.
+            self.rcv_data.put(None)
             raise DAPAccessIntf.DeviceError("Device %s read thread exited" %
                                             self.serial_number)
 
         # Trace when the higher layer actually gets a packet previously read.
         if TRACE.isEnabledFor(logging.DEBUG):
             # Strip off trailing zero bytes to reduce clutter.
-            TRACE.debug("  USB RD < (%d) %s", len(self.rcv_data[0]),
-                    ' '.join([f'{i:02x}' for i in bytes(self.rcv_data[0]).rstrip(b'\x00')]))
+            TRACE.debug("  USB RD < (%d) %s", len(data),
+                    ' '.join([f'{i:02x}' for i in bytes(data).rstrip(b'\x00')]))
 
-        return self.rcv_data.pop(0)
+        return data
 
     def close(self):
         """@brief Close the interface"""
@@ -240,8 +242,7 @@ class PyUSB(Interface):
         self.closed = True
         self.read_sem.release()
         self.thread.join()
-        assert self.rcv_data[-1] is None
-        self.rcv_data = []
+        self.rcv_data = queue.SimpleQueue()
         usb.util.release_interface(self.dev, self.intf_number)
         if self.kernel_driver_was_attached:
             try:
@@ -17,6 +17,7 @@
 # limitations under the License.
 
 import logging
+import queue
 import threading
 import errno
 import platform
@@ -31,7 +32,6 @@ from .common import (
     )
 from ..dap_access_api import DAPAccessIntf
 from ... import common
-from ....utility.timeout import Timeout
 
 LOG = logging.getLogger(__name__)
 TRACE = LOG.getChild("trace")
@@ -70,7 +70,7 @@ class PyUSBv2(Interface):
         self.rx_stop_event = None
         self.swo_thread = None
         self.swo_stop_event = None
-        self.rcv_data = []
+        self.rcv_data: queue.SimpleQueue = queue.SimpleQueue()
         self.swo_data = []
         self.read_sem = threading.Semaphore(0)
         self.packet_size = 512
@@ -171,10 +171,10 @@ class PyUSBv2(Interface):
                     if TRACE.isEnabledFor(logging.DEBUG):
                         TRACE.debug("  USB IN < (%d) %s", len(read_data), ' '.join([f'{i:02x}' for i in read_data]))
 
-                    self.rcv_data.append(read_data)
+                    self.rcv_data.put(read_data)
         finally:
-            # Set last element of rcv_data to None on exit
-            self.rcv_data.append(None)
+            # Queue None to tell the reader that the thread has exited.
+            self.rcv_data.put(None)
 
     def swo_rx_task(self):
         try:
@@ -209,9 +209,10 @@ class PyUSBv2(Interface):
     def write(self, data):
         """@brief Write data on the OUT endpoint."""
 
+        # Any bytes-like object or list of byte values is accepted, and is not modified.
         if self.ep_out:
             if (len(data) > 0) and (len(data) < self.packet_size) and (len(data) % self.ep_out.wMaxPacketSize == 0):
-                data.append(0)
+                data = bytes(data) + b'\x00'
 
         if TRACE.isEnabledFor(logging.DEBUG):
             TRACE.debug("  USB OUT> (%d) %s", len(data), ' '.join([f'{i:02x}' for i in data]))
@@ -222,22 +223,22 @@ class PyUSBv2(Interface):
 
     def read(self):
         """@brief Read data on the IN endpoint."""
-        # Spin for a while if there's not data available yet. 100 µs sleep between checks.
-        with Timeout(self.DEFAULT_USB_TIMEOUT_S, sleeptime=0.0001) as t_o:
-            while t_o.check():
-                if len(self.rcv_data) != 0:
-                    break
-            else:
-                raise DAPAccessIntf.DeviceError(f"Timeout reading from device {self.serial_number}")
-
-        if self.rcv_data[0] is None:
+        # Wait for the RX thread to queue a packet. The wait ends as soon as a packet is queued.
+        try:
+            data = self.rcv_data.get(timeout=self.DEFAULT_USB_TIMEOUT_S)
+        except queue.Empty:
+            raise DAPAccessIntf.DeviceError(f"Timeout reading from device {self.serial_number}") from None
+
+        if data is None:
+            # Requeue the exit marker so later reads also fail immediately.
+            self.rcv_data.put(None)
             raise DAPAccessIntf.DeviceError("Device %s read thread exited unexpectedly" % self.serial_number)
 
         # Trace when the higher layer actually gets a packet previously read.
         if TRACE.isEnabledFor(logging.DEBUG):
-            TRACE.debug("  USB RD < (%d) %s", len(self.rcv_data[0]), ' '.join([f'{i:02x}' for i in self.rcv_data[0]]))
+            TRACE.debug("  USB RD < (%d) %s", len(data), ' '.join([f'{i:02x}' for i in data]))
 
-        return self.rcv_data.pop(0)
+        return data
 
     def read_swo(self):
         # Accumulate all available SWO data.
@@ -259,8 +260,7 @@ class PyUSBv2(Interface):
         self.rx_stop_event.set()
         self.read_sem.release()
         self.thread.join()
-        assert self.rcv_data[-1] is None
-        self.rcv_data = []
+        self.rcv_data = queue.SimpleQueue()
         self.swo_data = []
         usb.util.release_interface(self.dev, self.intf_number)
         usb.util.dispose_resources(self.dev)
@@ -147,7 +147,8 @@ class PyWinUSB(Interface):
         if TRACE.isEnabledFor(logging.DEBUG):
             TRACE.debug("  USB OUT> (%d) %s", len(data), ' '.join([f'{i:02x}' for i in data]))
 
-        data.extend([0] * (self.packet_size - len(data)))
+        # Any bytes-like object or list of byte values is accepted, and is not modified.
+        data = list(data) + [0] * (self.packet_size - len(data))
         self.report.send([0] + data)
 
     def read(self):
@@ -19,7 +19,7 @@ import logging
 import struct
 import threading
 from enum import Enum
-from typing import (List, Optional, Sequence, Tuple, Union)
+from typing import (Optional, Sequence, Tuple, Union)
 import usb.core
 
 from .constants import (Commands, Status, SWD_FREQ_MAP, JTAG_FREQ_MAP)
@@ -71,6 +71,12 @@ class STLink(object):
     ## Port number to use to indicate DP registers.
     DP_PORT = 0xffff
 
+    ## Layout of memory read and write commands, padded to the command packet size.
+    _MEM_COMMAND = struct.Struct('<BBIHBBBB4x')
+
+    ## Command to get the status of the last memory transfer.
+    _GET_RW_STATUS_COMMAND = bytes([Commands.JTAG_COMMAND, Commands.JTAG_GETLASTRWSTATUS2]).ljust(16, b'\x00')
+
     ## Map to convert from STLink error response codes to exception classes.
     _ERROR_CLASSES = {
         # AP protocol errors
@@ -108,6 +114,7 @@ class STLink(object):
         self._target_voltage = 0
         self._protocol = None
         self._lock = threading.RLock()
+        self._rw_status_interval = 0
 
     def open(self):
         with self._lock:
@@ -385,88 +392,120 @@ class STLink(object):
             # Secure,Priv,Noncacheable,Nonbufferable,Data?
             return 0, 0, 0
 
-    def _read_mem(self, addr: int, size: int, memcmd: int, maxrx: int, apsel: int, csw: int) -> List[int]:
+    def set_rw_status_interval(self, interval: int) -> None:
+        """@brief Set how often the status of memory transfers is checked.
+
+        @param interval Number of memory transfer commands issued between checks of the transfer
+            status. If 0, the status is only checked once at the end of each transfer.
+        """
+        self._rw_status_interval = max(0, interval)
+
+    def _make_mem_command(self, memcmd: int, addr: int, size: int, apsel: int,
+            csw_bytes: Tuple[int, int, int]) -> bytes:
+        # Read/Write Memory {8,16,32} command bytes
+        #   0:      JTAG_COMMAND
+        #   1:      JTAG_{READ,WRITE}MEM_{8,16,32}BIT
+        #   2-5:    address
+        #   6-7:    length in bytes <= 6144 (except 8-bit must <= USB packet size)
+        #   8:      APSEL
+        #   9-11:   CSW[31:8]
+        #   12-15:  TCP unique ID (not used by pyocd)
+        return self._MEM_COMMAND.pack(Commands.JTAG_COMMAND, memcmd, addr, size, apsel, *csw_bytes)
+
+    def _check_rw_status(self, op: str, addr: int, size: int, is_single_command: bool) -> bool:
+        """@brief Check the status of the memory transfer commands issued since the last check.
+
+        @param op Either "read" or "write", for the exception message.
+        @param addr Start address of the transfers covered by this check.
+        @param size Number of bytes transferred since the last check.
+        @param is_single_command Whether only a single command was issued since the last check.
+        @retval True The transfers succeeded.
+        @retval False One of several commands had a memory fault. Sticky errors have been cleared
+            and the caller must repeat the commands one at a time to find the fault address.
+        @exception TransferFaultError A single command had a memory fault.
+        """
+        response = self._device.transfer(self._GET_RW_STATUS_COMMAND, readSize=12)
+        status, _, fault_addr = struct.unpack('<HHI', response[0:8])
+
+        if status == Status.JTAG_OK:
+            return True
+
+        # Handle transfer faults specially so we can assign the address info.
+        error_message = Status.get_error_message(status)
+        if status in self._MEM_FAULT_ERRORS:
+            # Clear sticky errors.
+            self._clear_sticky_error()
+
+            if not is_single_command:
+                return False
+
+            exc = exceptions.TransferFaultError(op)
+            exc.fault_address = fault_addr
+            exc.fault_length = (addr + size) - fault_addr
+            raise exc
+        elif status in self._ERROR_CLASSES:
+            raise self._ERROR_CLASSES[status](error_message)
+        else:
+            raise exceptions.ProbeError(error_message)
+
+    def _get_status_window_size(self, max_command_size: int) -> Optional[int]:
+        """@brief Number of bytes to transfer between status checks, or None for only at the end."""
+        return (max_command_size * self._rw_status_interval) if self._rw_status_interval else None
+
+    def _read_mem(self, addr: int, size: int, memcmd: int, maxrx: int, apsel: int, csw: int) -> bytearray:
         with self._lock:
-            result = []
+            csw_bytes = self._get_csw_bytes(csw)
+            window_size = self._get_status_window_size(maxrx) or size
+            result = bytearray()
             while size:
-                thisTransferSize = min(size, maxrx)
-
-                # Read Memory {8,16,32} command bytes
-                #   0:      JTAG_COMMAND
-                #   1:      JTAG_READMEM_{8,16,32}BIT
-                #   2-5:    address
-                #   6-7:    length in bytes <= 6144 (except 8-bit must <= USB packet size)
-                #   8:      APSEL
-                #   9-11:   CSW[31:8]
-                #   12-15:  TCP unique ID (not used by pyocd)
-                cmd = [Commands.JTAG_COMMAND, memcmd]
-                cmd.extend(struct.pack('<IHBBBB', addr, thisTransferSize, apsel, *self._get_csw_bytes(csw)))
-                result += self._device.transfer(cmd, readSize=thisTransferSize)
-
-                addr += thisTransferSize
-                size -= thisTransferSize
-
-                # Check status of this read.
-                response = self._device.transfer([Commands.JTAG_COMMAND, Commands.JTAG_GETLASTRWSTATUS2], readSize=12)
-                status, _, faultAddr = struct.unpack('<HHI', response[0:8])
-
-                # Handle transfer faults specially so we can assign the address info.
-                if status != Status.JTAG_OK:
-                    error_message = Status.get_error_message(status)
-                    if status in self._MEM_FAULT_ERRORS:
-                        # Clear sticky errors.
-                        self._clear_sticky_error()
-
-                        exc = exceptions.TransferFaultError("read")
-                        exc.fault_address = faultAddr
-                        exc.fault_length = thisTransferSize - (faultAddr - addr)
-                        raise exc
-                    elif status in self._ERROR_CLASSES:
-                        raise self._ERROR_CLASSES[status](error_message)
-                    elif status != Status.JTAG_OK:
-                        raise exceptions.ProbeError(error_message)
+                this_window_size = min(size, window_size)
+                result += self._read_mem_window(addr, this_window_size, memcmd, maxrx, apsel, csw_bytes)
+                addr += this_window_size
+                size -= this_window_size
             return result
 
+    def _read_mem_window(self, addr: int, size: int, memcmd: int, maxrx: int, apsel: int,
+            csw_bytes: Tuple[int, int, int]) -> bytearray:
+        """@brief Read a range of memory with one or more commands and a single status check."""
+        result = bytearray()
+        offset = 0
+        while offset < size:
+            this_transfer_size = min(size - offset, maxrx)
+            cmd = self._make_mem_command(memcmd, addr + offset, this_transfer_size, apsel, csw_bytes)
+            result += self._device.transfer(cmd, readSize=this_transfer_size)
+            offset += this_transfer_size
+
+        if not self._check_rw_status("read", addr, size, is_single_command=(size <= maxrx)):
+            # Repeat the reads one command at a time to locate the fault.
+            result = bytearray()
+            for chunk_addr in range(addr, addr + size, maxrx):
+                result += self._read_mem_window(chunk_addr, min(maxrx, addr + size - chunk_addr),
+                        memcmd, maxrx, apsel, csw_bytes)
+        return result
+
     def _write_mem(self, addr: int, data: Sequence[int], memcmd: int, maxtx: int, apsel: int, csw: int) -> None:
         with self._lock:
-            while len(data):
-                thisTransferSize = min(len(data), maxtx)
-                thisTransferData = data[:thisTransferSize]
-
-                # Write Memory {8,16,32} command bytes
-                #   0:      JTAG_COMMAND
-                #   1:      JTAG_WRITEMEM_{8,16,32}BIT
-                #   2-5:    address
-                #   6-7:    length in bytes <= 6144 (except 8-bit must <= USB packet size)
-                #   8:      APSEL
-                #   9-11:   CSW[31:8]
-                #   12-15:  TCP unique ID (not used by pyocd)
-                cmd = [Commands.JTAG_COMMAND, memcmd]
-                cmd.extend(struct.pack('<IHBBBB', addr, thisTransferSize, apsel, *self._get_csw_bytes(csw)))
-                self._device.transfer(cmd, writeData=thisTransferData)
-
-                addr += thisTransferSize
-                data = data[thisTransferSize:]
-
-                # Check status of this write.
-                response = self._device.transfer([Commands.JTAG_COMMAND, Commands.JTAG_GETLASTRWSTATUS2], readSize=12)
-                status, _, faultAddr = struct.unpack('<HHI', response[0:8])
-
-                # Handle transfer faults specially so we can assign the address info.
-                if status != Status.JTAG_OK:
-                    error_message = Status.get_error_message(status)
-                    if status in self._MEM_FAULT_ERRORS:
-                        # Clear sticky errors.
-                        self._clear_sticky_error()
-
-                        exc = exceptions.TransferFaultError("write")
-                        exc.fault_address = faultAddr
-                        exc.fault_length = thisTransferSize - (faultAddr - addr)
-                        raise exc
-                    elif status in self._ERROR_CLASSES:
-                        raise self._ERROR_CLASSES[status](error_message)
-                    elif status != Status.JTAG_OK:
-                        raise exceptions.ProbeError(error_message)
+            csw_bytes = self._get_csw_bytes(csw)
+            data = bytes(data)
+            window_size = self._get_status_window_size(maxtx) or len(data)
+            for offset in range(0, len(data), window_size):
+                self._write_mem_window(addr + offset, data[offset:offset + window_size], memcmd, maxtx,
+                        apsel, csw_bytes)
+
+    def _write_mem_window(self, addr: int, data: bytes, memcmd: int, maxtx: int, apsel: int,
+            csw_bytes: Tuple[int, int, int]) -> None:
+        """@brief Write a range of memory with one or more commands and a single status check."""
+        size = len(data)
+        for offset in range(0, size, maxtx):
+            this_transfer_data = data[offset:offset + maxtx]
+            cmd = self._make_mem_command(memcmd, addr + offset, len(this_transfer_data), apsel, csw_bytes)
+            self._device.transfer(cmd, writeData=this_transfer_data)
+
+        if not self._check_rw_status("write", addr, size, is_single_command=(size <= maxtx)):
+            # Repeat the writes one command at a time to locate the fault.
+            for offset in range(0, size, maxtx):
+                self._write_mem_window(addr + offset, data[offset:offset + maxtx], memcmd, maxtx, apsel,
+                        csw_bytes)
 
     def read_mem32(self, addr: int, size: int, apsel: int, csw: int):
         assert (addr & 0x3) == 0 and (size & 0x3) == 0, "address and size must be word aligned"
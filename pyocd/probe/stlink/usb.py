@@ -224,16 +224,21 @@ class STLinkUSBInterface:
 
         # Minimum read size is the maximum packet size.
         read_size = max(size, self._max_packet_size)
-        data = self._ep_in.read(read_size, timeout)
-        return bytearray(data)[:size]
+        data = bytearray(self._ep_in.read(read_size, timeout))
+        if len(data) > size:
+            del data[size:]
+        return data
 
     def transfer(self, cmd, writeData=None, readSize=None, timeout=1000):
         assert self._ep_out
 
-        # Pad command to required 16 bytes.
+        # Pad command to required 16 bytes. Callers issuing many commands can pass them pre-padded.
         assert len(cmd) <= self.CMD_SIZE
-        paddedCmd = bytearray(self.CMD_SIZE)
-        paddedCmd[0:len(cmd)] = cmd
+        if len(cmd) == self.CMD_SIZE:
+            paddedCmd = cmd
+        else:
+            paddedCmd = bytearray(self.CMD_SIZE)
+            paddedCmd[0:len(cmd)] = cmd
 
         try:
             # Command phase.
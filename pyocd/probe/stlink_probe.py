@@ -162,6 +162,8 @@ class StlinkProbe(DebugProbe):
             prescaler = self.session.options.get_default('stlink.v3_prescaler')
         self._link.set_prescaler(prescaler)
 
+        self._link.set_rw_status_interval(self.session.options.get('stlink.rw_status_interval'))
+
         # Update capabilities.
         self._caps = {
                 self.Capability.SWO,
@@ -287,9 +289,9 @@ class STLinkMemoryInterface(MemoryInterface):
         addr &= 0xffffffff
         csw = attrs.get('csw', 0)
         if transfer_size == 32:
-            self._link.write_mem32(addr, conversion.u32le_list_to_byte_list([data]), self._apsel, csw)
+            self._link.write_mem32(addr, data.to_bytes(4, 'little'), self._apsel, csw)
         elif transfer_size == 16:
-            self._link.write_mem16(addr, conversion.u16le_list_to_byte_list([data]), self._apsel, csw)
+            self._link.write_mem16(addr, data.to_bytes(2, 'little'), self._apsel, csw)
         elif transfer_size == 8:
             self._link.write_mem8(addr, [data], self._apsel, csw)
 
@@ -303,9 +305,9 @@ class STLinkMemoryInterface(MemoryInterface):
         addr &= 0xffffffff
         csw = attrs.get('csw', 0)
         if transfer_size == 32:
-            result = conversion.byte_list_to_u32le_list(self._link.read_mem32(addr, 4, self._apsel, csw))[0]
+            result = int.from_bytes(self._link.read_mem32(addr, 4, self._apsel, csw), 'little')
         elif transfer_size == 16:
-            result = conversion.byte_list_to_u16le_list(self._link.read_mem16(addr, 2, self._apsel, csw))[0]
+            result = int.from_bytes(self._link.read_mem16(addr, 2, self._apsel, csw), 'little')
         elif transfer_size == 8:
             result = self._link.read_mem8(addr, 1, self._apsel, csw)[0]
 
@@ -316,17 +318,23 @@ class STLinkMemoryInterface(MemoryInterface):
     def write_memory_block32(self, addr: int, data: Sequence[int], **attrs: Any) -> None:
         addr &= 0xffffffff
         csw = attrs.get('csw', 0)
-        self._link.write_mem32(addr, conversion.u32le_list_to_byte_list(data), self._apsel, csw)
+        self._link.write_mem32(addr, conversion.u32le_list_to_bytes(data), self._apsel, csw)
 
     def read_memory_block32(self, addr: int, size: int, **attrs: Any) -> Sequence[int]:
         addr &= 0xffffffff
         csw = attrs.get('csw', 0)
-        return conversion.byte_list_to_u32le_list(self._link.read_mem32(addr, size * 4, self._apsel, csw))
+        return conversion.bytes_to_u32le_list(self._link.read_mem32(addr, size * 4, self._apsel, csw))
 
     def read_memory_block8(self, addr: int, size: int, **attrs: Any) -> Sequence[int]:
+        return list(self.read_memory_block_bytes(addr, size, **attrs))
+
+    def write_memory_block8(self, addr: int, data: Sequence[int], **attrs: Any) -> None:
+        self.write_memory_block_bytes(addr, bytes(data), **attrs)
+
+    def read_memory_block_bytes(self, addr: int, size: int, **attrs: Any) -> bytearray:
         addr &= 0xffffffff
         csw = attrs.get('csw', 0)
-        res = []
+        res = bytearray()
 
         # Transfers are handled in 3 phases:
         #   1. read 8-bit chunks until the first aligned address is reached,
@@ -355,7 +363,7 @@ class STLinkMemoryInterface(MemoryInterface):
 
         return res
 
-    def write_memory_block8(self, addr: int, data: Sequence[int], **attrs: Any) -> None:
+    def write_memory_block_bytes(self, addr: int, data: Union[bytes, bytearray, memoryview], **attrs: Any) -> None:
         addr &= 0xffffffff
         csw = attrs.get('csw', 0)
         size = len(data)
@@ -404,5 +412,10 @@ class StlinkProbePlugin(Plugin):
         return [
             OptionInfo('stlink.v3_prescaler', int, 1,
                     "Sets the HCLK prescaler of an STLinkV3, changing performance versus power tradeoff. "
-                    "The value must be one of 1=high performance (default), 2=normal, or 4=low power.")
+                    "The value must be one of 1=high performance (default), 2=normal, or 4=low power."),
+            OptionInfo('stlink.rw_status_interval', int, 0,
+                    "Number of memory transfer commands sent to an STLink between checks of the transfer status. "
+                    "If 0 (the default), the status is checked once at the end of each memory transfer. A memory "
+                    "fault causes the affected commands to be repeated with a status check after each, to find "
+                    "the fault address."),
         ]
@@ -17,13 +17,16 @@
 
 import logging
 import json
+import struct
 import threading
-from typing import (Any, Optional, Tuple)
+from collections import deque
+from typing import (Any, Callable, Deque, Optional, Tuple, Union)
 
 from .debug_probe import DebugProbe
 from ..core import exceptions
 from ..core.memory_interface import MemoryInterface
 from ..core.plugin import Plugin
+from ..utility import conversion
 from ..utility.sockets import ClientSocket
 
 LOG = logging.getLogger(__name__)
@@ -31,10 +34,34 @@ LOG = logging.getLogger(__name__)
 TRACE = LOG.getChild("trace")
 TRACE.setLevel(logging.CRITICAL)
 
+## Frame prefix for protocol version 2: JSON header length and binary payload length.
+FRAME_PREFIX = struct.Struct("<II")
+
+class _PendingResponse:
+    """@brief Response to a pipelined protocol v2 request.
+
+    Only the outstanding request queue and the caller waiting for the result hold a reference, so
+    the response of a deferred read whose callback is never called is simply discarded.
+    """
+
+    __slots__ = ('rid', 'request', 'is_posted', 'is_done', 'result', 'exc')
+
+    def __init__(self, rid: int, request: str, is_posted: bool) -> None:
+        self.rid = rid
+        self.request = request
+        self.is_posted = is_posted
+        self.is_done = False
+        self.result: Any = None
+        self.exc: Optional[BaseException] = None
+
 class TCPClientProbe(DebugProbe):
     """@brief Probe class that connects to a debug probe server.
 
-    The protocol is a one-line JSON request and response form.
+    Protocol version 1 is a one-line JSON request and response form. Version 2, negotiated with the
+    `hello` request, sends the same JSON structures as length-prefixed frames with an optional binary
+    payload. Block data is sent as raw payload bytes. With version 2, requests whose results aren't
+    needed immediately, writes and deferred reads, are pipelined; the client doesn't wait for their
+    responses until a result is required or the probe is flushed.
 
     Request structure:
 
@@ -60,7 +87,14 @@ class TCPClientProbe(DebugProbe):
 
     DEFAULT_PORT = 5555
 
-    PROTOCOL_VERSION = 1
+    ## Preferred protocol version. Version 1 is used if the server doesn't support it.
+    PROTOCOL_VERSION = 2
+
+    ## Maximum number of pipelined requests awaiting a response before responses are read.
+    MAX_OUTSTANDING_REQUESTS = 256
+
+    ## Size of buffered request data at which the buffer is sent without waiting for a sync point.
+    SEND_BUFFER_THRESHOLD = 64 * 1024
 
     class StatusCode:
         """@brief Constants for errors reported from the server."""
@@ -111,6 +145,13 @@ class TCPClientProbe(DebugProbe):
         self._request_id = 0
         self._lock_count = 0
         self._lock_count_lock = threading.RLock()
+        self._protocol_version = 1
+        self._send_buffer = bytearray()
+        ## Requests sent with protocol v2 whose responses haven't been read, in order.
+        self._outstanding: Deque[_PendingResponse] = deque()
+        ## Errors from posted requests that haven't been raised yet, as (request ID, exception) tuples
+        # in request order.
+        self._posted_errors: Deque[Tuple[int, BaseException]] = deque()
 
     @property
     def vendor_name(self):
@@ -147,7 +188,118 @@ class TCPClientProbe(DebugProbe):
         self._request_id += 1
         return rid
 
-    def _perform_request_without_raise(self, request: str, *args: Any) -> Tuple[Any, Optional[BaseException]]:
+    @property
+    def protocol_version(self) -> int:
+        """@brief Version of the remote probe protocol negotiated with the server."""
+        return self._protocol_version
+
+    def _make_request(self, request: str, args: Tuple[Any, ...]) -> Tuple[int, bytes]:
+        rq = {
+                "id": self.request_id,
+                "request": request,
+            }
+        if len(args):
+            rq["arguments"] = args
+        formatted_request = json.dumps(rq)
+        TRACE.debug("Request: %s", formatted_request)
+        return rq["id"], formatted_request.encode('utf-8')
+
+    def _decode_response(self, request: str, decoded_response: Any) -> Tuple[Any, Optional[BaseException]]:
+        """@brief Check a decoded response and extract the result and an optional exception."""
+        TRACE.debug("decoded_response = %s", decoded_response)
+
+        # Check for required keys.
+        if ('id' not in decoded_response) or ('status' not in decoded_response):
+            raise exceptions.ProbeError("malformed response from server; missing required field")
+
+        # Check response status.
+        exc = None
+        status = decoded_response['status']
+        if status != 0:
+            # Get the error message.
+            error = decoded_response.get('error', "(missing error message key)")
+            LOG.debug("error received from server for command %s (status code %i): %s",
+                    request, status, error)
+
+            # Create an appropriate local exception based on the status code.
+            exc = self.STATUS_CODE_CLASS_MAP.get(status, exceptions.ProbeError)(
+                    "error received from server for command %s (status code %i): %s"
+                    % (request, status, error))
+
+        # Get response value. If not present then there was no return value from the command
+        result = decoded_response.get('result', None)
+
+        return result, exc
+
+    def _send_request(self, request: str, args: Tuple[Any, ...], payload: Optional[bytes] = None,
+            is_posted: bool = False) -> _PendingResponse:
+        """@brief Queue a protocol v2 request frame without waiting for its response.
+
+        @return The request's pending response.
+        """
+        rid, header = self._make_request(request, args)
+        self._send_buffer += FRAME_PREFIX.pack(len(header), len(payload) if payload else 0)
+        self._send_buffer += header
+        if payload:
+            self._send_buffer += payload
+        pending = _PendingResponse(rid, request, is_posted)
+        self._outstanding.append(pending)
+
+        if len(self._send_buffer) >= self.SEND_BUFFER_THRESHOLD:
+            self._flush_send_buffer()
+        # Keep the server from blocking on a full socket buffer by reading responses we've fallen behind on.
+        while len(self._outstanding) > self.MAX_OUTSTANDING_REQUESTS:
+            self._read_response()
+        return pending
+
+    def _flush_send_buffer(self) -> None:
+        if self._send_buffer:
+            self._socket.write(self._send_buffer)
+            self._send_buffer = bytearray()
+
+    def _read_response(self) -> None:
+        """@brief Read the protocol v2 response frame for the oldest outstanding request."""
+        self._flush_send_buffer()
+        header_length, payload_length = FRAME_PREFIX.unpack(self._socket.read_exact(FRAME_PREFIX.size))
+        header = self._socket.read_exact(header_length)
+        payload = self._socket.read_exact(payload_length) if payload_length else None
+
+        pending = self._outstanding.popleft()
+        decoded_response = json.loads(header)
+        if decoded_response.get('id') != pending.rid:
+            raise exceptions.ProbeError("unexpected response ID from server (expected %i, received %s)"
+                    % (pending.rid, decoded_response.get('id')))
+        result, exc = self._decode_response(pending.request, decoded_response)
+        if payload is not None:
+            result = payload
+
+        pending.result = result
+        pending.exc = exc
+        pending.is_done = True
+        if pending.is_posted and (exc is not None):
+            self._posted_errors.append((pending.rid, exc))
+
+    def _wait_for_response(self, pending: _PendingResponse) -> Tuple[Any, Optional[BaseException]]:
+        """@brief Return the result of a pipelined request, reading responses until it arrives.
+
+        If posted requests sent before this request failed, the first of their errors is returned in
+        place of this request's error. Errors of posted requests sent after this request are left to
+        be reported by a later request.
+        """
+        while not pending.is_done:
+            self._read_response()
+        exc = pending.exc
+        posted_exc: Optional[BaseException] = None
+        while self._posted_errors and (self._posted_errors[0][0] < pending.rid):
+            _, error = self._posted_errors.popleft()
+            if posted_exc is None:
+                posted_exc = error
+        if posted_exc is not None:
+            exc = posted_exc
+        return pending.result, exc
+
+    def _perform_request_without_raise(self, request: str, *args: Any, payload: Optional[bytes] = None) \
+            -> Tuple[Any, Optional[BaseException]]:
         """Execute a request-reply transaction with the server.
 
         The return value is a 2-tuple consisting of the optional result from the request and an optional
@@ -156,52 +308,65 @@ class TCPClientProbe(DebugProbe):
         """
         # Protect requests with the local lock.
         with self._lock:
-            rq = {
-                    "id": self.request_id,
-                    "request": request,
-                }
-            if len(args):
-                rq["arguments"] = args
-            formatted_request = json.dumps(rq)
-            TRACE.debug("Request: %s", formatted_request)
+            if self._protocol_version >= 2:
+                pending = self._send_request(request, args, payload)
+                return self._wait_for_response(pending)
+            assert payload is None
+
+            _, formatted_request = self._make_request(request, args)
 
             # Send request to server.
-            self._socket.write(formatted_request.encode('utf-8') + b"\n")
+            self._socket.write(formatted_request + b"\n")
 
             # Read response.
             response_data = self._socket.readline().decode('utf-8').strip()
-            decoded_response = json.loads(response_data)
-            TRACE.debug("decoded_response = %s", decoded_response)
+            return self._decode_response(request, json.loads(response_data))
+
+    def _perform_request(self, request: str, *args: Any, payload: Optional[bytes] = None) -> Any:
+        """@brief Perform the request and immediately raise any errors."""
+        result, exc = self._perform_request_without_raise(request, *args, payload=payload)
+        if exc is not None:
+            raise exc
+        return result
 
-            # Check for required keys.
-            if ('id' not in decoded_response) or ('status' not in decoded_response):
-                raise exceptions.ProbeError("malformed response from server; missing required field")
+    def _post_request(self, request: str, *args: Any, payload: Optional[bytes] = None) -> None:
+        """@brief Perform a request whose only result is success or failure.
 
-            # Check response status.
-            exc = None
-            status = decoded_response['status']
-            if status != 0:
-                # Get the error message.
-                error = decoded_response.get('error', "(missing error message key)")
-                LOG.debug("error received from server for command %s (status code %i): %s",
-                        request, status, error)
+        With protocol version 2 the request is pipelined, and an error is raised by a later request
+        or flush. Otherwise the request is performed immediately.
+        """
+        with self._lock:
+            if self._protocol_version >= 2:
+                self._send_request(request, args, payload, is_posted=True)
+            else:
+                self._perform_request(request, *args, payload=payload)
 
-                # Create an appropriate local exception based on the status code.
-                exc = self.STATUS_CODE_CLASS_MAP.get(status, exceptions.ProbeError)(
-                        "error received from server for command %s (status code %i): %s"
-                        % (request, status, error))
+    def _defer_request(self, request: str, *args: Any) -> Callable[[], Any]:
+        """@brief Perform a request and return a callable that returns the result or raises an error.
 
-            # Get response value. If not present then there was no return value from the command
-            result = decoded_response.get('result', None)
+        With protocol version 2 the request is pipelined, and the callable waits for the response.
+        """
+        with self._lock:
+            if self._protocol_version >= 2:
+                pending = self._send_request(request, args)
 
-            return result, exc
+                def wait_cb():
+                    with self._lock:
+                        return self._wait_for_response(pending)
+            else:
+                response = self._perform_request_without_raise(request, *args)
 
-    def _perform_request(self, request: str, *args: Any) -> Any:
-        """@brief Perform the request and immediately raise any errors."""
-        result, exc = self._perform_request_without_raise(request, *args)
-        if exc is not None:
-            raise exc
-        return result
+                def wait_cb():
+                    return response
+
+        def deferred_request_cb():
+            # Raise any exception here so the traceback includes the actual caller.
+            result, exc = wait_cb()
+            if exc is not None:
+                raise exc
+            return result
+
+        return deferred_request_cb
 
     _PROPERTY_CONVERTERS = {
             'capabilities':                 lambda value: [DebugProbe.Capability[v] for v in value],
@@ -223,8 +388,19 @@ class TCPClientProbe(DebugProbe):
             self._is_open = True
             self._socket.set_timeout(0.1)
 
-        # Send hello message.
-        self._perform_request('hello', self.PROTOCOL_VERSION)
+        # Send hello message. Fall back to protocol version 1 for servers that don't support v2. The server
+        # switches to the requested version after sending the hello response.
+        self._protocol_version = 1
+        if self.PROTOCOL_VERSION >= 2:
+            _, exc = self._perform_request_without_raise('hello', self.PROTOCOL_VERSION)
+            if exc is None:
+                self._protocol_version = self.PROTOCOL_VERSION
+            else:
+                LOG.debug("remote probe server doesn't support protocol version %i; using version 1",
+                        self.PROTOCOL_VERSION)
+                self._perform_request('hello', 1)
+        else:
+            self._perform_request('hello', self.PROTOCOL_VERSION)
 
         self._perform_request('open')
 
@@ -233,6 +409,9 @@ class TCPClientProbe(DebugProbe):
             self._perform_request('close')
             self._socket.close()
             self._is_open = False
+            self._protocol_version = 1
+            self._outstanding.clear()
+            self._posted_errors.clear()
 
     def lock(self):
         # The lock count is then used to only send the remote lock request once.
@@ -290,46 +469,42 @@ class TCPClientProbe(DebugProbe):
     ##@{
 
     def read_dp(self, addr, now=True):
-        result, exc = self._perform_request_without_raise('read_dp', addr)
-
-        def read_dp_cb():
-            # Raise any exception here so the traceback includes the actual caller.
-            if exc is not None:
-                raise exc
-            return result
-
-        return read_dp_cb() if now else read_dp_cb
+        result_cb = self._defer_request('read_dp', addr)
+        return result_cb() if now else result_cb
 
     def write_dp(self, addr, data):
-        self._perform_request('write_dp', addr, data)
+        self._post_request('write_dp', addr, data)
 
     def read_ap(self, addr, now=True):
-        result, exc = self._perform_request_without_raise('read_ap', addr)
-
-        def read_ap_cb():
-            # Raise any exception here so the traceback includes the actual caller.
-            if exc is not None:
-                raise exc
-            return result
-
-        return read_ap_cb() if now else read_ap_cb
+        result_cb = self._defer_request('read_ap', addr)
+        return result_cb() if now else result_cb
 
     def write_ap(self, addr, data):
-        self._perform_request('write_ap', addr, data)
+        self._post_request('write_ap', addr, data)
 
     def read_ap_multiple(self, addr, count=1, now=True):
-        results, exc = self._perform_request_without_raise('read_ap_multiple', addr, count)
+        result_cb = self._defer_request('read_ap_multiple', addr, count)
+        return result_cb() if now else result_cb
 
-        def read_ap_multiple_cb():
-            # Raise any exception here so the traceback includes the actual caller.
-            if exc is not None:
-                raise exc
-            return results
+    def write_ap_multiple(self, addr, values):
+        self._post_request('write_ap_multiple', addr, values)
 
-        return read_ap_multiple_cb() if now else read_ap_multiple_cb
+    def read_ap_multiple_bytes(self, addr, count=1, now=True):
+        if self._protocol_version < 2:
+            return super().read_ap_multiple_bytes(addr, count, now)
 
-    def write_ap_multiple(self, addr, values):
-        self._perform_request('write_ap_multiple', addr, values)
+        result_cb = self._defer_request('read_ap_multiple_bytes', addr, count)
+
+        def read_ap_multiple_bytes_cb():
+            return bytearray(result_cb() or b"")
+
+        return read_ap_multiple_bytes_cb() if now else read_ap_multiple_bytes_cb
+
+    def write_ap_multiple_bytes(self, addr, data):
+        if self._protocol_version < 2:
+            super().write_ap_multiple_bytes(addr, data)
+        else:
+            self._post_request('write_ap_multiple_bytes', addr, payload=bytes(data))
 
     def get_memory_interface_for_ap(self, ap_address):
         handle = self._perform_request('get_memory_interface_for_ap',
@@ -366,31 +541,46 @@ class RemoteMemoryInterface(MemoryInterface):
 
     def write_memory(self, addr, data, transfer_size=32, **attrs):
         assert transfer_size in (8, 16, 32)
-        self._remote_probe._perform_request('write_mem', self._handle, addr, data, transfer_size)
+        self._remote_probe._post_request('write_mem', self._handle, addr, data, transfer_size)
 
     def read_memory(self, addr, transfer_size=32, now=True, **attrs):
         assert transfer_size in (8, 16, 32)
-        result, exc = self._remote_probe._perform_request_without_raise('read_mem', self._handle, addr, transfer_size)
-
-        def read_callback():
-            # Raise any exception here so the traceback includes the actual caller.
-            if exc is not None:
-                raise exc
-            return result
-        return read_callback() if now else read_callback
+        result_cb = self._remote_probe._defer_request('read_mem', self._handle, addr, transfer_size)
+        return result_cb() if now else result_cb
 
     def write_memory_block32(self, addr, data, **attrs):
-        self._remote_probe._perform_request('write_block32', self._handle, addr, data)
+        if self._remote_probe.protocol_version >= 2:
+            self.write_memory_block_bytes(addr, conversion.u32le_list_to_bytes(data))
+        else:
+            self._remote_probe._perform_request('write_block32', self._handle, addr, data)
 
     def read_memory_block32(self, addr, size, **attrs):
+        if self._remote_probe.protocol_version >= 2:
+            return conversion.bytes_to_u32le_list(self.read_memory_block_bytes(addr, size * 4))
         return self._remote_probe._perform_request('read_block32', self._handle, addr, size)
 
     def write_memory_block8(self, addr, data, **attrs):
-        self._remote_probe._perform_request('write_block8', self._handle, addr, data)
+        if self._remote_probe.protocol_version >= 2:
+            self.write_memory_block_bytes(addr, bytes(data))
+        else:
+            self._remote_probe._perform_request('write_block8', self._handle, addr, data)
 
     def read_memory_block8(self, addr, size, **attrs):
+        if self._remote_probe.protocol_version >= 2:
+            return list(self.read_memory_block_bytes(addr, size))
         return self._remote_probe._perform_request('read_block8', self._handle, addr, size)
 
+    def write_memory_block_bytes(self, addr: int, data: Union[bytes, bytearray, memoryview]) -> None:
+        if self._remote_probe.protocol_version < 2:
+            super().write_memory_block_bytes(addr, data)
+        else:
+            self._remote_probe._post_request('write_block', self._handle, addr, payload=bytes(data))
+
+    def read_memory_block_bytes(self, addr: int, size: int) -> bytearray:
+        if self._remote_probe.protocol_version < 2:
+            return super().read_memory_block_bytes(addr, size)
+        return bytearray(self._remote_probe._perform_request('read_block', self._handle, addr, size) or b"")
+
 class TCPClientProbePlugin(Plugin):
     """@brief Plugin class for TCPClientProbePlugin."""
 
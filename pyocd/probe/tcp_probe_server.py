@@ -19,9 +19,10 @@ import logging
 import threading
 import json
 import socket
+import struct
 from socketserver import (ThreadingTCPServer, StreamRequestHandler)
 from time import sleep
-from typing import (Callable, Dict, Optional, TYPE_CHECKING, Tuple, cast)
+from typing import (Any, Callable, Dict, Optional, TYPE_CHECKING, Tuple, cast)
 
 from .shared_probe_proxy import SharedDebugProbeProxy
 from ..core import exceptions
@@ -175,7 +176,10 @@ class TCPProbeServer(ThreadingTCPServer):
 class DebugProbeRequestHandler(StreamRequestHandler):
     """@brief Probe server request handler.
 
-    This class implements the server side for the remote probe protocol.
+    This class implements the server side for the remote probe protocol. Every connection starts with
+    protocol version 1, one JSON request or response per line. Once a hello request for version 2
+    succeeds, the connection switches to length-prefixed frames, each with a JSON header and optional
+    binary payload. Requests are handled in order and each gets one response.
 
     request:
     ````
@@ -198,7 +202,16 @@ class DebugProbeRequestHandler(StreamRequestHandler):
     """
 
     ## Current version of the remote probe protocol.
-    PROTOCOL_VERSION = 1
+    PROTOCOL_VERSION = 2
+
+    ## Protocol versions accepted in a hello request.
+    SUPPORTED_PROTOCOL_VERSIONS = (1, 2)
+
+    ## Frame prefix for protocol version 2: JSON header length and binary payload length.
+    FRAME_PREFIX = struct.Struct("<II")
+
+    ## Requests that take the binary payload of a v2 frame as their last argument.
+    PAYLOAD_REQUESTS = ('write_block', 'write_ap_multiple_bytes')
 
     class StatusCode:
         """@brief Constants for errors reported from the server."""
@@ -229,6 +242,11 @@ class DebugProbeRequestHandler(StreamRequestHandler):
         if self._probe.session is None:
             self._probe.session = self._session
 
+        # Protocol version in use for this connection, and the version to switch to after the current
+        # request's response is sent.
+        self._protocol_version = 1
+        self._next_protocol_version = 1
+
         # Dict to store handles for AP memory interfaces.
         self._next_ap_memif_handle: int = 0
         self._ap_memif_handles: Dict[int, "MemoryInterface"] = {}
@@ -268,6 +286,11 @@ class DebugProbeRequestHandler(StreamRequestHandler):
                 'write_block32':        (self._request__write_block32,      3   ), # 'write_block32', handle:int, addr:int, data:List[int]
                 'read_block8':          (self._request__read_block8,        3   ), # 'read_block8', handle:int, addr:int, word_count:int -> List[int]
                 'write_block8':         (self._request__write_block8,       3   ), # 'write_block8', handle:int, addr:int, data:List[int]
+                # Protocol version 2 only.
+                'read_ap_multiple_bytes': (self._request__read_ap_multiple_bytes, 2), # 'read_ap_multiple_bytes', addr:int, count:int -> bytes
+                'write_ap_multiple_bytes': (self._request__write_ap_multiple_bytes, 2), # 'write_ap_multiple_bytes', addr:int, data:bytes
+                'read_block':           (self._request__read_block,         3   ), # 'read_block', handle:int, addr:int, byte_count:int -> bytes
+                'write_block':          (self._request__write_block,        3   ), # 'write_block', handle:int, addr:int, data:bytes
             }
 
         # Let superclass do its thing.
@@ -285,28 +308,55 @@ class DebugProbeRequestHandler(StreamRequestHandler):
 
         super().finish()
 
+    def _write_response(self, response_dict: Dict[str, Any], payload: Optional[bytes] = None) -> None:
+        response = json.dumps(response_dict)
+        TRACE.debug("response: %s", response)
+        response_encoded = response.encode('utf-8')
+        if self._protocol_version >= 2:
+            prefix = self.FRAME_PREFIX.pack(len(response_encoded), len(payload) if payload else 0)
+            self.wfile.write(b"".join((prefix, response_encoded, payload or b"")))
+        else:
+            self.wfile.write(response_encoded + b"\n")
+
     def _send_error_response(self, status=1, message=""):
         response_dict = {
                 "id": self._current_request_id,
                 "status": status,
                 "error": message,
             }
-        response = json.dumps(response_dict)
-        TRACE.debug("response: %s", response)
-        response_encoded = response.encode('utf-8')
-        self.wfile.write(response_encoded + b"\n")
+        self._write_response(response_dict)
 
     def _send_response(self, result):
         response_dict = {
                 "id": self._current_request_id,
                 "status": 0,
             }
+        # With protocol v2, binary results are sent as the frame payload.
+        if (self._protocol_version >= 2) and isinstance(result, (bytes, bytearray, memoryview)):
+            self._write_response(response_dict, bytes(result))
+            return
         if result is not None:
             response_dict["result"] = result
-        response = json.dumps(response_dict)
-        TRACE.debug("response: %s", response)
-        response_encoded = response.encode('utf-8')
-        self.wfile.write(response_encoded + b"\n")
+        self._write_response(response_dict)
+
+    def _read_request(self) -> Tuple[bytes, Optional[bytes]]:
+        """@brief Read the next request.
+
+        @return Tuple of the JSON request and the optional binary payload. The JSON request is empty if
+            the connection was closed.
+        """
+        if self._protocol_version < 2:
+            return self.rfile.readline(), None
+
+        prefix = self.rfile.read(self.FRAME_PREFIX.size)
+        if len(prefix) < self.FRAME_PREFIX.size:
+            return b"", None
+        header_length, payload_length = self.FRAME_PREFIX.unpack(prefix)
+        request = self.rfile.read(header_length)
+        payload = self.rfile.read(payload_length)
+        if (len(request) < header_length) or (len(payload) < payload_length):
+            return b"", None
+        return request, payload
 
     def handle(self):
         # Process requests until the connection is closed.
@@ -317,8 +367,8 @@ class DebugProbeRequestHandler(StreamRequestHandler):
                 request_dict = None
                 self._current_request_id = -1
 
-                # Read request line.
-                request = self.rfile.readline()
+                # Read request line or frame.
+                request, payload = self._read_request()
                 TRACE.debug("request: %s", request)
                 if len(request) == 0:
                     LOG.debug("empty request, closing connection")
@@ -354,6 +404,11 @@ class DebugProbeRequestHandler(StreamRequestHandler):
                 if request_type not in self._REQUEST_HANDLERS:
                     self._send_error_response(message="unknown request type")
                     continue
+                if request_type in self.PAYLOAD_REQUESTS:
+                    if payload is None:
+                        self._send_error_response(message="request requires protocol version 2")
+                        continue
+                    request_args.append(payload)
                 handler, arg_count = self._REQUEST_HANDLERS[request_type]
                 self._check_args(request_args, arg_count)
                 result = handler(*request_args)
@@ -376,6 +431,9 @@ class DebugProbeRequestHandler(StreamRequestHandler):
                 # Reraise non-pyocd errors.
                 if not isinstance(err, exceptions.Error):
                     raise
+            finally:
+                # Switch protocol versions only after the hello response is sent.
+                self._protocol_version = self._next_protocol_version
 
     def _get_exception_status_code(self, err):
         """@brief Convert an exception class into a status code."""
@@ -399,9 +457,10 @@ class DebugProbeRequestHandler(StreamRequestHandler):
 
     def _request__hello(self, version):
         # 'hello', protocol-version:int
-        if version != self.PROTOCOL_VERSION:
+        if version not in self.SUPPORTED_PROTOCOL_VERSIONS:
             raise exceptions.Error("client requested unsupported protocol version %i (expected %i)" %
                     (version, self.PROTOCOL_VERSION))
+        self._next_protocol_version = version
 
     def _request__read_property(self, name):
         # 'readprop', name:str
@@ -484,6 +543,26 @@ class DebugProbeRequestHandler(StreamRequestHandler):
             raise exceptions.Error("invalid handle received from remote memory access")
         self._ap_memif_handles[handle].write_memory_block8(addr, data)
 
+    def _request__read_ap_multiple_bytes(self, addr, count):
+        # 'read_ap_multiple_bytes', addr:int, count:int -> bytes
+        return self._probe.read_ap_multiple_bytes(addr, count)
+
+    def _request__write_ap_multiple_bytes(self, addr, data):
+        # 'write_ap_multiple_bytes', addr:int, data:bytes
+        self._probe.write_ap_multiple_bytes(addr, data)
+
+    def _request__read_block(self, handle, addr, byte_count):
+        # 'read_block', handle:int, addr:int, byte_count:int -> bytes
+        if handle not in self._ap_memif_handles:
+            raise exceptions.Error("invalid handle received from remote memory access")
+        return self._ap_memif_handles[handle].read_memory_block_bytes(addr, byte_count)
+
+    def _request__write_block(self, handle, addr, data):
+        # 'write_block', handle:int, addr:int, data:bytes
+        if handle not in self._ap_memif_handles:
+            raise exceptions.Error("invalid handle received from remote memory access")
+        self._ap_memif_handles[handle].write_memory_block_bytes(addr, data)
+
     _PROPERTY_CONVERTERS = {
             'capabilities':                 lambda value: [v.name for v in value],
             'supported_wire_protocols':     lambda value: [v.name for v in value],
@@ -16,6 +16,7 @@
 # limitations under the License.
 
 import logging
+import struct
 
 from .provider import TargetThread
 from ..core import exceptions
@@ -61,6 +62,123 @@ def read_c_string(context, ptr):
 
     return s
 
+def decode_c_string(data):
+    """@brief Decodes a null-terminated C string from bytes already read from the target.
+
+    Characters are replaced the same way as by read_c_string().
+
+    @param data Bytes starting with the string.
+    @return The decoded string, or None if _data_ does not contain a null terminator.
+    """
+    end = data.find(0)
+    if end == -1:
+        return None
+
+    s = ""
+    badCount = 0
+    for c in data[:end]:
+        if c > 127:
+            badCount += 1
+            if badCount > 4:
+                break
+            s += '?'
+        else:
+            s += chr(c)
+            badCount = 0
+    return s
+
+class TCBLayout(object):
+    """@brief Fields of a thread control block that are read by a thread snapshot.
+
+    Fields are described by a dict mapping field name to an (offset, format) tuple, where the format
+    is a struct module format string without a byte order character, such as 'I', 'b', or '16s'. The
+    size of the layout is the end of the last field, so all fields can be read in one block.
+    """
+
+    def __init__(self, fields):
+        self._fields = {name: (offset, struct.Struct('<' + fmt)) for name, (offset, fmt) in fields.items()}
+        self._size = max(offset + fmt.size for offset, fmt in self._fields.values())
+
+    @property
+    def size(self):
+        return self._size
+
+    def unpack(self, data):
+        """@brief Extract the field values from TCB data.
+        @return Dict of field name to value.
+        """
+        return {name: fmt.unpack_from(data, offset)[0] for name, (offset, fmt) in self._fields.items()}
+
+class ThreadSnapshot(object):
+    """@brief Reads thread control blocks for a thread provider with one block read per TCB.
+
+    A snapshot starts with a call to begin(), normally once each time the target halts. Each TCB is
+    read from the target at most once per snapshot.
+
+    Thread names are cached across snapshots. Each name is keyed by the TCB address and a value that
+    changes when the name does, such as the name pointer or the raw bytes of an inline name, so a
+    name is only read again if it has changed.
+
+    A provider can pass kernel values that change whenever its thread lists do, such as a task count,
+    to begin() as a generation key. If the key is unchanged the provider does not need to walk the
+    thread lists again.
+    """
+
+    def __init__(self, context, layout):
+        self._context = context
+        self._layout = layout
+        self._tcbs = {}
+        self._names = {}
+        self._generation = None
+
+    def begin(self, generation=None):
+        """@brief Start a new snapshot.
+        @param self
+        @param generation Optional key identifying the current contents of the thread lists.
+        @return Boolean indicating whether the thread lists must be walked. This is True unless
+            _generation_ is not None and equal to the key passed for the previous snapshot.
+        """
+        self._tcbs = {}
+        changed = (generation is None) or (generation != self._generation)
+        self._generation = generation
+        return changed
+
+    def read_tcb(self, base):
+        """@brief Read the layout fields of the TCB at _base_.
+        @return Dict of field name to value.
+        @exception TransferError
+        """
+        try:
+            return self._tcbs[base]
+        except KeyError:
+            pass
+        fields = self._layout.unpack(self._context.read_memory_block_bytes(base, self._layout.size))
+        self._tcbs[base] = fields
+        return fields
+
+    def get_name(self, base, key, reader):
+        """@brief Return a thread's name, calling _reader_ only if it is not cached.
+        @param self
+        @param base Address of the thread's TCB.
+        @param key Value that changes whenever the thread's name changes.
+        @param reader Callable that returns the thread's name.
+        """
+        cached = self._names.get(base)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        name = reader()
+        self._names[base] = (key, name)
+        return name
+
+    def retain(self, bases):
+        """@brief Drop cached names for TCBs not in _bases_."""
+        self._names = {base: value for base, value in self._names.items() if base in bases}
+
+    def invalidate(self):
+        self._tcbs = {}
+        self._names = {}
+        self._generation = None
+
 class HandlerModeThread(TargetThread):
     """@brief Class representing the handler mode."""
 
@@ -15,13 +15,15 @@
 # limitations under the License.
 
 from .provider import (TargetThread, ThreadProvider)
-from .common import (read_c_string, HandlerModeThread, EXC_RETURN_EXT_FRAME_MASK)
+from .common import (read_c_string, decode_c_string, HandlerModeThread, TCBLayout, ThreadSnapshot,
+                     EXC_RETURN_EXT_FRAME_MASK)
 from ..core import exceptions
 from ..core.target import Target
 from ..core.plugin import Plugin
 from ..debug.context import DebugContext
 from ..coresight.cortex_m_core_registers import index_for_reg
 import logging
+import struct
 
 FREERTOS_MAX_PRIORITIES	= 63
 
@@ -31,8 +33,10 @@ LIST_NODE_NEXT_OFFSET = 8 # 4?
 LIST_NODE_OBJECT_OFFSET = 12
 
 THREAD_STACK_POINTER_OFFSET = 0
+THREAD_STATE_LIST_OFFSET = 20 # xStateListItem.pvContainer
 THREAD_PRIORITY_OFFSET = 44
 THREAD_NAME_OFFSET = 52
+THREAD_NAME_LENGTH = 16 # Default configMAX_TASK_NAME_LEN
 
 # Create a logger for this module.
 LOG = logging.getLogger(__name__)
@@ -53,14 +57,14 @@ class TargetList(object):
 
         while (node != 0) and (node != prev) and (found < count):
             try:
-                # Read the object from the node.
-                obj = self._context.read32(node + LIST_NODE_OBJECT_OFFSET)
+                # Read the next node pointer and the object from the node together.
+                data = self._context.read_memory_block_bytes(node + LIST_NODE_NEXT_OFFSET, 8)
+                next_node, obj = struct.unpack('<II', data)
                 yield obj
                 found += 1
 
-                # Read next list node pointer.
                 prev = node
-                node = self._context.read32(node + LIST_NODE_NEXT_OFFSET)
+                node = next_node
             except exceptions.TransferError:
                 LOG.warning("TransferError while reading list elements (list=0x%08x, node=0x%08x), terminating list", self._list, node)
                 node = 0
@@ -249,19 +253,39 @@ class FreeRTOSThread(TargetThread):
             DELETED : "Deleted",
         }
 
-    def __init__(self, targetContext, provider, base):
+    ## TCB fields read once per halt.
+    TCB_LAYOUT = TCBLayout({
+            'state_list': (THREAD_STATE_LIST_OFFSET, 'I'),
+            'priority': (THREAD_PRIORITY_OFFSET, 'I'),
+            'name': (THREAD_NAME_OFFSET, '%ds' % THREAD_NAME_LENGTH),
+        })
+
+    def __init__(self, targetContext, provider, base, snapshot):
         super(FreeRTOSThread, self).__init__()
         self._target_context = targetContext
         self._provider = provider
         self._base = base
+        self._snapshot = snapshot
         self._state = FreeRTOSThread.READY
+        self._state_list = 0
         self._thread_context = FreeRTOSThreadContext(self._target_context, self)
-
-        self._priority = self._target_context.read32(self._base + THREAD_PRIORITY_OFFSET)
-
-        self._name = read_c_string(self._target_context, self._base + THREAD_NAME_OFFSET)
-        if len(self._name) == 0:
-            self._name = "Unnamed"
+        self.update_info()
+
+    def update_info(self):
+        """@brief Update priority, name, and state list from the TCB snapshot.
+        @exception TransferError
+        """
+        fields = self._snapshot.read_tcb(self._base)
+        self._priority = fields['priority']
+        self._state_list = fields['state_list']
+        self._name = self._snapshot.get_name(self._base, fields['name'], lambda: self._read_name(fields['name']))
+
+    def _read_name(self, data):
+        name = decode_c_string(data)
+        if name is None:
+            # The name is longer than the snapshot, so configMAX_TASK_NAME_LEN must be larger than the default.
+            name = read_c_string(self._target_context, self._base + THREAD_NAME_OFFSET)
+        return name or "Unnamed"
 
     def get_stack_pointer(self):
         # Get stack pointer saved in thread struct.
@@ -279,6 +303,11 @@ class FreeRTOSThread(TargetThread):
     def state(self, value):
         self._state = value
 
+    @property
+    def state_list(self):
+        """@brief Address of the list containing the task's state list item."""
+        return self._state_list
+
     @property
     def priority(self):
         return self._priority
@@ -328,7 +357,9 @@ class FreeRTOSThreadProvider(ThreadProvider):
         super(FreeRTOSThreadProvider, self).__init__(target)
         self._symbols = None
         self._total_priorities = 0
+        self._list_states = {}
         self._threads = {}
+        self._snapshot = ThreadSnapshot(self._target_context, FreeRTOSThread.TCB_LAYOUT)
 
     def init(self, symbolProvider):
         # Lookup required symbols.
@@ -346,6 +377,11 @@ class FreeRTOSThreadProvider(ThreadProvider):
         if tasksWaitingTerminationSym is not None:
             self._symbols['xTasksWaitingTermination'] = tasksWaitingTerminationSym['xTasksWaitingTermination']
 
+        # Look up optional uxTaskNumber, which is incremented each time a task is created.
+        taskNumberSym = self._lookup_symbols(["uxTaskNumber"], symbolProvider)
+        if taskNumberSym is not None:
+            self._symbols['uxTaskNumber'] = taskNumberSym['uxTaskNumber']
+
         # Look up vPortEnableVFP() to determine if the FreeRTOS port supports the FPU.
         vPortEnableVFP = self._lookup_symbols(["vPortEnableVFP"], symbolProvider)
         self._fpu_port = vPortEnableVFP is not None
@@ -374,6 +410,18 @@ class FreeRTOSThreadProvider(ThreadProvider):
             return False
         LOG.debug("FreeRTOS: number of priorities is %d", self._total_priorities)
 
+        # Map each task list to the state of the tasks in it.
+        self._list_states = {}
+        for i in range(self._total_priorities):
+            self._list_states[self._symbols['pxReadyTasksLists'] + i * LIST_SIZE] = FreeRTOSThread.READY
+        self._list_states[self._symbols['xDelayedTaskList1']] = FreeRTOSThread.BLOCKED
+        self._list_states[self._symbols['xDelayedTaskList2']] = FreeRTOSThread.BLOCKED
+        self._list_states[self._symbols['xPendingReadyList']] = FreeRTOSThread.READY
+        if 'xSuspendedTaskList' in self._symbols:
+            self._list_states[self._symbols['xSuspendedTaskList']] = FreeRTOSThread.SUSPENDED
+        if 'xTasksWaitingTermination' in self._symbols:
+            self._list_states[self._symbols['xTasksWaitingTermination']] = FreeRTOSThread.DELETED
+
         self._target.session.subscribe(self.event_handler, Target.Event.POST_FLASH_PROGRAM)
         self._target.session.subscribe(self.event_handler, Target.Event.POST_RESET)
 
@@ -381,6 +429,7 @@ class FreeRTOSThreadProvider(ThreadProvider):
 
     def invalidate(self):
         self._threads = {}
+        self._snapshot.invalidate()
 
     def event_handler(self, notification):
         # Invalidate threads list if flash is reprogrammed.
@@ -388,8 +437,6 @@ class FreeRTOSThreadProvider(ThreadProvider):
         self.invalidate();
 
     def _build_thread_list(self):
-        newThreads = {}
-
         # Read the number of threads.
         threadCount = self._target_context.read32(self._symbols['uxCurrentNumberOfTasks'])
 
@@ -402,6 +449,65 @@ class FreeRTOSThreadProvider(ThreadProvider):
             LOG.warning("FreeRTOS: no threads even though the scheduler is running")
             return
 
+        # The set of tasks can only change if the number of tasks does, or if a task is created
+        # and another deleted, which changes uxTaskNumber.
+        generation = (threadCount,)
+        if 'uxTaskNumber' in self._symbols:
+            generation += (self._target_context.read32(self._symbols['uxTaskNumber']),)
+
+        newThreads = None
+        if not self._snapshot.begin(generation):
+            newThreads = self._refresh_threads(currentThread)
+        if newThreads is None:
+            newThreads = self._walk_thread_lists(threadCount, currentThread)
+
+        # Create fake handler mode thread.
+        if self._target_context.read_core_register('ipsr') > 0:
+            LOG.debug("FreeRTOS: creating handler mode thread")
+            t = HandlerModeThread(self._target_context, self)
+            newThreads[t.unique_id] = t
+
+        self._snapshot.retain(newThreads)
+        self._threads = newThreads
+
+    def _refresh_threads(self, currentThread):
+        """@brief Update the known tasks without walking the task lists.
+
+        Each task's state is determined from the list that contains its state list item.
+
+        Tasks on xPendingReadyList are linked through their event list item rather than their state
+        list item, so their state can only be found by walking the lists.
+
+        @return Dict of the updated threads, or None if the task lists must be walked.
+        """
+        # Check uxNumberOfItems of the pending ready list.
+        if self._target_context.read32(self._symbols['xPendingReadyList']) != 0:
+            return None
+
+        newThreads = {}
+        for threadBase, t in self._threads.items():
+            if threadBase == HandlerModeThread.UNIQUE_ID:
+                continue
+            try:
+                t.update_info()
+            except exceptions.TransferError:
+                LOG.debug("TransferError while examining thread 0x%08x", threadBase)
+                return None
+
+            state = self._list_states.get(t.state_list)
+            if state is None:
+                # The TCB is not on a known list, so it may have been deleted.
+                return None
+            t.state = FreeRTOSThread.RUNNING if (threadBase == currentThread) else state
+            newThreads[threadBase] = t
+
+        if currentThread not in newThreads:
+            return None
+        return newThreads
+
+    def _walk_thread_lists(self, threadCount, currentThread):
+        newThreads = {}
+
         # Read the top ready priority.
         topPriority = self._target_context.read32(self._symbols['uxTopReadyPriority'])
 
@@ -435,8 +541,9 @@ class FreeRTOSThreadProvider(ThreadProvider):
                     # Reuse existing thread objects.
                     if threadBase in self._threads:
                         t = self._threads[threadBase]
+                        t.update_info()
                     else:
-                        t = FreeRTOSThread(self._target_context, self, threadBase)
+                        t = FreeRTOSThread(self._target_context, self, threadBase, self._snapshot)
 
                     # Set thread state.
                     if threadBase == currentThread:
@@ -451,14 +558,10 @@ class FreeRTOSThreadProvider(ThreadProvider):
 
         if len(newThreads) != threadCount:
             LOG.warning("FreeRTOS: thread count mismatch")
+            # Walk the lists again next time.
+            self._snapshot.begin()
 
-        # Create fake handler mode thread.
-        if self._target_context.read_core_register('ipsr') > 0:
-            LOG.debug("FreeRTOS: creating handler mode thread")
-            t = HandlerModeThread(self._target_context, self)
-            newThreads[t.unique_id] = t
-
-        self._threads = newThreads
+        return newThreads
 
     def get_threads(self):
         if not self.is_enabled:
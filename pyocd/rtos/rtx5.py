@@ -14,7 +14,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from .provider import (TargetThread, ThreadProvider)
-from .common import (read_c_string, HandlerModeThread, EXC_RETURN_EXT_FRAME_MASK)
+from .common import (read_c_string, HandlerModeThread, TCBLayout, ThreadSnapshot,
+                     EXC_RETURN_EXT_FRAME_MASK)
 from ..core import exceptions
 from ..core.target import Target
 from ..core.plugin import Plugin
@@ -26,10 +27,11 @@ import logging
 LOG = logging.getLogger(__name__)
 
 class TargetList(object):
-    def __init__(self, context, ptr, nextOffset):
+    def __init__(self, context, ptr, snapshot, nextField):
         self._context = context
         self._list = ptr
-        self._offset = nextOffset
+        self._snapshot = snapshot
+        self._field = nextField
 
     def __iter__(self):
         # Read first item on list.
@@ -40,8 +42,8 @@ class TargetList(object):
             yield node
 
             try:
-                # Read the next item in the list.
-                node = self._context.read32(node + self._offset)
+                # Read the next item in the list from the thread's snapshot.
+                node = self._snapshot.read_tcb(node)[self._field]
             except exceptions.TransferError as exc:
                 LOG.warning("TransferError while reading list elements (list=0x%08x, node=0x%08x), terminating list: %s", self._list, node, exc)
                 break
@@ -235,34 +237,35 @@ class RTXTargetThread(TargetThread):
          0x93: "Waiting[MsgPut]",
     }
 
-    def __init__(self, targetContext, provider, base):
+    def __init__(self, targetContext, provider, base, snapshot):
         super(RTXTargetThread, self).__init__()
         self._target_context = targetContext
         self._provider = provider
         self._base = base
+        self._snapshot = snapshot
         self._state = 0
         self._priority = 0
+        self._name = "?"
         self._thread_context = RTXThreadContext(self._target_context, self)
         self._has_fpu = self._thread_context.core.has_fpu
-        try:
-            name_ptr = self._target_context.read32(self._base + RTXTargetThread.NAME_OFFSET)
-            self._name = read_c_string(self._target_context, name_ptr)
-
-            self.update_state()
-        except exceptions.TransferError as exc:
-            LOG.debug("Transfer error while reading thread %x name: %s", self._base, exc)
-            self._name = "?"
+        self.update_state()
         LOG.debug('RTXTargetThread 0x%x' % base)
 
     def update_state(self):
         try:
-            state = self._target_context.read8(self._base + RTXTargetThread.STATE_OFFSET)
-            priority = self._target_context.read8(self._base + RTXTargetThread.PRIORITY_OFFSET)
+            fields = self._snapshot.read_tcb(self._base)
         except exceptions.TransferError as exc:
             LOG.debug("Transfer error while reading thread %x state: %s", self._base, exc)
-        else:
-            self._state = state
-            self._priority = priority
+            return
+        self._state = fields['state']
+        self._priority = fields['priority']
+
+        name_ptr = fields['name']
+        try:
+            self._name = self._snapshot.get_name(self._base, name_ptr,
+                    lambda: read_c_string(self._target_context, name_ptr))
+        except exceptions.TransferError as exc:
+            LOG.debug("Transfer error while reading thread %x name: %s", self._base, exc)
 
     @property
     def priority(self):
@@ -320,8 +323,18 @@ class RTX5ThreadProvider(ThreadProvider):
     THREADNEXT_OFFSET = 8
     DELAYNEXT_OFFSET = 16
 
+    ## osRtxThread_t fields read once per halt.
+    TCB_LAYOUT = TCBLayout({
+            'state': (RTXTargetThread.STATE_OFFSET, 'B'),
+            'name': (RTXTargetThread.NAME_OFFSET, 'I'),
+            'thread_next': (THREADNEXT_OFFSET, 'I'),
+            'delay_next': (DELAYNEXT_OFFSET, 'I'),
+            'priority': (RTXTargetThread.PRIORITY_OFFSET, 'B'),
+        })
+
     def __init__(self, target):
         super(RTX5ThreadProvider, self).__init__(target)
+        self._snapshot = ThreadSnapshot(self._target_context, self.TCB_LAYOUT)
 
     def init(self, symbolProvider):
         # Lookup required symbols.
@@ -346,6 +359,7 @@ class RTX5ThreadProvider(ThreadProvider):
 
     def invalidate(self):
         self._threads = {}
+        self._snapshot.invalidate()
 
     def event_handler(self, notification):
         # Invalidate threads list if flash is reprogrammed.
@@ -354,6 +368,10 @@ class RTX5ThreadProvider(ThreadProvider):
     def _build_thread_list(self):
         newThreads = {}
 
+        # Walking the thread lists reads every thread's snapshot, so there is nothing to gain from
+        # a generation key.
+        self._snapshot.begin()
+
         def create_or_update(thread):
             # Check for and reuse existing thread.
             if thread in self._threads:
@@ -362,7 +380,7 @@ class RTX5ThreadProvider(ThreadProvider):
                 t.update_state()
             else:
                 # Create a new thread.
-                t = RTXTargetThread(self._target_context, self, thread)
+                t = RTXTargetThread(self._target_context, self, thread, self._snapshot)
             newThreads[t.unique_id] = t
 
         # Currently running Thread
@@ -377,9 +395,9 @@ class RTX5ThreadProvider(ThreadProvider):
 
         # List of target thread lists to examine.
         threadLists = [
-            TargetList(self._target_context, self._readylist, RTX5ThreadProvider.THREADNEXT_OFFSET),
-            TargetList(self._target_context, self._delaylist, RTX5ThreadProvider.DELAYNEXT_OFFSET),
-            TargetList(self._target_context, self._waitlist, RTX5ThreadProvider.DELAYNEXT_OFFSET),
+            TargetList(self._target_context, self._readylist, self._snapshot, 'thread_next'),
+            TargetList(self._target_context, self._delaylist, self._snapshot, 'delay_next'),
+            TargetList(self._target_context, self._waitlist, self._snapshot, 'delay_next'),
             ]
 
         # Scan thread lists.
@@ -391,6 +409,7 @@ class RTX5ThreadProvider(ThreadProvider):
         if self._target_context.read_core_register('ipsr') > 0:
             newThreads[HandlerModeThread.UNIQUE_ID] = HandlerModeThread(self._target_context, self)
 
+        self._snapshot.retain(newThreads)
         self._threads = newThreads
 
     def get_thread(self, threadId):
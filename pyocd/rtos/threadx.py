@@ -15,7 +15,7 @@
 # limitations under the License.
 
 from .provider import (TargetThread, ThreadProvider)
-from .common import (read_c_string, HandlerModeThread,
+from .common import (read_c_string, HandlerModeThread, TCBLayout, ThreadSnapshot,
                      EXC_RETURN_EXT_FRAME_MASK)
 from ..core import exceptions
 from ..core.target import Target
@@ -36,14 +36,24 @@ THREAD_PRIORITY_OFFSET = 44
 THREAD_STATE_OFFSET = 48
 THREAD_NEXT_OFFSET = 136
 
+## TX_THREAD fields read once per halt.
+TCB_LAYOUT = TCBLayout({
+    'id': (THREAD_ID_OFFSET, 'I'),
+    'name': (THREAD_NAME_OFFSET, 'I'),
+    'priority': (THREAD_PRIORITY_OFFSET, 'I'),
+    'state': (THREAD_STATE_OFFSET, 'I'),
+    'next': (THREAD_NEXT_OFFSET, 'I'),
+    })
+
 # Create a logger for this module.
 LOG = logging.getLogger(__name__)
 
 
 class TargetList(object):
-    def __init__(self, context, ptr):
+    def __init__(self, context, ptr, snapshot):
         self._context = context
         self._list = ptr
+        self._snapshot = snapshot
 
     def __iter__(self):
         next = 0
@@ -53,8 +63,10 @@ class TargetList(object):
 
         while is_valid and next != head:
             try:
+                fields = self._snapshot.read_tcb(node)
+
                 # Check if this is really a thread
-                if self._context.read32(node) == TX_THREAD_ID:
+                if fields['id'] == TX_THREAD_ID:
                     # Yields the thread pointer.
                     yield node
                 else:
@@ -63,7 +75,7 @@ class TargetList(object):
                     LOG.warning(
                         "Wrong thread ID found. Memory corruption or unknown extensions")
 
-                next = self._context.read32(node + THREAD_NEXT_OFFSET)
+                next = fields['next']
                 node = next
             except exceptions.TransferError:
                 LOG.warning(
@@ -283,21 +295,16 @@ class ThreadXThread(TargetThread):
     PRIORITYCHANGE = 14
     UNKNOWN = 99
 
-    def __init__(self, targetContext, provider, base):
+    def __init__(self, targetContext, provider, base, snapshot):
         super(ThreadXThread, self).__init__()
         self._target_context = targetContext
         self._provider = provider
         self._base = base
-        self._state = self._target_context.read32(
-            self._base + THREAD_STATE_OFFSET)
-        self._priority = self._target_context.read32(
-            self._base + THREAD_PRIORITY_OFFSET)
-        self._name = ""
-        namePtr = self._target_context.read32(self._base + THREAD_NAME_OFFSET)
-        if namePtr != 0:
-            self._name = read_c_string(self._target_context, namePtr)
-        if len(self._name) == 0:
-            self._name = "Unnamed"
+        self._snapshot = snapshot
+        self._state = self.UNKNOWN
+        self._priority = 0
+        self._name = "Unnamed"
+        self.update_info()
         self._thread_context = ThreadXThreadContext(self._target_context, self)
 
     def get_stack_pointer(self):
@@ -311,12 +318,14 @@ class ThreadXThread(TargetThread):
 
     def update_info(self):
         try:
-            self._priority = self._target_context.read32(
-                self._base + THREAD_PRIORITY_OFFSET)
-            self._state = self._target_context.read32(
-                self._base + THREAD_STATE_OFFSET)
+            fields = self._snapshot.read_tcb(self._base)
+            self._priority = fields['priority']
+            self._state = fields['state']
             if not self.READY <= self._state <= self.PRIORITYCHANGE:
                 self._state = self.UNKNOWN
+            namePtr = fields['name']
+            self._name = self._snapshot.get_name(self._base, namePtr,
+                    lambda: (read_c_string(self._target_context, namePtr) if namePtr else "") or "Unnamed")
         except exceptions.TransferError:
             LOG.debug("Transfer error while reading thread info")
 
@@ -380,6 +389,7 @@ class ThreadXThreadProvider(ThreadProvider):
         self._current_ptr = None
         self._system_state = None
         self._threads = {}
+        self._snapshot = ThreadSnapshot(self._target_context, TCB_LAYOUT)
 
     def init(self, symbolProvider):
         self._created_ptr = symbolProvider.get_symbol_value(
@@ -416,6 +426,7 @@ class ThreadXThreadProvider(ThreadProvider):
 
     def invalidate(self):
         self._threads = {}
+        self._snapshot.invalidate()
 
     def event_handler(self, notification):
         # Invalidate threads list if flash is reprogrammed.
@@ -427,8 +438,12 @@ class ThreadXThreadProvider(ThreadProvider):
         # Read the number of threads.
         threadCount = self._target_context.read32(self._created_cnt)
 
+        # Walking the created list reads every thread's snapshot, so there is nothing to gain from
+        # a generation key.
+        self._snapshot.begin()
+
         # Build up list of all the threads
-        allThreads = TargetList(self._target_context, self._created_ptr)
+        allThreads = TargetList(self._target_context, self._created_ptr, self._snapshot)
         newThreads = {}
         for threadBase in allThreads:
             try:
@@ -439,7 +454,7 @@ class ThreadXThreadProvider(ThreadProvider):
                     # Ask the thread object to update its state and priority.
                     t.update_info()
                 else:
-                    t = ThreadXThread(self._target_context, self, threadBase)
+                    t = ThreadXThread(self._target_context, self, threadBase, self._snapshot)
                 LOG.debug("Thread 0x%08x (%s)", threadBase, t.name)
                 newThreads[t.unique_id] = t
             except exceptions.TransferError:
@@ -457,6 +472,7 @@ class ThreadXThreadProvider(ThreadProvider):
             t = HandlerModeThread(self._target_context, self)
             newThreads[t.unique_id] = t
 
+        self._snapshot.retain(newThreads)
         self._threads = newThreads
 
     def get_threads(self):
@@ -19,22 +19,27 @@
 import logging
 
 from .provider import (TargetThread, ThreadProvider)
-from .common import (read_c_string, HandlerModeThread)
+from .common import (read_c_string, decode_c_string, HandlerModeThread, TCBLayout, ThreadSnapshot)
 from ..core import exceptions
 from ..core.target import Target
 from ..core.plugin import Plugin
 from ..debug.context import DebugContext
 from ..coresight.cortex_m_core_registers import index_for_reg
-from ..utility.mask import twos_complement
 
 # Create a logger for this module.
 LOG = logging.getLogger(__name__)
 
+## Offset value for thread fields that are not present in the kernel's configuration.
+THREAD_INFO_UNIMPLEMENTED = 0xffffffff
+
+## Default CONFIG_THREAD_MAX_NAME_LEN.
+THREAD_NAME_LENGTH = 32
+
 class TargetList(object):
-    def __init__(self, context, ptr, next_offset):
+    def __init__(self, context, ptr, snapshot):
         self._context = context
         self._list = ptr
-        self._list_node_next_offset = next_offset
+        self._snapshot = snapshot
 
     def __iter__(self):
         node = self._context.read32(self._list)
@@ -43,8 +48,8 @@ class TargetList(object):
             try:
                 yield node
 
-                # Read next list node pointer.
-                node = self._context.read32(node + self._list_node_next_offset)
+                # Read next list node pointer from the thread's snapshot.
+                node = self._snapshot.read_tcb(node)['next_thread']
             except exceptions.TransferError:
                 LOG.warning("TransferError while reading list elements (list=0x%08x, node=0x%08x), terminating list", self._list, node)
                 node = 0
@@ -165,13 +170,14 @@ class ZephyrThread(TargetThread):
             RUNNING : "Running",
         }
 
-    def __init__(self, targetContext, provider, base, offsets):
+    def __init__(self, targetContext, provider, base, offsets, snapshot):
         super(ZephyrThread, self).__init__()
         self._target_context = targetContext
         self._provider = provider
         self._base = base
         self._thread_context = ZephyrThreadContext(self._target_context, self)
         self._offsets = offsets
+        self._snapshot = snapshot
         self._state = ZephyrThread.READY
         self._priority = 0
         self._name = "Unnamed"
@@ -192,16 +198,24 @@ class ZephyrThread(TargetThread):
 
     def update_info(self):
         try:
-            self._priority = twos_complement(self._target_context.read8(self._base + self._offsets["t_prio"]), width=8)
-            self._state = self._target_context.read8(self._base + self._offsets["t_state"])
+            fields = self._snapshot.read_tcb(self._base)
+            self._priority = fields['prio']
+            self._state = fields['state']
 
-            if self._provider.version > 0:
-                addr = self._base + self._offsets["t_name"]
-                self._name = read_c_string(self._target_context, addr)
+            if 'name' in fields:
+                self._name = self._snapshot.get_name(self._base, fields['name'],
+                        lambda: self._read_name(fields['name']))
 
         except exceptions.TransferError:
             LOG.debug("Transfer error while reading thread info")
 
+    def _read_name(self, data):
+        name = decode_c_string(data)
+        if name is None:
+            # The name is longer than the default CONFIG_THREAD_MAX_NAME_LEN.
+            name = read_c_string(self._target_context, self._base + self._offsets["t_name"])
+        return name
+
     @property
     def state(self):
         return self._state
@@ -270,6 +284,7 @@ class ZephyrThreadProvider(ThreadProvider):
         self._version = None
         self._all_threads = None
         self._curr_thread = None
+        self._snapshot = None
         self._threads = {}
 
     def init(self, symbolProvider):
@@ -307,15 +322,29 @@ class ZephyrThreadProvider(ThreadProvider):
             self._version = None
             self._all_threads = None
             self._curr_thread = None
+            self._snapshot = None
             LOG.debug("_offsets, _all_threads, and _curr_thread are invalid")
         else:
             self._version = self._offsets["version"]
             self._all_threads = self._symbols["_kernel"] + self._offsets["k_threads"]
             self._curr_thread = self._symbols["_kernel"] + self._offsets["k_curr_thread"]
+            self._snapshot = ThreadSnapshot(self._target_context, self._get_tcb_layout())
             LOG.debug("version = %d, _all_threads = 0x%08x, _curr_thread = 0x%08x", self._version, self._all_threads, self._curr_thread)
 
+    def _get_tcb_layout(self):
+        fields = {
+            'next_thread': (self._offsets["t_next_thread"], 'I'),
+            'state': (self._offsets["t_state"], 'B'),
+            'prio': (self._offsets["t_prio"], 'b'),
+            }
+        if self._version > 0 and self._offsets["t_name"] != THREAD_INFO_UNIMPLEMENTED:
+            fields['name'] = (self._offsets["t_name"], '%ds' % THREAD_NAME_LENGTH)
+        return TCBLayout(fields)
+
     def invalidate(self):
         self._threads = {}
+        if self._snapshot is not None:
+            self._snapshot.invalidate()
 
     def event_handler(self, notification):
         if notification.event == Target.Event.POST_RESET:
@@ -326,7 +355,10 @@ class ZephyrThreadProvider(ThreadProvider):
             self._update()
 
     def _build_thread_list(self):
-        allThreads = TargetList(self._target_context, self._all_threads, self._offsets["t_next_thread"])
+        # Walking the thread list reads every thread's snapshot, so there is nothing to gain from
+        # a generation key.
+        self._snapshot.begin()
+        allThreads = TargetList(self._target_context, self._all_threads, self._snapshot)
         newThreads = {}
 
         currentThread = self._target_context.read32(self._curr_thread)
@@ -341,7 +373,7 @@ class ZephyrThreadProvider(ThreadProvider):
                     # Ask the thread object to update its state and priority.
                     t.update_info()
                 else:
-                    t = ZephyrThread(self._target_context, self, threadBase, self._offsets)
+                    t = ZephyrThread(self._target_context, self, threadBase, self._offsets, self._snapshot)
 
                 # Set thread state.
                 if threadBase == currentThread:
@@ -358,6 +390,7 @@ class ZephyrThreadProvider(ThreadProvider):
             t = HandlerModeThread(self._target_context, self)
             newThreads[t.unique_id] = t
 
+        self._snapshot.retain(newThreads)
         self._threads = newThreads
 
     def get_threads(self):
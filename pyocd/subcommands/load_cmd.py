@@ -15,13 +15,16 @@
 # limitations under the License.
 
 import argparse
-from typing import List
+from typing import (List, Optional, Tuple)
 import logging
 from pathlib import Path
+from time import monotonic
 
 from .base import SubcommandBase
 from ..core.helpers import ConnectHelper
-from ..flash.file_programmer import FileProgrammer
+from ..core.session import Session
+from ..flash.file_programmer import (FileProgrammer, ProgramImage)
+from ..flash.parallel_programmer import (MultiProgressReport, ParallelProgrammer)
 from ..utility.cmdline import (
     convert_session_options,
     int_base_0,
@@ -65,6 +68,16 @@ class LoadSubcommand(SubcommandBase):
         parser_options.add_argument("--no-reset", action="store_true",
             help="Specify to prevent resetting device after programming has finished.")
 
+        parallel_options = parser.add_argument_group("multiple probe options")
+        parallel_options.add_argument("--all-probes", action="store_true",
+            help="Program the targets of all connected probes in parallel. To program a subset of probes, "
+                 "pass a comma-separated list of unique IDs to --probe instead.")
+        parallel_options.add_argument("--jobs", metavar="N", type=int,
+            help="Maximum number of targets programmed at the same time. Defaults to all.")
+        parallel_options.add_argument("--stagger", metavar="SECONDS", type=float, default=0.0,
+            help="Minimum time between connecting to each probe when programming multiple probes. "
+                 "Default is 0.")
+
         parser.add_argument("file", metavar="<file-path>", nargs="+",
             help="File to write to memory. Binary files can have an optional base address appended to the file "
                  "name as '@<address>', for instance 'app.bin@0x20000'.")
@@ -80,6 +93,11 @@ class LoadSubcommand(SubcommandBase):
             raise ValueError("--base-address cannot be set when loading more than one file; "
                     "use a base address suffix instead")
 
+        # Multiple probes are selected with --all-probes or a comma-separated list of unique IDs.
+        unique_ids = self._args.unique_id.split(',') if self._args.unique_id else []
+        if self._args.all_probes or len(unique_ids) > 1:
+            return self._load_multiple(unique_ids)
+
         session = ConnectHelper.session_with_chosen_probe(
                             project_dir=self._args.project_dir,
                             config_file=self._args.config,
@@ -102,31 +120,10 @@ class LoadSubcommand(SubcommandBase):
                             chip_erase=self._args.erase,
                             trust_crc=self._args.trust_crc,
                             no_reset=self._args.no_reset)
-            for filename in self._args.file:
-                # Get an initial path with the argument as-is.
-                file_path = Path(filename).expanduser()
-
-                # Look for a base address suffix. If the supplied argument including an address suffix
-                # references an existing file, then the address suffix is not extracted.
-                if "@" in filename and not file_path.exists():
-                    filename, suffix = filename.rsplit("@", 1)
-                    try:
-                        base_address = int_base_0(suffix)
-                    except ValueError:
-                        LOG.error(f'Base address suffix "{suffix}" on file "{filename}" is not a valid integer address')
-                        return 1
-                else:
-                    base_address = self._args.base_address
-
-                # Resolve our path.
-                file_path = Path(filename).expanduser().resolve()
-                filename = str(file_path)
-
-                if base_address is None:
-                    LOG.info("Loading %s", filename)
-                else:
-                    LOG.info("Loading %s at %#010x", filename, base_address)
-
+            files = self._get_files()
+            if files is None:
+                return 1
+            for filename, base_address in files:
                 programmer.program(filename,
                                 base_address=base_address,
                                 skip=self._args.skip,
@@ -134,4 +131,111 @@ class LoadSubcommand(SubcommandBase):
 
         return 0
 
+    def _get_files(self) -> Optional[List[Tuple[str, Optional[int]]]]:
+        """@brief Return the resolved path and base address for each file argument.
+
+        @return List of (path, base address) tuples, or None if a base address suffix is not a valid
+            integer. The error has already been logged in that case.
+        """
+        files: List[Tuple[str, Optional[int]]] = []
+        for filename in self._args.file:
+            # Get an initial path with the argument as-is.
+            file_path = Path(filename).expanduser()
+
+            # Look for a base address suffix. If the supplied argument including an address suffix
+            # references an existing file, then the address suffix is not extracted.
+            if "@" in filename and not file_path.exists():
+                filename, suffix = filename.rsplit("@", 1)
+                try:
+                    base_address = int_base_0(suffix)
+                except ValueError:
+                    LOG.error(f'Base address suffix "{suffix}" on file "{filename}" is not a valid integer address')
+                    return None
+            else:
+                base_address = self._args.base_address
+
+            # Resolve our path.
+            file_path = Path(filename).expanduser().resolve()
+            filename = str(file_path)
+
+            if base_address is None:
+                LOG.info("Loading %s", filename)
+            else:
+                LOG.info("Loading %s at %#010x", filename, base_address)
+            files.append((filename, base_address))
+        return files
+
+    def _load_multiple(self, unique_ids: List[str]) -> int:
+        """@brief Program the same files into the targets of several probes in parallel.
+
+        The files are parsed once, then each target is programmed by a worker thread.
+
+        @return Exit status, 0 if all targets were programmed successfully, otherwise 1.
+        """
+        blocking = not self._args.no_wait
+        if self._args.all_probes:
+            probes = ConnectHelper.get_all_connected_probes(blocking=blocking)
+        else:
+            probes = []
+            for unique_id in unique_ids:
+                matches = ConnectHelper.get_all_connected_probes(blocking=blocking, unique_id=unique_id)
+                if len(matches) != 1:
+                    LOG.error("%s debug probe matches unique ID '%s'",
+                            "No" if not matches else "More than one", unique_id)
+                    return 1
+                if matches[0].unique_id not in (p.unique_id for p in probes):
+                    probes.append(matches[0])
+        if not probes:
+            LOG.error("No target device available")
+            return 1
+
+        sessions = [Session(probe,
+                            project_dir=self._args.project_dir,
+                            config_file=self._args.config,
+                            user_script=self._args.script,
+                            no_config=self._args.no_config,
+                            pack=self._args.pack,
+                            target_override=self._args.target_override,
+                            frequency=self._args.frequency,
+                            connect_mode=self._args.connect_mode,
+                            options=convert_session_options(self._args.options),
+                            option_defaults=self._modified_option_defaults(),
+                            )
+                    for probe in probes]
+        hide_progress = sessions[0].options.get('hide_programming_progress')
+        progress = None if hide_progress else MultiProgressReport([p.unique_id for p in probes])
+
+        files = self._get_files()
+        if files is None:
+            return 1
+
+        with ProgramImage() as image:
+            for filename, base_address in files:
+                image.add_file(filename,
+                                self._args.format,
+                                base_address=base_address,
+                                skip=self._args.skip)
 
+            start = monotonic()
+            programmer = ParallelProgrammer(sessions, image,
+                            max_workers=self._args.jobs,
+                            stagger=self._args.stagger,
+                            progress=progress,
+                            chip_erase=self._args.erase,
+                            trust_crc=self._args.trust_crc,
+                            no_reset=self._args.no_reset)
+            results = programmer.program()
+            elapsed = monotonic() - start
+
+        # Print the result for each probe and the aggregate throughput.
+        for result in results:
+            print("%-32s %s %8.3f s" % (result.unique_id, "ok    " if result.status == 0 else "FAILED",
+                    result.elapsed), end='')
+            print(": " + result.error if result.error else "")
+        succeeded = [r for r in results if r.status == 0]
+        total_bytes = sum(r.byte_count for r in succeeded)
+        kbps = (total_bytes / 1024) / elapsed if elapsed > 0 else 0.0
+        print("Programmed %d of %d targets, %d bytes in %.3f s (%.02f kB/s aggregate)"
+                % (len(succeeded), len(results), total_bytes, elapsed, kbps))
+
+        return 0 if len(succeeded) == len(results) else 1
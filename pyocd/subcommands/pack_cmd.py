@@ -17,12 +17,14 @@
 import argparse
 from typing import (List, Set)
 import logging
+import os
 import re
 import fnmatch
 
 from .base import SubcommandBase
 from ..core import exceptions
 from ..target.pack import pack_target
+from ..target.pack.pack_index import PackIndex
 
 try:
     import cmsis_pack_manager
@@ -263,6 +265,61 @@ class PackInstallSubcommand(PackSubcommandBase):
 
         return 0
 
+class PackIndexSubcommand(PackSubcommandBase):
+    """@brief `pyocd pack index` subcommand."""
+
+    NAMES = ['index']
+    HELP = "Update and show the index of devices from installed packs."
+
+    @classmethod
+    def get_args(cls) -> List[argparse.ArgumentParser]:
+        """@brief Add this subcommand to the subparsers object."""
+        parser = argparse.ArgumentParser(description=cls.HELP, add_help=False)
+
+        index_options = parser.add_argument_group("index operations")
+        index_options.add_argument("-r", "--rebuild", action='store_true',
+            help="Discard the existing device index and parse all installed packs again.")
+
+        display_options = parser.add_argument_group('display options')
+        display_options.add_argument('-H', '--no-header', action='store_true',
+            help="Don't print a table header.")
+
+        return [cls.CommonOptions.LOGGING, parser]
+
+    def invoke(self) -> int:
+        """@brief Handle 'index' subcommand."""
+        cache = self._get_cache()
+        index = PackIndex.for_data_path(cache.data_path)
+
+        if self._args.rebuild:
+            LOG.info("Rebuilding device index...")
+            index.clear()
+
+        packs = pack_target.ManagedPacks.get_installed_packs(cache)
+        pack_paths = []
+        pt = self._get_pretty_table(["Pack", "Version", "Devices", "Status"])
+        for ref in packs:
+            pack_path = os.path.join(cache.data_path, ref.get_pack_name())
+            pack_paths.append(pack_path)
+            status = "cached" if index.is_current(pack_path) else "updated"
+            try:
+                devices = index.get_devices(pack_path)
+            except (exceptions.TargetSupportError, OSError) as err:
+                LOG.error("failed to index %s: %s", pack_path, err)
+                status = "error"
+                devices = []
+            pt.add_row([
+                        f"{ref.vendor}.{ref.pack}",
+                        ref.version,
+                        len(devices),
+                        status,
+                        ])
+        index.remove_missing(pack_paths)
+        index.save()
+        print(pt)
+        LOG.info("Device index: %s", index.path)
+        return 0
+
 class PackSubcommand(PackSubcommandBase):
     """@brief `pyocd pack` subcommand."""
 
@@ -271,6 +328,7 @@ class PackSubcommand(PackSubcommandBase):
     SUBCOMMANDS = [
         PackCleanSubcommand,
         PackFindSubcommand,
+        PackIndexSubcommand,
         PackInstallSubcommand,
         PackShowSubcommand,
         PackUpdateSubcommand,
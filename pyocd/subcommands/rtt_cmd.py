@@ -36,6 +36,20 @@ from pyocd.utility.kbhit import KBHit
 
 LOG = logging.getLogger(__name__)
 
+## Shortest and longest delays in seconds between polls of RTT channels that have no data.
+MIN_IDLE_POLL_INTERVAL = 0.0005
+MAX_IDLE_POLL_INTERVAL = 0.01
+
+def next_poll_interval(interval: float, active: bool) -> float:
+    """@brief Return the delay before the next RTT poll.
+
+    Polling continues without delay while data is flowing. When idle, the delay doubles up to
+    MAX_IDLE_POLL_INTERVAL to limit CPU use.
+    """
+    if active:
+        return 0.0
+    return min(max(interval * 2, MIN_IDLE_POLL_INTERVAL), MAX_IDLE_POLL_INTERVAL)
+
 
 class RTTSubcommand(SubcommandBase):
     """@brief `pyocd rtt` subcommand."""
@@ -148,13 +162,15 @@ class RTTSubcommand(SubcommandBase):
 
         with open(self._args.log_file, 'wb') as log_file:
 
+            poll_interval = 0.0
             while True:
-                # poll at most 1000 times per second to limit CPU use
-                sleep(0.001)
+                if poll_interval:
+                    sleep(poll_interval)
 
                 # read data from up buffer
                 data = up_chan.read()
                 log_file.write(data)
+                poll_interval = next_poll_interval(poll_interval, bool(data))
 
                 s = len(data)
                 block_size += s
@@ -173,15 +189,18 @@ class RTTSubcommand(SubcommandBase):
         # byte array to send via RTT
         cmd = bytes()
 
+        poll_interval = 0.0
         while True:
-            # poll at most 1000 times per second to limit CPU use
-            sleep(0.001)
+            if poll_interval:
+                sleep(poll_interval)
 
             # read data from up buffer 0 (target -> host) and write to
             # stdout
             up_data: bytes = up_chan.read()
-            sys.stdout.buffer.write(up_data)
-            sys.stdout.buffer.flush()
+            if up_data:
+                sys.stdout.buffer.write(up_data)
+                sys.stdout.buffer.flush()
+            poll_interval = next_poll_interval(poll_interval, bool(up_data) or bool(cmd))
 
             # try to fetch character
             if kb.kbhit():
@@ -0,0 +1,185 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# This file is generated by scripts/generate_builtin_target_manifest.py. Do not edit.
+
+from typing import (Dict, List, NamedTuple)
+
+class BuiltinTargetInfo(NamedTuple):
+    """@brief Information about a builtin target that is available without importing the target."""
+    vendor: str
+    part_number: str
+    part_families: List[str]
+
+## @brief Information about each builtin target, keyed by target type name.
+BUILTIN_TARGET_INFO: Dict[str, BuiltinTargetInfo] = {
+    'mps3_an522': BuiltinTargetInfo('Arm', 'AN522', []),
+    'mps3_an540': BuiltinTargetInfo('Arm', 'AN540', []),
+    'cortex_m': BuiltinTargetInfo('Generic', 'CoreSightTarget', []),
+    'kinetis': BuiltinTargetInfo('NXP', 'Kinetis', []),
+    'ke15z7': BuiltinTargetInfo('NXP', 'KE15Z7', []),
+    'ke17z7': BuiltinTargetInfo('NXP', 'KE17Z7', []),
+    'ke18f16': BuiltinTargetInfo('NXP', 'KE18F16', []),
+    'kl02z': BuiltinTargetInfo('NXP', 'KL02Z', []),
+    'kl05z': BuiltinTargetInfo('NXP', 'KL05Z', []),
+    'kl25z': BuiltinTargetInfo('NXP', 'KL25Z', []),
+    'kl26z': BuiltinTargetInfo('NXP', 'KL26Z', []),
+    'kl27z4': BuiltinTargetInfo('NXP', 'KL27Z4', []),
+    'kl28z': BuiltinTargetInfo('NXP', 'KL28x', []),
+    'kl43z4': BuiltinTargetInfo('NXP', 'KL43Z4', []),
+    'kl46z': BuiltinTargetInfo('NXP', 'KL46Z', []),
+    'kl82z7': BuiltinTargetInfo('NXP', 'KL82Z7', []),
+    'kv10z7': BuiltinTargetInfo('NXP', 'KV10Z7', []),
+    'kv11z7': BuiltinTargetInfo('NXP', 'KV11Z7', []),
+    'kw01z4': BuiltinTargetInfo('NXP', 'KW01Z4', []),
+    'kw24d5': BuiltinTargetInfo('NXP', 'KW24D5', []),
+    'kw36z4': BuiltinTargetInfo('NXP', 'KW36Z4', []),
+    'kw40z4': BuiltinTargetInfo('NXP', 'KW40Z4', []),
+    'kw41z4': BuiltinTargetInfo('NXP', 'KW41Z4', []),
+    'k20d50m': BuiltinTargetInfo('NXP', 'K20D50M', []),
+    'k22fa12': BuiltinTargetInfo('NXP', 'K22FA12', []),
+    'k22f': BuiltinTargetInfo('NXP', 'K22F', []),
+    'k28f15': BuiltinTargetInfo('NXP', 'K28F15', []),
+    'k64f': BuiltinTargetInfo('NXP', 'K64F', []),
+    'k66f18': BuiltinTargetInfo('NXP', 'K66F18', []),
+    'k82f25615': BuiltinTargetInfo('NXP', 'K82F25615', []),
+    'k32w042s': BuiltinTargetInfo('NXP', 'K32W042S', []),
+    'k32l2b3': BuiltinTargetInfo('NXP', 'K32L2B3', []),
+    'lpc800': BuiltinTargetInfo('NXP', 'LPC800', []),
+    'lpc845': BuiltinTargetInfo('NXP', 'LPC845', []),
+    'lpc11u24': BuiltinTargetInfo('NXP', 'LPC11U24', []),
+    'lpc1768': BuiltinTargetInfo('NXP', 'LPC1768', []),
+    'lpc4330': BuiltinTargetInfo('NXP', 'LPC4330', []),
+    'max32600': BuiltinTargetInfo('Maxim', 'MAX32600', []),
+    'max32620': BuiltinTargetInfo('Maxim', 'MAX32620', []),
+    'max32625': BuiltinTargetInfo('Maxim', 'MAX32625', []),
+    'max32630': BuiltinTargetInfo('Maxim', 'MAX32630', []),
+    'max32660': BuiltinTargetInfo('Maxim', 'MAX32660', []),
+    'max32670': BuiltinTargetInfo('Maxim', 'MAX32670', []),
+    'mimxrt1010': BuiltinTargetInfo('NXP', 'MIMXRT1011xxxxx', []),
+    'mimxrt1015': BuiltinTargetInfo('NXP', 'MIMXRT1015xxxxx', []),
+    'mimxrt1020': BuiltinTargetInfo('NXP', 'MIMXRT1021xxxxx', []),
+    'mimxrt1024': BuiltinTargetInfo('NXP', 'MIMXRT1024xxxxx', []),
+    'mimxrt1050_quadspi': BuiltinTargetInfo('NXP', 'MIMXRT1052xxxxB_quadspi', []),
+    'mimxrt1050_hyperflash': BuiltinTargetInfo('NXP', 'MIMXRT1052xxxxB_hyperflash', []),
+    'mimxrt1050': BuiltinTargetInfo('NXP', 'MIMXRT1052xxxxB_hyperflash', []),
+    'mimxrt1060': BuiltinTargetInfo('NXP', 'MIMXRT1062xxxxA', []),
+    'mimxrt1064': BuiltinTargetInfo('NXP', 'MIMXRT1064xxxxA', []),
+    'mimxrt1170_cm7': BuiltinTargetInfo('NXP', 'MIMXRT1176xxxxx_CM7', []),
+    'mimxrt1170_cm4': BuiltinTargetInfo('NXP', 'MIMXRT1176xxxxx_CM4', []),
+    'nrf51': BuiltinTargetInfo('Nordic Semiconductor', 'NRF51', []),
+    'nrf51822': BuiltinTargetInfo('Nordic Semiconductor', 'NRF51', []),
+    'nrf52': BuiltinTargetInfo('Nordic Semiconductor', 'NRF52832', []),
+    'nrf52832': BuiltinTargetInfo('Nordic Semiconductor', 'NRF52832', []),
+    'nrf52833': BuiltinTargetInfo('Nordic Semiconductor', 'NRF52833', []),
+    'nrf52840': BuiltinTargetInfo('Nordic Semiconductor', 'NRF52840', []),
+    'stm32f103rc': BuiltinTargetInfo('STMicroelectronics', 'STM32F103RC', []),
+    'stm32f051': BuiltinTargetInfo('STMicroelectronics', 'STM32F051', []),
+    'stm32f412xe': BuiltinTargetInfo('STMicroelectronics', 'STM32F412xE', []),
+    'stm32f412xg': BuiltinTargetInfo('STMicroelectronics', 'STM32F412xG', []),
+    'stm32f429xg': BuiltinTargetInfo('STMicroelectronics', 'STM32F429xG', []),
+    'stm32f429xi': BuiltinTargetInfo('STMicroelectronics', 'STM32F429xI', []),
+    'stm32f439xg': BuiltinTargetInfo('STMicroelectronics', 'STM32F439xG', []),
+    'stm32f439xi': BuiltinTargetInfo('STMicroelectronics', 'STM32F439xI', []),
+    'stm32f767zi': BuiltinTargetInfo('STMicroelectronics', 'STM32F767xx', []),
+    'stm32l432kc': BuiltinTargetInfo('STMicroelectronics', 'STM32L432xC', []),
+    'stm32l475xc': BuiltinTargetInfo('STMicroelectronics', 'STM32L475xC', []),
+    'stm32l475xe': BuiltinTargetInfo('STMicroelectronics', 'STM32L475xE', []),
+    'stm32l475xg': BuiltinTargetInfo('STMicroelectronics', 'STM32L475xG', []),
+    'stm32l031x6': BuiltinTargetInfo('STMicroelectronics', 'STM32L031x6', []),
+    'w7500': BuiltinTargetInfo('WIZnet', 'W7500', []),
+    's5js100': BuiltinTargetInfo('Samsung', 'S5JS100', []),
+    'lpc11xx_32': BuiltinTargetInfo('NXP', 'LPC11XX_32', []),
+    'lpc824': BuiltinTargetInfo('NXP', 'LPC824', []),
+    'lpc54114': BuiltinTargetInfo('NXP', 'LPC54114', []),
+    'lpc54608': BuiltinTargetInfo('NXP', 'LPC54608', []),
+    'lpc4088': BuiltinTargetInfo('NXP', 'LPC4088', []),
+    'ncs36510': BuiltinTargetInfo('ONSemiconductor', 'NCS36510', []),
+    'lpc4088qsb': BuiltinTargetInfo('NXP', 'LPC4088qsb', []),
+    'lpc4088dm': BuiltinTargetInfo('NXP', 'LPC4088dm', []),
+    'rtl8195am': BuiltinTargetInfo('Realtek Semiconductor', 'RTL8195AM', []),
+    'cc3220sf': BuiltinTargetInfo('Texas Instruments', 'CC3220SF', []),
+    'cy8c6xxa': BuiltinTargetInfo('Cypress', 'CY8C6xxA', []),
+    'cy8c6xx7': BuiltinTargetInfo('Cypress', 'CY8C6xx7', []),
+    'cy8c6xx7_s25fs512s': BuiltinTargetInfo('Cypress', 'CY8C6xx7_S25FS512S', []),
+    'cy8c6xx7_nosmif': BuiltinTargetInfo('Cypress', 'CY8C6xx7_nosmif', []),
+    'cy8c6xx5': BuiltinTargetInfo('Cypress', 'CY8C6xx5', []),
+    'cy8c64_sysap': BuiltinTargetInfo('Cypress', 'cy8c64_sysap', []),
+    'cy8c64xx_cm0': BuiltinTargetInfo('Cypress', 'cy8c64xx_cm0', []),
+    'cy8c64xx_cm4': BuiltinTargetInfo('Cypress', 'cy8c64xx_cm4', []),
+    'cy8c64xx_cm0_s25hx512t': BuiltinTargetInfo('Cypress', 'cy8c64xx_cm0_s25hx512t', []),
+    'cy8c64xx_cm4_s25hx512t': BuiltinTargetInfo('Cypress', 'cy8c64xx_cm4_s25hx512t', []),
+    'cy8c64xx_cm0_nosmif': BuiltinTargetInfo('Cypress', 'cy8c64xx_cm0_nosmif', []),
+    'cy8c64xx_cm4_nosmif': BuiltinTargetInfo('Cypress', 'cy8c64xx_cm4_nosmif', []),
+    'cy8c64xa_cm0': BuiltinTargetInfo('Cypress', 'cy8c64xA_cm0', []),
+    'cy8c64xa_cm4': BuiltinTargetInfo('Cypress', 'cy8c64xA_cm4', []),
+    'cy8c64x5_cm0': BuiltinTargetInfo('Cypress', 'cy8c64x5_cm0', []),
+    'cy8c64x5_cm4': BuiltinTargetInfo('Cypress', 'cy8c64x5_cm4', []),
+    'musca_a1': BuiltinTargetInfo('Arm', 'MuscaA1', []),
+    'musca_b1': BuiltinTargetInfo('Arm', 'MuscaB1', []),
+    'musca_s1': BuiltinTargetInfo('Arm', 'MuscaS1', []),
+    'lpc5526': BuiltinTargetInfo('NXP', 'LPC5526', []),
+    'lpc55s69': BuiltinTargetInfo('NXP', 'LPC55S69', []),
+    'lpc55s16': BuiltinTargetInfo('NXP', 'LPC55S16', []),
+    'lpc55s36': BuiltinTargetInfo('NXP', 'LPC55S36', []),
+    'lpc55s28': BuiltinTargetInfo('NXP', 'LPC55S28', []),
+    'cy8c64xx_cm0_full_flash': BuiltinTargetInfo('Cypress', 'cy8c64xx_cm0_full_flash', []),
+    'cy8c64xx_cm4_full_flash': BuiltinTargetInfo('Cypress', 'cy8c64xx_cm4_full_flash', []),
+    'cy8c64xa_cm0_full_flash': BuiltinTargetInfo('Cypress', 'cy8c64xA_cm0_full_flash', []),
+    'cy8c64xa_cm4_full_flash': BuiltinTargetInfo('Cypress', 'cy8c64xA_cm4_full_flash', []),
+    'cy8c64x5_cm0_full_flash': BuiltinTargetInfo('Cypress', 'cy8c64x5_cm0_full_flash', []),
+    'cy8c64x5_cm4_full_flash': BuiltinTargetInfo('Cypress', 'cy8c64x5_cm4_full_flash', []),
+    'm252kg6ae': BuiltinTargetInfo('Nuvoton', 'M252KG6AE', []),
+    'm263kiaae': BuiltinTargetInfo('Nuvoton', 'M263KIAAE', []),
+    'm467hjhae': BuiltinTargetInfo('Nuvoton', 'M467HJHAE', []),
+    'm487jidae': BuiltinTargetInfo('Nuvoton', 'M487JIDAE', []),
+    'm2354kjfae': BuiltinTargetInfo('Nuvoton', 'M2354KJFAE', []),
+    'hc32f451xc': BuiltinTargetInfo('HDSC', 'HC32F451xC', []),
+    'hc32f451xe': BuiltinTargetInfo('HDSC', 'HC32F451xE', []),
+    'hc32f452xc': BuiltinTargetInfo('HDSC', 'HC32F452xC', []),
+    'hc32f452xe': BuiltinTargetInfo('HDSC', 'HC32F452xE', []),
+    'hc32f460xc': BuiltinTargetInfo('HDSC', 'HC32F460xC', []),
+    'hc32f460xe': BuiltinTargetInfo('HDSC', 'HC32F460xE', []),
+    'hc32f4a0xg': BuiltinTargetInfo('HDSC', 'HC32F4A0xG', []),
+    'hc32f4a0xi': BuiltinTargetInfo('HDSC', 'HC32F4A0xI', []),
+    'hc32m423xa': BuiltinTargetInfo('HDSC', 'HC32M423xA', []),
+    'hc32f120x6': BuiltinTargetInfo('HDSC', 'HC32F120x6TA', []),
+    'hc32f120x8': BuiltinTargetInfo('HDSC', 'HC32F120x8TA', []),
+    'hc32m120': BuiltinTargetInfo('HDSC', 'HC32M120', []),
+    'hc32m120x6': BuiltinTargetInfo('HDSC', 'HC32M120', []),
+    'hc32f160xa': BuiltinTargetInfo('HDSC', 'HC32F160xA', []),
+    'hc32f160xc': BuiltinTargetInfo('HDSC', 'HC32F160xC', []),
+    'hc32l110': BuiltinTargetInfo('HDSC', 'HC32L110', []),
+    'hc32f003': BuiltinTargetInfo('HDSC', 'HC32F003', []),
+    'hc32f005': BuiltinTargetInfo('HDSC', 'HC32F005', []),
+    'hc32l136': BuiltinTargetInfo('HDSC', 'HC32L136', []),
+    'hc32l130': BuiltinTargetInfo('HDSC', 'HC32L130', []),
+    'hc32f030': BuiltinTargetInfo('HDSC', 'HC32F030', []),
+    'hc32l196': BuiltinTargetInfo('HDSC', 'HC32L196', []),
+    'hc32l190': BuiltinTargetInfo('HDSC', 'HC32L190', []),
+    'hc32f196': BuiltinTargetInfo('HDSC', 'HC32F196', []),
+    'hc32f190': BuiltinTargetInfo('HDSC', 'HC32F190', []),
+    'hc32l072': BuiltinTargetInfo('HDSC', 'HC32L072', []),
+    'hc32l073': BuiltinTargetInfo('HDSC', 'HC32L073', []),
+    'hc32f072': BuiltinTargetInfo('HDSC', 'HC32F072', []),
+    'rp2040': BuiltinTargetInfo('Raspberry Pi', 'RP2040Core0', []),
+    'rp2040_core0': BuiltinTargetInfo('Raspberry Pi', 'RP2040Core0', []),
+    'rp2040_core1': BuiltinTargetInfo('Raspberry Pi', 'RP2040Core1', []),
+    'ytm32b1ld0': BuiltinTargetInfo('Yuntu Microelectronics', 'YTM32B1LD0', []),
+    'ytm32b1le0': BuiltinTargetInfo('Yuntu Microelectronics', 'YTM32B1LE0', []),
+    'ytm32b1me0': BuiltinTargetInfo('YTMicro', 'YTM32B1ME0', []),
+    'ytm32b1md1': BuiltinTargetInfo('Yuntu Microelectronics', 'YTM32B1MD1', []),
+    }
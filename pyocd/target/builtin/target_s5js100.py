@@ -262,6 +262,11 @@ class CortexM_S5JS100(CortexM):
             else:
                 raise exceptions.TimeoutError("Timeout waiting for target halt")
 
+    def get_state_deferred(self):
+        # get_state() reconnects after a failed DHCSR read, so the read can't be queued.
+        state = self.get_state()
+        return lambda: state
+
     def get_state(self):
         # LOG.info("s5js100.get_state")
         try:
@@ -148,10 +148,10 @@ class FlmFlashRegionBuilder:
         the parent flash region's attributes or create sector size subregions."""
         # First set the region's start and end if they weren't set.
         if region.start == region.end:
-            # Directly access the attributes. Normally region start/end are not settable to
-            # prevent modification of regions in a memory map such that they overlap.
-            region._start = pack_algo.flash_start
-            region._end = pack_algo.flash_start + pack_algo.flash_size - 1
+            # Normally region start/end are not settable to prevent modification of regions in a
+            # memory map such that they overlap. The memory map must update its lookup index.
+            self._memory_map.set_region_bounds(region, pack_algo.flash_start,
+                    pack_algo.flash_start + pack_algo.flash_size - 1)
 
         # Don't need to create subregions if there is a single sector size and its range
         # starts at the same address and is equal or larger than the parent flash region.
@@ -0,0 +1,207 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import (asdict, dataclass)
+import json
+import logging
+import os
+from pathlib import Path
+import tempfile
+from typing import (Any, Dict, Iterable, List, Optional, Union)
+
+from .cmsis_pack import (CmsisPack, CmsisPackDevice, MalformedCmsisPackError)
+
+LOG = logging.getLogger(__name__)
+
+@dataclass
+class PackDeviceSummary:
+    """@brief Description of a CMSIS-Pack device as stored in the pack index.
+
+    This provides the same `part_number`, `vendor`, and `families` attributes as CmsisPackDevice,
+    which are enough to list and select targets. Memory regions, flash algorithms, and debug
+    sequences are not stored. The full CmsisPackDevice is only created when needed by calling
+    load_device(), which parses just the pack that defines the device.
+    """
+    part_number: str
+    vendor: str
+    families: List[str]
+    ## Path to the .pack file that defines this device.
+    pack_path: str
+
+    @classmethod
+    def from_device(cls, dev: CmsisPackDevice, pack_path: str) -> "PackDeviceSummary":
+        """@brief Build a summary of a device parsed from a pack."""
+        return cls(dev.part_number, dev.vendor, dev.families, pack_path)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PackDeviceSummary":
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def load_device(self) -> CmsisPackDevice:
+        """@brief Parse the pack that defines this device and return the matching CmsisPackDevice.
+        @exception MalformedCmsisPackError The pack no longer defines the device.
+        """
+        pack = CmsisPack(self.pack_path)
+        for dev in pack.devices:
+            if dev.part_number == self.part_number:
+                return dev
+        raise MalformedCmsisPackError(f"CMSIS-Pack '{self.pack_path}' does not define device {self.part_number}")
+
+class PackIndex:
+    """@brief Persistent cache of the devices defined by installed CMSIS-Packs.
+
+    Parsing a pack's PDSC file is relatively slow, and must otherwise be done for every installed pack
+    each time the list of installed pack targets is needed. This class stores a PackDeviceSummary for
+    each device of each pack in a JSON file, so that packs only need to be parsed again when they
+    change.
+
+    Index entries are keyed by the pack's path. An entry is only used if the pack file's modification
+    time and size are unchanged from when the entry was created.
+
+    The index file is read lazily on first access. Call save() to write any changes back to disk.
+    """
+
+    ## Name of the index file created in the cmsis-pack-manager data directory.
+    FILENAME = "pyocd_pack_index.json"
+
+    ## Version of the index file format. Files with a different version are discarded.
+    VERSION = 2
+
+    @classmethod
+    def for_data_path(cls, data_path: Union[str, Path]) -> "PackIndex":
+        """@brief Create an index stored in the given pack data directory."""
+        return cls(Path(data_path) / cls.FILENAME)
+
+    def __init__(self, index_path: Union[str, Path]) -> None:
+        """@brief Constructor.
+        @param self
+        @param index_path Path to the index file. It does not have to exist.
+        """
+        self._path = Path(index_path)
+        self._packs: Optional[Dict[str, Dict[str, Any]]] = None
+        self._is_dirty = False
+
+    @property
+    def path(self) -> Path:
+        """@brief Path of the index file."""
+        return self._path
+
+    @property
+    def pack_paths(self) -> List[str]:
+        """@brief List of paths of the packs with entries in the index."""
+        return list(self._get_packs().keys())
+
+    def _get_packs(self) -> Dict[str, Dict[str, Any]]:
+        if self._packs is None:
+            self._packs = {}
+            try:
+                with self._path.open('r') as f:
+                    data = json.load(f)
+                if data.get('version') == self.VERSION:
+                    self._packs = data['packs']
+                else:
+                    LOG.debug("discarding pack index %s with unsupported version", self._path)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, KeyError, AttributeError) as err:
+                LOG.debug("failed to read pack index %s: %s", self._path, err)
+        return self._packs
+
+    @staticmethod
+    def _get_key(pack_path: str) -> List[int]:
+        stat = os.stat(pack_path)
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def is_current(self, pack_path: Union[str, Path]) -> bool:
+        """@brief Whether the index has an up to date entry for a pack."""
+        pack_path = str(pack_path)
+        entry = self._get_packs().get(pack_path)
+        try:
+            return (entry is not None) and (entry['key'] == self._get_key(pack_path))
+        except OSError:
+            return False
+
+    def get_devices(self, pack_path: Union[str, Path]) -> List[PackDeviceSummary]:
+        """@brief Return summaries of the devices defined by a pack.
+
+        If the index does not contain a current entry for the pack, the pack is parsed and the index
+        updated.
+
+        @exception MalformedCmsisPackError The pack could not be parsed.
+        @exception OSError The pack does not exist.
+        """
+        pack_path = str(pack_path)
+        packs = self._get_packs()
+        key = self._get_key(pack_path)
+
+        entry = packs.get(pack_path)
+        if (entry is not None) and (entry['key'] == key):
+            return [PackDeviceSummary.from_dict(d) for d in entry['devices']]
+
+        LOG.debug("indexing CMSIS-Pack %s", pack_path)
+        pack = CmsisPack(pack_path)
+        devices = [PackDeviceSummary.from_device(dev, pack_path) for dev in pack.devices]
+        packs[pack_path] = {
+            'key': key,
+            'devices': [dev.to_dict() for dev in devices],
+            }
+        self._is_dirty = True
+        return devices
+
+    def remove_missing(self, pack_paths: Iterable[Union[str, Path]]) -> None:
+        """@brief Drop entries for any packs not in the provided list of pack paths."""
+        keep = {str(p) for p in pack_paths}
+        packs = self._get_packs()
+        for pack_path in [p for p in packs if p not in keep]:
+            del packs[pack_path]
+            self._is_dirty = True
+
+    def clear(self) -> None:
+        """@brief Remove all entries from the index."""
+        self._packs = {}
+        self._is_dirty = True
+
+    def save(self) -> None:
+        """@brief Write the index to disk if it has changed.
+
+        Errors writing the file are logged but otherwise ignored, since the index is only a cache.
+
+        The index is written to a uniquely named temporary file that then replaces the index file, so
+        concurrent processes saving the index cannot corrupt it.
+        """
+        if not self._is_dirty:
+            return
+        tmp_path: Optional[str] = None
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=self._path.parent, prefix=self._path.name + ".",
+                    suffix=".tmp", delete=False) as f:
+                tmp_path = f.name
+                json.dump({'version': self.VERSION, 'packs': self._get_packs()}, f, separators=(',', ':'))
+            os.replace(tmp_path, self._path)
+            tmp_path = None
+            self._is_dirty = False
+        except OSError as err:
+            LOG.debug("failed to write pack index %s: %s", self._path, err)
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
@@ -23,6 +23,7 @@ from typing import (cast, Callable, Dict, IO, Iterable, List, Optional, Set, Tup
 
 
 from .cmsis_pack import (CmsisPack, CmsisPackDevice, MalformedCmsisPackError)
+from .pack_index import (PackDeviceSummary, PackIndex)
 from .reset_sequence_maps import (RESET_SEQUENCE_TO_TYPE_MAP, RESET_TYPE_TO_SEQUENCE_MAP)
 from ..family import FAMILIES
 from .. import (normalise_target_type_name, TARGET)
@@ -93,19 +94,28 @@ class ManagedPacksImpl:
         return results
 
     @staticmethod
-    def get_installed_targets(cache: Optional[cmsis_pack_manager.Cache] = None) -> List[CmsisPackDevice]: # type:ignore
-        """@brief Return a list of CmsisPackDevice objects for installed pack targets."""
+    def get_installed_targets(cache: Optional[cmsis_pack_manager.Cache] = None) -> List[PackDeviceSummary]: # type:ignore
+        """@brief Return a list of PackDeviceSummary objects for installed pack targets.
+
+        The device summaries come from the pack index stored alongside the installed packs, so
+        only packs that are new or have changed since the index was last updated are parsed.
+        Call load_device() on a returned summary to get the full CmsisPackDevice.
+        """
         if cache is None:
             cache = cmsis_pack_manager.Cache(True, True)
+        index = PackIndex.for_data_path(cache.data_path)
         results = []
+        pack_paths = []
         for pack in ManagedPacks.get_installed_packs(cache=cache):
             try:
                 pack_path = os.path.join(cache.data_path, pack.get_pack_name())
-                pack = CmsisPack(pack_path)
-                results += list(pack.devices)
+                pack_paths.append(pack_path)
+                results += index.get_devices(pack_path)
             except Exception as err:
                 LOG.error("failure to access managed CMSIS-Pack: %s",
                         err, exc_info=Session.get_current().log_tracebacks)
+        index.remove_missing(pack_paths)
+        index.save()
         return sorted(results, key=lambda dev:dev.part_number)
 
     @staticmethod
@@ -120,7 +130,10 @@ class ManagedPacksImpl:
         targets = ManagedPacks.get_installed_targets()
         for dev in targets:
             if device_name == normalise_target_type_name(dev.part_number):
-                PackTargets.populate_device(dev)
+                try:
+                    PackTargets.populate_device(dev.load_device())
+                except (MalformedCmsisPackError, OSError) as err:
+                    LOG.warning(err)
 
 if CPM_AVAILABLE:
     ManagedPacks = ManagedPacksImpl
@@ -0,0 +1,90 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections.abc import MutableMapping
+from functools import lru_cache
+from importlib import import_module
+from typing import (Dict, Iterator, Optional)
+
+@lru_cache(maxsize=None)
+def _resolve(reference: str, package: Optional[str]) -> type:
+    """@brief Import the module named by a class reference and return the class."""
+    module_name, class_name = reference.split(':')
+    module = import_module(module_name, package=package)
+    return getattr(module, class_name)
+
+class LazyTargetDict(MutableMapping):
+    """@brief Dictionary of target type names to target classes, which imports classes on demand.
+
+    Values can be either target classes or references to classes. A reference is a string with the form
+    "module:ClassName". Relative module names are resolved against the package passed to the
+    constructor. The module is imported the first time a referenced class is accessed, so that
+    just building the dictionary doesn't require importing every target module.
+
+    Membership tests and iteration over keys never import anything.
+    """
+
+    def __init__(self, references: Optional[Dict[str, str]] = None, package: Optional[str] = None) -> None:
+        """@brief Constructor.
+        @param self
+        @param references Optional dict of target type names to class references.
+        @param package Package used to resolve relative module names in references.
+        """
+        self._package = package
+        # Values are either a class or a reference string.
+        self._entries: Dict[str, object] = dict(references or {})
+
+    def is_reference(self, name: str) -> bool:
+        """@brief Whether the named entry was added as a class reference rather than a class.
+
+        The result doesn't depend on whether the referenced class has been imported yet.
+        @exception KeyError There is no entry with the given name.
+        """
+        return isinstance(self._entries[name], str)
+
+    def get_reference(self, name: str) -> Optional[str]:
+        """@brief Return the class reference for the named entry, or None if it was added as a class."""
+        value = self._entries.get(name)
+        return value if isinstance(value, str) else None
+
+    def copy(self) -> "LazyTargetDict":
+        result = LazyTargetDict(package=self._package)
+        result._entries = self._entries.copy()
+        return result
+
+    def __getitem__(self, name: str) -> type:
+        value = self._entries[name]
+        if isinstance(value, str):
+            return _resolve(value, self._package)
+        return value # type:ignore
+
+    def __setitem__(self, name: str, value: type) -> None:
+        self._entries[name] = value
+
+    def __delitem__(self, name: str) -> None:
+        del self._entries[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}@{id(self):#x} {len(self)} targets>"
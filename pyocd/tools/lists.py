@@ -23,7 +23,7 @@ from ..core.session import Session
 from ..core.helpers import ConnectHelper
 from ..core import options
 from ..target import TARGET
-from ..target.builtin import BUILTIN_TARGETS
+from ..target.builtin import (BUILTIN_TARGETS, BUILTIN_TARGET_INFO)
 from ..board.board_ids import BOARD_ID_TO_INFO
 from ..target.pack import pack_target
 from ..probe.debug_probe import DebugProbe
@@ -157,6 +157,23 @@ class ListGenerator(object):
             if name_filter and name_filter not in name.lower():
                 continue
 
+            # Builtin targets that haven't been replaced are listed from the manifest, to avoid
+            # importing every target module.
+            info = BUILTIN_TARGET_INFO.get(name)
+            if (info is not None) and (TARGET.get_reference(name) == BUILTIN_TARGETS.get_reference(name)):
+                if vendor_filter and vendor_filter not in info.vendor.lower():
+                    continue
+                if source_filter and source_filter != 'builtin':
+                    continue
+                targets.append({
+                    'name' : name,
+                    'vendor' : info.vendor,
+                    'part_families' : info.part_families,
+                    'part_number' : info.part_number,
+                    'source': 'builtin',
+                    })
+                continue
+
             # Create session with a stub probe that allows us to instantiate the target. This will create
             # Board and Target instances of its own, so set some options to control that.
             s = Session(StubProbe(), no_config=True, target_override='cortex_m')
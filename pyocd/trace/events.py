@@ -19,6 +19,8 @@ from typing import Optional
 
 class TraceEvent:
     """@brief Base trace event class."""
+    __slots__ = ('_desc', '_timestamp')
+
     def __init__(self, desc: str = "", ts: int = 0) -> None:
         self._desc = desc
         self._timestamp = ts
@@ -39,11 +41,15 @@ class TraceEvent:
 
 class TraceOverflow(TraceEvent):
     """@brief Trace overflow event."""
+    __slots__ = ()
+
     def __init__(self, ts: int = 0) -> None:
         super().__init__("overflow", ts)
 
 class TraceTimestamp(TraceEvent):
     """@brief Trace local timestamp."""
+    __slots__ = ('_tc',)
+
     def __init__(self, tc: int, ts: int = 0):
         super().__init__("timestamp", ts)
         self._tc = tc
@@ -57,6 +63,8 @@ class TraceTimestamp(TraceEvent):
 
 class TraceITMEvent(TraceEvent):
     """@brief Trace ITM stimulus port event."""
+    __slots__ = ('_port', '_data', '_width')
+
     def __init__(self, port: int, data: int, width: int, ts: int = 0) -> None:
         super().__init__("itm", ts)
         self._port = port
@@ -87,6 +95,8 @@ class TraceITMEvent(TraceEvent):
 
 class TraceEventCounter(TraceEvent):
     """@brief Trace DWT counter overflow event."""
+    __slots__ = ('_mask',)
+
     CPI_MASK = 0x01
     EXC_MASK = 0x02
     SLEEP_MASK = 0x04
@@ -123,6 +133,8 @@ class TraceEventCounter(TraceEvent):
 
 class TraceExceptionEvent(TraceEvent):
     """@brief Exception trace event."""
+    __slots__ = ('_number', '_name', '_action')
+
     ENTERED = 1
     EXITED = 2
     RETURNED = 3
@@ -158,6 +170,8 @@ class TraceExceptionEvent(TraceEvent):
 
 class TracePeriodicPC(TraceEvent):
     """@brief Periodic PC trace event."""
+    __slots__ = ('_pc',)
+
     def __init__(self, pc: int, ts: int = 0) -> None:
         super().__init__("pc", ts)
         self._pc = pc
@@ -179,6 +193,8 @@ class TraceDataTraceEvent(TraceEvent):
     - PC value, data value, whether it was read or written, and the transfer size.
     - Bits[15:0] of a data address, data value, whether it was read or written, and the transfer size.
     """
+    __slots__ = ('_cmpn', '_pc', '_addr', '_value', '_rnw', '_sz')
+
     def __init__(
                 self,
                 cmpn: Optional[int] = None,
@@ -30,6 +30,18 @@ class TraceEventSink:
         """
         raise NotImplementedError()
 
+    def receive_batch(self, events: Sequence["TraceEvent"]) -> None:
+        """@brief Handle a sequence of trace events.
+
+        Trace sources pass events through this method in batches. The default implementation calls
+        receive() for each event. Subclasses can override it to process events in bulk.
+
+        @param self
+        @param events Sequence of TraceEvent instances, in the order they were generated.
+        """
+        for event in events:
+            self.receive(event)
+
 class TraceEventFilter(TraceEventSink):
     """@brief Abstract interface for a trace event filter."""
 
@@ -94,3 +106,12 @@ class TraceEventTee(TraceEventSink):
         for sink in self._sinks:
             sink.receive(event)
 
+    def receive_batch(self, events: Sequence["TraceEvent"]) -> None:
+        """@brief Replicate a batch of trace events to all connected downstream trace event sinks.
+
+        @param self
+        @param events Sequence of TraceEvent instances.
+        """
+        for sink in self._sinks:
+            sink.receive_batch(events)
+
@@ -15,7 +15,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import (TYPE_CHECKING, Generator, Iterable, List, Optional)
+import re
+from typing import (TYPE_CHECKING, Iterable, List, Optional, Tuple)
 
 from . import events
 
@@ -23,6 +24,53 @@ if TYPE_CHECKING:
     from ..core.core_target import CoreTarget
     from .sink import TraceEventSink
 
+# Packet kinds used in the header table.
+_SYNC = 0
+_OVERFLOW = 1
+_LOCAL_TS_SHORT = 2 # Local timestamp format 2, no payload.
+_LOCAL_TS = 3 # Local timestamp format 1, continuation payload.
+_GLOBAL_TS = 4
+_EXTENSION_SHORT = 5 # Extension without payload.
+_EXTENSION = 6 # Extension with continuation payload.
+_RESERVED = 7
+_INSTRUMENTATION = 8
+_HARDWARE = 9
+
+def _classify_header(hdr: int) -> Tuple[int, int]:
+    """@brief Decode a packet header byte.
+    @return Tuple of the packet kind and, for source packets, the payload size in bytes.
+    """
+    if hdr == 0:
+        return (_SYNC, 0)
+    elif hdr == 0x70:
+        return (_OVERFLOW, 0)
+    elif (hdr & 0x3) == 0:
+        c = (hdr >> 7) & 0x1
+        d = (hdr >> 4) & 0b111
+        if (hdr & 0xf) == 0 and d not in (0x0, 0x3):
+            return ((_LOCAL_TS if c else _LOCAL_TS_SHORT), 0)
+        elif hdr in (0b10010100, 0b10110100):
+            return (_GLOBAL_TS, 0)
+        elif (hdr & 0x8) == 0x8:
+            return ((_EXTENSION if c else _EXTENSION_SHORT), 0)
+        else:
+            return (_RESERVED, 0)
+    else:
+        size = 1 << ((hdr & 0x3) - 1)
+        return ((_HARDWARE if (hdr & 0x4) else _INSTRUMENTATION), size)
+
+## Packet kind and payload size for each of the 256 possible header bytes.
+_HEADER_TABLE: Tuple[Tuple[int, int], ...] = tuple(_classify_header(hdr) for hdr in range(256))
+
+## Matches the byte that ends a run of sync packet zeroes.
+_NONZERO_BYTE = re.compile(b'[^\\x00]')
+
+## Matches the last byte of a packet payload with continuation bits.
+_LAST_CONTINUATION_BYTE = re.compile(b'[\\x00-\\x7f]')
+
+## A sync packet requires at least this many zero bytes before the final 0x80.
+_SYNC_MIN_ZEROES = 5
+
 class SWOParser:
     """@brief SWO data stream parser.
 
@@ -31,6 +79,10 @@ class SWOParser:
     event sink object that is a subclass of TraceEventSink. The event sink must either be provided
     when the SWOParser is constructed, or can be set using the connect() method.
 
+    Data is parsed a whole chunk at a time, with packet headers decoded through a lookup table.
+    Bytes of a packet that is split across calls to parse() are kept until the rest of the packet
+    arrives. Events are passed to the sink in batches via TraceEventSink.receive_batch().
+
     A SWOParser instance can be reused for multiple SWO sessions. If a break in SWO data streaming
     occurs, the reset() method should be called before passing further data to parse().
     """
@@ -45,10 +97,7 @@ class SWOParser:
         self._timestamp = 0
         self._pending_events: List[events.TraceEvent] = []
         self._pending_data_trace = None
-
-        # Get generator instance and prime it.
-        self._parser = self._parse()
-        next(self._parser)
+        self._partial_packet = b''
 
     def connect(self, sink: "TraceEventSink") -> None:
         """@brief Connect the downstream trace sink or filter."""
@@ -68,17 +117,132 @@ class SWOParser:
         sink object passed into the constructor or connect().
 
         @param self
-        @param data A sequence of integer byte values, usually a bytearray.
+        @param data A sequence of integer byte values, usually a bytes or bytearray.
         """
-        for value in data:
-            self._parser.send(value)
-            self._bytes_parsed += 1
+        if not isinstance(data, (bytes, bytearray)):
+            data = bytes(data)
+        self._bytes_parsed += len(data)
+        if self._partial_packet:
+            data = self._partial_packet + data
+            self._partial_packet = b''
+
+        header_table = _HEADER_TABLE
+        length = len(data)
+        i = 0
+        while i < length:
+            hdr = data[i]
+            kind, size = header_table[hdr]
+
+            # Source packets, checked first as they are by far the most common.
+            if kind >= _INSTRUMENTATION:
+                end = i + 1 + size
+                if end > length:
+                    break
+                if size == 1:
+                    payload = data[i + 1]
+                else:
+                    payload = int.from_bytes(data[i + 1:end], 'little')
+                i = end
+
+                if kind == _INSTRUMENTATION:
+                    event = events.TraceITMEvent((self._itm_page * 32) + (hdr >> 3),
+                            payload, size, self._timestamp)
+                    if self._pending_data_trace is None:
+                        self._pending_events.append(event)
+                    else:
+                        self._send_event(event)
+                else:
+                    self._parse_hardware_packet(hdr, size, payload)
+            # Sync packet: a run of zero bytes ended by a non-zero byte.
+            elif kind == _SYNC:
+                match = _NONZERO_BYTE.search(data, i)
+                if match is None:
+                    # Only the number of zeroes matters, up to the minimum for a valid sync packet.
+                    self._partial_packet = bytes(min(length - i, _SYNC_MIN_ZEROES))
+                    return
+                i = match.end()
+                self._itm_page = 0
+            elif kind == _OVERFLOW:
+                i += 1
+                self._send_event(events.TraceOverflow(self._timestamp))
+            elif kind == _LOCAL_TS_SHORT:
+                i += 1
+                self._timestamp += (hdr >> 4) & 0x7
+                self._send_event(events.TraceTimestamp(0, self._timestamp))
+            elif kind in (_LOCAL_TS, _GLOBAL_TS, _EXTENSION):
+                match = _LAST_CONTINUATION_BYTE.search(data, i + 1)
+                if match is None:
+                    break
+                end = match.end()
+                value = 0
+                for shift, byte in enumerate(data[i + 1:end]):
+                    value |= (byte & 0x7f) << (7 * shift)
+                i = end
+
+                if kind == _LOCAL_TS:
+                    self._timestamp += value
+                    self._send_event(events.TraceTimestamp((hdr >> 4) & 0x3, self._timestamp))
+                elif kind == _EXTENSION:
+                    self._parse_extension(hdr, ((hdr >> 4) & 0x7) | (value << 3))
+                # TODO handle global timestamp
+            elif kind == _EXTENSION_SHORT:
+                i += 1
+                self._parse_extension(hdr, (hdr >> 4) & 0x7)
+            # Reserved packet.
+            else:
+                i += 1
+
+        # Keep the start of an incomplete packet until more data arrives.
+        if i < length:
+            self._partial_packet = bytes(data[i:])
+
+    def _parse_extension(self, hdr: int, ex: int) -> None:
+        """@brief Handle an extension packet."""
+        sh = (hdr >> 2) & 0x1
+        if sh == 0:
+            # Extension packet with sh==0 sets ITM stimulus page.
+            self._itm_page = ex
+
+    def _parse_hardware_packet(self, hdr: int, size: int, payload: int) -> None:
+        """@brief Create an event for a DWT hardware source packet."""
+        a = (hdr >> 3) & 0x1f
+        timestamp = self._timestamp
+        # Event counter
+        if a == 0:
+            self._send_event(events.TraceEventCounter(payload, timestamp))
+        # Exception trace
+        elif a == 1:
+            exception_number = payload & 0x1ff
+            fn = (payload >> 12) & 0x3
+            if 1 <= fn <= 3:
+                # TODO remove exception name and dependency on core
+                exception_name = self._core.exception_number_to_name(exception_number)
+                self._send_event(events.TraceExceptionEvent(
+                        exception_number, exception_name, fn, timestamp))
+        # Periodic PC
+        elif a == 2:
+            # A payload of 0 indicates a period PC sleep event.
+            self._send_event(events.TracePeriodicPC(payload, timestamp))
+        # Data trace
+        elif 8 <= a <= 23:
+            type = (hdr >> 6) & 0x3
+            cmpn = (hdr >> 4) & 0x3
+            bit3 = (hdr >> 3) & 0x1
+            # PC value
+            if type == 0b01 and bit3 == 0:
+                self._send_event(events.TraceDataTraceEvent(cmpn=cmpn, pc=payload, ts=timestamp))
+            # Address
+            elif type == 0b01 and bit3 == 1:
+                self._send_event(events.TraceDataTraceEvent(cmpn=cmpn, addr=payload, ts=timestamp))
+            # Data value
+            elif type == 0b10:
+                self._send_event(events.TraceDataTraceEvent(
+                        cmpn=cmpn, value=payload, rnw=(bit3 == 0), sz=size, ts=timestamp))
 
     def _flush_events(self) -> None:
         """@brief Send all pending events to event sink."""
-        if self._sink is not None:
-            for event in self._pending_events:
-                self._sink.receive(event)
+        if self._sink is not None and self._pending_events:
+            self._sink.receive_batch(self._pending_events)
         self._pending_events = []
 
     def _merge_data_trace_events(self, event: events.TraceEvent) -> bool:
@@ -92,14 +256,18 @@ class SWOParser:
                 # we can merge the two events. Otherwise we just add them to the pending event
                 # queue separately.
                 if event.comparator == self._pending_data_trace.comparator:
-                    # Merge the two data trace events.
+                    # Merge the two data trace events. Fields can be 0 or False, so compare to None.
+                    pending = self._pending_data_trace
+                    def merged(attr: str) -> Optional[int]:
+                        value = getattr(event, attr)
+                        return value if (value is not None) else getattr(pending, attr)
                     ev = events.TraceDataTraceEvent(cmpn=event.comparator,
-                        pc=(event.pc or self._pending_data_trace.pc),
-                        addr=(event.address or self._pending_data_trace.address),
-                        value=(event.value or self._pending_data_trace.value),
-                        rnw=(event.is_read or self._pending_data_trace.is_read),
-                        sz=(event.transfer_size or self._pending_data_trace.transfer_size),
-                        ts=self._pending_data_trace.timestamp)
+                        pc=merged('pc'),
+                        addr=merged('address'),
+                        value=merged('value'),
+                        rnw=merged('is_read'),
+                        sz=merged('transfer_size'),
+                        ts=pending.timestamp)
                 else:
                     ev = self._pending_data_trace
                 self._pending_events.append(ev)
@@ -137,148 +305,3 @@ class SWOParser:
 
         if flush:
             self._flush_events()
-
-    def _parse(self) -> Generator[None, int, None]:
-        """@brief SWO parser as generator function coroutine.
-
-        The generator yields every time it needs a byte of SWO data. The caller must use the
-        generator's send() method to provide the next byte.
-        """
-        timestamp = 0
-        invalid = False
-        while True:
-            byte = yield
-            hdr = byte
-
-            # Sync packet.
-            if hdr == 0:
-                packets = 0
-                while True:
-                    # Check for final 1 bit after at least 5 all-zero sync packets
-                    if (packets >= 5) and (byte == 0x80):
-                        break
-                    elif byte == 0:
-                        packets += 1
-                    else:
-                        # Get early non-zero packet, reset sync packet counter.
-                        #packets = 0
-                        invalid = True
-                        break
-                    byte = yield
-                self._itm_page = 0
-            # Overflow packet.
-            elif hdr == 0x70:
-                self._send_event(events.TraceOverflow(timestamp))
-            # Protocol packet.
-            elif (hdr & 0x3) == 0:
-                c = (hdr >> 7) & 0x1
-                d = (hdr >> 4) & 0b111
-                # Local timestamp.
-                if (hdr & 0xf) == 0 and d not in (0x0, 0x3):
-                    ts = 0
-                    tc = 0
-                    # Local timestamp packet format 1.
-                    if c == 1:
-                        tc = (hdr >> 4) & 0x3
-                        while c == 1:
-                            byte = yield
-                            ts = (ts << 7) | (byte & 0x7f)
-                            c = (byte >> 7) & 0x1
-                    # Local timestamp packet format 2.
-                    else:
-                        ts = (hdr >> 4) & 0x7
-                    timestamp += ts
-                    self._send_event(events.TraceTimestamp(tc, timestamp))
-                # Global timestamp.
-                elif hdr in (0b10010100, 0b10110100):
-                    # TODO handle global timestamp
-                    # t = (hdr >> 5) & 0x1
-                    pass
-                # Extension.
-                elif (hdr & 0x8) == 0x8:
-                    sh = (hdr >> 2) & 0x1
-                    if c == 0:
-                        ex = (hdr >> 4) & 0x7
-                    else:
-                        ex = 0
-                        while c == 1:
-                            byte = yield
-                            ex = (ex << 7) | (byte & 0x7f)
-                            c = (byte >> 7) & 0x1
-                    if sh == 0:
-                        # Extension packet with sh==0 sets ITM stimulus page.
-                        self._itm_page = ex
-                    else:
-                        #self._send_event(events.TraceEvent("Extension: SH={:d} EX={:#x}\n".format(sh, ex), timestamp))
-                        invalid = True
-                # Reserved packet.
-                else:
-                    invalid = True
-            # Source packet.
-            else:
-                ss = hdr & 0x3
-                l = 1 << (ss - 1)
-                a = (hdr >> 3) & 0x1f
-                if l == 1:
-                    payload = yield
-                elif l == 2:
-                    byte1 = yield
-                    byte2 = yield
-                    payload = (byte1 |
-                                (byte2 << 8))
-                else:
-                    byte1 = yield
-                    byte2 = yield
-                    byte3 = yield
-                    byte4 = yield
-                    payload = (byte1 |
-                                (byte2 << 8) |
-                                (byte3 << 16) |
-                                (byte4 << 24))
-
-                # Instrumentation packet.
-                if (hdr & 0x4) == 0:
-                    port = (self._itm_page * 32) + a
-                    self._send_event(events.TraceITMEvent(port, payload, l, timestamp))
-                # Hardware source packets...
-                # Event counter
-                elif a == 0:
-                    self._send_event(events.TraceEventCounter(payload, timestamp))
-                # Exception trace
-                elif a == 1:
-                    exception_number = payload & 0x1ff
-                    # TODO remove exception name and dependency on core
-                    exception_name = self._core.exception_number_to_name(exception_number)
-                    fn = (payload >> 12) & 0x3
-                    if 1 <= fn <= 3:
-                        self._send_event(events.TraceExceptionEvent(
-                                exception_number, exception_name, fn, timestamp))
-                    else:
-                        invalid = True
-                # Periodic PC
-                elif a == 2:
-                    # A payload of 0 indicates a period PC sleep event.
-                    self._send_event(events.TracePeriodicPC(payload, timestamp))
-                # Data trace
-                elif 8 <= a <= 23:
-                    type = (hdr >> 6) & 0x3
-                    cmpn = (hdr >> 4) & 0x3
-                    bit3 = (hdr >> 3) & 0x1
-                    # PC value
-                    if type == 0b01 and bit3 == 0:
-                        self._send_event(events.TraceDataTraceEvent(cmpn=cmpn, pc=payload, ts=timestamp))
-                    # Address
-                    elif type == 0b01 and bit3 == 1:
-                        self._send_event(events.TraceDataTraceEvent(cmpn=cmpn, addr=payload, ts=timestamp))
-                    # Data value
-                    elif type == 0b10:
-                        self._send_event(events.TraceDataTraceEvent(
-                                cmpn=cmpn, value=payload, rnw=(bit3 == 0), sz=l, ts=timestamp))
-                    else:
-                        invalid = True
-                # Invalid DWT 'a' value.
-                else:
-                    invalid = True
-
-
-
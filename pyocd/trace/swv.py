@@ -19,7 +19,7 @@
 import logging
 import threading
 from time import sleep
-from typing import (Optional, TextIO, TYPE_CHECKING)
+from typing import (Optional, Sequence, TextIO, TYPE_CHECKING)
 
 from .sink import TraceEventSink
 from .events import (TraceEvent, TraceITMEvent)
@@ -72,6 +72,26 @@ class SWVEventSink(TraceEventSink):
 
         self._console.write(data)
 
+    def receive_batch(self, events: Sequence[TraceEvent]) -> None:
+        """@brief Handle a batch of SWV trace events.
+
+        The bytes of all ITM events in the batch are written to the console with a single write.
+
+        @param self
+        @param events Sequence of TraceEvent instances. Events other than TraceITMEvent are ignored.
+        """
+        data = bytearray()
+        for event in events:
+            if isinstance(event, TraceITMEvent):
+                width = event.width
+                if width == 1:
+                    data.append(event.data)
+                elif width in (2, 4):
+                    data += event.data.to_bytes(width, 'little')
+        if data:
+            # Each byte maps to the character with the same code, as with chr() in receive().
+            self._console.write(data.decode('latin-1'))
+
 class SWVReader(threading.Thread):
     """@brief Sets up SWV and processes data in a background thread."""
 
@@ -206,7 +226,9 @@ class SWVReader(threading.Thread):
             if self._lock:
                 self._lock.release()
 
-            sleep(0.001)
+            # Read again right away while data is streaming, otherwise limit polling to
+            # 1000 times per second. A zero sleep still gives other threads a chance to run.
+            sleep(0 if data else 0.001)
 
             if self._lock:
                 self._lock.acquire()
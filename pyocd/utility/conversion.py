@@ -17,7 +17,7 @@
 
 import struct
 import binascii
-from typing import (Any, Iterator, List, Sequence, Tuple, cast)
+from typing import (Any, Iterator, List, Sequence, Tuple, Union, cast)
 
 from .mask import align_up
 
@@ -81,6 +81,21 @@ def u32le_list_to_byte_list(data: Sequence[int]) -> List[int]:
         res.append((x >> 24) & 0xff)
     return res
 
+def u32le_list_to_bytes(data: Sequence[int]) -> bytes:
+    """@brief Convert a word array into a bytes object.
+
+    The conversion is performed with a single struct pack operation, so it is much faster than
+    u32le_list_to_byte_list() for large arrays.
+    """
+    return struct.pack(f"<{len(data)}I", *data)
+
+def bytes_to_u32le_list(data: Union[bytes, bytearray, memoryview]) -> List[int]:
+    """@brief Convert a bytes-like object into a word array.
+
+    The length of the data must be a multiple of 4.
+    """
+    return list(struct.unpack(f"<{len(data) // 4}I", data))
+
 def u16le_list_to_byte_list(data: Sequence[int]) -> List[int]:
     """@brief Convert a halfword array into a byte array"""
     byte_data = []
@@ -123,7 +138,8 @@ def uint_to_hex_le(value: int, width: int) -> str:
         next whole byte. The bytes represent `value` in little-endian order. That is, the first hex
         byte contains the LSB of `value`, while the last hex byte the MSB.
     """
-    return ''.join("%02x" % ((value >> b) & 0xff) for b in range(0, align_up(width, 8), 8))
+    byte_count = align_up(width, 8) // 8
+    return (value & ((1 << (byte_count * 8)) - 1)).to_bytes(byte_count, 'little').hex()
 
 def hex_le_to_uint(value: str, width: int) -> int:
     """@brief Create an an integer value from an n-digit hexadecimal string.
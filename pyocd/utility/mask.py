@@ -135,6 +135,9 @@ def same(d1: Sequence[Any], d2: Sequence[Any]) -> bool:
     """
     if len(d1) != len(d2):
         return False
+    # Bytes-like sequences can be compared directly.
+    if isinstance(d1, (bytes, bytearray, memoryview)) and isinstance(d2, (bytes, bytearray, memoryview)):
+        return d1 == d2
     for i in range(len(d1)):
         if d1[i] != d2[i]:
             return False
@@ -17,18 +17,18 @@
 from abc import ABC, abstractmethod
 import selectors
 import socket
-from typing import Optional, Sequence
+from typing import List, Optional, Union
 
 from ..core.soc_target import SoCTarget
 from ..core import exceptions
-from ..debug.rtt import RTTControlBlock, RTTUpChannel, RTTDownChannel
+from ..debug.rtt import RTTControlBlock, RTTDownChannel
 
 
 class RTTChanWorker(ABC):
     """@brief Source and sink for data to be transferred over RTT. """
 
     @abstractmethod
-    def write_up_data(self, data: bytes) -> int:
+    def write_up_data(self, data: Union[bytes, bytearray, memoryview]) -> int:
         """@brief Write data that has been received from an up channel to the
                   correct destination.
 
@@ -56,6 +56,8 @@ class RTTChanTCPWorker(RTTChanWorker):
     """@brief Implementation of channel worker that forwards RTT data via a TCP
               socket. """
 
+    server: Optional[socket.socket]
+    client: Optional[socket.socket]
     port: int
 
     def __init__(self, port: int, listen: bool = True):
@@ -92,13 +94,17 @@ class RTTChanTCPWorker(RTTChanWorker):
                 self.client, _ = self.server.accept()
                 self.client.setblocking(False)
 
-    def write_up_data(self, data: bytes):
+    def write_up_data(self, data: Union[bytes, bytearray, memoryview]):
         if self.client is None:
             self._check_for_new_client()
             if self.client is None:
                 return 0
 
-        return self.client.send(data)
+        try:
+            return self.client.send(data)
+        except BlockingIOError:
+            # The socket's send buffer is full; the data stays buffered until the next poll.
+            return 0
 
     def get_down_data(self):
         if self.client is None:
@@ -136,9 +142,9 @@ class RTTServer:
     """@brief Keeps track of polling for multiple active RTT channels and the
               sources and sinks of data for each channel. """
     control_block: RTTControlBlock
-    workers: Optional[Sequence[Optional[RTTChanWorker]]]
-    up_buffers: Optional[Sequence[bytes]]
-    down_buffers: Optional[Sequence[bytes]]
+    workers: Optional[List[Optional[RTTChanWorker]]]
+    up_buffers: Optional[List[bytearray]]
+    down_buffers: Optional[List[bytearray]]
 
     def __init__(self, target: SoCTarget, address: int, size: int,
                  control_block_id: bytes):
@@ -158,39 +164,54 @@ class RTTServer:
         self.up_buffers = None
         self.down_buffers = None
 
-    def poll(self):
-        """@brief Reads from and writes to active RTT channels. """
+    def poll(self) -> int:
+        """@brief Reads from and writes to active RTT channels.
+
+        All up channels with a worker are read in one batch. Data waiting to be passed on is kept
+        in a bytearray per channel.
+
+        @return The number of bytes transferred in either direction. Callers can poll more often
+            while data is flowing.
+        """
         if not self.running:
             # not yet started
-            return
+            return 0
+        assert self.workers is not None
+        assert self.up_buffers is not None
+        assert self.down_buffers is not None
+
+        transferred = 0
+
+        # Read from up channels
+        up_channels = [i for i, worker in enumerate(self.workers)
+                if (worker is not None) and (i < len(self.up_buffers))]
+        for i, data in zip(up_channels, self.control_block.read_up_channels(up_channels)):
+            self.up_buffers[i] += data
+            transferred += len(data)
 
         for i, worker in enumerate(self.workers):
             if worker is None:
                 continue
 
-            # Read from up channel
-            try:
-                up_chan: RTTUpChannel = self.control_block.up_channels[i]
-            except IndexError:
-                pass
-            else:
-                self.up_buffers[i] += up_chan.read()
-
             # Write to worker
-            bytes_written = worker.write_up_data(self.up_buffers[i])
-            self.up_buffers[i] = self.up_buffers[i][bytes_written:]
+            if (i < len(self.up_buffers)) and self.up_buffers[i]:
+                up_buffer = self.up_buffers[i]
+                with memoryview(up_buffer) as view:
+                    bytes_written = worker.write_up_data(view)
+                del up_buffer[:bytes_written]
 
             # Read from worker
-            self.down_buffers[i] += worker.get_down_data()
+            if i < len(self.down_buffers):
+                self.down_buffers[i] += worker.get_down_data()
+
+                # Write data to down channel
+                if self.down_buffers[i]:
+                    down_chan: RTTDownChannel = self.control_block.down_channels[i]
+                    bytes_out: int = down_chan.write(bytes(self.down_buffers[i]))
+                    del self.down_buffers[i][:bytes_out]
+                    transferred += bytes_out
 
-            # Write data to down channel
-            try:
-                down_chan: RTTDownChannel = self.control_block.down_channels[i]
-            except IndexError:
-                pass
-            else:
-                bytes_out: int = down_chan.write(self.down_buffers[i])
-                self.down_buffers[i] = self.down_buffers[i][bytes_out:]
+        return transferred
 
     def start(self):
         """@brief Find and parse RTT control block. """
@@ -201,13 +222,14 @@ class RTTServer:
         num_chans: int = max(num_up_chans, num_down_chans)
 
         self.workers = [None] * num_chans
-        self.up_buffers = [bytes()] * num_up_chans
-        self.down_buffers = [bytes()] * num_down_chans
+        self.up_buffers = [bytearray() for _ in range(num_up_chans)]
+        self.down_buffers = [bytearray() for _ in range(num_down_chans)]
 
     def stop(self):
         """@brief Close all RTT workers. """
         if not self.running:
             return
+        assert self.workers is not None
 
         for i, worker in enumerate(self.workers):
             if worker is not None:
@@ -230,7 +252,8 @@ class RTTServer:
         """
         if not self.running:
             raise exceptions.RTTError("RTT is not yet started")
-        elif self.workers[channel] is not None:
+        assert self.workers is not None
+        if self.workers[channel] is not None:
             raise exceptions.RTTError(f"RTT is already started for channel {channel}")
 
         self.workers[channel] = RTTChanTCPWorker(port, listen = True)
@@ -243,6 +266,7 @@ class RTTServer:
 
         if not self.running:
             return
+        assert self.workers is not None
 
         for i, worker in enumerate(self.workers):
             if isinstance(worker, RTTChanTCPWorker):
@@ -123,6 +123,23 @@ class ClientSocket(object):
     def write(self, data):
         return self._socket.sendall(data)
 
+    def read_exact(self, length):
+        """@brief Read exactly _length_ bytes, blocking until all have been received.
+
+        @exception ConnectionError The connection was closed before all data was received.
+        """
+        while len(self._buffer) < length:
+            try:
+                data = self.read(max(self._packet_size, length - len(self._buffer)))
+            except socket.timeout:
+                continue
+            if not data:
+                raise ConnectionError("connection closed by remote host")
+            self._buffer += data
+        data = bytes(self._buffer[:length])
+        del self._buffer[:length]
+        return data
+
     def readline(self):
         while True:
             # Try to extract a line from the buffer.
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""@brief Generate pyocd/target/builtin/manifest.py.
+
+Every builtin target is imported and instantiated with a stub probe to read its vendor, part number,
+and part families. These are written to the manifest module so that target lists can be produced
+without importing every target module.
+
+Pass --check to verify the manifest is up to date instead of writing it.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+import sys
+from typing import List
+
+from pyocd.core.session import Session
+from pyocd.target.builtin import BUILTIN_TARGETS
+from pyocd.tools.lists import StubProbe
+
+MANIFEST_PATH = Path(__file__).resolve().parents[1] / "pyocd" / "target" / "builtin" / "manifest.py"
+
+HEADER = '''\
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# This file is generated by scripts/generate_builtin_target_manifest.py. Do not edit.
+
+from typing import (Dict, List, NamedTuple)
+
+class BuiltinTargetInfo(NamedTuple):
+    """@brief Information about a builtin target that is available without importing the target."""
+    vendor: str
+    part_number: str
+    part_families: List[str]
+
+## @brief Information about each builtin target, keyed by target type name.
+BUILTIN_TARGET_INFO: Dict[str, BuiltinTargetInfo] = {
+'''
+
+def generate() -> str:
+    # Instantiating targets may log warnings, e.g. about SVD files, that aren't relevant here.
+    logging.disable(logging.WARNING)
+    lines: List[str] = [HEADER]
+    for name in BUILTIN_TARGETS:
+        s = Session(StubProbe(), no_config=True, target_override='cortex_m')
+        t = BUILTIN_TARGETS[name](s)
+        lines.append(f"    {name!r}: BuiltinTargetInfo({t.vendor!r}, {t.part_number!r}, {list(t.part_families)!r}),\n")
+    lines.append("    }\n")
+    return "".join(lines)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate the builtin target manifest.")
+    parser.add_argument("--check", action='store_true',
+        help="Exit with an error if the manifest is out of date instead of writing it.")
+    args = parser.parse_args()
+
+    manifest = generate()
+    if args.check:
+        if MANIFEST_PATH.read_text() != manifest:
+            print(f"{MANIFEST_PATH} is out of date", file=sys.stderr)
+            return 1
+        return 0
+
+    MANIFEST_PATH.write_text(manifest)
+    print(f"Wrote {MANIFEST_PATH}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""@brief Measure ELF symbol lookup with a large synthetic ELF file.
+
+A little-endian ELF32 file is generated with a symbol table of function and object symbols and
+a GNU build ID note. The times reported are:
+
+- read: reading the symbol table.
+- intervaltree: building an IntervalTree of the symbols and looking up random addresses, as was
+    done by ElfSymbolDecoder before it used sorted arrays.
+- index: building the ElfSymbolDecoder address index and looking up the same addresses.
+- cached: creating a new decoder that loads the symbols from the index cache, and the first lookup.
+"""
+
+import argparse
+import io
+import random
+import struct
+import tempfile
+from time import perf_counter
+
+from elftools.elf.elffile import ELFFile
+from intervaltree import IntervalTree
+
+from pyocd.debug.elf.decoder import ElfSymbolDecoder
+
+STT_OBJECT = 1
+STT_FUNC = 2
+STB_GLOBAL = 1
+SHT_PROGBITS = 1
+SHT_SYMTAB = 2
+SHT_STRTAB = 3
+SHT_NOTE = 7
+
+def make_elf(count: int, rng: random.Random) -> bytes:
+    """@brief Return the contents of an ELF file with the given number of symbols."""
+    strtab = bytearray(b'\x00')
+    symtab = bytearray(16) # Null symbol.
+    addr = 0x1000
+    for i in range(count):
+        is_func = rng.random() < 0.7
+        size = rng.randint(2, 0x200) & ~1 if is_func else rng.choice((0, 1, 2, 4, 8, 64))
+        name_offset = len(strtab)
+        strtab += ("%s_%d" % ("function" if is_func else "object", i)).encode() + b'\x00'
+        symtab += struct.pack('<IIIBBH', name_offset, addr | int(is_func), size,
+                (STB_GLOBAL << 4) | (STT_FUNC if is_func else STT_OBJECT), 0, 1)
+        addr += size + rng.choice((0, 0, 2, 4))
+    note = struct.pack('<III', 4, 20, 3) + b'GNU\x00' + bytes(rng.getrandbits(8) for _ in range(20))
+    shstrtab = b'\x00.text\x00.symtab\x00.strtab\x00.shstrtab\x00.note.gnu.build-id\x00'
+
+    # Section contents follow the ELF header, then the section header table.
+    out = bytearray(52)
+    offsets = []
+    for data in (symtab, bytes(strtab), shstrtab, note):
+        offsets.append(len(out))
+        out += data
+        out += bytes(-len(out) % 4)
+    shoff = len(out)
+    sections = [
+        (0, 0, 0, 0, 0, 0, 0, 0, 0, 0),
+        (shstrtab.index(b'.text'), SHT_PROGBITS, 6, 0x1000, 0, addr - 0x1000, 0, 0, 2, 0),
+        (shstrtab.index(b'.symtab'), SHT_SYMTAB, 0, 0, offsets[0], len(symtab), 3, 1, 4, 16),
+        (shstrtab.index(b'.strtab'), SHT_STRTAB, 0, 0, offsets[1], len(strtab), 0, 0, 1, 0),
+        (shstrtab.index(b'.shstrtab'), SHT_STRTAB, 0, 0, offsets[2], len(shstrtab), 0, 0, 1, 0),
+        (shstrtab.index(b'.note.gnu.build-id'), SHT_NOTE, 2, 0, offsets[3], len(note), 0, 0, 4, 0),
+        ]
+    for section in sections:
+        out += struct.pack('<10I', *section)
+    # The .text section has no contents in the file, which is fine since it is never read.
+    out[0:52] = struct.pack('<16sHHIIIIIHHHHHH', b'\x7fELF\x01\x01\x01' + bytes(9),
+            2, 40, 1, 0x1001, 0, shoff, 0x05000000, 52, 32, 0, 40, len(sections), 4)
+    return bytes(out)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--symbols", type=int, default=100000, help="Number of symbols (default 100000).")
+    parser.add_argument("-l", "--lookups", type=int, default=100000, help="Number of lookups (default 100000).")
+    args = parser.parse_args()
+
+    rng = random.Random(1234)
+    elf = ELFFile(io.BytesIO(make_elf(args.symbols, rng)))
+
+    start = perf_counter()
+    decoder = ElfSymbolDecoder(elf)
+    symbols = list(decoder.symbol_dict.values())
+    read_time = perf_counter() - start
+    end_address = max(s.address + s.size for s in symbols)
+    addresses = [rng.randrange(0x1000, end_address + 0x100) for _ in range(args.lookups)]
+
+    start = perf_counter()
+    tree = IntervalTree()
+    for sym in symbols:
+        tree.addi(sym.address, sym.address + max(sym.size, 1), sym)
+    tree_build_time = perf_counter() - start
+    start = perf_counter()
+    tree_results = []
+    for addr in addresses:
+        matches = sorted(tree[addr])
+        tree_results.append(matches[0].data if matches else None)
+    tree_lookup_time = perf_counter() - start
+
+    start = perf_counter()
+    decoder.get_symbol_for_address(0)
+    index_build_time = perf_counter() - start
+    start = perf_counter()
+    index_results = [decoder.get_symbol_for_address(addr) for addr in addresses]
+    index_lookup_time = perf_counter() - start
+    assert index_results == tree_results
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        ElfSymbolDecoder(elf, cache_dir).get_symbol_for_address(0)
+        start = perf_counter()
+        ElfSymbolDecoder(elf, cache_dir).get_symbol_for_address(addresses[0])
+        cached_time = perf_counter() - start
+
+    print("%d symbols, %d lookups" % (len(symbols), len(addresses)))
+    print("read:          %8.3f s" % read_time)
+    print("intervaltree:  %8.3f s build, %8.3f s lookup (%.2f us/lookup)"
+            % (tree_build_time, tree_lookup_time, tree_lookup_time / len(addresses) * 1e6))
+    print("index:         %8.3f s build, %8.3f s lookup (%.2f us/lookup)"
+            % (index_build_time, index_lookup_time, index_lookup_time / len(addresses) * 1e6))
+    print("cached:        %8.3f s load and build" % cached_time)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""@brief Measure pyOCD import time in fresh interpreters.
+
+Each case runs in a new Python process so module caching doesn't affect the results. The
+"all targets" case imports every builtin target module, as pyOCD did before targets were loaded on
+demand.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import List
+
+CASES = [
+    ("import pyocd",
+        "import pyocd"),
+    ("list targets",
+        "from pyocd.tools.lists import ListGenerator; ListGenerator.list_targets(source_filter='builtin')"),
+    ("one target",
+        "from pyocd.target import TARGET; TARGET['k64f']"),
+    ("all targets",
+        "from pyocd.target import TARGET; [TARGET[name] for name in TARGET]"),
+    ]
+
+def time_case(code: str, repeat: int) -> List[float]:
+    # Time is measured inside the child process to exclude interpreter startup.
+    timed = f"import time; t = time.perf_counter(); {code}; print(time.perf_counter() - t)"
+    return [float(subprocess.check_output([sys.executable, "-c", timed])) for _ in range(repeat)]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure pyOCD import time.")
+    parser.add_argument("-r", "--repeat", type=int, default=10,
+        help="Number of processes to run for each case. Default is 10.")
+    args = parser.parse_args()
+
+    for name, code in CASES:
+        times = time_case(code, args.repeat)
+        print(f"{name:>14}: median {statistics.median(times) * 1000:7.1f} ms, "
+                f"min {min(times) * 1000:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""@brief Compare listing devices from CMSIS-Packs with and without the pack index.
+
+Simulates a system with many installed packs by copying the given packs into a temporary directory
+the requested number of times. Three cases are timed:
+
+- parse: open every pack and parse its PDSC, as was done before the index existed.
+- cold: index every pack with an empty index, then save the index.
+- warm: load the saved index and list every pack's devices.
+"""
+
+import argparse
+from pathlib import Path
+import shutil
+import tempfile
+from time import perf_counter
+from typing import (Callable, List)
+
+from pyocd.target.pack.cmsis_pack import CmsisPack
+from pyocd.target.pack.pack_index import PackIndex
+
+DEFAULT_PACK = Path(__file__).resolve().parent / "data" / "packs" / "NXP.MK64F12_DFP.11.0.0.pack"
+
+def time_it(name: str, repeat: int, fn: Callable[[], int]) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = perf_counter()
+        device_count = fn()
+        best = min(best, perf_counter() - start)
+    print(f"{name:>6}: {best * 1000:9.2f} ms ({device_count} devices)")
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0].replace("@brief ", ""))
+    parser.add_argument("packs", metavar="PACK", nargs='*', type=Path, default=[DEFAULT_PACK],
+        help="Pack files to benchmark with. Defaults to a pack from the test data.")
+    parser.add_argument("-n", "--count", type=int, default=30,
+        help="Number of copies of each pack to install. Default is 30.")
+    parser.add_argument("-r", "--repeat", type=int, default=3,
+        help="Number of times to repeat each measurement. The best time is reported. Default is 3.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        pack_paths: List[Path] = []
+        for pack in args.packs:
+            for i in range(args.count):
+                dest = tmp_path / f"{pack.stem}.{i}{pack.suffix}"
+                shutil.copyfile(pack, dest)
+                pack_paths.append(dest)
+        index_path = tmp_path / PackIndex.FILENAME
+        print(f"Benchmarking with {len(pack_paths)} packs")
+
+        def parse() -> int:
+            return sum(len(CmsisPack(p).devices) for p in pack_paths)
+
+        def cold() -> int:
+            index_path.unlink(missing_ok=True)
+            index = PackIndex(index_path)
+            count = sum(len(index.get_devices(p)) for p in pack_paths)
+            index.save()
+            return count
+
+        def warm() -> int:
+            index = PackIndex(index_path)
+            return sum(len(index.get_devices(p)) for p in pack_paths)
+
+        parse_time = time_it("parse", args.repeat, parse)
+        time_it("cold", args.repeat, cold)
+        warm_time = time_it("warm", args.repeat, warm)
+        print(f"Warm index is {parse_time / warm_time:.1f}x faster than parsing")
+
+if __name__ == "__main__":
+    main()
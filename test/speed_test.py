@@ -111,13 +111,15 @@ def speed_test(board_id):
 
         test_config = "uncached 8-bit"
 
-        def test_ram(record_speed=False, width=8):
+        def test_ram(record_speed=False, width=8, bytes_api=False):
             print("\n\n------ TEST RAM READ / WRITE SPEED [%s] ------" % test_config)
             test_addr = ram_start
             test_size = ram_size
             data = [randrange(1, 50) for x in range(test_size)]
             start = time()
-            if width == 8:
+            if bytes_api:
+                target.write_memory_block_bytes(test_addr, bytes(data))
+            elif width == 8:
                 target.write_memory_block8(test_addr, data)
             elif width == 32:
                 target.write_memory_block32(test_addr, conversion.byte_list_to_u32le_list(data))
@@ -133,7 +135,9 @@ def speed_test(board_id):
                 result.write_speed = write_speed
             print("Writing %i byte took %.3f seconds: %.3f B/s" % (test_size, diff, write_speed))
             start = time()
-            if width == 8:
+            if bytes_api:
+                block = target.read_memory_block_bytes(test_addr, test_size)
+            elif width == 8:
                 block = target.read_memory_block8(test_addr, test_size)
             elif width == 32:
                 block = conversion.u32le_list_to_byte_list(target.read_memory_block32(test_addr, test_size // 4))
@@ -163,12 +167,14 @@ def speed_test(board_id):
                 print("TEST PASSED")
             return not error
 
-        def test_rom(record_speed=False, width=8):
+        def test_rom(record_speed=False, width=8, bytes_api=False):
             print("\n\n------ TEST ROM READ SPEED [%s] ------" % test_config)
             test_addr = rom_start
             test_size = rom_size
             start = time()
-            if width == 8:
+            if bytes_api:
+                block = target.read_memory_block_bytes(test_addr, test_size)
+            elif width == 8:
                 block = target.read_memory_block8(test_addr, test_size)
             elif width == 32:
                 block = conversion.u32le_list_to_byte_list(target.read_memory_block32(test_addr, test_size // 4))
@@ -205,6 +211,16 @@ def speed_test(board_id):
         test_count += 1
         test_pass_count += int(passed)
 
+        # Bytes API without memcache
+        test_config = "uncached bytes"
+        passed = test_ram(False, bytes_api=True)
+        test_count += 1
+        test_pass_count += int(passed)
+
+        passed = test_rom(False, bytes_api=True)
+        test_count += 1
+        test_pass_count += int(passed)
+
         # With memcache
         target = target.get_target_context()
         test_config = "cached 8-bit, pass 1"
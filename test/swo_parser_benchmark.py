@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""@brief Measure SWO parser throughput with synthetic SWO streams.
+
+Each stream is parsed in chunks of the given sizes. Throughput is reported in MB/s of SWO data and
+as the highest UART (NRZ) SWO baud rate that could be sustained, at 10 bits per byte.
+
+- text: 8-bit ITM writes to port 0 with a local timestamp every 16 packets, like printf output.
+- itm32: 32-bit ITM writes to several ports with a local timestamp every 8 packets.
+- mixed: ITM writes, exception trace, periodic PC samples, and data trace, with timestamps.
+"""
+
+import argparse
+import io
+import random
+from time import perf_counter
+from typing import (Callable, Dict)
+
+from pyocd.trace.swo import SWOParser
+from pyocd.trace.swv import SWVEventSink
+
+class FakeCore:
+    def exception_number_to_name(self, exc_num: int) -> str:
+        return "Exception%d" % exc_num
+
+def itm(port: int, data: int, width: int) -> bytes:
+    return bytes([((port & 0x1f) << 3) | {1: 1, 2: 2, 4: 3}[width]]) + data.to_bytes(width, 'little')
+
+def local_timestamp(rng: random.Random) -> bytes:
+    if rng.random() < 0.5:
+        # Format 2, single byte.
+        return bytes([rng.randint(1, 6) << 4])
+    else:
+        # Format 1 with a two byte payload.
+        return b'\xc0' + bytes([0x80 | rng.randint(0, 0x7f), rng.randint(0, 0x7f)])
+
+def make_text(size: int, rng: random.Random) -> bytes:
+    out = bytearray()
+    while len(out) < size:
+        for _ in range(16):
+            out += itm(0, rng.randint(0x20, 0x7e), 1)
+        out += local_timestamp(rng)
+    return bytes(out)
+
+def make_itm32(size: int, rng: random.Random) -> bytes:
+    out = bytearray()
+    while len(out) < size:
+        for _ in range(8):
+            out += itm(rng.randint(0, 7), rng.getrandbits(32), 4)
+        out += local_timestamp(rng)
+    return bytes(out)
+
+def make_mixed(size: int, rng: random.Random) -> bytes:
+    out = bytearray()
+    while len(out) < size:
+        choice = rng.random()
+        if choice < 0.4:
+            out += itm(rng.randint(0, 31), rng.getrandbits(8), 1)
+        elif choice < 0.6:
+            # Exception entry or exit.
+            out += b'\x0e' + (rng.randint(1, 3) << 12 | rng.randint(1, 100)).to_bytes(2, 'little')
+        elif choice < 0.8:
+            # Periodic PC.
+            out += b'\x17' + rng.getrandbits(32).to_bytes(4, 'little')
+        else:
+            # Data trace PC and value for comparator 0.
+            out += b'\x47' + rng.getrandbits(32).to_bytes(4, 'little')
+            out += b'\x8f' + rng.getrandbits(32).to_bytes(4, 'little')
+        if rng.random() < 0.1:
+            out += local_timestamp(rng)
+    return bytes(out)
+
+STREAMS: Dict[str, Callable[[int, random.Random], bytes]] = {
+    'text': make_text,
+    'itm32': make_itm32,
+    'mixed': make_mixed,
+    }
+
+def run(data: bytes, chunk_size: int) -> float:
+    parser = SWOParser(FakeCore(), SWVEventSink(io.StringIO()))
+    start = perf_counter()
+    for offset in range(0, len(data), chunk_size):
+        parser.parse(data[offset:offset + chunk_size])
+    elapsed = perf_counter() - start
+    assert parser.bytes_parsed == len(data)
+    return elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0].replace("@brief ", ""))
+    parser.add_argument("-s", "--size", type=int, default=1024 * 1024,
+        help="Size in bytes of each synthetic stream. Default is 1 MiB.")
+    parser.add_argument("-c", "--chunk-size", type=int, action='append',
+        help="Size of the chunks passed to the parser. Can be repeated. Default is 1, 64, and 4096.")
+    parser.add_argument("-r", "--repeat", type=int, default=3,
+        help="Number of times to repeat each measurement. The best time is reported. Default is 3.")
+    parser.add_argument("stream", nargs='*', choices=[[]] + list(STREAMS.keys()),
+        help="Streams to benchmark. Default is all.")
+    args = parser.parse_args()
+
+    rng = random.Random(1234)
+    for name in (args.stream or STREAMS.keys()):
+        data = STREAMS[name](args.size, rng)
+        for chunk_size in (args.chunk_size or [1, 64, 4096]):
+            best = min(run(data, chunk_size) for _ in range(args.repeat))
+            rate = len(data) / best
+            print(f"{name:>6} chunk={chunk_size:<5}: {rate / 1e6:7.2f} MB/s ({rate * 10 / 1e6:6.2f} Mbaud)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# pyOCD debugger
+# Copyright (c) 2022 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import pytest
+import struct
+
+from pyocd.probe.pydapaccess.dap_access_cmsis_dap import DAPAccessCMSISDAP
+from pyocd.probe.pydapaccess.cmsis_dap_core import Command
+from pyocd.utility.conversion import u32le_list_to_bytes
+
+READ = 1 << 1
+
+class MockDAPInterface:
+    """@brief Loopback CMSIS-DAP interface that implements DAP_Transfer and DAP_TransferBlock.
+
+    Reads of any register return successive values of a counter. Written values are recorded.
+    """
+
+    vendor_name = "Mock"
+    product_name = "Mock CMSIS-DAP"
+    vid = 0
+    pid = 0
+    is_bulk = True
+
+    def __init__(self, packet_count=4):
+        self.packet_count = packet_count
+        self.responses = collections.deque()
+        self.written = []
+        self.packets_sent = 0
+        self.max_outstanding = 0
+        self._counter = 0
+
+    def get_serial_number(self):
+        return "mock"
+
+    def get_packet_count(self):
+        return self.packet_count
+
+    def _next_read(self):
+        value = self._counter
+        self._counter += 1
+        return struct.pack('<I', value)
+
+    def write(self, data):
+        data = bytes(data)
+        self.packets_sent += 1
+        if data[0] == Command.DAP_TRANSFER_BLOCK:
+            _, _, count, request = struct.unpack_from('<BBHB', data)
+            response = bytearray(struct.pack('<BHB', Command.DAP_TRANSFER_BLOCK, count, 1))
+            if request & READ:
+                for _ in range(count):
+                    response += self._next_read()
+            else:
+                self.written += struct.unpack_from('<%dI' % count, data, 5)
+        else:
+            assert data[0] == Command.DAP_TRANSFER
+            count = data[2]
+            response = bytearray(struct.pack('<BBB', Command.DAP_TRANSFER, count, 1))
+            pos = 3
+            for _ in range(count):
+                request = data[pos]
+                pos += 1
+                if request & READ:
+                    response += self._next_read()
+                else:
+                    self.written.append(struct.unpack_from('<I', data, pos)[0])
+                    pos += 4
+        self.responses.append(response)
+        self.max_outstanding = max(self.max_outstanding, len(self.responses))
+
+    def read(self):
+        return self.responses.popleft()
+
+@pytest.fixture(scope='function')
+def iface():
+    return MockDAPInterface()
+
+@pytest.fixture(scope='function')
+def dap(iface):
+    link = DAPAccessCMSISDAP(None, interface=iface)
+    link._packet_size = 64
+    link._init_deferred_buffers()
+    return link
+
+class TestDAPAccessCMSISDAP:
+    def test_read_repeat_bytes_spans_packets(self, dap, iface):
+        # 300 words is many 64-byte packets.
+        data = dap.reg_read_repeat_bytes(300, DAPAccessCMSISDAP.REG.AP_0xC)
+        assert data == u32le_list_to_bytes(list(range(300)))
+        assert iface.packets_sent > 1
+
+    def test_read_repeat_list(self, dap):
+        assert dap.reg_read_repeat(20, DAPAccessCMSISDAP.REG.AP_0xC) == list(range(20))
+
+    def test_deferred_reads(self, dap, iface):
+        dap.set_deferred_transfer(True)
+        cb1 = dap.read_reg(DAPAccessCMSISDAP.REG.AP_0x0, now=False)
+        cb2 = dap.reg_read_repeat_bytes(100, DAPAccessCMSISDAP.REG.AP_0xC, now=False)
+        cb3 = dap.read_reg(DAPAccessCMSISDAP.REG.AP_0x4, now=False)
+        assert cb1() == 0
+        assert cb2() == u32le_list_to_bytes(list(range(1, 101)))
+        assert cb3() == 101
+        assert iface.max_outstanding > 1
+
+    def test_write_repeat(self, dap, iface):
+        values = [0x12345678 + i for i in range(50)]
+        dap.reg_write_repeat(len(values), DAPAccessCMSISDAP.REG.AP_0xC, values)
+        dap.reg_write_repeat_bytes(DAPAccessCMSISDAP.REG.AP_0xC, memoryview(u32le_list_to_bytes(values)))
+        dap.flush()
+        assert iface.written == values + values
+
+    def test_mixed_transfer(self, dap, iface):
+        # Mixing requests forces DAP_Transfer encoding.
+        dap.set_deferred_transfer(True)
+        dap.write_reg(DAPAccessCMSISDAP.REG.AP_0x4, 0xaabbccdd)
+        cb = dap.read_reg(DAPAccessCMSISDAP.REG.AP_0xC, now=False)
+        dap.write_reg(DAPAccessCMSISDAP.REG.AP_0x0, 0x11223344)
+        assert cb() == 0
+        assert iface.written == [0xaabbccdd, 0x11223344]
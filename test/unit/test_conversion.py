@@ -23,6 +23,8 @@ from pyocd.utility.conversion import (
     nbit_le_list_to_byte_list,
     byte_list_to_u32le_list,
     u32le_list_to_byte_list,
+    u32le_list_to_bytes,
+    bytes_to_u32le_list,
     u16le_list_to_byte_list,
     byte_list_to_u16le_list,
     u32_to_float32,
@@ -154,6 +156,15 @@ class TestConversionUtilities(object):
         ]
         assert u32le_list_to_byte_list(data) == list(range(32))
 
+    def test_u32le_list_to_bytes(self):
+        assert u32le_list_to_bytes([]) == b''
+        assert u32le_list_to_bytes([0x03020100, 0x07060504]) == bytes(range(8))
+
+    def test_bytes_to_u32le_list(self):
+        assert bytes_to_u32le_list(b'') == []
+        assert bytes_to_u32le_list(bytes(range(8))) == [0x03020100, 0x07060504]
+        assert bytes_to_u32le_list(memoryview(bytearray(range(8)))[4:]) == [0x07060504]
+
     def test_u16leListToByteList(self):
         data = [0x3412, 0xFEAB]
         assert u16le_list_to_byte_list(data) == [
@@ -197,6 +208,10 @@ class TestConversionUtilities(object):
     def test_uint_to_hex_le_odd_width(self):
         assert uint_to_hex_le(0xd0102ABCD, 36) == "cdab02010d"
 
+    def test_uint_to_hex_le_truncates(self):
+        assert uint_to_hex_le(0x123456789, 32) == "89674523"
+        assert uint_to_hex_le(0x0102030405060708, 64) == "0807060504030201"
+
     def test_hex_le_to_uint_odd_width(self):
         assert hex_le_to_uint("0102ABCD0d", 36) == 0x0dCDAB0201
 
@@ -265,7 +280,7 @@ class TestGdbEscape(object):
     @pytest.mark.parametrize("data",
         [six.int2byte(x) for x in range(256) if (x not in ESCAPEES)])
     def test_unescape_passthrough(self, data):
-        assert unescape(data) == [six.byte2int(data)]
+        assert unescape(data) == data
 
     @pytest.mark.parametrize(("expected", "data"), [
             (0x23, b'}\x03'),
@@ -274,11 +289,11 @@ class TestGdbEscape(object):
             (0x2a, b'}\x0a')
         ])
     def test_unescape_1(self, data, expected):
-        assert unescape(data) == [expected]
+        assert unescape(data) == six.int2byte(expected)
 
     def test_unescape_2(self):
         assert unescape(b'1234}\x0309}\x0axyz') == \
-            [0x31, 0x32, 0x33, 0x34, 0x23, 0x30, 0x39, 0x2a, 0x78, 0x79, 0x7a]
+            bytes([0x31, 0x32, 0x33, 0x34, 0x23, 0x30, 0x39, 0x2a, 0x78, 0x79, 0x7a])
 
 class TestPairwise(object):
     def test_empty(self):
@@ -30,10 +30,13 @@ from pyocd.debug.sequences.sequences import (
     DebugSequenceExecutionContext,
     DebugSequence,
     Block,
+    Compiler,
     WhileControl,
     IfControl,
+    Interpreter,
     Parser,
     SemanticChecker,
+    TRACE,
     _ConstantFolder,
 )
 from pyocd.core.session import Session
@@ -771,3 +774,57 @@ class TestDebugSequences:
         seq.execute(context)
 
 
+
+class TestCompiledExecution:
+    def test_parse_memoised(self):
+        assert Parser.parse("__var x = 1;") is Parser.parse("__var x = 1;")
+        assert Block("x = 1;")._ast is Block("x = 1;")._ast
+
+    def test_while_compiled_once(self, context):
+        seq = DebugSequence('test')
+        seq.add_child(Block("__var x = 0;"))
+        w = WhileControl("x < 100")
+        w.add_child(Block("x += 1;"))
+        seq.add_child(w)
+        with mock.patch.object(Compiler, 'compile', autospec=True, side_effect=Compiler.compile) as compile_fn, \
+                mock.patch.object(SemanticChecker, 'check', autospec=True, side_effect=SemanticChecker.check) as check:
+            assert seq.execute(context).get('x') == 100
+            assert compile_fn.call_count == 3
+            assert check.call_count == 3
+            seq.execute(context)
+            assert compile_fn.call_count == 3
+            assert check.call_count == 3
+
+    def test_checked_per_delegate(self, session):
+        block = Block("valid_fn_no_args();")
+        for _ in range(2):
+            context = DebugSequenceExecutionContext(session, SequenceDelegateForTesting(), pname=None)
+            with mock.patch.object(SemanticChecker, 'check') as check:
+                seq = DebugSequence('test')
+                seq.add_child(block)
+                seq.execute(context)
+                check.assert_called_once_with()
+
+    @pytest.mark.parametrize("code", [
+            "__var x = 3; __var y; y = x ? x * 2 : 1; y <<= 2;",
+            "__var x = (1 ? 5 : 6) + valid_fn_1_arg(2); x % 0;",
+            "__var x = 0xffff; x = ~x & 0xf0f0 | (x >> 4);",
+            "",
+        ])
+    def test_matches_interpreter(self, block_context, code):
+        scope_1 = Scope(block_context.current_scope)
+        scope_2 = Scope(block_context.current_scope)
+        ast = Parser.parse(code)
+        result_1 = Interpreter(ast, scope_1, block_context).execute()
+        result_2 = Compiler().compile(_ConstantFolder().transform(ast))(scope_2,
+                block_context.delegate.get_sequence_functions())
+        assert result_1 == result_2
+        assert {v: scope_1.get(v) for v in scope_1.variables} == {v: scope_2.get(v) for v in scope_2.variables}
+
+    def test_trace_uses_interpreter(self, block_context):
+        block = Block("__var x = 2;")
+        with mock.patch.object(TRACE, 'isEnabledFor', return_value=True), \
+                mock.patch.object(Compiler, 'compile') as compile_fn:
+            block.execute(block_context)
+            compile_fn.assert_not_called()
+        assert block_context.current_scope.get('x') == 2
@@ -0,0 +1,166 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import pytest
+from unittest import mock
+
+from pyocd.coresight.ap import (APSEL_SHIFT, APv1Address)
+from pyocd.coresight.discovery import ADIv5Discovery
+from pyocd.coresight.discovery_cache import (DiscoveryCache, DiscoveryRecord)
+
+class FakeDebugPort:
+    """@brief DP with APs that have the given IDR values, counting AP register reads."""
+    def __init__(self, idrs, dpidr=0x2ba01477):
+        self.idrs = idrs
+        self.dpidr = mock.Mock(idr=dpidr)
+        self.valid_aps = None
+        self.aps = {}
+        self.reads = 0
+
+    def read_ap(self, addr, now=True):
+        self.reads += 1
+        idr = self.idrs.get(addr >> APSEL_SHIFT, 0)
+        return idr if now else (lambda: idr)
+
+def make_discovery(dp, cache_dir):
+    target = mock.Mock(dp=dp, part_number="test_target")
+    target.session.options = {
+            'adi.v5.discovery_cache_dir': cache_dir,
+            'adi.v5.max_invalid_ap_count': 2,
+            'scan_all_aps': False,
+            }
+    discovery = ADIv5Discovery(target)
+    discovery._load_cache()
+    return discovery
+
+def make_ap(apsel, idr, reads=None):
+    ap = mock.Mock(address=APv1Address(apsel), idr=idr, rom_table_reads=reads)
+    ap.short_description = "AP#%d" % apsel
+    return ap
+
+IDRS = {0: 0x24770011, 1: 0x44770001, 3: 0x54770002}
+
+class TestDiscoveryCache:
+    def test_round_trip(self, tmp_path):
+        cache = DiscoveryCache(str(tmp_path))
+        key = {'dpidr': 1, 'target': 'a'}
+        record = DiscoveryRecord({0: 0x24770011})
+        record.reads_for(0).read_memory_block32(mock.Mock(read_memory_block32=lambda a, c: [a] * c), 0x10, 2)
+        cache.store(key, record)
+        loaded = cache.load(key)
+        assert loaded.aps == {0: 0x24770011}
+        assert loaded.reads_for(0).first_read == (0x10, 2, [0x10, 0x10])
+        assert not loaded.is_modified
+        assert cache.load({'dpidr': 2, 'target': 'a'}) is None
+
+    def test_invalid_file(self, tmp_path):
+        cache = DiscoveryCache(str(tmp_path))
+        key = {'dpidr': 1}
+        cache.store(key, DiscoveryRecord())
+        path, = tmp_path.iterdir()
+        path.write_text("{")
+        assert cache.load(key) is None
+
+class TestADIv5DiscoveryCache:
+    def test_scan_then_cached(self, tmp_path):
+        dp = FakeDebugPort(IDRS)
+        discovery = make_discovery(dp, str(tmp_path))
+        discovery._find_aps()
+        assert dp.valid_aps == [0, 1, 3]
+        # The scan stops after two invalid APs.
+        assert dp.reads == 6
+        dp.aps = {APv1Address(apsel): make_ap(apsel, idr) for apsel, idr in IDRS.items()}
+        discovery._store_cache()
+        assert len(os.listdir(str(tmp_path))) == 1
+
+        dp = FakeDebugPort(IDRS)
+        discovery = make_discovery(dp, str(tmp_path))
+        discovery._find_aps()
+        assert dp.valid_aps == [0, 1, 3]
+        # The cached APs, the gap at APSEL 2, and the following APSEL are checked.
+        assert dp.reads == 5
+
+    def test_new_ap_in_gap_rescans(self, tmp_path):
+        dp = FakeDebugPort(IDRS)
+        discovery = make_discovery(dp, str(tmp_path))
+        discovery._find_aps()
+        dp.aps = {APv1Address(apsel): make_ap(apsel, idr) for apsel, idr in IDRS.items()}
+        discovery._store_cache()
+
+        idrs = dict(IDRS)
+        idrs[2] = 0x14770004
+        dp = FakeDebugPort(idrs)
+        discovery = make_discovery(dp, str(tmp_path))
+        discovery._find_aps()
+        assert dp.valid_aps == [0, 1, 2, 3]
+
+    def test_last_apsel_checked(self, tmp_path):
+        dp = FakeDebugPort({})
+        discovery = make_discovery(dp, str(tmp_path))
+        discovery._record = DiscoveryRecord({254: 0x24770011})
+        assert not discovery._check_cached_aps()
+        dp.idrs = {254: 0x24770011}
+        dp.reads = 0
+        assert discovery._check_cached_aps()
+        # APSELs 0-255 are all read.
+        assert dp.reads == 256
+
+    def test_mismatch_rescans(self, tmp_path):
+        dp = FakeDebugPort(IDRS)
+        discovery = make_discovery(dp, str(tmp_path))
+        discovery._find_aps()
+        dp.aps = {APv1Address(apsel): make_ap(apsel, idr) for apsel, idr in IDRS.items()}
+        discovery._store_cache()
+
+        idrs = dict(IDRS)
+        idrs[4] = 0x14770004
+        dp = FakeDebugPort(idrs)
+        discovery = make_discovery(dp, str(tmp_path))
+        discovery._find_aps()
+        assert dp.valid_aps == [0, 1, 3, 4]
+
+    def test_other_dpidr_not_used(self, tmp_path):
+        dp = FakeDebugPort(IDRS)
+        discovery = make_discovery(dp, str(tmp_path))
+        discovery._find_aps()
+        dp.aps = {APv1Address(apsel): make_ap(apsel, idr) for apsel, idr in IDRS.items()}
+        discovery._store_cache()
+
+        dp = FakeDebugPort(IDRS, dpidr=0x0bc11477)
+        discovery = make_discovery(dp, str(tmp_path))
+        discovery._find_aps()
+        assert dp.reads == 6
+
+    @pytest.mark.parametrize(("rom_id", "expect_replay"), [([1, 2, 3], True), ([1, 2, 4], False)])
+    def test_rom_table_check(self, tmp_path, rom_id, expect_replay):
+        dp = FakeDebugPort(IDRS)
+        discovery = make_discovery(dp, str(tmp_path))
+        reads = discovery._record.reads_for(0)
+        reads.read_memory_block32(mock.Mock(read_memory_block32=lambda a, c: [1, 2, 3]), 0xe00fffd0, 3)
+        ap = make_ap(0, IDRS[0], reads)
+        ap.read_memory_block32.return_value = rom_id
+        discovery._find_ap_components(ap)
+        ap.read_memory_block32.assert_called_once_with(0xe00fffd0, 3)
+        ap.find_components.assert_called_once_with()
+        assert (ap.rom_table_reads.first_read is not None) == expect_replay
+
+    def test_disabled(self):
+        dp = FakeDebugPort(IDRS)
+        discovery = make_discovery(dp, None)
+        discovery._find_aps()
+        assert discovery._record is None
+        discovery._store_cache()
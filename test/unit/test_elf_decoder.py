@@ -0,0 +1,138 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import pytest
+from elftools.elf.elffile import ELFFile
+from pathlib import Path
+from unittest import mock
+
+from pyocd.debug.elf import decoder
+from pyocd.debug.elf.decoder import (AddressRangeIndex, DwarfAddressDecoder, ElfSymbolDecoder)
+
+ELF_PATH = Path(__file__).resolve().parents[2] / "src" / "gdb_test_program" / "gdb_test.elf"
+
+@pytest.fixture(scope='module')
+def elf():
+    with ELF_PATH.open('rb') as f:
+        yield ELFFile(f)
+
+def first_containing(ranges, addr):
+    """@brief Reference lookup: the first of the sorted ranges containing the address."""
+    for i, (start, end) in enumerate(ranges):
+        if start <= addr < end:
+            return i
+    return None
+
+class TestAddressRangeIndex:
+    @pytest.mark.parametrize("ranges", [
+            [],
+            [(0x10, 0x20)],
+            [(0x10, 0x20), (0x20, 0x30), (0x40, 0x41)],
+            # Nested and overlapping ranges, where a later range ends before an earlier one.
+            [(0x0, 0x100), (0x10, 0x20), (0x10, 0x30), (0x50, 0x60), (0x100, 0x108), (0x104, 0x106)],
+        ])
+    def test_find(self, ranges):
+        index = AddressRangeIndex((r[0] for r in ranges), (r[1] for r in ranges))
+        assert len(index) == len(ranges)
+        for addr in range(0, 0x120):
+            assert index.find(addr) == first_containing(ranges, addr)
+
+class TestElfSymbolDecoder:
+    def test_lookup(self, elf):
+        symbols = ElfSymbolDecoder(elf)
+        assert symbols._symbol_index is None
+        main = symbols.get_symbol_for_name('main')
+        assert main.type == 'STT_FUNC' and main.size > 0
+        assert symbols.get_symbol_for_address(main.address) == main
+        assert symbols.get_symbol_for_address(main.address + main.size - 1) == main
+        assert symbols.get_symbol_for_name('not_a_symbol') is None
+
+    def test_matches_reference(self, elf):
+        symbols = ElfSymbolDecoder(elf)
+        ranges = sorted((s.address, s.address + max(s.size, 1), s) for s in symbols.symbol_dict.values())
+        for start, end, _ in ranges:
+            for addr in (start - 1, start, end - 1, end):
+                i = first_containing([r[:2] for r in ranges], addr)
+                expected = ranges[i][2] if i is not None else None
+                assert symbols.get_symbol_for_address(addr) == expected
+
+class TestDwarfAddressDecoder:
+    def test_function(self, elf):
+        symbols = ElfSymbolDecoder(elf)
+        dwarf = DwarfAddressDecoder(elf)
+        # main is at address 0, so it is excluded as if it were not linked.
+        assert dwarf.get_function_for_address(0) is None
+        sym = symbols.get_symbol_for_name('function_1')
+        fn = dwarf.get_function_for_address(sym.address & ~1)
+        assert fn.name == b'function_1'
+        assert fn.low_pc == sym.address & ~1
+        assert dwarf.get_function_for_address(0xfffffff0) is None
+
+    def test_lines(self, elf):
+        dwarf = DwarfAddressDecoder(elf)
+        assert dwarf._line_index is None
+        data = dwarf._read_line_rows()
+        ranges = list(zip(data['starts'], data['ends']))
+        assert ranges
+        for start, end in ranges:
+            line = dwarf.get_line_for_address(start)
+            i = first_containing(ranges, start)
+            assert line.line == data['lines'][i]
+            assert line.filename
+            assert line.cu is not None
+        assert dwarf.get_line_for_address(0xfffffff0) is None
+
+class TestIndexCache:
+    @pytest.fixture
+    def build_id(self):
+        with mock.patch.object(decoder, 'get_build_id', return_value='0123abcd'):
+            yield
+
+    def test_no_build_id(self, elf, tmp_path):
+        # The test ELF was linked without a build ID, so nothing is cached.
+        ElfSymbolDecoder(elf, str(tmp_path)).get_symbol_for_name('main')
+        assert decoder.get_build_id(elf) is None
+        assert os.listdir(str(tmp_path)) == []
+
+    def test_round_trip(self, elf, tmp_path, build_id):
+        cache_dir = str(tmp_path)
+        symbols = ElfSymbolDecoder(elf, cache_dir)
+        dwarf = DwarfAddressDecoder(elf, cache_dir)
+        main = symbols.get_symbol_for_name('main')
+        line = dwarf.get_line_for_address(symbols.get_symbol_for_name('function_1').address & ~1)
+        assert line is not None
+        assert sorted(os.listdir(cache_dir)) == ['0123abcd.lines.json', '0123abcd.symbols.json']
+
+        with mock.patch.object(ElfSymbolDecoder, '_read_symbols') as read_symbols, \
+                mock.patch.object(DwarfAddressDecoder, '_read_line_rows') as read_line_rows:
+            cached_symbols = ElfSymbolDecoder(elf, cache_dir)
+            cached_dwarf = DwarfAddressDecoder(elf, cache_dir)
+            assert cached_symbols.symbol_dict == symbols.symbol_dict
+            assert cached_symbols.get_symbol_for_address(main.address) == main
+            cached_line = cached_dwarf.get_line_for_address(symbols.get_symbol_for_name('function_1').address & ~1)
+            assert cached_line.filename == line.filename
+            assert cached_line.dirname == line.dirname
+            assert cached_line.line == line.line
+            assert cached_line.cu.cu_offset == line.cu.cu_offset
+            assert type(cached_line.filename) is type(line.filename)
+            read_symbols.assert_not_called()
+            read_line_rows.assert_not_called()
+
+    def test_invalid_cache_ignored(self, elf, tmp_path, build_id):
+        (tmp_path / '0123abcd.symbols.json').write_text('{"version": 0, "symbols": []}')
+        symbols = ElfSymbolDecoder(elf, str(tmp_path))
+        assert symbols.get_symbol_for_name('main') is not None
@@ -0,0 +1,187 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import pytest
+from elftools.elf.elffile import ELFFile
+from intelhex import IntelHex
+from pathlib import Path
+from unittest import mock
+
+from pyocd.core import exceptions
+from pyocd.core.memory_map import (FlashRegion, MemoryMap, RamRegion)
+from pyocd.core.target import Target
+from pyocd.flash.builder import FlashBuilder
+from pyocd.flash.file_programmer import (FileProgrammer, ProgramImage)
+from pyocd.flash.loader import MemoryLoader
+from pyocd.flash.parallel_programmer import (MultiProgressReport, ParallelProgrammer)
+
+ELF_PATH = Path(__file__).resolve().parents[2] / "src" / "gdb_test_program" / "gdb_test.elf"
+
+RAM0 = 0x20000000
+RAM1 = 0x20004000
+RAM_SIZE = 0x4000
+
+class FakeRamTarget:
+    """@brief Target with two contiguous RAM regions, recording block writes."""
+    def __init__(self):
+        self.memory_map = MemoryMap(
+            RamRegion(start=RAM0, length=RAM_SIZE, name='ram0', is_boot_memory=True),
+            RamRegion(start=RAM1, length=RAM_SIZE, name='ram1'),
+            )
+        self.memory = bytearray(2 * RAM_SIZE)
+        self.writes = []
+
+    def write_memory_block_bytes(self, addr, data):
+        assert isinstance(data, (bytes, bytearray, memoryview))
+        self.writes.append((addr, len(data)))
+        self.memory[addr - RAM0:addr - RAM0 + len(data)] = data
+
+@pytest.fixture
+def target():
+    return FakeRamTarget()
+
+def make_session(target):
+    session = mock.MagicMock()
+    session.options = {'hide_programming_progress': True}
+    session.log_tracebacks = False
+    session.board.target = target
+    session.target = mock.Mock(spec=Target, wraps=target)
+    session.target.memory_map = target.memory_map
+    return session
+
+@pytest.fixture
+def session(target):
+    return make_session(target)
+
+IMAGE = bytes(i * 7 & 0xff for i in range(0x5000))
+
+class TestMemoryLoader:
+    def test_add_data_across_regions(self, session, target):
+        loader = MemoryLoader(session)
+        loader.add_data(RAM1 - 0x100, memoryview(IMAGE)[:0x200])
+        assert sorted(b.region.name for b in loader._builders.values()) == ['ram0', 'ram1']
+        loader.commit()
+        assert target.memory[RAM_SIZE - 0x100:RAM_SIZE + 0x100] == IMAGE[:0x200]
+
+    def test_add_list(self, session, target):
+        MemoryLoader.program_binary_data(session, RAM0 + 3, [1, 2, 3])
+        assert target.memory[3:6] == b'\x01\x02\x03'
+
+    def test_no_region(self, session):
+        with pytest.raises(ValueError):
+            MemoryLoader(session).add_data(0x1000, b'\x00')
+
+class TestFileProgrammer:
+    def test_bin_path(self, session, target, tmp_path):
+        path = tmp_path / "image.bin"
+        path.write_bytes(IMAGE)
+        FileProgrammer(session).program(str(path), skip=0x10)
+        assert target.memory[:len(IMAGE) - 0x10] == IMAGE[0x10:]
+
+    def test_bin_file_object(self, session, target):
+        FileProgrammer(session).program(io.BytesIO(IMAGE), file_format='bin', base_address=RAM1 - 0x1000)
+        assert target.memory[RAM_SIZE - 0x1000:RAM_SIZE - 0x1000 + len(IMAGE)] == IMAGE
+
+    def test_empty_bin(self, session, target, tmp_path):
+        path = tmp_path / "empty.bin"
+        path.write_bytes(b'')
+        FileProgrammer(session).program(str(path))
+        assert target.writes == []
+
+    def test_hex(self, session, target, tmp_path):
+        hexfile = IntelHex()
+        hexfile.frombytes(IMAGE[:0x100], offset=RAM0)
+        hexfile.frombytes(IMAGE[0x100:0x180], offset=RAM1 + 0x20)
+        path = tmp_path / "image.hex"
+        hexfile.write_hex_file(str(path))
+        FileProgrammer(session).program(str(path))
+        assert target.memory[:0x100] == IMAGE[:0x100]
+        assert target.memory[RAM_SIZE + 0x20:RAM_SIZE + 0xa0] == IMAGE[0x100:0x180]
+
+    def test_elf_segments(self):
+        with ProgramImage() as image, ELF_PATH.open('rb') as f:
+            image.add_file(f, 'elf')
+            segments = [seg for seg in ELFFile(f).iter_segments()
+                    if seg.header.p_type == 'PT_LOAD' and seg.header.p_filesz != 0]
+            assert len(image.segments) == len(segments)
+            for image_segment, seg in zip(image.segments, segments):
+                assert image_segment.address == seg['p_paddr']
+                assert isinstance(image_segment.data, memoryview)
+                assert image_segment.data == seg.data()
+        assert image.segments == []
+
+    def test_image_reuse(self, tmp_path):
+        path = tmp_path / "image.bin"
+        path.write_bytes(IMAGE)
+        targets = [FakeRamTarget() for _ in range(2)]
+        with ProgramImage() as image:
+            image.add_file(str(path))
+            assert image.byte_count == len(IMAGE)
+            for t in targets:
+                perf_list = FileProgrammer(make_session(t)).program_image(image)
+                assert isinstance(perf_list, list)
+        for t in targets:
+            assert t.memory[:len(IMAGE)] == IMAGE
+
+    def test_bin_no_boot_memory(self):
+        t = FakeRamTarget()
+        t.memory_map = MemoryMap(RamRegion(start=RAM0, length=RAM_SIZE, name='ram0'))
+        with ProgramImage() as image:
+            image.add_file(io.BytesIO(IMAGE[:0x10]), 'bin')
+            with pytest.raises(exceptions.TargetSupportError):
+                FileProgrammer(make_session(t)).program_image(image)
+
+class TestParallelProgrammer:
+    def test_results(self):
+        targets = [FakeRamTarget() for _ in range(3)]
+        sessions = [make_session(t) for t in targets]
+        for i, s in enumerate(sessions):
+            s.probe.unique_id = "probe%d" % i
+        # The second session fails to open.
+        sessions[1].__enter__ = mock.Mock(side_effect=exceptions.ProbeError("no target"))
+        output = io.StringIO()
+        progress = MultiProgressReport([s.probe.unique_id for s in sessions], output)
+        with ProgramImage() as image:
+            image.add_file(io.BytesIO(IMAGE[:0x800]), 'bin', base_address=RAM0 + 0x100)
+            results = ParallelProgrammer(sessions, image, max_workers=2, progress=progress).program()
+        assert [r.unique_id for r in results] == ["probe0", "probe1", "probe2"]
+        assert [r.status for r in results] == [0, 1, 0]
+        assert results[1].error == "no target"
+        assert results[0].byte_count == 0x800
+        for i in (0, 2):
+            assert targets[i].memory[0x100:0x900] == IMAGE[:0x800]
+            assert "probe%d: 100%%" % i in output.getvalue()
+        assert targets[1].writes == []
+
+class TestFlashBuilderAddData:
+    @pytest.fixture
+    def builder(self):
+        flash = mock.Mock(region=FlashRegion(start=0, length=0x10000, blocksize=0x400))
+        return FlashBuilder(flash)
+
+    def test_sorted(self, builder):
+        for addr in (0x800, 0x0, 0x400):
+            builder.add_data(addr, memoryview(IMAGE)[:0x100])
+        assert [op.addr for op in builder.flash_operation_list] == [0x0, 0x400, 0x800]
+        assert builder.buffered_data_size == 0x300
+
+    @pytest.mark.parametrize("addr", [0x3ff, 0x4ff, 0x300])
+    def test_overlap(self, builder, addr):
+        builder.add_data(0x400, b'\x00' * 0x100)
+        with pytest.raises(ValueError):
+            builder.add_data(addr, b'\x00' * 0x101)
+        assert len(builder.flash_operation_list) == 1
@@ -0,0 +1,113 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from unittest import mock
+
+from pyocd.core.exceptions import (FlashFailure, TransferFaultError)
+from pyocd.core.target import Target
+from pyocd.flash.flash import Flash
+
+FLASH_ALGO = {
+    'load_address': 0x20000000,
+    'instructions': [0xe7fdbe00] + [0] * 15,
+    'pc_init': 0x20000005,
+    'pc_erase_sector': 0x20000009,
+    'pc_program_page': 0x2000000d,
+    'begin_stack': 0x20000800,
+    'end_stack': 0x20000400,
+    'begin_data': 0x20001000,
+    'static_base': 0x20000040,
+    'analyzer_supported': False,
+    }
+
+def make_target(running_polls=0, r0=0, canary=Flash._STACK_CANARY):
+    target = mock.Mock()
+    states = [Target.State.RUNNING] * running_polls + [Target.State.HALTED]
+    target.get_state.side_effect = lambda: states.pop(0) if len(states) > 1 else states[0]
+    target.read_core_register.return_value = r0
+    target.read32.return_value = lambda: canary
+    return target
+
+class TestFlashAlgoCall:
+    def test_call_function(self):
+        target = make_target()
+        flash = Flash(target, FLASH_ALGO)
+        flash._call_function(FLASH_ALGO['pc_erase_sector'], 0x1000)
+        target.resume_with_registers.assert_called_once_with(['pc', 'r0', 'lr'],
+                [FLASH_ALGO['pc_erase_sector'], 0x1000, FLASH_ALGO['load_address'] + 1])
+        target.resume.assert_not_called()
+        target.write_core_registers_raw.assert_not_called()
+
+    def test_result(self):
+        target = make_target(running_polls=3, r0=5)
+        flash = Flash(target, FLASH_ALGO)
+        assert flash._call_function_and_wait(FLASH_ALGO['pc_erase_sector'], 0x1000) == 5
+        assert target.get_state.call_count == 4
+        target.read32.assert_called_once_with(FLASH_ALGO['end_stack'], now=False)
+
+    def test_stack_overflow(self):
+        target = make_target(canary=0)
+        flash = Flash(target, FLASH_ALGO)
+        with pytest.raises(FlashFailure):
+            flash._call_function_and_wait(FLASH_ALGO['pc_erase_sector'], 0x1000)
+
+    def test_canary_read_on_error(self):
+        target = make_target()
+        target.read_core_register.side_effect = FlashFailure("r0")
+        canary_cb = mock.Mock(return_value=Flash._STACK_CANARY)
+        target.read32.return_value = canary_cb
+        flash = Flash(target, FLASH_ALGO)
+        with pytest.raises(FlashFailure):
+            flash._call_function_and_wait(FLASH_ALGO['pc_erase_sector'], 0x1000)
+        canary_cb.assert_called_once_with()
+
+    def test_canary_error_does_not_replace_r0_error(self):
+        target = make_target()
+        target.read_core_register.side_effect = FlashFailure("r0")
+        canary_cb = mock.Mock(side_effect=TransferFaultError("canary"))
+        target.read32.return_value = canary_cb
+        flash = Flash(target, FLASH_ALGO)
+        with pytest.raises(FlashFailure, match="r0"):
+            flash._call_function_and_wait(FLASH_ALGO['pc_erase_sector'], 0x1000)
+        canary_cb.assert_called_once_with()
+
+    def test_run_time_history(self):
+        target = make_target()
+        flash = Flash(target, FLASH_ALGO)
+        with mock.patch('pyocd.flash.flash.monotonic', side_effect=[10.0, 10.0, 10.5, 20.0, 20.0, 20.25]), \
+                mock.patch('pyocd.flash.flash.sleep') as sleep:
+            flash._call_function_and_wait(FLASH_ALGO['pc_erase_sector'], 0x1000)
+            assert flash._run_times == {FLASH_ALGO['pc_erase_sector']: 0.5}
+            sleep.assert_not_called()
+
+            # The first poll of the second call is delayed based on the first run time.
+            flash._call_function_and_wait(FLASH_ALGO['pc_erase_sector'], 0x2000)
+            sleep.assert_called_once_with(pytest.approx(0.4))
+            assert flash._run_times == {FLASH_ALGO['pc_erase_sector']: 0.25}
+
+class TestPollDelay:
+    def test_no_history(self):
+        flash = Flash(make_target(), FLASH_ALGO)
+        assert flash._get_poll_delay(0.0, None) == 0.0
+        assert flash._get_poll_delay(0.004, None) == 0.0005
+        assert flash._get_poll_delay(1.0, None) == Flash._MAX_POLL_INTERVAL
+
+    def test_history(self):
+        flash = Flash(make_target(), FLASH_ALGO)
+        assert flash._get_poll_delay(0.0, 0.1) == pytest.approx(0.08)
+        assert flash._get_poll_delay(0.05, 0.1) == pytest.approx(0.03)
+        assert flash._get_poll_delay(0.2, 0.1) == Flash._MAX_POLL_INTERVAL
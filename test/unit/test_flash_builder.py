@@ -0,0 +1,98 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from binascii import crc32
+from types import SimpleNamespace
+from unittest import mock
+
+from pyocd.core import exceptions
+from pyocd.core.memory_map import FlashRegion
+from pyocd.flash.builder import (FlashBuilder, _FlashPage)
+
+PAGE_SIZE = 0x400
+
+class FakeFlashTarget:
+    """@brief Target whose flash contents are a bytearray, recording block reads."""
+    def __init__(self, data):
+        self.data = data
+        self.reads = []
+
+    def read_memory_blocks_bytes(self, blocks):
+        self.reads.append(list(blocks))
+        for addr, size in blocks:
+            if addr + size > len(self.data):
+                raise exceptions.TransferFaultError("fault", fault_address=addr)
+        return [bytearray(self.data[addr:addr + size]) for addr, size in blocks]
+
+def make_page(addr, data):
+    page = _FlashPage(SimpleNamespace(base_addr=addr, size=PAGE_SIZE, program_weight=0.1))
+    page.data = bytearray(data)
+    return page
+
+def make_builder(target):
+    flash = mock.Mock(target=target, region=FlashRegion(start=0, length=0x10000, blocksize=PAGE_SIZE))
+    builder = FlashBuilder(flash)
+    builder.algo_inited_for_read = True
+    return builder
+
+class TestFlashBuilderAnalysis:
+    def test_page_crc_padding(self):
+        data = bytes(range(100))
+        page = make_page(0, data)
+        assert FlashBuilder._compute_page_crc(page) == crc32(data + b'\xff' * (PAGE_SIZE - 100))
+
+    def test_page_crc_large_padding(self):
+        page = _FlashPage(SimpleNamespace(base_addr=0, size=0x4000, program_weight=0.1))
+        page.data = bytearray(b'\x55' * 3)
+        assert FlashBuilder._compute_page_crc(page) == crc32(b'\x55' * 3 + b'\xff' * (0x4000 - 3))
+
+    def test_partial_read(self):
+        flash_data = bytearray(b'\xff' * 0x1000)
+        flash_data[0x400:0x420] = bytes(range(32))
+        target = FakeFlashTarget(flash_data)
+        builder = make_builder(target)
+        builder.page_list = [
+            make_page(0x000, b'\xff' * PAGE_SIZE),
+            make_page(0x400, bytes(range(32)) + bytes(PAGE_SIZE - 32)),
+            make_page(0x800, b'\x00' * 6),
+            ]
+        builder._analyze_pages_with_partial_read()
+
+        # The samples of all pages are read together.
+        assert target.reads == [[(0x000, 32), (0x400, 32), (0x800, 6)]]
+        assert [p.same for p in builder.page_list] == [None, None, False]
+        assert builder.page_list[0].cached_estimate_data == b"\xff" * 32
+        assert builder.page_list[1].cached_estimate_data == bytes(range(32))
+
+    def test_partial_read_skips_analyzed_pages(self):
+        target = FakeFlashTarget(bytearray(b'\xff' * 0x800))
+        builder = make_builder(target)
+        builder.page_list = [make_page(0x000, b'\xff' * 8), make_page(0x400, b'\xff' * 8)]
+        builder.page_list[0].same = True
+        builder._analyze_pages_with_partial_read()
+        assert target.reads == [[(0x400, 8)]]
+
+    def test_crc32_overlaps_analyzer(self):
+        flash = mock.Mock(region=FlashRegion(start=0, length=0x10000, blocksize=PAGE_SIZE))
+        builder = FlashBuilder(flash)
+        builder.algo_inited_for_read = True
+        data = bytes(range(256)) * 4
+        builder.page_list = [make_page(0, data), make_page(0x400, data)]
+        flash.finish_compute_crcs.return_value = [crc32(data), 0]
+        builder._analyze_pages_with_crc32(assume_estimate_correct=True)
+
+        flash.start_compute_crcs.assert_called_once_with([(0, PAGE_SIZE), (0x400, PAGE_SIZE)])
+        assert [p.same for p in builder.page_list] == [True, False]
@@ -14,10 +14,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from unittest import mock
+
 from pyocd.gdbserver.gdbserver import (
     escape,
     unescape,
 )
+from pyocd.gdbserver.packet_io import (
+    checksum,
+    GDBServerPacketIOThread,
+)
 
 # escaped chars: '#$}*'
 # escaped by prefixing with '}' and xor'ing the char with 0x20
@@ -48,20 +54,72 @@ class TestGdbServerEscaping:
         assert escape(b'}}}') == b"}]}]}]"
 
     def test_unescape_transparent(self):
-        assert unescape(b"bytes") == list(b"bytes")
+        assert unescape(b"bytes") == b"bytes"
 
     def test_unescape_individual(self):
-        assert unescape(b"hello}\x03foo") == list(b"hello#foo")
-        assert unescape(b"hello}\x04foo") == list(b"hello$foo")
-        assert unescape(b"hello}]foo") == list(b"hello}foo")
-        assert unescape(b"hello}\x0afoo") == list(b"hello*foo")
+        assert unescape(b"hello}\x03foo") == b"hello#foo"
+        assert unescape(b"hello}\x04foo") == b"hello$foo"
+        assert unescape(b"hello}]foo") == b"hello}foo"
+        assert unescape(b"hello}\x0afoo") == b"hello*foo"
 
     def test_unescape_single(self):
-        assert unescape(b"}\x03") == [b'#'[0]]
-        assert unescape(b"}\x04") == [b'$'[0]]
-        assert unescape(b"}]") == [b'}'[0]]
-        assert unescape(b"}\x0a") == [b'*'[0]]
+        assert unescape(b"}\x03") == b'#'
+        assert unescape(b"}\x04") == b'$'
+        assert unescape(b"}]") == b'}'
+        assert unescape(b"}\x0a") == b'*'
 
     def test_unescape_combined(self):
-        assert unescape(b"}\x03}\x04}]}\x0a") == list(b"#$}*")
-        assert unescape(b"}]}]}]") == list(b"}}}")
+        assert unescape(b"}\x03}\x04}]}\x0a") == b"#$}*"
+        assert unescape(b"}]}]}]") == b"}}}"
+
+def make_packet(data):
+    return b'$' + data + b'#' + checksum(data)
+
+@mock.patch.object(GDBServerPacketIOThread, 'start')
+class TestGdbServerPacketFraming:
+    def make_io(self):
+        sock = mock.Mock(port=3333)
+        io = GDBServerPacketIOThread(sock)
+        return io, sock
+
+    def feed(self, io, data):
+        io._buffer += data
+        io._process_data()
+
+    def received(self, io):
+        packets = []
+        while True:
+            packet = io.receive(block=False)
+            if packet is None:
+                return packets
+            packets.append(packet)
+
+    def test_split_packet(self, start):
+        io, sock = self.make_io()
+        packet = make_packet(b'X20000000,4:' + escape(b'a#b$'))
+        for i in range(len(packet)):
+            assert self.received(io) == []
+            self.feed(io, packet[i:i + 1])
+        assert self.received(io) == [packet]
+        sock.write.assert_called_once_with(b'+')
+        assert io._buffer == b''
+
+    def test_multiple_packets(self, start):
+        io, sock = self.make_io()
+        io._expecting_ack = True
+        self.feed(io, b'+' + make_packet(b'g') + b'\x03' + make_packet(b'm0,4') + b'$qSupp')
+        assert self.received(io) == [make_packet(b'g'), make_packet(b'm0,4')]
+        assert io.interrupt_event.is_set()
+        assert io._buffer == b'$qSupp'
+
+        self.feed(io, b'orted#' + checksum(b'qSupported')[:1])
+        assert self.received(io) == []
+        self.feed(io, checksum(b'qSupported')[1:])
+        assert self.received(io) == [make_packet(b'qSupported')]
+        assert io._buffer == b''
+
+    def test_bad_checksum(self, start):
+        io, sock = self.make_io()
+        self.feed(io, b'$g#00')
+        assert self.received(io) == []
+        sock.write.assert_called_once_with(b'-')
@@ -0,0 +1,209 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import struct
+from unittest import mock
+
+from pyocd.core import exceptions
+from pyocd.coresight.ap import (MEM_AP, APv1Address, MEM_AP_CSW, MEM_AP_TAR, MEM_AP_DRW, CSW_SIZE)
+
+MEMORY_SIZE = 0x2000
+
+class MockDP(object):
+    """@brief DP that implements MEM-AP register accesses on a bytearray."""
+
+    SIZES = {0: 1, 1: 2, 2: 4}
+
+    def __init__(self):
+        self.probe = mock.Mock()
+        self.probe.get_memory_interface_for_ap.return_value = None
+        self.session = mock.Mock()
+        self.memory = bytearray(range(256)) * (MEMORY_SIZE // 256)
+        self.csw = 0
+        self.tar = 0
+        self.next_access_number = 0
+        ## Log of ('queue', addr) and ('collect', addr) events for block reads.
+        self.events = []
+
+    def _handle_error(self, error, num):
+        pass
+
+    def write_ap(self, addr, data):
+        if addr == MEM_AP_CSW:
+            self.csw = data
+        elif addr == MEM_AP_TAR:
+            self.tar = data
+        elif addr == MEM_AP_DRW:
+            size = self.SIZES[self.csw & CSW_SIZE]
+            lane = self.tar & 3 & ~(size - 1)
+            value = (data >> (8 * lane)).to_bytes(8, 'little')[:size]
+            self.memory[self.tar:self.tar + size] = value
+
+    def read_ap(self, addr, now=True):
+        assert addr == MEM_AP_DRW
+        aligned = self.tar & ~3
+        value = struct.unpack_from('<I', self.memory, aligned)[0]
+        return value if now else (lambda: value)
+
+    def write_ap_multiple_bytes(self, addr, data):
+        assert addr == MEM_AP_DRW
+        self.memory[self.tar:self.tar + len(data)] = data
+
+    def read_ap_multiple_bytes(self, addr, count, now=True):
+        assert addr == MEM_AP_DRW and not now
+        start = self.tar
+        data = bytearray(self.memory[start:start + count * 4])
+        self.events.append(('queue', start))
+        def read_cb():
+            self.events.append(('collect', start))
+            return data
+        return read_cb
+
+@pytest.fixture
+def dp():
+    return MockDP()
+
+@pytest.fixture
+def ap(dp):
+    ap = MEM_AP(dp, APv1Address(0))
+    ap._transfer_sizes = {8, 16, 32}
+    return ap
+
+class TestMemApBytes:
+    def test_read_aligned(self, dp, ap):
+        data = ap.read_memory_block_bytes(0x100, 0x40)
+        assert isinstance(data, bytearray)
+        assert data == dp.memory[0x100:0x140]
+
+    def test_write_aligned(self, dp, ap):
+        ap.write_memory_block_bytes(0x100, bytes(range(0x40, 0x80)))
+        assert dp.memory[0x100:0x140] == bytes(range(0x40, 0x80))
+
+    @pytest.mark.parametrize(("addr", "size"), [
+            (0x101, 3),     # 8-bit then 16-bit head
+            (0x103, 12),    # 8-bit head, aligned words, 16-bit and 8-bit tail
+            (0x102, 7),     # 16-bit head, 1 word, 8-bit tail
+            (0x101, 1),
+            (0x100, 0),
+        ])
+    def test_read_unaligned(self, dp, ap, addr, size):
+        assert ap.read_memory_block_bytes(addr, size) == dp.memory[addr:addr + size]
+
+    @pytest.mark.parametrize(("addr", "size"), [
+            (0x101, 3),
+            (0x103, 12),
+            (0x102, 7),
+            (0x101, 1),
+        ])
+    def test_write_unaligned(self, dp, ap, addr, size):
+        expected = bytearray(dp.memory)
+        data = bytes(0xa0 + i for i in range(size))
+        expected[addr:addr + size] = data
+        ap.write_memory_block_bytes(addr, memoryview(data))
+        assert dp.memory == expected
+
+    def test_block8_uses_bytes_path(self, dp, ap):
+        assert ap.read_memory_block8(0x103, 5) == list(dp.memory[0x103:0x108])
+        ap.write_memory_block8(0x103, [1, 2, 3, 4, 5])
+        assert dp.memory[0x103:0x108] == bytes([1, 2, 3, 4, 5])
+
+class TestMemApPipelinedRead:
+    def test_multi_page(self, dp, ap):
+        # 0x200..0x1200 spans 5 auto-increment pages of 0x400 bytes.
+        data = ap.read_memory_block_bytes(0x200, 0x1000)
+        assert data == dp.memory[0x200:0x1200]
+        starts = [0x200, 0x400, 0x800, 0xc00, 0x1000]
+        # Every page is queued before any result is collected.
+        assert dp.events == [('queue', a) for a in starts] + [('collect', a) for a in starts]
+
+    def test_multi_page_unaligned(self, dp, ap):
+        data = ap.read_memory_block_bytes(0x3fd, 0x409)
+        assert data == dp.memory[0x3fd:0x806]
+        assert [e for e in dp.events if e[0] == 'queue'] == [('queue', 0x400), ('queue', 0x800)]
+
+    def test_block32(self, dp, ap):
+        words = ap.read_memory_block32(0x3f0, 0x108)
+        assert words == list(struct.unpack_from('<264I', dp.memory, 0x3f0))
+
+    def test_fault_mid_pipeline(self, dp, ap):
+        original = dp.read_ap_multiple_bytes
+        def read_multiple(addr, count, now=True):
+            cb = original(addr, count, now)
+            if dp.tar == 0x800:
+                def fault_cb():
+                    cb()
+                    raise exceptions.TransferFaultError()
+                return fault_cb
+            return cb
+        dp.read_ap_multiple_bytes = read_multiple
+
+        with pytest.raises(exceptions.TransferFaultError) as exc_info:
+            ap.read_memory_block_bytes(0x400, 0xc00)
+        assert exc_info.value.fault_address == 0x800
+        # All pages were still collected.
+        assert [e for e in dp.events if e[0] == 'collect'] == \
+                [('collect', 0x400), ('collect', 0x800), ('collect', 0xc00)]
+
+    def test_queue_error_not_replaced(self, dp, ap):
+        original = dp.read_ap_multiple_bytes
+        def read_multiple(addr, count, now=True):
+            if dp.tar == 0xc00:
+                raise exceptions.ProbeError("queue full")
+            cb = original(addr, count, now)
+            if dp.tar == 0x400:
+                def fault_cb():
+                    cb()
+                    raise exceptions.TransferFaultError()
+                return fault_cb
+            return cb
+        dp.read_ap_multiple_bytes = read_multiple
+
+        with pytest.raises(exceptions.ProbeError, match="queue full"):
+            ap.read_memory_block_bytes(0x400, 0xc00)
+        # Pages queued before the error were drained.
+        assert [e for e in dp.events if e[0] == 'collect'] == [('collect', 0x400), ('collect', 0x800)]
+
+class TestMemApMultiBlockRead:
+    def test_blocks_pipelined(self, dp, ap):
+        blocks = [(0x000, 32), (0x400, 32), (0x3f0, 0x20)]
+        results = ap.read_memory_blocks_bytes(blocks)
+        assert results == [dp.memory[a:a + n] for a, n in blocks]
+        # Pages of all blocks are queued before any result is collected.
+        starts = [0x000, 0x400, 0x3f0, 0x400]
+        assert dp.events == [('queue', a) for a in starts] + [('collect', a) for a in starts]
+
+    def test_unaligned_block(self, dp, ap):
+        blocks = [(0x100, 8), (0x203, 5), (0x300, 6)]
+        assert ap.read_memory_blocks_bytes(blocks) == [dp.memory[a:a + n] for a, n in blocks]
+
+    def test_fault_collects_all(self, dp, ap):
+        original = dp.read_ap_multiple_bytes
+        def read_multiple(addr, count, now=True):
+            cb = original(addr, count, now)
+            if dp.tar == 0x400:
+                def fault_cb():
+                    cb()
+                    raise exceptions.TransferFaultError()
+                return fault_cb
+            return cb
+        dp.read_ap_multiple_bytes = read_multiple
+
+        with pytest.raises(exceptions.TransferFaultError) as exc_info:
+            ap.read_memory_blocks_bytes([(0x000, 32), (0x400, 32), (0x800, 32)])
+        assert exc_info.value.fault_address == 0x400
+        assert [e for e in dp.events if e[0] == 'collect'] == \
+                [('collect', 0x000), ('collect', 0x400), ('collect', 0x800)]
@@ -25,7 +25,12 @@ from pyocd.utility import mask
 
 @pytest.fixture(scope='function')
 def memcache(mockcore):
-    return MemoryCache(DebugContext(mockcore), mockcore)
+    # Read-ahead is disabled so tests can control exactly which bytes are cached.
+    return MemoryCache(DebugContext(mockcore), mockcore, read_ahead=False)
+
+@pytest.fixture(scope='function')
+def memcache_ra(mockcore):
+    return MemoryCache(DebugContext(mockcore), mockcore, read_ahead=True)
 
 class TestMemoryCache:
     def test_1(self, mockcore, memcache):
@@ -108,27 +113,27 @@ class TestMemoryCache:
     def test_16_no_mem_region(self, mockcore, memcache):
         assert memcache.read_memory_block8(0x30000000, 4) == [0x55] * 4
         # Make sure we didn't cache anything.
-        assert memcache._cache.overlap(0x30000000, 0x30000004) == set()
+        assert not memcache._is_cached(0x30000000, 4)
 
     def test_17_noncacheable_region_read(self, mockcore, memcache):
         mockcore.write_memory_block8(0x20000410, [90, 91, 92, 93])
         assert memcache.read_memory_block8(0x20000410, 4) == [90, 91, 92, 93]
         # Make sure we didn't cache anything.
-        assert memcache._cache.overlap(0x20000410, 0x20000414) == set()
+        assert not memcache._is_cached(0x20000410, 4)
 
     def test_18_noncacheable_region_write(self, mockcore, memcache):
         memcache.write_memory_block8(0x20000410, [1, 2, 3, 4])
         mockcore.write_memory_block8(0x20000410, [90, 91, 92, 93])
         assert memcache.read_memory_block8(0x20000410, 4) == [90, 91, 92, 93]
         # Make sure we didn't cache anything.
-        assert memcache._cache.overlap(0x20000410, 0x20000414) == set()
+        assert not memcache._is_cached(0x20000410, 4)
 
     def test_19_write_into_cached(self, mockcore, memcache):
         mockcore.write_memory_block8(4, [1, 2, 3, 4, 5, 6, 7, 8])
         assert memcache.read_memory_block8(4, 8) == [1, 2, 3, 4, 5, 6, 7, 8]
         memcache.write_memory_block8(6, [128, 129, 130, 131])
         assert memcache.read_memory_block8(4, 8) == [1, 2, 128, 129, 130, 131, 7, 8]
-        assert len(list(memcache._cache.overlap(4, 12))[0].data) == 8
+        assert memcache._is_cached(4, 8)
 
     def test_20_empty_read(self, memcache):
         assert memcache.read_memory_block8(128, 0) == []
@@ -180,6 +185,74 @@ class TestMemoryCache:
         block = memcache.read_memory_block8(0x2000007e, 4)
         assert block == data[0x7e:0x82]
 
+    def test_27_read_ahead(self, mockcore, memcache_ra):
+        mockcore.write_memory_block8(0x20000000, list(range(16)))
+        assert memcache_ra.read_memory_block8(0x20000004, 4) == [4, 5, 6, 7]
+        # The whole line was read.
+        assert memcache_ra._is_cached(0x20000000, MemoryCache.LINE_SIZE)
+        mockcore.write_memory_block8(0x20000000, [0xaa] * 16)
+        assert memcache_ra.read_memory_block8(0x20000000, 4) == [0, 1, 2, 3]
+
+    def test_28_no_read_ahead(self, mockcore, memcache):
+        assert memcache.read_memory_block8(0x20000004, 4) == [0] * 4
+        assert memcache._is_cached(0x20000004, 4)
+        assert not memcache._is_cached(0x20000000, 4)
+        assert not memcache._is_cached(0x20000008, 4)
+
+    def test_29_read_ahead_clipped_to_region(self, mockcore, memcache_ra):
+        # Read at the end of the flash region, which is adjacent to nothing.
+        assert memcache_ra.read_memory_block8(0x3fc, 4) == [0xff] * 4
+        assert memcache_ra._is_cached(0x300, 0x100)
+
+    def test_30_lru_eviction(self, mockcore):
+        line = MemoryCache.LINE_SIZE
+        memcache = MemoryCache(DebugContext(mockcore), mockcore, size_limit=2 * line)
+        memcache.read_memory_block8(0x20000000, 4)
+        memcache.read_memory_block8(0x20000000 + line, 4)
+        # Touch the first line so the second is least recently used.
+        memcache.read_memory_block8(0x20000000, 4)
+        memcache.read_memory_block8(0x20000000 + 2 * line, 4)
+        assert memcache._is_cached(0x20000000, 4)
+        assert not memcache._is_cached(0x20000000 + line, 4)
+        assert memcache._is_cached(0x20000000 + 2 * line, 4)
+
+    def test_31_read_larger_than_limit(self, mockcore):
+        line = MemoryCache.LINE_SIZE
+        memcache = MemoryCache(DebugContext(mockcore), mockcore, size_limit=line)
+        data = list((n % 256) for n in range(0x400))
+        mockcore.write_memory_block8(0x20000000, data)
+        assert memcache.read_memory_block8(0x20000000, 0x400) == data
+
+    def test_32_invalidate_on_run(self, mockcore, memcache_ra):
+        mockcore.memory_map = memory_map.MemoryMap(
+            memory_map.FlashRegion(start=0, length=1*1024, blocksize=1024, name="flash",
+                    invalidate_cache_on_run=False),
+            mockcore.ram_region,
+            )
+        memcache_ra.read_memory_block8(0x0, 4)
+        memcache_ra.read_memory_block8(0x20000000, 4)
+        mockcore.run_token += 1
+        # Flash lines survive the run, RAM lines do not.
+        memcache_ra.read_memory_block8(0x20000100, 4)
+        assert memcache_ra._is_cached(0x0, 4)
+        assert not memcache_ra._is_cached(0x20000000, 4)
+        memcache_ra.invalidate()
+        assert not memcache_ra._is_cached(0x0, 4)
+
+    def test_33_invalidate_on_run_line_spans_regions(self, mockcore, memcache_ra):
+        # A single cache line covers both a retained region and one invalidated on run.
+        mockcore.memory_map = memory_map.MemoryMap(
+            memory_map.FlashRegion(start=0, length=0x80, blocksize=0x80, name="flash",
+                    invalidate_cache_on_run=False),
+            memory_map.RamRegion(start=0x80, length=0x80),
+            )
+        memcache_ra.read_memory_block8(0x0, 4)
+        memcache_ra.read_memory_block8(0x80, 4)
+        assert memcache_ra._is_cached(0x80, 4)
+        mockcore.run_token += 1
+        memcache_ra.read_memory_block8(0x20000000, 4)
+        assert not memcache_ra._is_cached(0x80, 4)
+
 
 
 # TODO test read32/16/8 with and without callbacks
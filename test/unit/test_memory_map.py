@@ -421,6 +421,46 @@ class TestMemoryMap:
         assert memmap.get_region_for_address(0x20000000).name == 'ram'
         assert memmap.get_region_for_address(0x20000500).name == 'ram2'
 
+    def test_rgn_for_addr_gaps(self, memmap):
+        assert memmap.get_region_for_address(0x400) is None
+        assert memmap.get_region_for_address(0x1c004000) is None
+        assert memmap.get_region_for_address(0x20000800) is None
+        assert memmap.get_region_for_address(0xffffffff) is None
+
+    def test_rgn_for_addr_overlapping(self):
+        big = RamRegion(start=0x1000, length=0x1000, name='big')
+        inner = RamRegion(start=0x1400, length=0x100, name='inner')
+        late = RamRegion(start=0x1800, length=0x1000, name='late')
+        memmap = MemoryMap(late, inner, big)
+        # The first region in address order that contains the address is returned.
+        assert memmap.get_region_for_address(0x1450).name == 'big'
+        assert memmap.get_region_for_address(0x1fff).name == 'big'
+        assert memmap.get_region_for_address(0x2000).name == 'late'
+        memmap.remove_region(memmap['big'])
+        assert memmap.get_region_for_address(0x1450).name == 'inner'
+        assert memmap.get_region_for_address(0x1500) is None
+
+    def test_set_region_bounds(self):
+        flash = FlashRegion(start=0, length=0x100000, blocksize=0x800, name='flash')
+        empty = FlashRegion(start=0x10000000, end=0x10000000, blocksize=0x800, name='empty')
+        memmap = MemoryMap(flash, empty)
+
+        # Shrink a region.
+        memmap.set_region_bounds(flash, 0, 0x7ffff)
+        assert memmap.get_region_for_address(0x7ffff) is flash
+        assert memmap.get_region_for_address(0x90000) is None
+
+        # Set the size of a region added without one.
+        memmap.set_region_bounds(empty, 0x10000000, 0x1003ffff)
+        assert memmap.get_region_for_address(0x10000000) is empty
+        assert memmap.get_region_for_address(0x10020000) is empty
+
+        # The region list is resorted if a region moves.
+        memmap.set_region_bounds(empty, 0x80000, 0xbffff)
+        assert memmap.regions == [flash, empty]
+        assert memmap.get_region_for_address(0x90000) is empty
+        assert memmap.get_region_for_address(0x10000000) is None
+
     def test_valid(self, memmap):
         assert memmap.is_valid_address(0)
         assert memmap.is_valid_address(0x200)
@@ -22,7 +22,7 @@ from xml.etree import ElementTree
 from pathlib import Path
 from unittest.mock import MagicMock
 
-from pyocd.target.pack import (cmsis_pack, flash_algo, pack_target)
+from pyocd.target.pack import (cmsis_pack, flash_algo, pack_index, pack_target)
 from pyocd.target.pack.flm_region_builder import FlmFlashRegionBuilder
 from pyocd.target import TARGET
 from pyocd.core import memory_map
@@ -163,7 +163,7 @@ class Disabled_TestPack:
         assert K64F.lower() in TARGET
 
     def test_k64_mem_map(self, k64dev):
-        map = k64dev.memory_map
+        map = k64dev.load_device().memory_map
         raml = map.get_region_for_address(0x1fff0000)
         ramu = map.get_region_for_address(0x20000000)
         flash = map.get_default_region_of_type(memory_map.MemoryType.FLASH)
@@ -212,6 +212,74 @@ class TestPack:
         assert flash.start == 0 and flash.length == 1 * 1024 * 1024
         # assert flash.sector_size == 4096
 
+class TestPackIndex:
+    @pytest.fixture
+    def index_path(self, tmp_path):
+        return tmp_path / pack_index.PackIndex.FILENAME
+
+    def test_build(self, index_path):
+        index = pack_index.PackIndex(index_path)
+        assert not index.is_current(K64F_PACK_PATH)
+        devs = index.get_devices(K64F_PACK_PATH)
+        assert [d.part_number for d in devs] == [d.part_number for d in cmsis_pack.CmsisPack(K64F_PACK_PATH).devices]
+        dev = [d for d in devs if d.part_number == "MK64FN1M0xxx12"].pop()
+        assert dev.vendor == "NXP"
+        assert dev.families == ["MK64F12"]
+        assert dev.pack_path == str(K64F_PACK_PATH)
+
+    def test_reload_without_parsing(self, index_path, monkeypatch):
+        index = pack_index.PackIndex(index_path)
+        devs = index.get_devices(K64F_PACK_PATH)
+        index.save()
+
+        # A new index instance must not parse the pack again.
+        def fail(*args, **kwargs):
+            raise AssertionError("pack was parsed")
+        monkeypatch.setattr(pack_index, 'CmsisPack', fail)
+        index = pack_index.PackIndex(index_path)
+        assert index.is_current(K64F_PACK_PATH)
+        assert index.get_devices(K64F_PACK_PATH) == devs
+
+    def test_changed_pack(self, index_path, tmp_path):
+        pack_path = tmp_path / K64F_PACK_PATH.name
+        pack_path.write_bytes(K64F_PACK_PATH.read_bytes())
+        index = pack_index.PackIndex(index_path)
+        index.get_devices(pack_path)
+        assert index.is_current(pack_path)
+        with pack_path.open('ab') as f:
+            f.write(b'\0')
+        assert not index.is_current(pack_path)
+
+    def test_remove_missing(self, index_path):
+        index = pack_index.PackIndex(index_path)
+        index.get_devices(K64F_PACK_PATH)
+        index.remove_missing([])
+        assert index.pack_paths == []
+
+    def test_save(self, index_path):
+        index = pack_index.PackIndex(index_path)
+        index.get_devices(K64F_PACK_PATH)
+        index.save()
+        # Only the index file is left in the directory.
+        assert list(index_path.parent.iterdir()) == [index_path]
+        assert pack_index.PackIndex(index_path).is_current(K64F_PACK_PATH)
+
+    def test_old_version_discarded(self, index_path):
+        index_path.write_text('{"version": 1, "packs": {"x.pack": {"key": [0, 0], "devices": []}}}')
+        assert pack_index.PackIndex(index_path).pack_paths == []
+
+    def test_bad_index_file(self, index_path):
+        index_path.write_text("not json")
+        index = pack_index.PackIndex(index_path)
+        assert index.pack_paths == []
+
+    def test_load_device(self, index_path):
+        index = pack_index.PackIndex(index_path)
+        summary = index.get_devices(K64F_PACK_PATH)[0]
+        dev = summary.load_device()
+        assert isinstance(dev, cmsis_pack.CmsisPackDevice)
+        assert dev.part_number == summary.part_number
+
 class TestFLM:
     def test_algo(self, k64algo):
         i = k64algo.flash_info
@@ -0,0 +1,141 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import struct
+from unittest import mock
+
+from pyocd.core import exceptions
+from pyocd.probe.picoprobe import (PicoLink, Picoprobe)
+from pyocd.utility.mask import parity32_high
+
+class FakePicoprobeFirmware:
+    """@brief Emulates the Picoprobe command protocol and a simple SWD target.
+
+    AP reads are posted, as on a real target: each returns the result of the previous AP read, and
+    the last one is returned by a read of DP RDBUFF. Each AP read yields the next value of a counter.
+    """
+    def __init__(self):
+        self.packets = 0
+        self.ids = []
+        self.ap_counter = 0x1000
+        self.ap_posted = 0
+        self.ap_written = []
+        self.ack = Picoprobe.ACK_OK
+        self.corrupt_parity = False
+        self._request = None
+        self._response = b''
+
+    def _process(self, cmd_id, cmd, bits, data):
+        self.ids.append(cmd_id)
+        if cmd == PicoLink.PROBE_WRITE_BITS and bits == 8:
+            req = data[0]
+            self._request = ((req >> 1) & 1, (req >> 2) & 1, ((req >> 3) & 3) << 2)
+        elif cmd == PicoLink.PROBE_READ_BITS and bits in (4, 5):
+            return bytes([self.ack << 1])
+        elif cmd == PicoLink.PROBE_READ_BITS and bits == 34:
+            apndp, rnw, addr = self._request
+            assert rnw == Picoprobe.READ
+            value = self.ap_posted
+            if apndp == Picoprobe.AP:
+                self.ap_posted = self.ap_counter
+                self.ap_counter += 1
+            else:
+                assert addr == Picoprobe.RDBUFF
+            raw = value | parity32_high(value)
+            if self.corrupt_parity:
+                raw ^= Picoprobe.PARITY_BIT
+            return raw.to_bytes(5, 'little')
+        elif cmd == PicoLink.PROBE_WRITE_BITS and bits == 36:
+            apndp, rnw, addr = self._request
+            assert rnw == Picoprobe.WRITE and apndp == Picoprobe.AP
+            raw = int.from_bytes(data, 'little')
+            value = raw & 0xffffffff
+            assert raw >> 32 == parity32_high(value) >> 32
+            self.ap_written.append(value)
+        return None
+
+    def write(self, packet):
+        packet = bytes(packet)
+        assert len(packet) <= PicoLink.BUFFER_SIZE
+        assert int.from_bytes(packet[:4], 'little') == len(packet)
+        self.packets += 1
+        response = bytearray(4)
+        offset = 4
+        while offset < len(packet):
+            cmd_id, cmd, bits = struct.unpack_from('<BBI', packet, offset)
+            offset += 6
+            count = (bits + 7) // 8 if cmd == PicoLink.PROBE_WRITE_BITS else 0
+            result = self._process(cmd_id, cmd, bits, packet[offset:offset + count])
+            offset += count
+            if result is not None:
+                response += struct.pack('<BBI', cmd_id, cmd, bits) + result
+        assert len(response) <= PicoLink.BUFFER_SIZE
+        response[:4] = len(response).to_bytes(4, 'little')
+        self._response = bytes(response)
+
+    def read(self, buffer):
+        memoryview(buffer)[:len(self._response)] = self._response
+        return len(self._response)
+
+@pytest.fixture
+def firmware():
+    return FakePicoprobeFirmware()
+
+@pytest.fixture
+def probe(firmware):
+    link = PicoLink(mock.Mock(serial_number="1234"))
+    link._wr_ep = firmware
+    link._rd_ep = firmware
+    return Picoprobe(link)
+
+class TestPicoprobeBulkTransfers:
+    @pytest.mark.parametrize("count", [1, 2, 429, 1000])
+    def test_bulk_read(self, probe, firmware, count):
+        assert probe._bulk_read_ap_multiple(0xc, count) == list(range(0x1000, 0x1000 + count))
+        assert firmware.packets == (count + 428) // 429
+
+    def test_bulk_matches_safe_read(self, probe, firmware):
+        bulk = probe._bulk_read_ap_multiple(0xc, 5)
+        firmware.ap_counter = 0x1000
+        assert probe._safe_read_ap_multiple(0xc, 5) == bulk
+
+    def test_bulk_write(self, probe, firmware):
+        values = [((i * 0x01010101) ^ 0xa5a5a5a5) & 0xffffffff for i in range(700)]
+        probe._bulk_write_ap_multiple(0xc, values)
+        assert firmware.ap_written == values
+        assert firmware.packets == 3
+
+    def test_progressive_ids(self, probe, firmware):
+        probe._bulk_read_ap_multiple(0xc, 100)
+        probe._bulk_write_ap_multiple(0xc, [1, 2, 3])
+        assert firmware.ids == [i & 0xff for i in range(len(firmware.ids))]
+
+    def test_ack_fault(self, probe, firmware):
+        firmware.ack = Picoprobe.ACK_FAULT
+        with pytest.raises(exceptions.TransferFaultError):
+            probe._bulk_read_ap_multiple(0xc, 4)
+        with pytest.raises(exceptions.TransferFaultError):
+            probe._bulk_write_ap_multiple(0xc, [0])
+
+    def test_bad_parity(self, probe, firmware):
+        firmware.corrupt_parity = True
+        with pytest.raises(exceptions.ProbeError):
+            probe._bulk_read_ap_multiple(0xc, 4)
+
+    def test_get_bits(self, probe, firmware):
+        firmware.ap_posted = 0x12345678
+        assert probe._read_reg(Picoprobe.RDBUFF, Picoprobe.DP) == 0x12345678
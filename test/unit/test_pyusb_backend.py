@@ -0,0 +1,84 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import pytest
+from time import (monotonic, sleep)
+from unittest import mock
+
+from pyocd.probe.pydapaccess.dap_access_api import DAPAccessIntf
+from pyocd.probe.pydapaccess.interface.pyusb_backend import PyUSB
+from pyocd.probe.pydapaccess.interface.pyusb_v2_backend import PyUSBv2
+
+def make_interface(cls):
+    dev = mock.Mock(idVendor=0x0d28, idProduct=0x0204, serial_number="1234")
+    iface = cls(dev)
+    iface.ep_out = mock.Mock(wMaxPacketSize=64)
+    iface.ep_in = mock.Mock(wMaxPacketSize=64)
+    iface.DEFAULT_USB_TIMEOUT_S = 0.5
+    return iface
+
+@pytest.fixture(params=[PyUSB, PyUSBv2])
+def iface(request):
+    return make_interface(request.param)
+
+class TestPyUSBHandoff:
+    def test_read_wakes_on_packet(self, iface):
+        def rx():
+            sleep(0.05)
+            iface.rcv_data.put(b'\x01\x02')
+        thread = threading.Thread(target=rx)
+        start = monotonic()
+        thread.start()
+        assert iface.read() == b'\x01\x02'
+        assert monotonic() - start < iface.DEFAULT_USB_TIMEOUT_S
+        thread.join()
+
+    def test_read_order(self, iface):
+        for i in range(3):
+            iface.rcv_data.put(bytes([i]))
+        assert [iface.read() for _ in range(3)] == [b'\x00', b'\x01', b'\x02']
+
+    def test_read_timeout(self, iface):
+        iface.DEFAULT_USB_TIMEOUT_S = 0.01
+        with pytest.raises(DAPAccessIntf.DeviceError):
+            iface.read()
+
+    def test_thread_exit(self, iface):
+        iface.rcv_data.put(None)
+        for _ in range(2):
+            with pytest.raises(DAPAccessIntf.DeviceError):
+                iface.read()
+
+class TestPyUSBWrite:
+    @pytest.mark.parametrize("data", [[1, 2, 3], b'\x01\x02\x03', bytearray(b'\x01\x02\x03'),
+            memoryview(b'\x01\x02\x03')])
+    def test_v1_pads_report(self, data):
+        iface = make_interface(PyUSB)
+        iface.write(data)
+        written = iface.ep_out.write.call_args[0][0]
+        assert bytes(written) == b'\x01\x02\x03' + bytes(61)
+        assert len(data) == 3
+
+    def test_v2_zero_length_packet(self):
+        iface = make_interface(PyUSBv2)
+        data = bytearray(64)
+        iface.write(data)
+        assert len(iface.ep_out.write.call_args[0][0]) == 65
+        assert len(data) == 64
+
+        iface.write(memoryview(b'\x01\x02'))
+        assert bytes(iface.ep_out.write.call_args[0][0]) == b'\x01\x02'
@@ -0,0 +1,231 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from unittest import mock
+
+from pyocd.coresight.cortex_m import CortexM
+from pyocd.coresight.fpb import (FPB, HardwareBreakpoint)
+from pyocd.debug.range_step import (find_range_exits, IS_CAPSTONE_AVAILABLE)
+
+needs_capstone = pytest.mark.skipif(not IS_CAPSTONE_AVAILABLE, reason="capstone is not installed")
+
+# Counting loop at 0x1000:
+#   movs r0, #0
+#   adds r0, #1     ; 0x1002
+#   cmp r0, #10     ; 0x1004
+#   bne 0x1002      ; 0x1006
+LOOP_CODE = bytes.fromhex('0020 0130 0a28 fcd1')
+LOOP_START = 0x1000
+LOOP_END = 0x1008
+
+class LoopCore(CortexM):
+    """@brief CortexM that executes LOOP_CODE against a register model instead of a probe."""
+
+    def __init__(self, options=None, num_hw_bps=4, slow_steps=(), trap_step=None, hang_on_run=False):
+        self._session = mock.Mock()
+        self._session.options.get.side_effect = lambda name: (options or {}).get(name)
+        self._session.probe = None
+        self._core_number = 0
+        self._run_token = 0
+        self.bp_manager = mock.Mock()
+        self.bp_manager.find_breakpoint.return_value = None
+        self.fpb = FPB(mock.Mock(), addr=0xe0002000)
+        self.fpb.fpb_rev = 2
+        self.fpb.hw_breakpoints = [HardwareBreakpoint(0xe0002008 + 4 * i, self.fpb)
+                for i in range(num_hw_bps)]
+        self.pc = LOOP_START
+        self.r0 = 0
+        self.zero = False
+        self.halted = True
+        self.dfsr = 0
+        self.dhcsr = CortexM.C_DEBUGEN | CortexM.C_HALT
+        self.step_count = 0
+        self.immediate_reads = 0
+        # Step numbers for which the core is still running at the first DHCSR read.
+        self.slow_steps = set(slow_steps)
+        # Step number after which a watchpoint triggers.
+        self.trap_step = trap_step
+        # Whether running the core without stepping never reaches a breakpoint.
+        self.hang_on_run = hang_on_run
+        self._running_reads = 0
+        self.running = False
+        self.dcrsr_writes_while_running = 0
+
+    def execute(self):
+        if self.pc == 0x1000:
+            self.r0 = 0
+        elif self.pc == 0x1002:
+            self.r0 += 1
+        elif self.pc == 0x1004:
+            self.zero = (self.r0 == 10)
+        elif self.pc == 0x1006 and not self.zero:
+            self.pc = 0x1002
+            return
+        self.pc += 2
+
+    def write_memory(self, addr, data, transfer_size=32):
+        if addr == CortexM.DHCSR:
+            if data & CortexM.C_HALT:
+                self.halted = True
+                self.running = False
+                self._running_reads = 0
+            elif data & CortexM.C_STEP:
+                self.step_count += 1
+                self.execute()
+                self.dfsr |= CortexM.DFSR_HALTED
+                if self.step_count == self.trap_step:
+                    self.dfsr |= CortexM.DFSR_DWTTRAP
+                if self.step_count in self.slow_steps:
+                    self._running_reads = 1
+                    self.running = True
+            elif self.hang_on_run:
+                self._running_reads = -1
+                self.running = True
+            else:
+                while True:
+                    self.execute()
+                    if self.fpb.find_breakpoint(self.pc) is not None:
+                        self.dfsr |= CortexM.DFSR_BKPT
+                        break
+        elif addr == CortexM.DFSR:
+            self.dfsr &= ~data
+        elif addr == CortexM.DCRSR:
+            self.dcrsr_writes_while_running += self.running
+
+    def read_memory(self, addr, transfer_size=32, now=True):
+        if addr == CortexM.DHCSR:
+            if self._running_reads:
+                if self._running_reads > 0:
+                    self._running_reads -= 1
+                value = CortexM.C_DEBUGEN
+            else:
+                self.running = False
+                value = CortexM.C_DEBUGEN | CortexM.C_HALT | CortexM.S_HALT | CortexM.S_REGRDY
+        elif addr == CortexM.DFSR:
+            value = self.dfsr
+        elif addr == CortexM.DCRDR:
+            value = self.pc
+        else:
+            value = 0
+        if now:
+            self.immediate_reads += 1
+            return value
+        return lambda: value
+
+    def read_memory_block8(self, addr, size):
+        offset = addr - LOOP_START
+        return list(LOOP_CODE[offset:offset + size])
+
+    def read_core_register(self, reg):
+        assert reg == 'pc'
+        self.immediate_reads += 1
+        return self.pc
+
+class TestPipelinedRangeStep:
+    def test_single_step(self):
+        core = LoopCore()
+        core.step()
+        assert core.pc == 0x1002
+        assert core.step_count == 1
+
+    def test_range_step(self):
+        core = LoopCore()
+        core.step(start=LOOP_START, end=LOOP_END)
+        assert core.pc == LOOP_END
+        assert core.r0 == 10
+        assert core.step_count == 31
+        # Only the initial DHCSR read is not part of a step's batched transfers.
+        assert core.immediate_reads == 1
+
+    def test_slow_step(self):
+        core = LoopCore(slow_steps=(3,))
+        core.step(start=LOOP_START, end=LOOP_END)
+        assert core.pc == LOOP_END
+        assert core.step_count == 31
+        # The PC is not selected through DCRSR until the core has halted.
+        assert core.dcrsr_writes_while_running == 0
+
+    def test_hook_stops(self):
+        core = LoopCore()
+        calls = []
+        def hook():
+            calls.append(None)
+            return len(calls) > 4
+        core.step(start=LOOP_START, end=LOOP_END, hook_cb=hook)
+        assert core.step_count == 4
+
+    def test_stops_on_debug_event(self):
+        core = LoopCore(trap_step=5)
+        core.step(start=LOOP_START, end=LOOP_END)
+        assert core.step_count == 5
+        assert core.pc == 0x1004
+
+@needs_capstone
+class TestBreakpointRangeStep:
+    OPTIONS = {'cpu.step.range.breakpoint_min_size': 8}
+
+    def test_run_to_exit(self):
+        core = LoopCore(options=self.OPTIONS)
+        core.step(start=LOOP_START, end=LOOP_END)
+        assert core.pc == LOOP_END
+        assert core.r0 == 10
+        assert core.step_count == 1
+        assert core.fpb.available_breakpoints == 4
+        assert not core.fpb.enabled
+        assert (core.dfsr & CortexM.DFSR_BKPT) == 0
+
+    def test_range_below_min_size(self):
+        core = LoopCore(options={'cpu.step.range.breakpoint_min_size': 16})
+        core.step(start=LOOP_START, end=LOOP_END)
+        assert core.pc == LOOP_END
+        assert core.step_count == 31
+
+    def test_run_timeout_halts(self):
+        core = LoopCore(options=dict(self.OPTIONS, **{'cpu.step.instruction.timeout': 0.05}),
+                hang_on_run=True)
+        core.step(start=LOOP_START, end=LOOP_END)
+        assert core.halted and not core.running
+        assert core.step_count == 1
+        assert not core.fpb.enabled
+
+    def test_no_free_breakpoints(self):
+        core = LoopCore(options=self.OPTIONS, num_hw_bps=0)
+        core.step(start=LOOP_START, end=LOOP_END)
+        assert core.pc == LOOP_END
+        assert core.step_count == 31
+
+@needs_capstone
+class TestFindRangeExits:
+    def test_loop(self):
+        assert find_range_exits(LOOP_CODE, LOOP_START) == {LOOP_END}
+
+    def test_direct_branches(self):
+        # bl 0x1024; cbz r0, 0x100e; nop; nop
+        code = bytes.fromhex('00f0 10f8 18b1 00bf 00bf')
+        assert find_range_exits(code, 0x1000) == {0x1024, 0x100a, 0x100e}
+
+    @pytest.mark.parametrize("code", [
+            '7047',         # bx lr
+            '00bd',         # pop {pc}
+            '9847',         # blx r3
+            'dfe800f0',     # tbb [r0, r0]
+            '00df',         # svc #0
+            '00be',         # bkpt #0
+            '0020 00',      # partial instruction
+        ])
+    def test_unsupported(self, code):
+        assert find_range_exits(bytes.fromhex(code), 0x1000) is None
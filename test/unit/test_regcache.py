@@ -18,6 +18,7 @@ import pytest
 import logging
 
 from pyocd.cache.register import RegisterCache
+from pyocd.debug.cache import CachingDebugContext
 from pyocd.debug.context import DebugContext
 from pyocd.coresight.cortex_m import CortexM
 from pyocd.coresight.cortex_m_core_registers import CortexMCoreRegisterInfo
@@ -205,7 +206,23 @@ class TestRegisterCache:
         with pytest.raises(KeyError):
             regcache_no_fpu.write_core_registers_raw(['s1'], [1.234])
 
-
-
-
-
+    def test_prefetch(self, mockcore):
+        self.set_core_regs(mockcore)
+        ctx = CachingDebugContext(mockcore)
+        reads = []
+        original_read = mockcore.read_core_registers_raw
+        def counting_read(reg_list):
+            reads.append(list(reg_list))
+            return original_read(reg_list)
+        mockcore.read_core_registers_raw = counting_read
+
+        ctx.prefetch_core_registers(['r0', 'r7', 'sp', 'lr', 'pc', 'd1'])
+        assert len(reads) == 1
+        assert ctx.read_core_registers_raw(['pc', 'r7', 'd1']) == [
+            get_expected_reg_value('pc'), get_expected_reg_value('r7'), get_expected_reg_value('d1')]
+        assert len(reads) == 1
+
+    def test_prefetch_uncached(self, mockcore):
+        ctx = DebugContext(mockcore)
+        mockcore.read_core_registers_raw = None # Must not be called.
+        ctx.prefetch_core_registers(['r0', 'pc'])
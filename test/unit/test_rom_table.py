@@ -21,7 +21,8 @@ from intervaltree import (Interval, IntervalTree)
 from .conftest import mock
 
 from pyocd.coresight.component import CoreSightCoreComponent
-from pyocd.core import memory_map
+from pyocd.core import (exceptions, memory_map)
+from pyocd.coresight.discovery_cache import RecordedReads
 from pyocd.coresight.rom_table import (
     CoreSightComponentID,
     ROMTable,
@@ -378,3 +379,85 @@ class TestRomTable:
         assert ahb.part == 0x9e3
         assert ahb.archid == 0xa17
 
+
+class FaultingCoreSight(MockCoreSight):
+    """@brief MockCoreSight where reads within a given 4 kB component window fault."""
+    def __init__(self, components, fault_base):
+        super(FaultingCoreSight, self).__init__(components)
+        self._fault_base = fault_base
+
+    def read_memory_block_bytes(self, addr, size):
+        if self._fault_base <= addr < self._fault_base + 0x1000:
+            raise exceptions.TransferFaultError("fault", fault_address=addr)
+        return super(FaultingCoreSight, self).read_memory_block_bytes(addr, size)
+
+class TestPipelinedReads:
+    def test_m4_rom(self, m4_rom):
+        cmpid = CoreSightComponentID(None, m4_rom, MockM4Components.M4_ROM_TABLE_BASE)
+        cmpid.read_id_registers()
+        rom_table = ROMTable.create(m4_rom, cmpid)
+        with mock.patch.object(m4_rom, 'read_memory_block32', wraps=m4_rom.read_memory_block32) as block_read:
+            rom_table.init()
+        # Only the table entries are read as a block, the component IDs are read with deferred reads.
+        block_read.assert_called_once_with(MockM4Components.M4_ROM_TABLE_BASE, ROMTable.ROM_TABLE_ENTRY_READ_COUNT)
+        assert [c.part for c in rom_table.components] == [0x00c, 0x002, 0x003, 0x001, 0x9a1, 0x925]
+        assert rom_table.components[4].devid == [0xca1, 0, 0]
+        assert rom_table._prefetched == {}
+
+    def test_read_multiple_matches_single(self, m4_rom):
+        bases = [MockM4Components.SCS_BASE, MockM4Components.TPIU_BASE, MockM4Components.ETM_BASE]
+        multiple = [CoreSightComponentID(None, m4_rom, base) for base in bases]
+        CoreSightComponentID.read_id_registers_multiple(m4_rom, multiple)
+        for cmpid, base in zip(multiple, bases):
+            single = CoreSightComponentID(None, m4_rom, base)
+            single.read_id_registers()
+            assert repr(cmpid) == repr(single)
+            assert cmpid.factory == single.factory
+
+    def test_fault_falls_back(self):
+        memif = FaultingCoreSight([
+                    MockM4Components.M4_ROM_TABLE,
+                    MockM4Components.SCS,
+                    MockM4Components.DWT,
+                    MockM4Components.FPB,
+                    MockM4Components.ITM,
+                    MockM4Components.TPIU,
+                ], fault_base=MockM4Components.ETM_BASE)
+        cmpid = CoreSightComponentID(None, memif, MockM4Components.M4_ROM_TABLE_BASE)
+        cmpid.read_id_registers()
+        rom_table = ROMTable.create(memif, cmpid)
+        memif.dp = mock.Mock()
+        memif.dp.session.get_current.return_value.log_tracebacks = False
+        rom_table.init()
+        # The faulting ETM is skipped, the other components are found.
+        assert [c.part for c in rom_table.components] == [0x00c, 0x002, 0x003, 0x001, 0x9a1]
+
+class TestRecordedReads:
+    def test_replay(self, m4_rom):
+        # Parse the ROM table while recording reads.
+        m4_rom.rom_table_reads = RecordedReads()
+        cmpid = CoreSightComponentID(None, m4_rom, MockM4Components.M4_ROM_TABLE_BASE)
+        cmpid.read_id_registers()
+        ROMTable.create(m4_rom, cmpid).init()
+        assert m4_rom.rom_table_reads.is_modified
+        recorded = m4_rom.rom_table_reads.to_list()
+        assert m4_rom.rom_table_reads.first_read[0] == MockM4Components.M4_ROM_TABLE_BASE + 0xfd0
+
+        # Parse again from the recorded reads, with a memory interface that can't be read.
+        memif = mock.Mock(spec=MemoryInterface)
+        memif.read_memory_block32.side_effect = AssertionError("unexpected read")
+        memif.short_description = "MockCoreSight"
+        memif.rom_table_reads = RecordedReads.from_list(recorded)
+        cmpid = CoreSightComponentID(None, memif, MockM4Components.M4_ROM_TABLE_BASE)
+        cmpid.read_id_registers()
+        rom_table = ROMTable.create(memif, cmpid)
+        rom_table.init()
+        assert not memif.rom_table_reads.is_modified
+        assert [(c.address, c.part, c.devid) for c in rom_table.components] == [
+                (MockM4Components.SCS_BASE, 0x00c, [0, 0, 0]),
+                (MockM4Components.DWT_BASE, 0x002, [0, 0, 0]),
+                (MockM4Components.FPB_BASE, 0x003, [0, 0, 0]),
+                (MockM4Components.ITM_BASE, 0x001, [0, 0, 0]),
+                (MockM4Components.TPIU_BASE, 0x9a1, [0xca1, 0, 0]),
+                (MockM4Components.ETM_BASE, 0x925, [0, 0, 0]),
+                ]
@@ -0,0 +1,338 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import struct
+from unittest import mock
+
+from pyocd.rtos import (rtx5, threadx, zephyr)
+from pyocd.rtos.common import (decode_c_string, TCBLayout, ThreadSnapshot)
+from pyocd.rtos.freertos import (FreeRTOSThread, FreeRTOSThreadProvider)
+
+RAM_BASE = 0x20000000
+RAM_SIZE = 0x1000
+
+class MemoryContext(object):
+    """@brief Debug context backed by a bytearray that counts block reads."""
+
+    def __init__(self):
+        self.ram = bytearray(RAM_SIZE)
+        self.core = mock.Mock(has_fpu=False)
+        self.block_reads = []
+
+    def write32(self, addr, value):
+        struct.pack_into('<I', self.ram, addr - RAM_BASE, value)
+
+    def write_bytes(self, addr, data):
+        self.ram[addr - RAM_BASE:addr - RAM_BASE + len(data)] = data
+
+    def read32(self, addr):
+        return struct.unpack_from('<I', self.ram, addr - RAM_BASE)[0]
+
+    def read_memory_block8(self, addr, size):
+        return list(self.read_memory_block_bytes(addr, size))
+
+    def read_memory_block_bytes(self, addr, size):
+        self.block_reads.append((addr, size))
+        return bytearray(self.ram[addr - RAM_BASE:addr - RAM_BASE + size])
+
+    def read_core_register(self, reg):
+        assert reg == 'ipsr'
+        return 0
+
+class TestThreadSnapshot:
+    LAYOUT = TCBLayout({
+            'next': (8, 'I'),
+            'prio': (1, 'b'),
+            'name': (12, '4s'),
+        })
+
+    def test_layout(self):
+        assert self.LAYOUT.size == 16
+        data = bytes([0, 0xfe]) + bytes(6) + struct.pack('<I', 0x1234) + b'abc\0'
+        assert self.LAYOUT.unpack(data) == {'next': 0x1234, 'prio': -2, 'name': b'abc\0'}
+
+    def test_decode_c_string(self):
+        assert decode_c_string(b'abc\0def') == 'abc'
+        assert decode_c_string(b'a\xffb\0') == 'a?b'
+        assert decode_c_string(b'abcd') is None
+
+    def test_read_once_per_snapshot(self):
+        context = MemoryContext()
+        snapshot = ThreadSnapshot(context, self.LAYOUT)
+        snapshot.begin()
+        snapshot.read_tcb(RAM_BASE)
+        snapshot.read_tcb(RAM_BASE)
+        assert context.block_reads == [(RAM_BASE, 16)]
+        snapshot.begin()
+        snapshot.read_tcb(RAM_BASE)
+        assert len(context.block_reads) == 2
+
+    def test_generation(self):
+        snapshot = ThreadSnapshot(MemoryContext(), self.LAYOUT)
+        assert snapshot.begin((1,))
+        assert not snapshot.begin((1,))
+        assert snapshot.begin((2,))
+        assert snapshot.begin()
+        assert snapshot.begin((2,))
+        snapshot.invalidate()
+        assert snapshot.begin((2,))
+
+    def test_name_cache(self):
+        snapshot = ThreadSnapshot(MemoryContext(), self.LAYOUT)
+        reader = mock.Mock(side_effect=["a", "b"])
+        assert snapshot.get_name(0x100, 1, reader) == "a"
+        assert snapshot.get_name(0x100, 1, reader) == "a"
+        assert snapshot.get_name(0x100, 2, reader) == "b"
+        assert reader.call_count == 2
+        snapshot.retain({0x200})
+        reader = mock.Mock(return_value="c")
+        assert snapshot.get_name(0x100, 2, reader) == "c"
+
+## Address of the list head in the list walking tests.
+LIST_HEAD = RAM_BASE
+## Addresses of the TCBs in the list walking tests.
+LIST_TCBS = [RAM_BASE + 0x100 + 0x100 * i for i in range(3)]
+
+class TestListWalking:
+    """@brief Walk each RTOS's thread list through a ThreadSnapshot."""
+
+    def link(self, context, offset, last_next):
+        context.write32(LIST_HEAD, LIST_TCBS[0])
+        for tcb, next_tcb in zip(LIST_TCBS, LIST_TCBS[1:] + [last_next]):
+            context.write32(tcb + offset, next_tcb)
+
+    def test_zephyr(self):
+        context = MemoryContext()
+        layout = TCBLayout({'next_thread': (0x64, 'I'), 'state': (0x0d, 'B'), 'prio': (0x0e, 'b')})
+        snapshot = ThreadSnapshot(context, layout)
+        self.link(context, 0x64, 0)
+        snapshot.begin()
+        assert list(zephyr.TargetList(context, LIST_HEAD, snapshot)) == LIST_TCBS
+        assert context.block_reads == [(tcb, layout.size) for tcb in LIST_TCBS]
+        assert snapshot.read_tcb(LIST_TCBS[1])['next_thread'] == LIST_TCBS[2]
+        assert len(context.block_reads) == len(LIST_TCBS)
+
+    def test_rtx5(self):
+        context = MemoryContext()
+        layout = rtx5.RTX5ThreadProvider.TCB_LAYOUT
+        snapshot = ThreadSnapshot(context, layout)
+        # Threads are linked through thread_next, with a separate delay list through delay_next.
+        self.link(context, rtx5.RTX5ThreadProvider.THREADNEXT_OFFSET, 0)
+        context.write32(LIST_TCBS[2] + rtx5.RTX5ThreadProvider.DELAYNEXT_OFFSET, LIST_TCBS[0])
+        snapshot.begin()
+        assert list(rtx5.TargetList(context, LIST_HEAD, snapshot, 'thread_next')) == LIST_TCBS
+        assert context.block_reads == [(tcb, layout.size) for tcb in LIST_TCBS]
+
+        # Walking the delay list reuses the TCBs already read.
+        context.write32(LIST_HEAD + 4, LIST_TCBS[2])
+        assert list(rtx5.TargetList(context, LIST_HEAD + 4, snapshot, 'delay_next')) == \
+                [LIST_TCBS[2], LIST_TCBS[0]]
+        assert len(context.block_reads) == len(LIST_TCBS)
+
+    def test_threadx(self):
+        context = MemoryContext()
+        snapshot = ThreadSnapshot(context, threadx.TCB_LAYOUT)
+        # The created thread list is circular.
+        self.link(context, threadx.THREAD_NEXT_OFFSET, LIST_TCBS[0])
+        for tcb in LIST_TCBS:
+            context.write32(tcb + threadx.THREAD_ID_OFFSET, threadx.TX_THREAD_ID)
+        snapshot.begin()
+        assert list(threadx.TargetList(context, LIST_HEAD, snapshot)) == LIST_TCBS
+        assert context.block_reads == [(tcb, threadx.TCB_LAYOUT.size) for tcb in LIST_TCBS]
+
+        # A thread with a NULL name pointer is unnamed, without reading a name from address 0.
+        context.write32(LIST_TCBS[0] + threadx.THREAD_NAME_OFFSET, 0)
+        context.read_memory_block8 = mock.Mock(side_effect=AssertionError("name read"))
+        thread = threadx.ThreadXThread(context, mock.Mock(), LIST_TCBS[0], snapshot)
+        assert thread.name == "Unnamed"
+
+        # The walk stops at a TCB without the thread ID.
+        context.write32(LIST_TCBS[1] + threadx.THREAD_ID_OFFSET, 0)
+        snapshot.begin()
+        assert list(threadx.TargetList(context, LIST_HEAD, snapshot)) == LIST_TCBS[:1]
+
+SYMBOLS = {
+    'uxCurrentNumberOfTasks': 0x20000000,
+    'pxCurrentTCB': 0x20000004,
+    'uxTopReadyPriority': 0x20000008,
+    'xSchedulerRunning': 0x2000000c,
+    'uxTaskNumber': 0x20000010,
+    'pxReadyTasksLists': 0x20000100,
+    'xDelayedTaskList1': 0x20000128,
+    'xDelayedTaskList2': 0x2000013c,
+    'xPendingReadyList': 0x20000150,
+    'xSuspendedTaskList': 0x20000164,
+    }
+
+READY_LIST = SYMBOLS['pxReadyTasksLists']
+DELAYED_LIST = SYMBOLS['xDelayedTaskList1']
+TCBS = [0x20000200 + 0x80 * i for i in range(4)]
+
+class FreeRTOSTarget(object):
+    """@brief FreeRTOS kernel data in a MemoryContext."""
+
+    def __init__(self):
+        self.context = MemoryContext()
+        self.lists = {addr: [] for name, addr in SYMBOLS.items()
+                if name.startswith(('px', 'x')) and name not in ('pxCurrentTCB', 'xSchedulerRunning')}
+        self.lists[READY_LIST + 20] = []
+        self.task_number = 0
+        self.context.write32(SYMBOLS['xSchedulerRunning'], 1)
+        self.context.write32(SYMBOLS['uxTopReadyPriority'], 1)
+
+    def create_task(self, tcb, name, priority, list_addr):
+        self.context.write32(tcb + 44, priority)
+        self.context.write_bytes(tcb + 52, name)
+        self.task_number += 1
+        self.move_task(tcb, list_addr)
+
+    def move_task(self, tcb, list_addr):
+        for items in self.lists.values():
+            if tcb in items:
+                items.remove(tcb)
+        self.lists[list_addr].append(tcb)
+        self.update()
+
+    def update(self):
+        ctx = self.context
+        for list_addr, tcbs in self.lists.items():
+            # Items are walked backwards from the list end via pxPrevious.
+            ctx.write32(list_addr, len(tcbs))
+            prev = list_addr + 8
+            for tcb in tcbs:
+                ctx.write32(tcb + 4 + 8, prev)
+                ctx.write32(tcb + 4 + 12, tcb)
+                ctx.write32(tcb + 4 + 16, list_addr)
+                prev = tcb + 4
+            ctx.write32(list_addr + 16, prev)
+        ctx.write32(SYMBOLS['uxCurrentNumberOfTasks'], sum(len(tcbs) for tcbs in self.lists.values()))
+        ctx.write32(SYMBOLS['uxTaskNumber'], self.task_number)
+
+    def pend_task(self, tcb):
+        """@brief Put a task's event list item, at offset 24, on the pending ready list."""
+        ctx = self.context
+        list_addr = SYMBOLS['xPendingReadyList']
+        ctx.write32(list_addr, 1)
+        ctx.write32(tcb + 24 + 8, list_addr + 8)
+        ctx.write32(tcb + 24 + 12, tcb)
+        ctx.write32(tcb + 24 + 16, list_addr)
+        ctx.write32(list_addr + 16, tcb + 24)
+
+@pytest.fixture
+def rtos():
+    rtos = FreeRTOSTarget()
+    rtos.create_task(TCBS[0], b'main\0', 1, READY_LIST + 20)
+    rtos.create_task(TCBS[1], b'idle\0', 0, READY_LIST)
+    rtos.create_task(TCBS[2], b'sensor\0', 1, DELAYED_LIST)
+    rtos.context.write32(SYMBOLS['pxCurrentTCB'], TCBS[0])
+    return rtos
+
+@pytest.fixture
+def provider(rtos):
+    target = mock.Mock()
+    target.elf = None
+    target.run_token = 0
+    target.get_target_context.return_value = rtos.context
+    symbols = mock.Mock()
+    symbols.get_symbol_value.side_effect = lambda name: SYMBOLS.get(name)
+    provider = FreeRTOSThreadProvider(target)
+    assert provider.init(symbols)
+    provider.read_from_target = True
+    return provider
+
+def halt(provider):
+    provider._target.run_token += 1
+    return {t.unique_id: t for t in provider.get_threads()}
+
+def node_reads(context):
+    return [read for read in context.block_reads if read[1] == 8]
+
+class TestFreeRTOSSnapshot:
+    def test_build(self, rtos, provider):
+        threads = halt(provider)
+        assert sorted(threads) == TCBS[:3]
+        assert threads[TCBS[0]].state == FreeRTOSThread.RUNNING
+        assert threads[TCBS[1]].state == FreeRTOSThread.READY
+        assert threads[TCBS[2]].state == FreeRTOSThread.BLOCKED
+        assert [threads[tcb].name for tcb in TCBS[:3]] == ['main', 'idle', 'sensor']
+        assert threads[TCBS[2]].priority == 1
+
+    def test_refresh_without_walk(self, rtos, provider):
+        halt(provider)
+        rtos.move_task(TCBS[2], READY_LIST + 20)
+        rtos.context.write32(TCBS[2] + 44, 3)
+        rtos.context.write32(SYMBOLS['pxCurrentTCB'], TCBS[2])
+        del rtos.context.block_reads[:]
+
+        threads = halt(provider)
+        assert not node_reads(rtos.context)
+        assert sorted(rtos.context.block_reads) == [(tcb, 68) for tcb in TCBS[:3]]
+        assert threads[TCBS[0]].state == FreeRTOSThread.READY
+        assert threads[TCBS[2]].state == FreeRTOSThread.RUNNING
+        assert threads[TCBS[2]].priority == 3
+
+    def test_new_task_walks_lists(self, rtos, provider):
+        halt(provider)
+        rtos.create_task(TCBS[3], b'net\0', 1, SYMBOLS['xSuspendedTaskList'])
+        del rtos.context.block_reads[:]
+
+        threads = halt(provider)
+        assert node_reads(rtos.context)
+        assert threads[TCBS[3]].state == FreeRTOSThread.SUSPENDED
+        assert threads[TCBS[3]].name == 'net'
+
+    def test_replaced_task_walks_lists(self, rtos, provider):
+        halt(provider)
+        # Delete a task and create another, so the task count is unchanged.
+        rtos.move_task(TCBS[2], READY_LIST)
+        rtos.lists[READY_LIST].remove(TCBS[2])
+        rtos.create_task(TCBS[3], b'net\0', 1, READY_LIST + 20)
+
+        threads = halt(provider)
+        assert sorted(threads) == [TCBS[0], TCBS[1], TCBS[3]]
+
+    def test_pending_ready_walks_lists(self, rtos, provider):
+        halt(provider)
+        # A task waiting without a timeout is woken while the scheduler is suspended. Its state list
+        # item stays on the suspended list and its event list item is put on the pending ready list.
+        rtos.move_task(TCBS[2], SYMBOLS['xSuspendedTaskList'])
+        rtos.pend_task(TCBS[2])
+        del rtos.context.block_reads[:]
+
+        threads = halt(provider)
+        assert node_reads(rtos.context)
+        assert threads[TCBS[2]].state == FreeRTOSThread.READY
+
+    def test_name_cache(self, rtos, provider):
+        with mock.patch('pyocd.rtos.freertos.decode_c_string', wraps=decode_c_string) as decode:
+            halt(provider)
+            assert decode.call_count == 3
+
+            # Unchanged names are not decoded again.
+            halt(provider)
+            assert decode.call_count == 3
+
+            # Names are only decoded again if the name bytes change.
+            rtos.context.write_bytes(TCBS[1] + 52, b'IDLE\0')
+            threads = halt(provider)
+            assert threads[TCBS[1]].name == 'IDLE'
+            assert decode.call_count == 4
+
+    def test_long_name(self, rtos, provider):
+        rtos.context.write_bytes(TCBS[1] + 52, b'a_very_long_task_name\0')
+        threads = halt(provider)
+        assert threads[TCBS[1]].name == 'a_very_long_task_name'
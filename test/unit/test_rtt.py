@@ -0,0 +1,188 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import struct
+
+from pyocd.core.memory_interface import MemoryInterface
+from pyocd.debug.rtt import GenericRTTControlBlock
+from pyocd.subcommands.rtt_cmd import (MAX_IDLE_POLL_INTERVAL, MIN_IDLE_POLL_INTERVAL, next_poll_interval)
+from pyocd.utility import conversion
+from pyocd.utility.rtt_server import (RTTChanWorker, RTTServer)
+
+CB_ADDR = 0x100
+UP_DESC = CB_ADDR + 24
+DOWN_DESC = UP_DESC + 2 * 24
+UP_BUFS = (0x200, 0x300)
+DOWN_BUF = 0x400
+BUF_SIZE = 0x40
+
+class FakeRTTTarget(MemoryInterface):
+    """@brief Target with an RTT control block having two up channels and one down channel."""
+    def __init__(self):
+        self.data = bytearray(0x800)
+        self.data[CB_ADDR:UP_DESC] = struct.pack("<16sii", b'SEGGER RTT', 2, 1)
+        self.data[0x500:0x508] = b'Terminal'
+        for i, buf in enumerate(UP_BUFS):
+            self.set_desc(UP_DESC + i * 24, 0x500 if i == 0 else 0, buf)
+        self.set_desc(DOWN_DESC, 0, DOWN_BUF)
+        self.reads = []
+
+    def set_desc(self, addr, name, buf, wr=0, rd=0):
+        self.data[addr:addr + 24] = struct.pack("<6I", name, buf, BUF_SIZE if buf else 0, wr, rd, 0)
+
+    def offsets(self, addr):
+        return struct.unpack_from("<II", self.data, addr + 12)
+
+    def put_up(self, chan, data):
+        """@brief Write data into an up channel ring buffer as the target would."""
+        addr = UP_DESC + chan * 24
+        wr, rd = self.offsets(addr)
+        for b in data:
+            self.data[UP_BUFS[chan] + wr] = b
+            wr = (wr + 1) % BUF_SIZE
+        struct.pack_into("<I", self.data, addr + 12, wr)
+
+    def write_memory(self, addr, data, transfer_size=32):
+        self.data[addr:addr + transfer_size // 8] = data.to_bytes(transfer_size // 8, 'little')
+
+    def read_memory(self, addr, transfer_size=32, now=True):
+        self.reads.append((addr, transfer_size // 8))
+        value = int.from_bytes(self.data[addr:addr + transfer_size // 8], 'little')
+        return value if now else (lambda: value)
+
+    def read_memory_block_bytes(self, addr, size):
+        self.reads.append((addr, size))
+        return bytearray(self.data[addr:addr + size])
+
+    def write_memory_block_bytes(self, addr, data):
+        self.data[addr:addr + len(data)] = data
+
+    def read_memory_block8(self, addr, size):
+        return list(self.read_memory_block_bytes(addr, size))
+
+    def write_memory_block8(self, addr, data):
+        self.write_memory_block_bytes(addr, bytes(data))
+
+    def read_memory_block32(self, addr, size):
+        return conversion.bytes_to_u32le_list(self.read_memory_block_bytes(addr, size * 4))
+
+    def write_memory_block32(self, addr, data):
+        self.write_memory_block_bytes(addr, conversion.u32le_list_to_bytes(data))
+
+class FakeWorker(RTTChanWorker):
+    """@brief Worker that accepts a limited number of bytes per write."""
+    def __init__(self, limit=None):
+        self.received = bytearray()
+        self.limit = limit
+        self.down_data = b''
+
+    def write_up_data(self, data):
+        n = len(data) if self.limit is None else min(self.limit, len(data))
+        self.received += data[:n]
+        return n
+
+    def get_down_data(self):
+        data, self.down_data = self.down_data, b''
+        return data
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def target():
+    return FakeRTTTarget()
+
+@pytest.fixture
+def cb(target):
+    cb = GenericRTTControlBlock(target, address=CB_ADDR, size=0)
+    cb.start()
+    target.reads.clear()
+    return cb
+
+class TestRTTControlBlock:
+    def test_start(self, cb):
+        assert len(cb.up_channels) == 2
+        assert len(cb.down_channels) == 1
+        assert cb.up_channels[0].name == "Terminal"
+
+    def test_read_up_channels_batched(self, target, cb):
+        target.put_up(1, b'hello')
+        assert cb.read_up_channels() == [b'', b'hello']
+
+        # One read for both descriptors, and one data read for the non-empty channel.
+        assert target.reads == [(UP_DESC, 48), (UP_BUFS[1], 5)]
+        assert target.offsets(UP_DESC + 24) == (5, 5)
+
+    def test_read_wraparound(self, target, cb):
+        target.set_desc(UP_DESC, 0x500, UP_BUFS[0], wr=BUF_SIZE - 2, rd=BUF_SIZE - 2)
+        target.put_up(0, b'abcdef')
+        assert cb.read_up_channels([0]) == [b'abcdef']
+        assert target.offsets(UP_DESC) == (4, 4)
+
+        # Data ending exactly at the end of the buffer needs only one data read.
+        target.set_desc(UP_DESC, 0x500, UP_BUFS[0], wr=BUF_SIZE - 3, rd=BUF_SIZE - 3)
+        target.put_up(0, b'xyz')
+        target.reads.clear()
+        assert cb.up_channels[0].read() == b'xyz'
+        assert len(target.reads) == 2
+
+    def test_unconfigured_channel(self, target):
+        target.set_desc(UP_DESC + 24, 0, 0)
+        cb = GenericRTTControlBlock(target, address=CB_ADDR, size=0)
+        cb.start()
+        assert not cb.up_channels[1].is_configured
+        assert cb.read_up_channels([1]) == [b'']
+
+        # The target configures the channel later.
+        target.set_desc(UP_DESC + 24, 0x500, UP_BUFS[1])
+        target.put_up(1, b'x')
+        assert cb.read_up_channels([1]) == [b'x']
+        assert cb.up_channels[1].name == "Terminal"
+
+class TestRTTServer:
+    @pytest.fixture
+    def server(self, target):
+        server = RTTServer(target, CB_ADDR, 0, b'SEGGER RTT')
+        server.start()
+        return server
+
+    def test_poll(self, target, server):
+        worker = FakeWorker(limit=3)
+        server.workers[1] = worker
+        assert server.poll() == 0
+
+        target.put_up(1, b'abcdef')
+        assert server.poll() == 6
+        assert worker.received == b'abc'
+
+        # Buffered data is passed on without new data from the target.
+        assert server.poll() == 0
+        assert worker.received == b'abcdef'
+
+    def test_poll_down(self, target, server):
+        worker = FakeWorker()
+        worker.down_data = b'cmd'
+        server.workers[0] = worker
+        assert server.poll() == 3
+        assert target.data[DOWN_BUF:DOWN_BUF + 3] == b'cmd'
+        assert target.offsets(DOWN_DESC) == (3, 0)
+
+def test_next_poll_interval():
+    assert next_poll_interval(0.0, False) == MIN_IDLE_POLL_INTERVAL
+    assert next_poll_interval(MIN_IDLE_POLL_INTERVAL, False) == MIN_IDLE_POLL_INTERVAL * 2
+    assert next_poll_interval(MAX_IDLE_POLL_INTERVAL, False) == MAX_IDLE_POLL_INTERVAL
+    assert next_poll_interval(MAX_IDLE_POLL_INTERVAL, True) == 0.0
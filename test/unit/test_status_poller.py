@@ -0,0 +1,112 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from pyocd.core import exceptions
+from pyocd.core.target import Target
+from pyocd.gdbserver.status_poller import TargetStatusPoller
+
+class FakeTarget:
+    """@brief Target stand-in that counts deferred state reads."""
+    def __init__(self, state=Target.State.RUNNING, error=None):
+        self.state = state
+        self.error = error
+        self.queued = 0
+        self.completed = 0
+
+    def get_state_deferred(self):
+        self.queued += 1
+        def complete():
+            self.completed += 1
+            if self.error is not None:
+                raise self.error
+            return self.state
+        return complete
+
+@pytest.fixture
+def poller():
+    return TargetStatusPoller()
+
+class TestStatusPoller:
+    def test_single(self, poller):
+        t = FakeTarget()
+        with poller.watch(t):
+            assert poller.get_state(t) == Target.State.RUNNING
+            assert poller.get_state(t) == Target.State.RUNNING
+        assert t.queued == t.completed == 2
+
+    def test_batched(self, poller):
+        t0 = FakeTarget()
+        t1 = FakeTarget(Target.State.HALTED)
+        with poller.watch(t0), poller.watch(t1):
+            assert poller.get_state(t0, max_age=10) == Target.State.RUNNING
+            assert t1.queued == t1.completed == 1
+
+            # The kept state for t1 is used once.
+            assert poller.get_state(t1, max_age=10) == Target.State.HALTED
+            assert t1.queued == 1
+            assert poller.get_state(t1, max_age=10) == Target.State.HALTED
+            assert t1.queued == 2
+
+    def test_kept_state_too_old(self, poller):
+        t0 = FakeTarget()
+        t1 = FakeTarget()
+        with poller.watch(t0), poller.watch(t1):
+            poller.get_state(t0)
+            t1.state = Target.State.HALTED
+            assert poller.get_state(t1, max_age=-1) == Target.State.HALTED
+            assert t1.queued == 2
+
+    def test_invalidate(self, poller):
+        t0 = FakeTarget()
+        t1 = FakeTarget(Target.State.HALTED)
+        with poller.watch(t0), poller.watch(t1):
+            poller.get_state(t0)
+            poller.invalidate(t1)
+            t1.state = Target.State.RUNNING
+            assert poller.get_state(t1, max_age=10) == Target.State.RUNNING
+            assert t1.queued == 2
+
+    def test_unwatched_not_batched(self, poller):
+        t0 = FakeTarget()
+        t1 = FakeTarget()
+        with poller.watch(t0):
+            with poller.watch(t1):
+                pass
+            poller.get_state(t0)
+        assert t1.queued == 0
+
+    def test_error_isolation(self, poller):
+        t0 = FakeTarget()
+        t1 = FakeTarget(error=exceptions.TransferFaultError())
+        with poller.watch(t0), poller.watch(t1):
+            # An error for another target is not raised to the caller.
+            assert poller.get_state(t0) == Target.State.RUNNING
+            assert t1.completed == 1
+
+            # An error for the requested target is raised, after completing all reads.
+            with pytest.raises(exceptions.TransferFaultError):
+                poller.get_state(t1)
+            assert t0.queued == t0.completed == 2
+
+    def test_for_session(self):
+        class FakeSession:
+            pass
+        s0 = FakeSession()
+        s1 = FakeSession()
+        assert TargetStatusPoller.for_session(s0) is TargetStatusPoller.for_session(s0)
+        assert TargetStatusPoller.for_session(s0) is not TargetStatusPoller.for_session(s1)
@@ -0,0 +1,141 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import struct
+
+from pyocd.core import exceptions
+from pyocd.probe.stlink.constants import (Commands, Status)
+from pyocd.probe.stlink.stlink import STLink
+from pyocd.probe.stlink_probe import STLinkMemoryInterface
+
+MEMORY_SIZE = 0x10000
+
+class FakeSTLinkDevice:
+    """@brief STLink USB device with memory that faults at and above a given address.
+
+    As with a real DAP, a fault sets a sticky error so later transfers also fail until the sticky
+    error is cleared through the DP ABORT register.
+    """
+    max_packet_size = 64
+
+    def __init__(self, fault_address=MEMORY_SIZE):
+        self.memory = bytearray(range(256)) * (MEMORY_SIZE // 256)
+        self.fault_address = fault_address
+        self.sticky = False
+        self.status = (Status.JTAG_OK, 0)
+        self.commands = []
+
+    def _access(self, addr, size):
+        if self.sticky:
+            self.status = (Status.SWD_AP_STICKY_ERROR, addr)
+            return False
+        if addr + size > self.fault_address:
+            self.sticky = True
+            self.status = (Status.SWD_AP_FAULT, max(addr, self.fault_address))
+            return False
+        self.status = (Status.JTAG_OK, 0)
+        return True
+
+    def transfer(self, cmd, writeData=None, readSize=None, timeout=1000):
+        op = cmd[1]
+        self.commands.append(op)
+        if op in (Commands.JTAG_READMEM_32BIT, Commands.JTAG_READMEM_16BIT, Commands.JTAG_READMEM_8BIT):
+            assert len(cmd) == 16
+            _, _, addr, size = struct.unpack_from('<BBIH', cmd)
+            assert readSize == size
+            if self._access(addr, size):
+                return bytearray(self.memory[addr:addr + size])
+            return bytearray(size)
+        elif op in (Commands.JTAG_WRITEMEM_32BIT, Commands.JTAG_WRITEMEM_16BIT, Commands.JTAG_WRITEMEM_8BIT):
+            _, _, addr, size = struct.unpack_from('<BBIH', cmd)
+            assert len(writeData) == size
+            if self._access(addr, size):
+                self.memory[addr:addr + size] = writeData
+        elif op == Commands.JTAG_GETLASTRWSTATUS2:
+            return bytearray(struct.pack('<HHI4x', self.status[0], 0, self.status[1]))
+        elif op == Commands.JTAG_WRITE_DAP_REG:
+            self.sticky = False
+            return bytearray(struct.pack('<H', Status.JTAG_OK))
+        else:
+            raise AssertionError("unexpected command %#x" % op)
+
+def make_link(device, interval=0):
+    link = STLink(device)
+    link._hw_version = 3
+    link._jtag_version = 7
+    link._protocol = STLink.Protocol.SWD
+    link.set_rw_status_interval(interval)
+    return link
+
+def status_checks(device):
+    return device.commands.count(Commands.JTAG_GETLASTRWSTATUS2)
+
+class TestSTLinkMemoryTransfers:
+    def test_read_single_status_check(self):
+        device = FakeSTLinkDevice()
+        link = make_link(device)
+        data = link.read_mem32(0, 0x8000, 0, 0)
+        assert isinstance(data, bytearray)
+        assert data == device.memory[:0x8000]
+        assert device.commands.count(Commands.JTAG_READMEM_32BIT) == 6
+        assert status_checks(device) == 1
+
+    def test_read_status_interval(self):
+        device = FakeSTLinkDevice()
+        link = make_link(device, interval=2)
+        link.read_mem32(0, 0x8000, 0, 0)
+        assert status_checks(device) == 3
+
+    def test_write(self):
+        device = FakeSTLinkDevice()
+        link = make_link(device)
+        link.write_mem32(0x100, bytes(0x4000), 0, 0)
+        assert device.memory[0x100:0x4100] == bytes(0x4000)
+        assert device.memory[0x4100] == 0x00 and device.memory[0x4101] == 0x01
+        assert status_checks(device) == 1
+
+    @pytest.mark.parametrize("interval", [0, 1, 2])
+    def test_read_fault_address(self, interval):
+        device = FakeSTLinkDevice(fault_address=0x3100)
+        link = make_link(device, interval)
+        with pytest.raises(exceptions.TransferFaultError) as excinfo:
+            link.read_mem32(0, 0x8000, 0, 0)
+        assert excinfo.value.fault_address == 0x3100
+        # The fault length runs to the end of the faulting command, which starts at 0x3000.
+        assert excinfo.value.fault_length == 0x4800 - 0x3100
+        assert not device.sticky
+
+    def test_write_fault_address(self):
+        device = FakeSTLinkDevice(fault_address=0x5000)
+        link = make_link(device)
+        with pytest.raises(exceptions.TransferFaultError) as excinfo:
+            link.write_mem32(0, bytes(0x8000), 0, 0)
+        assert excinfo.value.fault_address == 0x5000
+        # Commands before the faulting one were written again while locating the fault.
+        assert device.memory[:0x4800] == bytes(0x4800)
+
+class TestSTLinkMemoryInterface:
+    def test_unaligned_bytes(self):
+        device = FakeSTLinkDevice()
+        memif = STLinkMemoryInterface(make_link(device), 0)
+        assert memif.read_memory_block_bytes(0x3, 9) == device.memory[3:12]
+        memif.write_memory_block_bytes(0x11, b'\xaa' * 6)
+        assert device.memory[0x10:0x18] == b'\x10' + b'\xaa' * 6 + b'\x17'
+        assert memif.read32(0x10) == 0xaaaaaa10
+        memif.write16(0x20, 0x1234)
+        assert memif.read_memory_block8(0x20, 2) == [0x34, 0x12]
+        assert memif.read_memory_block32(0x20, 1) == [0x23221234]
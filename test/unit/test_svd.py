@@ -14,6 +14,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from pyocd.debug.svd.cache import (
+    CACHE_FILE_EXTENSION,
+    CACHE_FORMAT_VERSION,
+    CachedSVDPeripheral,
+    SVDCache,
+)
 from pyocd.debug.svd.loader import (
     SVDFile,
     SVDLoader,
@@ -32,3 +38,55 @@ class TestIntervalSvdAccess:
         assert loader.device
         assert [p for p in loader.device.peripherals if p.name == 'UART0']
 
+
+class TestSVDCache:
+    def load(self, name, cache_dir):
+        svd = SVDFile.from_builtin(name)
+        svd.load(cache_dir=str(cache_dir))
+        return svd.device
+
+    @staticmethod
+    def describe(device):
+        return [(p.name, p.base_address, [(r.name, r.address_offset, r.size,
+                    [(f.name, f.bit_offset, f.bit_width) for f in r.fields]) for r in p.registers])
+                for p in device.peripherals]
+
+    def test_round_trip(self, tmp_path):
+        parsed = self.load('Musca_B1.svd', tmp_path)
+        assert len(list(tmp_path.glob('*' + CACHE_FILE_EXTENSION))) == 1
+        cached = self.load('Musca_B1.svd', tmp_path)
+        assert all(isinstance(p, CachedSVDPeripheral) for p in cached.peripherals)
+        assert cached.name == parsed.name
+        assert cached.cpu.name == parsed.cpu.name
+        assert self.describe(cached) == self.describe(parsed)
+        assert cached.to_dict() == parsed.to_dict()
+
+    def test_to_dict_before_access(self, tmp_path):
+        parsed = self.load('Musca_B1.svd', tmp_path)
+        cached = self.load('Musca_B1.svd', tmp_path)
+        assert all('_cache_record' in p.__dict__ for p in cached.peripherals)
+        assert cached.to_dict() == parsed.to_dict()
+
+    def test_registers_decoded_on_demand(self, tmp_path):
+        self.load('Musca_B1.svd', tmp_path)
+        cached = self.load('Musca_B1.svd', tmp_path)
+        uart0 = [p for p in cached.peripherals if p.name == 'UART0'][0]
+        assert all('_cache_record' in p.__dict__ for p in cached.peripherals)
+        assert uart0.interrupts
+        assert '_cache_record' in uart0.__dict__
+        assert uart0.registers
+        assert '_cache_record' not in uart0.__dict__
+        assert all(r.parent is uart0 for r in uart0._registers)
+
+    def test_invalid_cache_file(self, tmp_path):
+        parsed = self.load('Musca_B1.svd', tmp_path)
+        cache_file = next(tmp_path.glob('*' + CACHE_FILE_EXTENSION))
+        cache_file.write_bytes(b'{"version": 1}')
+        assert self.describe(self.load('Musca_B1.svd', tmp_path)) == self.describe(parsed)
+
+    def test_version_mismatch(self, tmp_path):
+        self.load('Musca_B1.svd', tmp_path)
+        cache_file = next(tmp_path.glob('*' + CACHE_FILE_EXTENSION))
+        data = cache_file.read_bytes()
+        cache_file.write_bytes(data.replace(b'"version":%d' % CACHE_FORMAT_VERSION, b'"version":0', 1))
+        assert SVDCache(str(tmp_path)).load(cache_file.stem) is None
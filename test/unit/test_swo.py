@@ -0,0 +1,133 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import pytest
+from unittest import mock
+
+from pyocd.trace import events
+from pyocd.trace.sink import (TraceEventSink, TraceEventTee)
+from pyocd.trace.swo import SWOParser
+from pyocd.trace.swv import SWVEventSink
+
+class RecordingSink(TraceEventSink):
+    def __init__(self):
+        self.events = []
+        self.batches = 0
+
+    def receive(self, event):
+        self.events.append(event)
+
+    def receive_batch(self, events):
+        self.batches += 1
+        super().receive_batch(events)
+
+def itm(port, data, width=1):
+    return bytes([(port << 3) | {1: 1, 2: 2, 4: 3}[width]]) + data.to_bytes(width, 'little')
+
+TS1 = b'\x10' # Local timestamp format 2, TS=1.
+OVERFLOW = b'\x70'
+SYNC = b'\x00' * 5 + b'\x80'
+
+@pytest.fixture
+def sink():
+    return RecordingSink()
+
+@pytest.fixture
+def parser(sink):
+    core = mock.Mock()
+    core.exception_number_to_name.return_value = "SysTick"
+    return SWOParser(core, sink)
+
+def describe(evts):
+    return [str(e) for e in evts]
+
+class TestSWOParser:
+    def test_itm_batched_until_timestamp(self, parser, sink):
+        parser.parse(itm(0, 0x41) + itm(1, 0x4342, 2) + itm(31, 0x12345678, 4))
+        assert sink.events == []
+        parser.parse(TS1)
+        assert sink.batches == 1
+        assert [(e.port, e.data, e.width, e.timestamp) for e in sink.events[:3]] == [
+            (0, 0x41, 1, 1), (1, 0x4342, 2, 1), (31, 0x12345678, 4, 1)]
+        # Timestamp events only set the time of the events before them.
+        assert len(sink.events) == 3
+        assert parser.bytes_parsed == 2 + 3 + 5 + 1
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 7])
+    def test_split_chunks(self, parser, sink, chunk_size):
+        stream = (SYNC + itm(2, 0xdeadbeef, 4) + b'\x08' + b'\x00' * 9 + b'\x80' + itm(3, 0x55)
+                + b'\xc0\x81\x01' + OVERFLOW)
+        expected = RecordingSink()
+        SWOParser(mock.Mock(), expected).parse(stream)
+        for i in range(0, len(stream), chunk_size):
+            parser.parse(stream[i:i + chunk_size])
+        assert describe(sink.events) == describe(expected.events)
+        assert len(sink.events) == 3
+
+    def test_extension_page(self, parser, sink):
+        # Extension with sh=0 and EX=2 selects ITM page 2, which a sync packet resets.
+        parser.parse(b'\x28' + itm(1, 0xaa) + SYNC + itm(1, 0xbb) + OVERFLOW)
+        assert [e.port for e in sink.events[:2]] == [65, 1]
+
+    def test_extension_continuation(self, parser, sink):
+        # EX[2:0] from the header, EX[9:3] from the payload.
+        parser.parse(b'\x98\x01' + itm(0, 0) + OVERFLOW)
+        assert sink.events[0].port == ((1 << 3) | 1) * 32
+
+    def test_local_timestamp_continuation(self, parser, sink):
+        # Format 1 local timestamp with TC=0 and a two byte payload, least significant bits first.
+        parser.parse(itm(0, 1) + b'\xc0\x81\x01')
+        assert sink.events[0].timestamp == 0x81
+
+    def test_hardware_packets(self, parser, sink):
+        parser.parse(b'\x0e\x0f\x10' # exception 15 entered
+                + b'\x17\x00\x10\x00\x00' # periodic PC
+                + b'\x47\x00\x20\x00\x00' + b'\x4e\x34\x12' # comparator 0 PC and address, merged
+                + b'\x8e\x55\x00' # comparator 0 write of a 16-bit value
+                + OVERFLOW)
+        assert describe(sink.events) == [
+            "[0] DWT: Exception #15 Entered SysTick",
+            "[0] DWT: PC=0x00001000",
+            "[0] DWT: Data Trace PC=0x00002000",
+            "[0] DWT: Data Trace Value=W:0x0055",
+            "[0] overflow",
+            ]
+        assert sink.events[2].address == 0x1234
+
+    def test_reset_discards_partial_packet(self, parser, sink):
+        parser.parse(b'\x03\x01')
+        parser.reset()
+        parser.parse(itm(0, 7) + OVERFLOW)
+        assert sink.events[0].data == 7
+
+class TestSWVEventSink:
+    def test_batch_matches_receive(self):
+        evts = [events.TraceITMEvent(0, 0x41, 1), events.TraceTimestamp(0, 1),
+                events.TraceITMEvent(0, 0x4443, 2), events.TraceITMEvent(0, 0xe9464645, 4)]
+        single = io.StringIO()
+        batch = io.StringIO()
+        for e in evts:
+            SWVEventSink(single).receive(e)
+        SWVEventSink(batch).receive_batch(evts)
+        assert batch.getvalue() == single.getvalue() == "ACDEFF\xe9"
+
+    def test_tee_forwards_batch(self):
+        sinks = [RecordingSink(), RecordingSink()]
+        tee = TraceEventTee()
+        tee.connect(sinks)
+        tee.receive_batch([events.TraceOverflow()])
+        assert all(s.batches == 1 and len(s.events) == 1 for s in sinks)
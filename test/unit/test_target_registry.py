@@ -0,0 +1,89 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import types
+
+from pyocd.core.soc_target import SoCTarget
+from pyocd.target import (registry, TARGET)
+from pyocd.target.builtin import (BUILTIN_TARGETS, BUILTIN_TARGET_INFO)
+from pyocd.target.registry import LazyTargetDict
+
+class Foo:
+    pass
+
+@pytest.fixture
+def imports(monkeypatch):
+    """@brief Record imports made by LazyTargetDict, serving a fake module."""
+    imported = []
+    def fake_import_module(name, package=None):
+        imported.append((name, package))
+        return types.SimpleNamespace(Foo=Foo)
+    monkeypatch.setattr(registry, 'import_module', fake_import_module)
+    registry._resolve.cache_clear()
+    yield imported
+    registry._resolve.cache_clear()
+
+class TestLazyTargetDict:
+    def test_no_import_until_access(self, imports):
+        d = LazyTargetDict({'foo': '.mod:Foo'}, package='pkg')
+        assert 'foo' in d
+        assert list(d) == ['foo']
+        assert len(d) == 1
+        assert imports == []
+        assert d['foo'] is Foo
+        assert imports == [('.mod', 'pkg')]
+
+    def test_set_class(self, imports):
+        d = LazyTargetDict({'foo': '.mod:Foo'})
+        assert d.is_reference('foo')
+        d['foo'] = int
+        assert not d.is_reference('foo')
+        assert d.get_reference('foo') is None
+        assert d['foo'] is int
+        assert imports == []
+
+    def test_copy(self, imports):
+        d = LazyTargetDict({'foo': '.mod:Foo'})
+        c = d.copy()
+        c['bar'] = int
+        del c['foo']
+        assert 'bar' not in d
+        assert d.get_reference('foo') == '.mod:Foo'
+        assert imports == []
+
+    def test_missing(self):
+        d = LazyTargetDict()
+        with pytest.raises(KeyError):
+            d['foo']
+        assert d.get('foo') is None
+
+class TestBuiltinTargets:
+    def test_target_is_lazy(self):
+        assert isinstance(TARGET, LazyTargetDict)
+        assert all(TARGET.get_reference(name) == BUILTIN_TARGETS.get_reference(name) for name in BUILTIN_TARGETS)
+
+    def test_all_resolve(self):
+        for name in BUILTIN_TARGETS:
+            assert issubclass(BUILTIN_TARGETS[name], SoCTarget)
+
+    def test_manifest_matches(self):
+        # If this fails, run scripts/generate_builtin_target_manifest.py.
+        assert list(BUILTIN_TARGET_INFO.keys()) == list(BUILTIN_TARGETS.keys())
+        for name, info in BUILTIN_TARGET_INFO.items():
+            klass = BUILTIN_TARGETS[name]
+            assert info.vendor == klass.VENDOR
+            assert info.part_number == getattr(klass, 'PART_NUMBER', klass.__name__)
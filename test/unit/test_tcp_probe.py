@@ -0,0 +1,226 @@
+# pyOCD debugger
+# Copyright (c) 2023 Chris Reed
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import threading
+from unittest import mock
+
+from pyocd.core import exceptions
+from pyocd.core.memory_interface import MemoryInterface
+from pyocd.coresight.ap import APv1Address
+from pyocd.probe.debug_probe import DebugProbe
+from pyocd.probe.shared_probe_proxy import SharedDebugProbeProxy
+from pyocd.probe.tcp_client_probe import TCPClientProbe
+from pyocd.probe.tcp_probe_server import (DebugProbeRequestHandler, TCPProbeServer)
+from pyocd.utility import conversion
+
+class FakeMemory(MemoryInterface):
+    def __init__(self):
+        self.data = bytearray(256)
+
+    def write_memory(self, addr, data, transfer_size=32):
+        if addr >= len(self.data):
+            raise exceptions.TransferFaultError("fault", fault_address=addr)
+        self.data[addr:addr + transfer_size // 8] = data.to_bytes(transfer_size // 8, 'little')
+
+    def read_memory(self, addr, transfer_size=32, now=True):
+        value = int.from_bytes(self.data[addr:addr + transfer_size // 8], 'little')
+        return value if now else (lambda: value)
+
+    def read_memory_block_bytes(self, addr, size):
+        return self.data[addr:addr + size]
+
+    def write_memory_block_bytes(self, addr, data):
+        self.data[addr:addr + len(data)] = data
+
+    def read_memory_block8(self, addr, size):
+        return list(self.read_memory_block_bytes(addr, size))
+
+    def write_memory_block8(self, addr, data):
+        self.write_memory_block_bytes(addr, bytes(data))
+
+    def read_memory_block32(self, addr, size):
+        return conversion.bytes_to_u32le_list(self.read_memory_block_bytes(addr, size * 4))
+
+    def write_memory_block32(self, addr, data):
+        self.write_memory_block_bytes(addr, conversion.u32le_list_to_bytes(data))
+
+class FakeProbe(DebugProbe):
+    """@brief Probe with an AP register file and one memory interface."""
+    def __init__(self):
+        super().__init__()
+        self.ap_regs = {}
+        self.memory = FakeMemory()
+
+    @property
+    def unique_id(self):
+        return "fake"
+
+    @property
+    def vendor_name(self):
+        return "Vendor"
+
+    @property
+    def product_name(self):
+        return "Product"
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def read_ap(self, addr, now=True):
+        value = self.ap_regs.get(addr, 0)
+        return value if now else (lambda: value)
+
+    def write_ap(self, addr, data):
+        if addr == 0xbad:
+            raise exceptions.TransferFaultError("fault")
+        self.ap_regs[addr] = data
+
+    def read_ap_multiple(self, addr, count=1, now=True):
+        values = [self.ap_regs.get(addr, 0)] * count
+        return values if now else (lambda: values)
+
+    def write_ap_multiple(self, addr, values):
+        for v in values:
+            self.write_ap(addr, v)
+
+    def get_memory_interface_for_ap(self, ap_address):
+        return self.memory
+
+@pytest.fixture(params=[1, 2])
+def remote(request, monkeypatch):
+    """@brief Serve a FakeProbe on localhost and yield (client, probe) for each protocol version."""
+    monkeypatch.setattr(TCPClientProbe, 'PROTOCOL_VERSION', request.param)
+    probe = FakeProbe()
+    server = TCPProbeServer(('localhost', 0), mock.Mock(log_tracebacks=False), SharedDebugProbeProxy(probe))
+    server.server_bind()
+    server.server_activate()
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+
+    client = TCPClientProbe("localhost:%i" % server.socket.getsockname()[1])
+    client.open()
+    assert client.protocol_version == request.param
+    yield client, probe
+
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+class TestTCPProbe:
+    def test_ap_access(self, remote):
+        client, probe = remote
+        client.write_ap(0x10, 0x1234)
+        assert client.read_ap(0x10) == 0x1234
+        assert client.read_ap_multiple(0x10, 3) == [0x1234] * 3
+
+    def test_deferred_reads(self, remote):
+        client, probe = remote
+        callbacks = []
+        for i in range(8):
+            client.write_ap(0x20, i)
+            callbacks.append(client.read_ap(0x20, now=False))
+        assert [cb() for cb in callbacks] == list(range(8))
+
+    def test_ap_multiple_bytes(self, remote):
+        client, probe = remote
+        client.write_ap_multiple_bytes(0x30, bytes(range(8)))
+        client.flush()
+        assert probe.ap_regs[0x30] == 0x07060504
+        assert client.read_ap_multiple_bytes(0x30, 2) == bytes([4, 5, 6, 7]) * 2
+
+    def test_write_error_raised_by_flush(self, remote):
+        client, probe = remote
+        if client.protocol_version >= 2:
+            client.write_ap(0xbad, 0)
+            with pytest.raises(exceptions.TransferFaultError):
+                client.flush()
+            # The error is only reported once.
+            client.flush()
+        else:
+            with pytest.raises(exceptions.TransferFaultError):
+                client.write_ap(0xbad, 0)
+
+    def test_write_error_not_raised_by_earlier_read(self, remote):
+        client, probe = remote
+        if client.protocol_version < 2:
+            return
+        probe.ap_regs[0x10] = 5
+        read_cb = client.read_ap(0x10, now=False)
+        client.write_ap(0xbad, 0)
+        later_cb = client.read_ap(0x10, now=False)
+        # The read sent before the failed write gets its own result.
+        assert read_cb() == 5
+        # The error is raised by the first request sent after the write.
+        with pytest.raises(exceptions.TransferFaultError):
+            later_cb()
+        client.flush()
+
+    def test_uncalled_deferred_reads_released(self, remote):
+        client, probe = remote
+        if client.protocol_version < 2:
+            return
+        for _ in range(8):
+            client.read_ap(0x10, now=False)
+        client.flush()
+        assert not client._outstanding
+        assert not client._posted_errors
+
+    def test_memory_blocks(self, remote):
+        client, probe = remote
+        memif = client.get_memory_interface_for_ap(APv1Address(0))
+        memif.write_memory_block32(0x10, [0x11223344, 0x55667788])
+        assert memif.read_memory_block32(0x10, 2) == [0x11223344, 0x55667788]
+        memif.write_memory_block8(0x21, [1, 2, 3])
+        assert memif.read_memory_block8(0x20, 5) == [0, 1, 2, 3, 0]
+        memif.write_memory_block_bytes(0x40, bytes(range(64)))
+        assert memif.read_memory_block_bytes(0x40, 64) == bytes(range(64))
+        memif.write32(0x80, 0xdeadbeef)
+        assert memif.read32(0x80) == 0xdeadbeef
+        assert probe.memory.data[0x80:0x84] == bytes([0xef, 0xbe, 0xad, 0xde])
+
+    def test_many_pipelined_requests(self, remote):
+        client, probe = remote
+        memif = client.get_memory_interface_for_ap(APv1Address(0))
+        for i in range(TCPClientProbe.MAX_OUTSTANDING_REQUESTS * 2):
+            memif.write8(i & 0xff, i & 0xff)
+        assert memif.read_memory_block_bytes(0, 256) == bytes(range(256))
+
+class TestProtocolFallback:
+    def test_v1_server(self, monkeypatch):
+        # A server that only supports v1 causes the client to fall back.
+        monkeypatch.setattr(DebugProbeRequestHandler, 'SUPPORTED_PROTOCOL_VERSIONS', (1,))
+        server = TCPProbeServer(('localhost', 0), mock.Mock(log_tracebacks=False),
+                SharedDebugProbeProxy(FakeProbe()))
+        server.server_bind()
+        server.server_activate()
+        threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+        try:
+            client = TCPClientProbe("localhost:%i" % server.socket.getsockname()[1])
+            client.open()
+            assert client.protocol_version == 1
+            client.write_ap(0x10, 5)
+            assert client.read_ap(0x10) == 5
+            client.close()
+        finally:
+            server.shutdown()
+            server.server_close()